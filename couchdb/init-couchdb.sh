@@ -158,6 +158,9 @@ DESIGN_DOC='{
         "by_type": {
             "map": "function(doc) { if(doc.type) emit(doc.type, null); }"
         },
+        "by_access": {
+            "map": "function(doc) { if(!doc.type || !doc.access) return; for (var i = 0; i < doc.access.length; i++) { if(doc.type === \"mark\" && doc.access[i] === doc.owner_id) continue; emit([doc.access[i], doc.type, doc.updated_at || \"\"], null); } }"
+        },
         "pending_items": {
             "map": "function(doc) { if(doc.type === \"item\" && doc.status === \"pending\") emit(doc._id, {wishlist_id: doc.wishlist_id, source_url: doc.source_url}); }"
         },
@@ -171,6 +174,9 @@ DESIGN_DOC='{
         "shares_by_token": {
             "map": "function(doc) { if(doc.type === \"share\" && !doc.revoked) emit(doc.token, null); }"
         },
+        "item_images": {
+            "map": "function(doc) { if(doc.type === \"item_image\" && doc.item_id) emit(doc.item_id, null); }"
+        },
         "users_by_email": {
             "map": "function(doc) { if(doc.type === \"user\" && doc.email) emit(doc.email.toLowerCase(), null); }"
         }
@@ -32,6 +32,14 @@ class Settings(BaseSettings):
     couchdb_admin_user: str = "admin"
     couchdb_admin_password: str = ""
 
+    # Sync: write full pulls to the client row by row instead of building the
+    # whole response in memory
+    sync_stream_pulls: bool = True
+
+    # Sync: how long users removed from a document's access keep receiving it
+    # as a tombstone in delta pulls
+    sync_access_removed_retention_days: int = 30
+
     # JWT
     jwt_secret_key: str = ""
     jwt_algorithm: str = "HS256"
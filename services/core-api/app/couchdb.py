@@ -1,6 +1,9 @@
 """CouchDB client for async operations."""
 
+import json
 import logging
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
 from typing import Any
 from uuid import uuid4
 
@@ -8,9 +11,16 @@ import aiohttp
 from aiohttp import BasicAuth
 
 from app.config import settings
+from app.json_stream import iter_array_objects
 
 logger = logging.getLogger(__name__)
 
+# Read size for streamed responses
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# View of item-resolver's full-size image documents keyed by item ID
+ITEM_IMAGES_VIEW = ("app", "item_images")
+
 
 class CouchDBError(Exception):
     """Base CouchDB error."""
@@ -44,6 +54,44 @@ class ConflictError(CouchDBError):
         )
 
 
+def set_access(
+    doc: dict[str, Any],
+    access: list[str],
+    *,
+    stored: dict[str, Any] | None = None,
+    now: datetime | None = None,
+) -> None:
+    """Replace a document's access array, remembering who lost access.
+
+    Delta pulls only see documents whose selector still matches the user;
+    `access_removed` keeps former readers matching, so their next pull
+    reports the document as a tombstone. `access_removed_at` records when
+    each of them was removed, and entries older than
+    `sync_access_removed_retention_days` are dropped: a client that has not
+    pulled for that long keeps a stale copy until its next full pull.
+    `stored` is the version being replaced, when `doc` is a new revision of it.
+    """
+    stored = doc if stored is None else stored
+    now = now or datetime.now(timezone.utc)
+    cutoff = (now - timedelta(days=settings.sync_access_removed_retention_days)).isoformat()
+    removed_at = dict(stored.get("access_removed_at") or {})
+    for uid in stored.get("access_removed") or []:
+        # Entries from before removal times were recorded start their retention now
+        removed_at.setdefault(uid, now.isoformat())
+    for uid in stored.get("access") or []:
+        if uid not in access and uid not in removed_at:
+            removed_at[uid] = now.isoformat()
+    removed_at = {uid: at for uid, at in removed_at.items() if uid not in access and at >= cutoff}
+
+    doc["access"] = access
+    if removed_at:
+        doc["access_removed"] = list(removed_at)
+        doc["access_removed_at"] = removed_at
+    else:
+        doc.pop("access_removed", None)
+        doc.pop("access_removed_at", None)
+
+
 class CouchDBClient:
     """Async CouchDB client."""
 
@@ -103,18 +151,23 @@ class CouchDBClient:
             ) as response:
                 data = await response.json()
                 if response.status >= 400:
-                    error = data.get("error", "unknown")
-                    reason = data.get("reason", "Unknown error")
-                    if response.status == 404:
-                        raise DocumentNotFoundError(url)
-                    if response.status == 409:
-                        raise ConflictError(url)
-                    raise CouchDBError(reason, response.status, error)
+                    self._raise_for_error(response.status, data, url)
                 return data
         except aiohttp.ClientError as e:
             logger.error(f"CouchDB request error: {e}")
             raise CouchDBError(str(e), 503, "connection_error")
 
+    @staticmethod
+    def _raise_for_error(status: int, data: dict, url: str) -> None:
+        """Raise the error matching a CouchDB error response."""
+        error = data.get("error", "unknown")
+        reason = data.get("reason", "Unknown error")
+        if status == 404:
+            raise DocumentNotFoundError(url)
+        if status == 409:
+            raise ConflictError(url)
+        raise CouchDBError(reason, status, error)
+
     # Database operations
 
     async def db_info(self) -> dict:
@@ -134,6 +187,32 @@ class CouchDBClient:
             raise ValueError("Document must have an _id field")
         return await self._request("PUT", f"{self.db_url}/{doc_id}", json=doc)
 
+    async def get_many(self, doc_ids: list[str]) -> dict[str, dict]:
+        """Get several documents in one request, keyed by ID; missing and deleted ones are left out."""
+        if not doc_ids:
+            return {}
+        result = await self._request(
+            "POST",
+            f"{self.db_url}/_all_docs",
+            json={"keys": list(dict.fromkeys(doc_ids))},
+            params={"include_docs": "true"},
+        )
+        return {row["id"]: row["doc"] for row in result.get("rows", []) if row.get("doc")}
+
+    async def get_attachment(self, doc_id: str, name: str) -> tuple[bytes, str]:
+        """Get a document attachment as (data, content type)."""
+        url = f"{self.db_url}/{doc_id}/{name}"
+        session = await self._get_session()
+        try:
+            async with session.get(url) as response:
+                if response.status >= 400:
+                    self._raise_for_error(response.status, await response.json(content_type=None), url)
+                content_type = response.headers.get("Content-Type", "application/octet-stream")
+                return await response.read(), content_type
+        except aiohttp.ClientError as e:
+            logger.error(f"CouchDB request error: {e}")
+            raise CouchDBError(str(e), 503, "connection_error")
+
     async def delete(self, doc_id: str, rev: str) -> dict:
         """Delete a document."""
         return await self._request(
@@ -181,6 +260,27 @@ class CouchDBClient:
         docs = await self.find(selector, fields=fields, limit=1)
         return docs[0] if docs else None
 
+    async def changes(
+        self,
+        since: str = "0",
+        selector: dict | None = None,
+        include_docs: bool = False,
+        limit: int | None = None,
+    ) -> dict:
+        """Read the changes feed since a sequence, optionally filtered by a Mango selector."""
+        params: dict[str, Any] = {"since": since}
+        if include_docs:
+            params["include_docs"] = "true"
+        if limit:
+            params["limit"] = limit
+
+        url = f"{self.db_url}/_changes"
+
+        if selector is not None:
+            params["filter"] = "_selector"
+            return await self._request("POST", url, json={"selector": selector}, params=params)
+        return await self._request("GET", url, params=params)
+
     # View operations
 
     async def view(
@@ -191,33 +291,101 @@ class CouchDBClient:
         keys: list | None = None,
         startkey: Any | None = None,
         endkey: Any | None = None,
+        startkey_docid: str | None = None,
         include_docs: bool = False,
         reduce: bool = False,
         group: bool = False,
         limit: int | None = None,
+        descending: bool = False,
     ) -> dict:
         """Query a view."""
+        params = self._view_params(
+            key=key,
+            startkey=startkey,
+            endkey=endkey,
+            startkey_docid=startkey_docid,
+            include_docs=include_docs,
+            reduce=reduce,
+            group=group,
+            limit=limit,
+            descending=descending,
+        )
+        url = f"{self.db_url}/_design/{design_doc}/_view/{view_name}"
+
+        if keys:
+            return await self._request("POST", url, json={"keys": keys}, params=params)
+        return await self._request("GET", url, params=params)
+
+    async def stream_view(
+        self,
+        design_doc: str,
+        view_name: str,
+        startkey: Any | None = None,
+        endkey: Any | None = None,
+        startkey_docid: str | None = None,
+        include_docs: bool = False,
+        limit: int | None = None,
+        descending: bool = False,
+    ) -> AsyncIterator[bytes]:
+        """Query a view and yield the raw JSON of each row as it arrives.
+
+        Unlike view(), the response is never held in memory as a whole. Errors
+        are raised on the first iteration, before any row is yielded.
+        """
+        params = self._view_params(
+            startkey=startkey,
+            endkey=endkey,
+            startkey_docid=startkey_docid,
+            include_docs=include_docs,
+            limit=limit,
+            descending=descending,
+        )
+        url = f"{self.db_url}/_design/{design_doc}/_view/{view_name}"
+
+        session = await self._get_session()
+        try:
+            async with session.get(url, params=params) as response:
+                if response.status >= 400:
+                    self._raise_for_error(response.status, await response.json(), url)
+                async for row in iter_array_objects(response.content.iter_chunked(STREAM_CHUNK_SIZE), "rows"):
+                    yield row
+        except aiohttp.ClientError as e:
+            logger.error(f"CouchDB request error: {e}")
+            raise CouchDBError(str(e), 503, "connection_error")
+
+    @staticmethod
+    def _view_params(
+        key: Any | None = None,
+        startkey: Any | None = None,
+        endkey: Any | None = None,
+        startkey_docid: str | None = None,
+        include_docs: bool = False,
+        reduce: bool = False,
+        group: bool = False,
+        limit: int | None = None,
+        descending: bool = False,
+    ) -> dict[str, Any]:
+        # View keys are JSON values (strings, numbers or arrays for range queries)
         params: dict[str, Any] = {}
         if key is not None:
-            params["key"] = f'"{key}"' if isinstance(key, str) else key
+            params["key"] = json.dumps(key)
         if startkey is not None:
-            params["startkey"] = f'"{startkey}"' if isinstance(startkey, str) else startkey
+            params["startkey"] = json.dumps(startkey)
         if endkey is not None:
-            params["endkey"] = f'"{endkey}"' if isinstance(endkey, str) else endkey
+            params["endkey"] = json.dumps(endkey)
+        if startkey_docid is not None:
+            params["startkey_docid"] = startkey_docid
         if include_docs:
             params["include_docs"] = "true"
+        if descending:
+            params["descending"] = "true"
         if reduce:
             params["reduce"] = "true"
         if group:
             params["group"] = "true"
         if limit:
             params["limit"] = limit
-
-        url = f"{self.db_url}/_design/{design_doc}/_view/{view_name}"
-
-        if keys:
-            return await self._request("POST", url, json={"keys": keys}, params=params)
-        return await self._request("GET", url, params=params)
+        return params
 
     # Helper methods for document types
 
@@ -410,13 +578,13 @@ class CouchDBClient:
         wishlist = await self.get(wishlist_id)
 
         # Update wishlist access
-        access = wishlist.get("access", [])
+        access = list(wishlist.get("access", []))
         if action == "add" and user_id not in access:
             access.append(user_id)
         elif action == "remove" and user_id in access:
             access.remove(user_id)
 
-        wishlist["access"] = access
+        set_access(wishlist, access)
         await self.put(wishlist)
 
         # Update all items in this wishlist (including deleted ones for consistency)
@@ -428,14 +596,42 @@ class CouchDBClient:
 
         if items:
             for item in items:
-                item_access = item.get("access", [])
+                item_access = list(item.get("access", []))
                 if action == "add" and user_id not in item_access:
                     item_access.append(user_id)
                 elif action == "remove" and user_id in item_access:
                     item_access.remove(user_id)
-                item["access"] = item_access
+                set_access(item, item_access)
 
             await self.bulk_docs(items)
+            await self.sync_item_images(items)
+
+    async def get_item_images(self, item_ids: list[str]) -> dict[str, dict]:
+        """Full-size image documents of items, keyed by item ID; items without one are left out."""
+        if not item_ids:
+            return {}
+        result = await self.view(*ITEM_IMAGES_VIEW, keys=list(dict.fromkeys(item_ids)), include_docs=True)
+        return {row["key"]: row["doc"] for row in result.get("rows", []) if row.get("doc")}
+
+    async def sync_item_images(self, items: list[dict]) -> None:
+        """Make the full-size image documents of written items follow them.
+
+        An image document carries a copy of its item's access array, so it is
+        updated on every access change and deleted with the item.
+        """
+        by_item_id = {item["_id"]: item for item in items}
+        images = await self.get_item_images(list(by_item_id))
+        updates = []
+        for item_id, image in images.items():
+            item = by_item_id[item_id]
+            if item.get("_deleted"):
+                updates.append({"_id": image["_id"], "_rev": image["_rev"], "_deleted": True})
+            elif image.get("access") != item.get("access", []):
+                # The attachment stub is kept as is
+                image["access"] = list(item.get("access", []))
+                updates.append(image)
+        if updates:
+            await self.bulk_docs(updates)
 
 
 # Global client instance
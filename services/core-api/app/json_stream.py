@@ -0,0 +1,86 @@
+"""Incremental splitting of large CouchDB JSON responses."""
+
+import json
+import re
+from collections.abc import AsyncIterable, AsyncIterator
+
+# Outside strings only these bytes change the nesting. Inside strings only a
+# quote or a backslash matters; both are found with bytes.find (memchr), so
+# long base64 values are skipped at memory speed.
+_STRUCTURAL = re.compile(rb'["{}\[\]]')
+
+
+async def iter_array_objects(chunks: AsyncIterable[bytes], key: str) -> AsyncIterator[bytes]:
+    """Yield the raw JSON of each object in the top-level array `key`.
+
+    Only the object being read and the current chunk are kept in memory,
+    so a view response of any size is split with bounded memory. The
+    objects are not parsed or validated here; other top-level values and
+    non-object array elements are skipped.
+    """
+    target = json.dumps(key).encode()
+    buf = bytearray()
+    pos = 0
+    depth = 0
+    in_string = False
+    string_start = -1
+    last_key = b""
+    in_target = False
+    item_start = -1
+
+    async for chunk in chunks:
+        buf += chunk
+        while pos < len(buf):
+            if in_string:
+                quote = buf.find(b'"', pos)
+                backslash = buf.find(b"\\", pos, len(buf) if quote < 0 else quote)
+                if backslash >= 0:
+                    if backslash + 1 >= len(buf):
+                        # The escaped byte is in the next chunk
+                        pos = backslash
+                        break
+                    pos = backslash + 2
+                    continue
+                if quote < 0:
+                    pos = len(buf)
+                    break
+                in_string = False
+                pos = quote + 1
+                if depth == 1:
+                    last_key = bytes(buf[string_start:pos])
+                continue
+
+            m = _STRUCTURAL.search(buf, pos)
+            if m is None:
+                pos = len(buf)
+                break
+            c = m.group()
+            pos = m.end()
+            if c == b'"':
+                in_string = True
+                string_start = m.start()
+            elif c == b"{" or c == b"[":
+                depth += 1
+                if depth == 2 and c == b"[" and last_key == target:
+                    in_target = True
+                elif depth == 3 and in_target and c == b"{":
+                    item_start = m.start()
+            else:
+                if depth == 3 and item_start >= 0:
+                    yield bytes(buf[item_start:pos])
+                    item_start = -1
+                elif depth == 2:
+                    in_target = False
+                depth -= 1
+
+        # Drop what has been consumed; keep a partial object or top-level key
+        keep_from = item_start if item_start >= 0 else (string_start if in_string and depth == 1 else pos)
+        if keep_from > 0:
+            del buf[:keep_from]
+            pos -= keep_from
+            string_start -= keep_from
+            if item_start >= 0:
+                item_start -= keep_from
+
+    if depth != 0 or in_string:
+        raise ValueError("Truncated JSON response")
@@ -25,6 +25,7 @@ from app.routers.sync_couchdb import router as sync_router
 from app.routers.oauth import router as oauth_router
 from app.routers.share import router as share_router
 from app.routers.shared import router as shared_router
+from app.routers.items import router as items_router
 
 
 @asynccontextmanager
@@ -87,6 +88,7 @@ app.include_router(sync_router)    # /api/v2/sync
 app.include_router(oauth_router)   # /api/v1/oauth (kept for Google/Yandex OAuth)
 app.include_router(share_router)   # /api/v1/wishlists/{id}/share
 app.include_router(shared_router)  # /api/v1/shared/{token}
+app.include_router(items_router)   # /api/v2/items/{id}/image
 
 
 @app.get("/")
@@ -0,0 +1,163 @@
+"""Compare buffered and streamed full pulls.
+
+Usage:
+
+    python -m app.pull_benchmark [--docs 500] [--image-kb 200] [--runs 3]
+
+A local fake CouchDB serves one access view page of `--docs` item
+documents, each carrying an `--image-kb` base64 image. Each pull mode then
+runs `--runs` times in its own process: the buffered path (parse the whole
+view response, validate PullResponse, serialize it) and the streamed path
+(the body StreamingResponse would send). Peak RSS growth over the process's
+idle baseline and the median time to first byte and to the last byte are
+printed as JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import sys
+import time
+from typing import Any
+
+from aiohttp import web
+
+from app.couchdb import STREAM_CHUNK_SIZE, CouchDBClient
+from app.routers import sync_couchdb
+
+USER_ID = "user:benchmark"
+DATABASE = "benchmark"
+
+
+def _view_body(docs: int, image_kb: int) -> bytes:
+    # The layout CouchDB itself uses: one row per line
+    image = "data:image/webp;base64," + "A" * (image_kb * 1024)
+    rows = []
+    for i in range(docs):
+        updated_at = f"2024-01-01T00:00:{i % 60:02d}.{i:06d}Z"
+        doc = {
+            "_id": f"item:{i:08d}",
+            "_rev": "1-benchmark",
+            "type": "item",
+            "title": f"Item {i}",
+            "access": [USER_ID],
+            "updated_at": updated_at,
+            "image_base64": image,
+        }
+        rows.append(json.dumps({"id": doc["_id"], "key": [USER_ID, "item", updated_at], "value": None, "doc": doc}))
+    joined = ",\r\n".join(rows)
+    return f'{{"total_rows":{docs},"offset":0,"rows":[\r\n{joined}\r\n]}}\n'.encode()
+
+
+async def _serve(body: bytes) -> web.AppRunner:
+    async def db_info(_request: web.Request) -> web.Response:
+        return web.json_response({"db_name": DATABASE, "update_seq": "1-benchmark"})
+
+    async def view(request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "application/json"})
+        await response.prepare(request)
+        for start in range(0, len(body), STREAM_CHUNK_SIZE):
+            await response.write(body[start : start + STREAM_CHUNK_SIZE])
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get(f"/{DATABASE}", db_info)
+    app.router.add_get(f"/{DATABASE}/_design/app/_view/by_access", view)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    return runner
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _pull_once(db: CouchDBClient, mode: str) -> dict[str, float]:
+    start = time.perf_counter()
+    if mode == "buffered":
+        result = await sync_couchdb._pull_all("items", USER_ID, db)
+        # What FastAPI does with the returned model: validate, dump, JSONResponse.render()
+        content = sync_couchdb.PullResponse.model_validate(result).model_dump(mode="json")
+        body = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+        first_byte = time.perf_counter()
+        size = len(body)
+    else:
+        response = await sync_couchdb._stream_all("items", USER_ID, db)
+        first_byte = None
+        size = 0
+        async for chunk in response.body_iterator:
+            first_byte = first_byte or time.perf_counter()
+            size += len(chunk)
+    end = time.perf_counter()
+    return {"ttfb_ms": (first_byte - start) * 1000, "total_ms": (end - start) * 1000, "bytes": size}
+
+
+async def _worker(url: str, mode: str, runs: int) -> dict[str, Any]:
+    db = CouchDBClient(url=url, database=DATABASE, username="", password="")
+    try:
+        # Warm up the connection and imports before taking the baseline
+        await db.db_info()
+        baseline = _peak_rss_mb()
+        samples = [await _pull_once(db, mode) for _ in range(runs)]
+    finally:
+        await db.close()
+    return {
+        "peak_rss_growth_mb": round(_peak_rss_mb() - baseline, 1),
+        "ttfb_ms": round(statistics.median(s["ttfb_ms"] for s in samples), 1),
+        "total_ms": round(statistics.median(s["total_ms"] for s in samples), 1),
+        "response_bytes": samples[0]["bytes"],
+    }
+
+
+async def compare(*, docs: int, image_kb: int, runs: int) -> dict[str, Any]:
+    body = _view_body(docs, image_kb)
+    runner = await _serve(body)
+    port = runner.addresses[0][1]
+    report: dict[str, Any] = {"docs": docs, "view_response_mb": round(len(body) / 2**20, 1)}
+    try:
+        for mode in ("buffered", "streamed"):
+            # Separate processes, so that one mode's peak RSS does not hide the other's
+            proc = await asyncio.create_subprocess_exec(
+                sys.executable,
+                "-m",
+                "app.pull_benchmark",
+                "--worker",
+                mode,
+                "--url",
+                f"http://127.0.0.1:{port}",
+                "--runs",
+                str(runs),
+                stdout=asyncio.subprocess.PIPE,
+            )
+            stdout, _ = await proc.communicate()
+            if proc.returncode != 0:
+                raise RuntimeError(f"{mode} worker failed with exit code {proc.returncode}")
+            report[mode] = json.loads(stdout)
+    finally:
+        await runner.cleanup()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=sync_couchdb.PULL_PAGE_SIZE)
+    parser.add_argument("--image-kb", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--worker", choices=("buffered", "streamed"), help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    runs = max(1, args.runs)
+    if args.worker:
+        print(json.dumps(asyncio.run(_worker(args.url, args.worker, runs))))
+        return
+    report = asyncio.run(compare(docs=args.docs, image_kb=args.image_kb, runs=runs))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
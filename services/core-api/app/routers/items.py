@@ -0,0 +1,71 @@
+"""Item image endpoint (CouchDB-based).
+
+When item-resolver is configured to put a thumbnail into item documents,
+the full-size image is kept as an attachment of a separate `item_image`
+document that is not part of the sync pull. Clients load it from here.
+"""
+
+import logging
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+
+from app.couchdb import CouchDBClient, DocumentNotFoundError, get_couchdb
+from app.dependencies import CurrentUserCouchDB
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v2/items", tags=["items"])
+
+# Attachment name item-resolver stores the image under
+IMAGE_ATTACHMENT = "image"
+
+
+async def get_db() -> CouchDBClient:
+    """Get CouchDB client dependency."""
+    return get_couchdb()
+
+
+def normalize_item_id(item_id: str) -> str:
+    """Normalize item ID to CouchDB format (item:uuid)."""
+    if item_id.startswith("item:"):
+        return item_id
+    return f"item:{item_id}"
+
+
+@router.get(
+    "/{item_id}/image",
+    response_class=Response,
+    responses={
+        200: {"description": "Full-size item image", "content": {"image/*": {}}},
+        404: {"description": "Item has no full-size image or is not accessible"},
+    },
+)
+async def get_item_image(
+    item_id: str,
+    current_user: CurrentUserCouchDB,
+    db: Annotated[CouchDBClient, Depends(get_db)],
+) -> Response:
+    """Serve an item's full-size image to users with access to the item."""
+    not_found = HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Image not found",
+    )
+
+    item_doc_id = normalize_item_id(item_id)
+    image = (await db.get_item_images([item_doc_id])).get(item_doc_id)
+    # The image document carries a copy of its item's access array.
+    # Users without access get a 404 rather than learning the image exists.
+    if image is None or current_user["_id"] not in (image.get("access") or []):
+        raise not_found
+
+    try:
+        data, content_type = await db.get_attachment(image["_id"], IMAGE_ATTACHMENT)
+    except DocumentNotFoundError:
+        raise not_found
+
+    return Response(
+        content=data,
+        media_type=content_type,
+        headers={"Cache-Control": "private, max-age=3600"},
+    )
@@ -4,15 +4,22 @@ Note: This is an API-based pull/push sync, not native CouchDB replication protoc
 The frontend's PouchDB uses these endpoints to sync data with the CouchDB backend.
 """
 
+import base64
+import binascii
+import json
 import logging
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
-from typing import Annotated, Literal
+from typing import Annotated, Any, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from app.couchdb import CouchDBClient, ConflictError, DocumentNotFoundError, get_couchdb
+from app.config import settings
+from app.couchdb import CouchDBClient, CouchDBError, DocumentNotFoundError, get_couchdb, set_access
 from app.dependencies import CurrentUserCouchDB
+from app.schemas.sync import SyncCheckpoint
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +27,32 @@ router = APIRouter(prefix="/api/v2/sync", tags=["sync-v2"])
 
 CollectionType = Literal["wishlists", "items", "marks", "bookmarks", "users", "shares"]
 
+# Fields that are only changed via dedicated auth endpoints, never by sync
+SENSITIVE_USER_FIELDS = ("password_hash", "email", "refresh_tokens")
+
+# Server-side bookkeeping of who lost access; never sent to clients
+SERVER_ONLY_FIELDS = ("access_removed", "access_removed_at")
+
+# Design document and view keyed [user_id, type, updated_at] for every access entry
+ACCESS_VIEW = ("app", "by_access")
+
+# Documents per pull page; a page bigger than this would make a request's
+# memory grow with the size of the account
+PULL_PAGE_SIZE = 500
+
+# Streamed pulls are written to the client in chunks of about this size
+STREAM_FLUSH_BYTES = 64 * 1024
+
+# Map collection to document type
+TYPE_MAP = {
+    "wishlists": "wishlist",
+    "items": "item",
+    "marks": "mark",
+    "bookmarks": "bookmark",
+    "users": "user",
+    "shares": "share",
+}
+
 
 class SyncDocument(BaseModel):
     """A document being synced."""
@@ -37,6 +70,8 @@ class PullResponse(BaseModel):
     """Response for pull operation."""
 
     documents: list[dict]
+    checkpoint: SyncCheckpoint | None = None
+    next_cursor: str | None = None
 
 
 class PushRequest(BaseModel):
@@ -64,6 +99,264 @@ async def get_db() -> CouchDBClient:
     return get_couchdb()
 
 
+def _pull_selector(collection: str, user_id: str) -> dict:
+    """Mango selector for the documents of a collection a user may see."""
+    # For users, only return the user's own document
+    if collection == "users":
+        return {
+            "type": "user",
+            "_id": user_id,
+        }
+
+    # For shares, only return shares owned by the user
+    if collection == "shares":
+        return {
+            "type": "share",
+            "owner_id": user_id,
+        }
+
+    # Find all documents of this type that user has access to
+    return {
+        "type": TYPE_MAP[collection],
+        "access": {"$elemMatch": {"$eq": user_id}},
+    }
+
+
+def _changes_selector(collection: str, user_id: str) -> dict:
+    """Like `_pull_selector`, but also matching documents the user has lost access to."""
+    selector = _pull_selector(collection, user_id)
+    if "access" not in selector:
+        return selector
+    return {
+        "type": selector["type"],
+        "$or": [
+            {"access": selector["access"]},
+            {"access_removed": selector["access"]},
+        ],
+    }
+
+
+def _hidden_from_user(collection: str, doc: dict, user_id: str) -> bool:
+    """Marks are hidden from the wishlist owner ("surprise mode")."""
+    return collection == "marks" and doc.get("owner_id") == user_id
+
+
+def _is_gone(collection: str, doc: dict) -> bool:
+    """Deleted documents and revoked shares are no longer part of the collection."""
+    return bool(doc.get("_deleted")) or (collection == "shares" and doc.get("revoked") is True)
+
+
+def _revoked_from_user(collection: str, doc: dict, user_id: str) -> bool:
+    """Documents the user has been removed from are gone for them."""
+    return collection not in ("users", "shares") and user_id not in doc.get("access", [])
+
+
+def _for_client(doc: dict) -> dict:
+    """The document as clients see it, without server-only fields."""
+    return {k: v for k, v in doc.items() if k not in SERVER_ONLY_FIELDS}
+
+
+def _tombstone(doc: dict) -> dict:
+    return {"_id": doc["_id"], "_rev": doc.get("_rev"), "type": doc.get("type"), "_deleted": True}
+
+
+def _visible_in_full_pull(collection: str, doc: dict, user_id: str) -> bool:
+    """Checks the access view cannot express in its key."""
+    if doc.get("_deleted"):
+        return False
+    # For shares, only return non-revoked shares owned by the user
+    if collection == "shares":
+        return doc.get("owner_id") == user_id and doc.get("revoked") is not True
+    return True
+
+
+def _encode_cursor(position: dict[str, str]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(position, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> dict[str, str]:
+    """Decode a pull cursor; raises ValueError for anything this router did not issue."""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Malformed cursor") from e
+    if not isinstance(position, dict) or not all(isinstance(v, str) for v in position.values()):
+        raise ValueError("Malformed cursor")
+    if set(position) not in ({"since"}, {"checkpoint", "updated_at", "id"}):
+        raise ValueError("Malformed cursor")
+    return position
+
+
+async def _full_pull_query(
+    collection: str,
+    user_id: str,
+    db: CouchDBClient,
+    position: dict[str, str] | None,
+) -> tuple[SyncCheckpoint, dict[str, Any]]:
+    """Checkpoint and access view query for one page of a full pull."""
+    doc_type = TYPE_MAP[collection]
+
+    if position is None:
+        # Read the feed position before the first page: changes that land while
+        # the pages are read are delivered again by the next delta pull rather
+        # than lost. Every page of the same pull reports this checkpoint.
+        checkpoint = SyncCheckpoint(seq=str((await db.db_info())["update_seq"]))
+        startkey: list = [user_id, doc_type]
+        startkey_docid = None
+    else:
+        # Only the position within the range comes from the cursor; the user
+        # and type always come from the request.
+        checkpoint = SyncCheckpoint(seq=position["checkpoint"])
+        startkey = [user_id, doc_type, position["updated_at"]]
+        startkey_docid = position["id"]
+
+    # The access view emits [user_id, type, updated_at] once per access entry
+    # (marks skip their wishlist owner), so this range holds exactly the user's
+    # documents of one type, oldest first, and costs only as much as they do.
+    # A document edited mid-pull moves to a later page instead of dropping out.
+    # (updated_at, doc id) is a total order over the rows, so one extra row
+    # tells where the next page starts.
+    query = {
+        "startkey": startkey,
+        "endkey": [user_id, doc_type, {}],
+        "startkey_docid": startkey_docid,
+        "include_docs": True,
+        "limit": PULL_PAGE_SIZE + 1,
+    }
+    return checkpoint, query
+
+
+def _page_cursor(checkpoint: SyncCheckpoint, next_row: dict) -> str:
+    return _encode_cursor({"checkpoint": checkpoint.seq, "updated_at": next_row["key"][2], "id": next_row["id"]})
+
+
+async def _pull_user(user_id: str, db: CouchDBClient) -> PullResponse:
+    """Full pull of the users collection: the user's own document, read by ID.
+
+    User documents created through OAuth have no access array, so the access
+    view cannot be relied on to find them.
+    """
+    checkpoint = SyncCheckpoint(seq=str((await db.db_info())["update_seq"]))
+    try:
+        user = await db.get(user_id)
+    except DocumentNotFoundError:
+        return PullResponse(documents=[], checkpoint=checkpoint)
+    documents = [_for_client(user)] if user.get("type") == "user" else []
+    return PullResponse(documents=documents, checkpoint=checkpoint)
+
+
+async def _pull_all(
+    collection: str,
+    user_id: str,
+    db: CouchDBClient,
+    position: dict[str, str] | None = None,
+) -> PullResponse:
+    """Full pull: one page of visible documents, plus the feed position to continue from."""
+    checkpoint, query = await _full_pull_query(collection, user_id, db, position)
+    result = await db.view(ACCESS_VIEW[0], ACCESS_VIEW[1], **query)
+    rows = result.get("rows", [])
+
+    next_cursor = None
+    if len(rows) > PULL_PAGE_SIZE:
+        next_cursor = _page_cursor(checkpoint, rows[PULL_PAGE_SIZE])
+        rows = rows[:PULL_PAGE_SIZE]
+
+    documents: list[dict] = []
+    seen: set[str] = set()
+    for row in rows:
+        doc = row.get("doc")
+        if doc is None or doc["_id"] in seen or not _visible_in_full_pull(collection, doc, user_id):
+            continue
+        seen.add(doc["_id"])
+        documents.append(_for_client(doc))
+    return PullResponse(documents=documents, checkpoint=checkpoint, next_cursor=next_cursor)
+
+
+async def _stream_all(
+    collection: str,
+    user_id: str,
+    db: CouchDBClient,
+    position: dict[str, str] | None = None,
+) -> StreamingResponse:
+    """Full pull like _pull_all, written to the client as the view rows arrive."""
+    checkpoint, query = await _full_pull_query(collection, user_id, db, position)
+    rows = db.stream_view(ACCESS_VIEW[0], ACCESS_VIEW[1], **query)
+    # Send the query now, so that CouchDB errors still become an error response
+    first = await anext(rows, None)
+    return StreamingResponse(
+        _stream_page(collection, user_id, checkpoint, first, rows),
+        media_type="application/json",
+    )
+
+
+async def _stream_page(
+    collection: str,
+    user_id: str,
+    checkpoint: SyncCheckpoint,
+    first: bytes | None,
+    rows: AsyncIterator[bytes],
+) -> AsyncIterator[bytes]:
+    """Write a PullResponse body holding one row at a time in memory."""
+    out = bytearray(b'{"documents":[')
+    empty = True
+    seen: set[str] = set()
+    next_cursor = None
+    count = 0
+    try:
+        raw = first
+        while raw is not None:
+            row = json.loads(raw)
+            count += 1
+            if count > PULL_PAGE_SIZE:
+                next_cursor = _page_cursor(checkpoint, row)
+                break
+            doc = row.get("doc")
+            if doc is not None and doc["_id"] not in seen and _visible_in_full_pull(collection, doc, user_id):
+                seen.add(doc["_id"])
+                if not empty:
+                    out += b","
+                out += json.dumps(_for_client(doc), ensure_ascii=False, separators=(",", ":")).encode()
+                empty = False
+                if len(out) >= STREAM_FLUSH_BYTES:
+                    yield bytes(out)
+                    out.clear()
+            raw = await anext(rows, None)
+    finally:
+        await rows.aclose()
+
+    out += b'],"checkpoint":' + checkpoint.model_dump_json().encode()
+    out += b',"next_cursor":' + json.dumps(next_cursor).encode() + b"}"
+    yield bytes(out)
+
+
+async def _pull_changes(collection: str, user_id: str, since: str, db: CouchDBClient) -> PullResponse:
+    """Delta pull: one page of documents changed since the checkpoint, with explicit tombstones."""
+    # The filter also matches tombstones: pushed deletions keep type and access.
+    # Documents the user was removed from still match through access_removed.
+    changes = await db.changes(
+        since=since,
+        selector=_changes_selector(collection, user_id),
+        include_docs=True,
+        limit=PULL_PAGE_SIZE,
+    )
+    results = changes.get("results", [])
+    last_seq = str(changes["last_seq"])
+
+    documents: list[dict] = []
+    for row in results:
+        doc = row.get("doc")
+        if doc is None or _hidden_from_user(collection, doc, user_id):
+            continue
+        if row.get("deleted") or _is_gone(collection, doc) or _revoked_from_user(collection, doc, user_id):
+            documents.append(_tombstone(doc))
+        else:
+            documents.append(_for_client(doc))
+
+    # A short page means the feed was read to its end
+    next_cursor = _encode_cursor({"since": last_seq}) if len(results) >= PULL_PAGE_SIZE else None
+    return PullResponse(documents=documents, checkpoint=SyncCheckpoint(seq=last_seq), next_cursor=next_cursor)
+
+
 @router.get(
     "/pull/{collection}",
     response_model=PullResponse,
@@ -72,64 +365,58 @@ async def pull_collection(
     collection: CollectionType,
     current_user: CurrentUserCouchDB,
     db: Annotated[CouchDBClient, Depends(get_db)],
-) -> PullResponse:
-    """Pull all documents of a collection that the user has access to.
-
-    Returns documents where the user's ID is in the access array.
+    since: Annotated[str | None, Query(max_length=512, description="Checkpoint seq from the previous pull")] = None,
+    cursor: Annotated[str | None, Query(max_length=2048, description="next_cursor from the previous page")] = None,
+) -> PullResponse | StreamingResponse:
+    """Pull the documents of a collection that the user has access to.
+
+    Without `since`, returns all documents where the user's ID is in the
+    access array. With the `checkpoint.seq` of a previous pull, returns only
+    documents changed since then; deleted or revoked documents, and documents
+    the user has been removed from the access array of, come back as
+    tombstones (`_deleted: true`). Either way the response carries the
+    checkpoint for the next delta pull.
+
+    Results come in pages of at most PULL_PAGE_SIZE documents. While
+    `next_cursor` is set, request it (with the same collection) to get the
+    next page; the cursor takes precedence over `since`. Store the checkpoint
+    only once the last page has been read.
+
+    Full pulls are streamed from CouchDB to the client row by row unless
+    `sync_stream_pulls` is turned off; the body is the same either way.
     """
     user_id = current_user["_id"]
 
-    # Map collection to document type
-    type_map = {
-        "wishlists": "wishlist",
-        "items": "item",
-        "marks": "mark",
-        "bookmarks": "bookmark",
-        "users": "user",
-        "shares": "share",
-    }
-    doc_type = type_map[collection]
-
-    # Find all documents of this type that user has access to
-    selector: dict = {
-        "type": doc_type,
-        "access": {"$elemMatch": {"$eq": user_id}},
-    }
-
-    # For marks, also exclude marks where user is the wishlist owner
-    # (marks are hidden from wishlist owner in "surprise mode")
-    if collection == "marks":
-        selector["owner_id"] = {"$ne": user_id}
-
-    # For users, only return the user's own document
-    if collection == "users":
-        selector = {
-            "type": "user",
-            "_id": user_id,
-        }
-
-    # For shares, only return non-revoked shares owned by the user
-    if collection == "shares":
-        selector = {
-            "type": "share",
-            "owner_id": user_id,
-            "revoked": {"$ne": True},
-        }
+    position = None
+    if cursor:
+        try:
+            position = _decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pull cursor",
+            )
+        if "since" in position:
+            since = position["since"]
+            position = None
+        else:
+            # A full-pull cursor continues the full pull, whatever `since` says
+            since = None
 
     try:
-        # Note: CouchDB Mango with $elemMatch doesn't work well with indexes,
-        # so we fetch without sort and sort in Python
-        all_documents = await db.find(
-            selector=selector,
-            limit=1000,  # Reasonable limit for initial sync
-        )
-        # Filter out deleted documents - client uses reconciliation to detect deletions
-        # (if a doc exists locally but not in server response, it was deleted)
-        documents = [d for d in all_documents if not d.get("_deleted")]
-        # Sort by updated_at descending in Python
-        documents.sort(key=lambda d: d.get("updated_at", ""), reverse=True)
-        return PullResponse(documents=documents)
+        if since:
+            return await _pull_changes(collection, user_id, since, db)
+        if collection == "users":
+            return await _pull_user(user_id, db)
+        if settings.sync_stream_pulls:
+            return await _stream_all(collection, user_id, db, position)
+        return await _pull_all(collection, user_id, db, position)
     except Exception as e:
+        if since and isinstance(e, CouchDBError) and e.status_code == 400:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid sync checkpoint",
+            )
         logger.error(f"Pull error for {collection}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -137,6 +424,57 @@ async def pull_collection(
         )
 
 
+def _authorize_push(collection: str, doc: dict, user_id: str, fetched: dict[str, dict]) -> str | None:
+    """Return why the user may not push this document, or None if they may."""
+    if collection == "wishlists":
+        # User must be the owner
+        if doc.get("owner_id") != user_id:
+            return "Unauthorized: not the wishlist owner"
+    elif collection == "items":
+        # User must have access to the wishlist
+        wishlist_id = doc.get("wishlist_id")
+        if not wishlist_id:
+            return "Item missing wishlist_id"
+        wishlist = fetched.get(wishlist_id)
+        if wishlist is None:
+            return "Wishlist not found"
+        if user_id not in wishlist.get("access", []):
+            return "Unauthorized: no access to wishlist"
+    elif collection == "marks":
+        # User must be the one who marked it
+        if doc.get("marked_by") != user_id:
+            return "Unauthorized: not the mark owner"
+    elif collection == "users":
+        # User can only push their own user document
+        if doc["_id"] != user_id:
+            return "Unauthorized: can only update own user document"
+    elif collection == "shares":
+        # User must be the owner of the share
+        if doc.get("owner_id") != user_id:
+            return "Unauthorized: not the share owner"
+    return None
+
+
+def _initial_access(collection: str, doc: dict, user_id: str, fetched: dict[str, dict]) -> list[str]:
+    """Access array for a document created by a push."""
+    wishlist = fetched.get(doc.get("wishlist_id") or "")
+    if collection == "items":
+        # Inherit access from wishlist
+        return wishlist.get("access", [user_id]) if wishlist is not None else [user_id]
+    if collection == "marks":
+        # Marks are visible to all viewers except owner
+        if wishlist is None:
+            return [user_id]
+        owner_id = wishlist.get("owner_id")
+        return [uid for uid in wishlist.get("access", []) if uid != owner_id]
+    # Wishlists, users, shares and bookmarks are only visible to their owner
+    return [user_id]
+
+
+def _in_request_order(conflicts: dict[int, ConflictInfo]) -> PushResponse:
+    return PushResponse(conflicts=[conflicts[i] for i in sorted(conflicts)])
+
+
 @router.post(
     "/push/{collection}",
     response_model=PushResponse,
@@ -151,194 +489,165 @@ async def push_collection(
 
     Uses Last-Write-Wins (LWW) conflict resolution based on updated_at.
     Validates that user has access to each document.
+
+    The batch costs two CouchDB round trips however many documents it holds:
+    existing documents and referenced wishlists are read with one
+    `_all_docs` request, authorization and LWW run in memory, and accepted
+    documents are written with one `_bulk_docs` request. Conflicts are
+    reported per document, in request order. A document repeated in the
+    batch is written once, as its last entry.
     """
     user_id = current_user["_id"]
-    conflicts: list[ConflictInfo] = []
-
-    # Map collection to document type
-    type_map = {
-        "wishlists": "wishlist",
-        "items": "item",
-        "marks": "mark",
-        "bookmarks": "bookmark",
-        "users": "user",
-        "shares": "share",
-    }
-    doc_type = type_map[collection]
+    doc_type = TYPE_MAP[collection]
+    # Request index -> conflict, so the response keeps the documents' order
+    conflicts: dict[int, ConflictInfo] = {}
+
+    # _id -> (request index, document); a repeated _id keeps only its last entry,
+    # which is what writing the entries one after another would leave
+    latest: dict[str, tuple[int, dict]] = {}
+    for index, doc in enumerate(data.documents):
+        doc_id = doc.get("_id")
+        if not doc_id:
+            conflicts[index] = ConflictInfo(
+                document_id="unknown",
+                error="Document missing _id",
+            )
+            continue
+
+        # Validate document type
+        if doc.get("type") != doc_type:
+            conflicts[index] = ConflictInfo(
+                document_id=doc_id,
+                error=f"Document type mismatch: expected {doc_type}",
+            )
+            continue
+
+        latest.pop(doc_id, None)
+        latest[doc_id] = (index, doc)
+    candidates = list(latest.values())
+
+    # One read for the existing versions and the wishlists items and marks refer to
+    keys = [doc["_id"] for _, doc in candidates]
+    if collection in ("items", "marks"):
+        keys += [doc["wishlist_id"] for _, doc in candidates if doc.get("wishlist_id")]
+    try:
+        fetched = await db.get_many(keys)
+    except Exception as e:
+        logger.error(f"Push error for {collection}: {e}")
+        for index, doc in candidates:
+            conflicts[index] = ConflictInfo(document_id=doc["_id"], error=str(e))
+        return _in_request_order(conflicts)
+
+    accepted: list[tuple[int, dict]] = []
+
+    for index, doc in candidates:
+        doc_id = doc["_id"]
+
+        error = _authorize_push(collection, doc, user_id, fetched)
+        if error is not None:
+            conflicts[index] = ConflictInfo(document_id=doc_id, error=error)
+            continue
+
+        if collection == "users":
+            # Don't allow syncing sensitive fields
+            # These should only be changed via dedicated auth endpoints
+            for field in SENSITIVE_USER_FIELDS:
+                doc.pop(field, None)
+
+        existing = fetched.get(doc_id)
+        if existing is not None:
+            # LWW: Check if client version is newer
+            client_updated = doc.get("updated_at", "")
+            server_updated = existing.get("updated_at", "")
+
+            if client_updated <= server_updated:
+                # Server wins - but if client is deleting, allow it
+                if not doc.get("_deleted"):
+                    conflicts[index] = ConflictInfo(
+                        document_id=doc_id,
+                        error="Server has newer version",
+                        server_document=_for_client(existing),
+                    )
+                    continue
 
-    for doc in data.documents:
-        try:
-            doc_id = doc.get("_id")
-            if not doc_id:
-                conflicts.append(ConflictInfo(
-                    document_id="unknown",
-                    error="Document missing _id",
-                ))
+            # Client wins - update document
+            doc["_rev"] = existing["_rev"]  # Use server's revision
+            doc["updated_at"] = datetime.now(timezone.utc).isoformat()
+
+            # Ensure access array is preserved (unless deleting)
+            if "access" not in doc and not doc.get("_deleted"):
+                doc["access"] = existing.get("access", [])
+            # access_removed is kept by the server, not the client
+            if "access" in doc:
+                set_access(doc, doc["access"], stored=existing)
+        else:
+            # Document doesn't exist on server
+            # If it's already deleted on client, skip it (nothing to sync)
+            if doc.get("_deleted"):
+                logger.debug(f"Skipping deleted doc that doesn't exist on server: {doc_id}")
                 continue
 
-            # Validate document type
-            if doc.get("type") != doc_type:
-                conflicts.append(ConflictInfo(
-                    document_id=doc_id,
-                    error=f"Document type mismatch: expected {doc_type}",
-                ))
-                continue
+            # New document - ensure required fields
+            doc["updated_at"] = datetime.now(timezone.utc).isoformat()
+            if "created_at" not in doc:
+                doc["created_at"] = doc["updated_at"]
+            doc["access"] = _initial_access(collection, doc, user_id, fetched)
 
-            # Authorization check based on collection
-            if collection == "wishlists":
-                # User must be the owner
-                if doc.get("owner_id") != user_id:
-                    conflicts.append(ConflictInfo(
-                        document_id=doc_id,
-                        error="Unauthorized: not the wishlist owner",
-                    ))
-                    continue
-            elif collection == "items":
-                # User must have access to the wishlist
-                wishlist_id = doc.get("wishlist_id")
-                if not wishlist_id:
-                    conflicts.append(ConflictInfo(
-                        document_id=doc_id,
-                        error="Item missing wishlist_id",
-                    ))
-                    continue
-                try:
-                    wishlist = await db.get(wishlist_id)
-                    if user_id not in wishlist.get("access", []):
-                        conflicts.append(ConflictInfo(
-                            document_id=doc_id,
-                            error="Unauthorized: no access to wishlist",
-                        ))
-                        continue
-                except DocumentNotFoundError:
-                    conflicts.append(ConflictInfo(
-                        document_id=doc_id,
-                        error="Wishlist not found",
-                    ))
-                    continue
-            elif collection == "marks":
-                # User must be the one who marked it
-                if doc.get("marked_by") != user_id:
-                    conflicts.append(ConflictInfo(
-                        document_id=doc_id,
-                        error="Unauthorized: not the mark owner",
-                    ))
-                    continue
-            elif collection == "users":
-                # User can only push their own user document
-                if doc_id != user_id:
-                    conflicts.append(ConflictInfo(
-                        document_id=doc_id,
-                        error="Unauthorized: can only update own user document",
-                    ))
-                    continue
-                # Don't allow syncing sensitive fields
-                # These should only be changed via dedicated auth endpoints
-                sensitive_fields = ["password_hash", "email", "refresh_tokens"]
-                for field in sensitive_fields:
-                    if field in doc:
-                        del doc[field]
-            elif collection == "shares":
-                # User must be the owner of the share
-                if doc.get("owner_id") != user_id:
-                    conflicts.append(ConflictInfo(
-                        document_id=doc_id,
-                        error="Unauthorized: not the share owner",
-                    ))
-                    continue
+        accepted.append((index, doc))
 
-            # Try to get existing document
-            try:
-                existing = await db.get(doc_id)
-
-                # LWW: Check if client version is newer
-                client_updated = doc.get("updated_at", "")
-                server_updated = existing.get("updated_at", "")
-
-                if client_updated <= server_updated:
-                    # Server wins - but if client is deleting, allow it
-                    if not doc.get("_deleted"):
-                        conflicts.append(ConflictInfo(
-                            document_id=doc_id,
-                            error="Server has newer version",
-                            server_document=existing,
-                        ))
-                        continue
-
-                # Client wins - update document
-                doc["_rev"] = existing["_rev"]  # Use server's revision
-                doc["updated_at"] = datetime.now(timezone.utc).isoformat()
-
-                # Ensure access array is preserved (unless deleting)
-                if "access" not in doc and not doc.get("_deleted"):
-                    doc["access"] = existing.get("access", [])
-
-            except DocumentNotFoundError:
-                # Document doesn't exist on server
-                # If it's already deleted on client, skip it (nothing to sync)
-                if doc.get("_deleted"):
-                    logger.debug(f"Skipping deleted doc that doesn't exist on server: {doc_id}")
-                    continue
+    if not accepted:
+        return _in_request_order(conflicts)
 
-                # New document - ensure required fields
-                doc["updated_at"] = datetime.now(timezone.utc).isoformat()
-                if "created_at" not in doc:
-                    doc["created_at"] = doc["updated_at"]
-
-                # Set access array based on document type
-                if collection == "wishlists":
-                    doc["access"] = [user_id]
-                elif collection == "items":
-                    # Inherit access from wishlist
-                    try:
-                        wishlist = await db.get(doc["wishlist_id"])
-                        doc["access"] = wishlist.get("access", [user_id])
-                    except DocumentNotFoundError:
-                        doc["access"] = [user_id]
-                elif collection == "marks":
-                    # Marks are visible to all viewers except owner
-                    try:
-                        wishlist = await db.get(doc["wishlist_id"])
-                        owner_id = wishlist.get("owner_id")
-                        doc["access"] = [
-                            uid for uid in wishlist.get("access", [])
-                            if uid != owner_id
-                        ]
-                    except DocumentNotFoundError:
-                        doc["access"] = [user_id]
-                elif collection == "users":
-                    # Users can only access their own document
-                    doc["access"] = [user_id]
-                elif collection == "shares":
-                    # Only owner can access their own shares
-                    doc["access"] = [user_id]
-                elif collection == "bookmarks":
-                    # Only owner can access their own bookmarks
-                    doc["access"] = [user_id]
-
-            # Save document
-            try:
-                await db.put(doc)
-            except ConflictError:
-                # Race condition - refetch and return as conflict
-                try:
-                    server_doc = await db.get(doc_id)
-                    conflicts.append(ConflictInfo(
-                        document_id=doc_id,
-                        error="Concurrent modification",
-                        server_document=server_doc,
-                    ))
-                except DocumentNotFoundError:
-                    conflicts.append(ConflictInfo(
-                        document_id=doc_id,
-                        error="Document was deleted",
-                    ))
+    # Save all accepted documents at once
+    try:
+        results = await db.bulk_docs([doc for _, doc in accepted])
+    except Exception as e:
+        logger.error(f"Push error for {collection}: {e}")
+        for index, doc in accepted:
+            conflicts[index] = ConflictInfo(document_id=doc["_id"], error=str(e))
+        return _in_request_order(conflicts)
+
+    raced: list[tuple[int, str]] = []
+    written: list[dict] = []
+    for (index, doc), result in zip(accepted, results, strict=True):
+        if result.get("ok"):
+            written.append(doc)
+        elif result.get("error") == "conflict":
+            raced.append((index, doc["_id"]))
+        elif result.get("error"):
+            logger.error(f"Push error for document {doc['_id']}: {result.get('reason')}")
+            conflicts[index] = ConflictInfo(
+                document_id=doc["_id"],
+                error=result.get("reason") or result["error"],
+            )
+
+    if collection == "items" and written:
+        # Full-size images live in their own documents, outside the synced items
+        try:
+            await db.sync_item_images(written)
+        except Exception as e:
+            logger.error(f"Failed to update item images: {e}")
 
+    if raced:
+        # Race condition - refetch and return as conflicts
+        try:
+            server_docs = await db.get_many([doc_id for _, doc_id in raced])
         except Exception as e:
-            logger.error(f"Push error for document {doc.get('_id', 'unknown')}: {e}")
-            conflicts.append(ConflictInfo(
-                document_id=doc.get("_id", "unknown"),
-                error=str(e),
-            ))
+            logger.error(f"Push error for {collection}: {e}")
+            server_docs = None
+        for index, doc_id in raced:
+            if server_docs is None:
+                conflicts[index] = ConflictInfo(document_id=doc_id, error="Concurrent modification")
+            elif doc_id in server_docs:
+                conflicts[index] = ConflictInfo(
+                    document_id=doc_id,
+                    error="Concurrent modification",
+                    server_document=_for_client(server_docs[doc_id]),
+                )
+            else:
+                conflicts[index] = ConflictInfo(
+                    document_id=doc_id,
+                    error="Document was deleted",
+                )
 
-    return PushResponse(conflicts=conflicts)
+    return _in_request_order(conflicts)
@@ -9,10 +9,9 @@ from pydantic import BaseModel, Field
 
 
 class SyncCheckpoint(BaseModel):
-    """Checkpoint for sync pagination."""
+    """Position in the CouchDB changes feed that a client has pulled up to."""
 
-    updated_at: datetime
-    id: UUID
+    seq: str
 
 
 class WishlistSyncDocument(BaseModel):
@@ -52,6 +51,7 @@ class PullResponse(BaseModel):
 
     documents: list[dict[str, Any]]
     checkpoint: SyncCheckpoint | None = None
+    next_cursor: str | None = None
 
 
 class PushRequest(BaseModel):
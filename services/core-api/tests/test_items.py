@@ -0,0 +1,87 @@
+"""Tests for the item image endpoint (/api/v2/items/{id}/image)."""
+
+from datetime import datetime, timezone
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.couchdb import CouchDBClient, DocumentNotFoundError
+from app.main import app
+from app.security import create_access_token
+
+
+@pytest.fixture
+def user() -> dict[str, Any]:
+    """Create a user document."""
+    user_id = f"user:{uuid4()}"
+    return {
+        "_id": user_id,
+        "type": "user",
+        "email": "user@example.com",
+        "name": "User",
+        "access": [user_id],
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+@pytest.fixture
+def mock_couchdb(user: dict[str, Any]) -> MagicMock:
+    """Create a mock CouchDB client that knows the user."""
+    mock = MagicMock(spec=CouchDBClient)
+
+    async def mock_get(doc_id: str) -> dict[str, Any]:
+        if doc_id == user["_id"]:
+            return user
+        raise DocumentNotFoundError(doc_id)
+
+    mock.get = AsyncMock(side_effect=mock_get)
+    mock.get_item_images = AsyncMock(return_value={})
+    mock.get_attachment = AsyncMock(return_value=(b"RIFF-webp", "image/webp"))
+    return mock
+
+
+async def _get_image(mock_couchdb: MagicMock, user: dict[str, Any], item_id: str):
+    with patch("app.routers.items.get_couchdb", return_value=mock_couchdb), \
+         patch("app.dependencies.get_couchdb", return_value=mock_couchdb):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get(
+                f"/api/v2/items/{item_id}/image",
+                headers={"Authorization": f"Bearer {create_access_token(user['_id'])}"},
+            )
+
+
+@pytest.mark.asyncio
+async def test_image_is_served_to_users_with_access(mock_couchdb: MagicMock, user: dict[str, Any]) -> None:
+    mock_couchdb.get_item_images.return_value = {
+        "item:abc": {"_id": "item_image:abc", "item_id": "item:abc", "access": [user["_id"]]},
+    }
+
+    response = await _get_image(mock_couchdb, user, "abc")
+
+    assert response.status_code == 200
+    assert response.content == b"RIFF-webp"
+    assert response.headers["content-type"] == "image/webp"
+    mock_couchdb.get_item_images.assert_awaited_once_with(["item:abc"])
+    mock_couchdb.get_attachment.assert_awaited_once_with("item_image:abc", "image")
+
+
+@pytest.mark.asyncio
+async def test_image_without_access_is_not_found(mock_couchdb: MagicMock, user: dict[str, Any]) -> None:
+    mock_couchdb.get_item_images.return_value = {
+        "item:abc": {"_id": "item_image:abc", "item_id": "item:abc", "access": ["user:someone-else"]},
+    }
+
+    response = await _get_image(mock_couchdb, user, "item:abc")
+
+    assert response.status_code == 404
+    mock_couchdb.get_attachment.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_item_without_image_is_not_found(mock_couchdb: MagicMock, user: dict[str, Any]) -> None:
+    response = await _get_image(mock_couchdb, user, "item:abc")
+
+    assert response.status_code == 404
@@ -0,0 +1,54 @@
+"""Tests for incremental splitting of CouchDB JSON responses."""
+
+import json
+from collections.abc import AsyncIterator
+
+import pytest
+
+from app.json_stream import iter_array_objects
+
+ROWS = [
+    {"id": "item:1", "key": ["user:1", "item", "2024-01-02"], "value": None, "doc": {"_id": "item:1", "tags": []}},
+    # Quotes, backslashes and brackets inside strings must not end the row
+    {"id": "item:2", "key": ["user:1", "item", "x\"]}\\"], "value": None, "doc": {"title": '{["\\\\'}},
+    {"id": "item:3", "key": ["user:1", "item", ""], "value": {"n": [1, [2]]}, "doc": {"img": "A" * 5000}},
+]
+
+
+async def _chunks(data: bytes, size: int) -> AsyncIterator[bytes]:
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+async def test_splits_rows_across_any_chunking(chunk_size: int):
+    """Every row comes out whole, whatever the chunk boundaries."""
+    # CouchDB's own layout, one row per line
+    body = ('{"total_rows":3,"offset":0,"rows":[\r\n' + ",\r\n".join(json.dumps(r) for r in ROWS) + "\r\n]}\n").encode()
+
+    rows = [json.loads(raw) async for raw in iter_array_objects(_chunks(body, chunk_size), "rows")]
+
+    assert rows == ROWS
+
+
+@pytest.mark.asyncio
+async def test_only_reads_the_requested_array():
+    """Other top-level values, including arrays and string values named like the key, are skipped."""
+    body = json.dumps(
+        {"warning": "rows", "other": [{"id": "x"}], "results": ROWS, "rows": [{"id": "y"}], "last_seq": "5-a"}
+    ).encode()
+
+    rows = [json.loads(raw) async for raw in iter_array_objects(_chunks(body, 16), "results")]
+
+    assert rows == ROWS
+
+
+@pytest.mark.asyncio
+async def test_truncated_response_raises():
+    """A response cut off mid-row is an error, not a shorter result."""
+    body = json.dumps({"rows": ROWS}).encode()[:-100]
+
+    with pytest.raises(ValueError):
+        async for _ in iter_array_objects(_chunks(body, 64), "rows"):
+            pass
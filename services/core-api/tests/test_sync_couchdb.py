@@ -2,11 +2,19 @@
 
 Tests cover:
 - Pull operations: access control, surprise mode, filtering
+- Delta pulls: checkpoints, tombstones, invalid checkpoints
+- Paginated pulls: cursors for full and delta pulls, invalid cursors
+- Streamed pulls: same body as buffered pulls, CouchDB errors before streaming
 - Push operations: authorization, LWW conflict resolution, type validation
+- Access revocation bookkeeping: access_removed retention, hidden from pulls
+- Batched push: round trips, conflict order, races in _bulk_docs
 """
 
-from collections.abc import AsyncGenerator
-from datetime import datetime, timedelta, timezone
+import base64
+import contextlib
+import json
+from collections.abc import AsyncGenerator, AsyncIterator
+from datetime import UTC, datetime, timedelta, timezone
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
@@ -15,7 +23,8 @@ import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 
-from app.couchdb import CouchDBClient, ConflictError, DocumentNotFoundError
+from app.config import settings
+from app.couchdb import CouchDBClient, CouchDBError, ConflictError, DocumentNotFoundError, set_access
 from app.main import app
 from app.security import create_access_token
 
@@ -231,6 +240,16 @@ def deleted_wishlist_doc(user_id: str) -> dict[str, Any]:
     }
 
 
+def _view_rows(docs: list[dict[str, Any]]) -> dict[str, Any]:
+    """Access view result holding the given documents, in the given order."""
+    return {
+        "rows": [
+            {"id": d["_id"], "key": [None, d.get("type"), d.get("updated_at", "")], "doc": d}
+            for d in docs
+        ]
+    }
+
+
 @pytest.fixture
 def mock_couchdb() -> MagicMock:
     """Create a mock CouchDB client."""
@@ -251,7 +270,40 @@ async def client_with_mock_db(
 
     mock_couchdb.get = AsyncMock(side_effect=mock_get)
     mock_couchdb.find = AsyncMock(return_value=[])
+    mock_couchdb.view = AsyncMock(return_value=_view_rows([]))
     mock_couchdb.put = AsyncMock(return_value={"ok": True, "rev": "2-new"})
+    mock_couchdb.db_info = AsyncMock(return_value={"update_seq": "10-seq"})
+
+    # Batch reads and writes go through the per-document get/put mocks,
+    # so tests can keep configuring those.
+    async def mock_get_many(doc_ids: list[str]) -> dict[str, dict[str, Any]]:
+        found = {}
+        for doc_id in dict.fromkeys(doc_ids):
+            with contextlib.suppress(DocumentNotFoundError):
+                found[doc_id] = await mock_couchdb.get(doc_id)
+        return found
+
+    async def mock_bulk_docs(docs: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        results = []
+        for doc in docs:
+            try:
+                saved = await mock_couchdb.put(doc)
+                results.append({"ok": True, "id": doc["_id"], "rev": saved.get("rev")})
+            except ConflictError:
+                results.append({"id": doc["_id"], "error": "conflict", "reason": "Document update conflict."})
+        return results
+
+    # Streamed view reads go through the view mock
+    async def mock_stream_view(design_doc: str, view_name: str, **kwargs: Any) -> AsyncIterator[bytes]:
+        result = await mock_couchdb.view(design_doc, view_name, **kwargs)
+        for row in result.get("rows", []):
+            yield json.dumps(row).encode()
+
+    mock_couchdb.get_many = AsyncMock(side_effect=mock_get_many)
+    mock_couchdb.stream_view = MagicMock(side_effect=mock_stream_view)
+    mock_couchdb.bulk_docs = AsyncMock(side_effect=mock_bulk_docs)
+    mock_couchdb.sync_item_images = AsyncMock()
+    mock_couchdb.changes = AsyncMock(return_value={"results": [], "last_seq": "10-seq"})
 
     with patch("app.routers.sync_couchdb.get_couchdb", return_value=mock_couchdb):
         with patch("app.dependencies.get_couchdb", return_value=mock_couchdb):
@@ -294,8 +346,8 @@ class TestPullEndpoint:
             "updated_at": datetime.now(timezone.utc).isoformat(),
         }
 
-        # Mock find to return only user's wishlist
-        mock_db.find = AsyncMock(return_value=[wishlist_doc])
+        # The view range only holds the user's wishlist
+        mock_db.view = AsyncMock(return_value=_view_rows([wishlist_doc]))
 
         response = await client.get(
             "/api/v2/sync/pull/wishlists",
@@ -308,12 +360,15 @@ class TestPullEndpoint:
         assert len(data["documents"]) == 1
         assert data["documents"][0]["_id"] == wishlist_doc["_id"]
 
-        # Verify the selector used in find
-        mock_db.find.assert_called_once()
-        call_args = mock_db.find.call_args
-        selector = call_args.kwargs.get("selector") or call_args[0][0]
-        assert selector["type"] == "wishlist"
-        assert selector["access"]["$elemMatch"]["$eq"] == user_id
+        # Verify the access view range: this user's wishlists, oldest first
+        mock_db.find.assert_not_called()
+        mock_db.view.assert_called_once()
+        call_args = mock_db.view.call_args
+        assert call_args.args == ("app", "by_access")
+        assert call_args.kwargs["startkey"] == [user_id, "wishlist"]
+        assert call_args.kwargs["endkey"] == [user_id, "wishlist", {}]
+        assert "descending" not in call_args.kwargs
+        assert call_args.kwargs["include_docs"] is True
 
     # -------------------------------------------------------------------------
     # Test 2: Pull items returns only user-accessible items
@@ -328,7 +383,7 @@ class TestPullEndpoint:
     ):
         """Only items where user is in access array are returned."""
         client, mock_db = client_with_mock_db
-        mock_db.find = AsyncMock(return_value=[item_doc])
+        mock_db.view = AsyncMock(return_value=_view_rows([item_doc]))
 
         response = await client.get(
             "/api/v2/sync/pull/items",
@@ -340,10 +395,10 @@ class TestPullEndpoint:
         assert len(data["documents"]) == 1
         assert data["documents"][0]["_id"] == item_doc["_id"]
 
-        # Verify selector
-        call_args = mock_db.find.call_args
-        selector = call_args.kwargs.get("selector") or call_args[0][0]
-        assert selector["type"] == "item"
+        # Verify view range
+        call_args = mock_db.view.call_args
+        assert call_args.kwargs["startkey"] == [user_id, "item"]
+        assert call_args.kwargs["endkey"] == [user_id, "item", {}]
 
     # -------------------------------------------------------------------------
     # Test 3: Pull marks excludes owner's marks (surprise mode)
@@ -380,7 +435,8 @@ class TestPullEndpoint:
             "updated_at": datetime.now(timezone.utc).isoformat(),
         }
 
-        mock_db.find = AsyncMock(return_value=[visible_mark])
+        # The view emits no key for the wishlist owner, so own_mark is not in range
+        mock_db.view = AsyncMock(return_value=_view_rows([visible_mark]))
 
         response = await client.get(
             "/api/v2/sync/pull/marks",
@@ -393,10 +449,10 @@ class TestPullEndpoint:
         assert len(data["documents"]) == 1
         assert data["documents"][0]["owner_id"] != user_id
 
-        # Verify the selector includes owner_id != user_id
-        call_args = mock_db.find.call_args
-        selector = call_args.kwargs.get("selector") or call_args[0][0]
-        assert selector["owner_id"] == {"$ne": user_id}
+        # Verify the marks range of this user was queried
+        call_args = mock_db.view.call_args
+        assert call_args.kwargs["startkey"] == [user_id, "mark"]
+        assert call_args.kwargs["endkey"] == [user_id, "mark", {}]
 
     # -------------------------------------------------------------------------
     # Test 4: Pull bookmarks returns only user-owned bookmarks
@@ -411,7 +467,7 @@ class TestPullEndpoint:
     ):
         """Only bookmarks where user is in access array are returned."""
         client, mock_db = client_with_mock_db
-        mock_db.find = AsyncMock(return_value=[bookmark_doc])
+        mock_db.view = AsyncMock(return_value=_view_rows([bookmark_doc]))
 
         response = await client.get(
             "/api/v2/sync/pull/bookmarks",
@@ -468,7 +524,7 @@ class TestPullEndpoint:
     ):
         """Empty collection should return empty documents array."""
         client, mock_db = client_with_mock_db
-        mock_db.find = AsyncMock(return_value=[])
+        mock_db.view = AsyncMock(return_value=_view_rows([]))
 
         response = await client.get(
             "/api/v2/sync/pull/wishlists",
@@ -494,7 +550,7 @@ class TestPullEndpoint:
         client, mock_db = client_with_mock_db
 
         # Return both active and deleted wishlists
-        mock_db.find = AsyncMock(return_value=[wishlist_doc, deleted_wishlist_doc])
+        mock_db.view = AsyncMock(return_value=_view_rows([wishlist_doc, deleted_wishlist_doc]))
 
         response = await client.get(
             "/api/v2/sync/pull/wishlists",
@@ -511,6 +567,399 @@ class TestPullEndpoint:
         )
 
 
+class TestDeltaPull:
+    """Tests for checkpoint-based delta pulls."""
+
+    @pytest.mark.asyncio
+    async def test_full_pull_returns_checkpoint(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+        wishlist_doc: dict[str, Any],
+    ):
+        """A pull without a checkpoint returns everything plus the feed position."""
+        client, mock_db = client_with_mock_db
+        mock_db.view = AsyncMock(return_value=_view_rows([wishlist_doc]))
+        mock_db.db_info = AsyncMock(return_value={"update_seq": "42-abc"})
+
+        response = await client.get(
+            "/api/v2/sync/pull/wishlists",
+            headers={"Authorization": f"Bearer {auth_token}"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["checkpoint"] == {"seq": "42-abc"}
+        assert len(data["documents"]) == 1
+        mock_db.changes.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_delta_pull_returns_changes_and_tombstones(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+        user_id: str,
+        item_doc: dict[str, Any],
+        wishlist_id: str,
+    ):
+        """Only changed documents come back; deletions are explicit tombstones."""
+        client, mock_db = client_with_mock_db
+        deleted_item = {
+            "_id": f"item:{uuid4()}",
+            "_rev": "3-gone",
+            "type": "item",
+            "wishlist_id": wishlist_id,
+            "access": [user_id],
+            "_deleted": True,
+        }
+        mock_db.changes = AsyncMock(return_value={
+            "results": [
+                {"seq": "43-a", "id": item_doc["_id"], "doc": item_doc},
+                {"seq": "44-b", "id": deleted_item["_id"], "deleted": True, "doc": deleted_item},
+            ],
+            "last_seq": "44-b",
+        })
+
+        response = await client.get(
+            "/api/v2/sync/pull/items",
+            params={"since": "42-abc"},
+            headers={"Authorization": f"Bearer {auth_token}"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["checkpoint"] == {"seq": "44-b"}
+        assert data["documents"] == [
+            item_doc,
+            {"_id": deleted_item["_id"], "_rev": "3-gone", "type": "item", "_deleted": True},
+        ]
+        mock_db.view.assert_not_called()
+        call_kwargs = mock_db.changes.call_args.kwargs
+        assert call_kwargs["since"] == "42-abc"
+        assert call_kwargs["include_docs"] is True
+        assert call_kwargs["selector"] == {
+            "type": "item",
+            "$or": [
+                {"access": {"$elemMatch": {"$eq": user_id}}},
+                {"access_removed": {"$elemMatch": {"$eq": user_id}}},
+            ],
+        }
+
+    @pytest.mark.asyncio
+    async def test_delta_pull_revoked_access_is_tombstone(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+        user_id: str,
+        item_doc: dict[str, Any],
+    ):
+        """A document the user was removed from since the checkpoint is reported as deleted."""
+        client, mock_db = client_with_mock_db
+        revoked = {**item_doc, "_rev": "4-r", "access": ["user:owner"], "access_removed": [user_id]}
+        mock_db.changes = AsyncMock(return_value={"results": [{"seq": "9", "doc": revoked}], "last_seq": "9"})
+
+        response = await client.get(
+            "/api/v2/sync/pull/items",
+            params={"since": "8"},
+            headers={"Authorization": f"Bearer {auth_token}"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["documents"] == [
+            {"_id": item_doc["_id"], "_rev": "4-r", "type": "item", "_deleted": True}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_delta_pull_hides_access_removed(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+        user_id: str,
+        item_doc: dict[str, Any],
+    ):
+        """Current readers are not told who else lost access to a document."""
+        client, mock_db = client_with_mock_db
+        doc = {**item_doc, "access_removed": ["user:former"], "access_removed_at": {"user:former": "2026-01-01"}}
+        mock_db.changes = AsyncMock(return_value={"results": [{"seq": "9", "doc": doc}], "last_seq": "9"})
+
+        response = await client.get(
+            "/api/v2/sync/pull/items",
+            params={"since": "8"},
+            headers={"Authorization": f"Bearer {auth_token}"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["documents"] == [item_doc]
+
+    @pytest.mark.asyncio
+    async def test_delta_pull_revoked_share_is_tombstone(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+        user_id: str,
+    ):
+        """A share revoked since the checkpoint is reported as deleted."""
+        client, mock_db = client_with_mock_db
+        share = {"_id": f"share:{uuid4()}", "_rev": "2-r", "type": "share", "owner_id": user_id, "revoked": True}
+        mock_db.changes = AsyncMock(return_value={"results": [{"seq": "5", "doc": share}], "last_seq": "5"})
+
+        response = await client.get(
+            "/api/v2/sync/pull/shares",
+            params={"since": "4"},
+            headers={"Authorization": f"Bearer {auth_token}"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["documents"] == [
+            {"_id": share["_id"], "_rev": "2-r", "type": "share", "_deleted": True}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_delta_pull_hides_marks_from_wishlist_owner(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+        user_id: str,
+        mark_doc: dict[str, Any],
+    ):
+        """Surprise mode: the owner gets neither marks nor mark tombstones."""
+        client, mock_db = client_with_mock_db
+        mark = {**mark_doc, "access": [user_id]}
+        mock_db.changes = AsyncMock(return_value={
+            "results": [
+                {"seq": "7", "doc": mark},
+                {"seq": "8", "deleted": True, "doc": {**mark, "_deleted": True}},
+            ],
+            "last_seq": "8",
+        })
+
+        response = await client.get(
+            "/api/v2/sync/pull/marks",
+            params={"since": "6"},
+            headers={"Authorization": f"Bearer {auth_token}"},
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"documents": [], "checkpoint": {"seq": "8"}, "next_cursor": None}
+
+    @pytest.mark.asyncio
+    async def test_delta_pull_invalid_checkpoint(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+    ):
+        """A checkpoint CouchDB cannot parse is a client error."""
+        client, mock_db = client_with_mock_db
+        mock_db.changes = AsyncMock(side_effect=CouchDBError("Malformed sequence", 400, "bad_request"))
+
+        response = await client.get(
+            "/api/v2/sync/pull/items",
+            params={"since": "garbage"},
+            headers={"Authorization": f"Bearer {auth_token}"},
+        )
+
+        assert response.status_code == 400
+
+
+class TestPullPagination:
+    """Tests for cursor-paginated pulls."""
+
+    @pytest.mark.asyncio
+    async def test_full_pull_pages_through_view(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+        user_id: str,
+    ):
+        """A full pull returns a page plus a cursor that resumes at the next view row."""
+        client, mock_db = client_with_mock_db
+        docs = [
+            {"_id": f"wishlist:{i}", "type": "wishlist", "updated_at": f"2024-01-0{7 + i}"}
+            for i in range(3)
+        ]
+        mock_db.view = AsyncMock(return_value=_view_rows(docs))
+        mock_db.db_info = AsyncMock(return_value={"update_seq": "42-abc"})
+
+        with patch("app.routers.sync_couchdb.PULL_PAGE_SIZE", 2):
+            response = await client.get(
+                "/api/v2/sync/pull/wishlists",
+                headers={"Authorization": f"Bearer {auth_token}"},
+            )
+            assert response.status_code == 200
+            data = response.json()
+            assert [d["_id"] for d in data["documents"]] == ["wishlist:0", "wishlist:1"]
+            assert data["checkpoint"] == {"seq": "42-abc"}
+            assert data["next_cursor"]
+            assert mock_db.view.call_args.kwargs["limit"] == 3
+
+            mock_db.view = AsyncMock(return_value=_view_rows(docs[2:]))
+            mock_db.db_info.reset_mock()
+            response = await client.get(
+                "/api/v2/sync/pull/wishlists",
+                params={"cursor": data["next_cursor"]},
+                headers={"Authorization": f"Bearer {auth_token}"},
+            )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [d["_id"] for d in data["documents"]] == ["wishlist:2"]
+        # Every page reports the checkpoint read before the first one
+        assert data["checkpoint"] == {"seq": "42-abc"}
+        assert data["next_cursor"] is None
+        mock_db.db_info.assert_not_called()
+        call_kwargs = mock_db.view.call_args.kwargs
+        assert call_kwargs["startkey"] == [user_id, "wishlist", "2024-01-09"]
+        assert call_kwargs["startkey_docid"] == "wishlist:2"
+        assert call_kwargs["endkey"] == [user_id, "wishlist", {}]
+
+    @pytest.mark.asyncio
+    async def test_full_pull_cursor_takes_precedence_over_since(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+        user_id: str,
+    ):
+        """A full-pull cursor continues the full pull even when `since` is sent too."""
+        client, mock_db = client_with_mock_db
+        cursor = base64.urlsafe_b64encode(
+            json.dumps({"checkpoint": "42-abc", "updated_at": "2024-01-07", "id": "wishlist:2"}).encode()
+        ).decode()
+
+        response = await client.get(
+            "/api/v2/sync/pull/wishlists",
+            params={"since": "40-old", "cursor": cursor},
+            headers={"Authorization": f"Bearer {auth_token}"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["checkpoint"] == {"seq": "42-abc"}
+        mock_db.changes.assert_not_called()
+        assert mock_db.view.call_args.kwargs["startkey_docid"] == "wishlist:2"
+
+    @pytest.mark.asyncio
+    async def test_delta_pull_pages_through_changes(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+        item_doc: dict[str, Any],
+    ):
+        """A full page of changes comes with a cursor that continues from its last seq."""
+        client, mock_db = client_with_mock_db
+        mock_db.changes = AsyncMock(return_value={
+            "results": [
+                {"seq": "43-a", "id": item_doc["_id"], "doc": item_doc},
+                {"seq": "44-b", "id": item_doc["_id"], "doc": item_doc},
+            ],
+            "last_seq": "44-b",
+        })
+
+        with patch("app.routers.sync_couchdb.PULL_PAGE_SIZE", 2):
+            response = await client.get(
+                "/api/v2/sync/pull/items",
+                params={"since": "42-abc"},
+                headers={"Authorization": f"Bearer {auth_token}"},
+            )
+            assert response.status_code == 200
+            data = response.json()
+            assert data["checkpoint"] == {"seq": "44-b"}
+            assert data["next_cursor"]
+            assert mock_db.changes.call_args.kwargs["limit"] == 2
+
+            mock_db.changes = AsyncMock(return_value={"results": [], "last_seq": "45-c"})
+            response = await client.get(
+                "/api/v2/sync/pull/items",
+                params={"since": "42-abc", "cursor": data["next_cursor"]},
+                headers={"Authorization": f"Bearer {auth_token}"},
+            )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["checkpoint"] == {"seq": "45-c"}
+        assert data["next_cursor"] is None
+        assert mock_db.changes.call_args.kwargs["since"] == "44-b"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "not a cursor!",
+            # Valid base64 of JSON, but not a position this router issues
+            "eyJ1c2VyIjoidXNlcjpvdGhlciJ9",
+        ],
+    )
+    async def test_invalid_cursor(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+        cursor: str,
+    ):
+        """Cursors the server did not issue are rejected before CouchDB is queried."""
+        client, mock_db = client_with_mock_db
+
+        response = await client.get(
+            "/api/v2/sync/pull/wishlists",
+            params={"cursor": cursor},
+            headers={"Authorization": f"Bearer {auth_token}"},
+        )
+
+        assert response.status_code == 400
+        mock_db.view.assert_not_called()
+
+
+class TestStreamingPull:
+    """Tests for full pulls streamed from the access view."""
+
+    @pytest.mark.asyncio
+    async def test_streamed_and_buffered_pulls_match(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+        user_id: str,
+    ):
+        """Both paths return the same page, filtering and cursor."""
+        client, mock_db = client_with_mock_db
+        docs = [
+            {"_id": f"wishlist:{i}", "type": "wishlist", "name": "Zoë", "updated_at": f"2024-01-0{7 + i}"}
+            for i in range(3)
+        ]
+        docs[0]["_deleted"] = True
+        mock_db.view = AsyncMock(return_value=_view_rows([docs[0], docs[1], docs[1], docs[2]]))
+
+        bodies = {}
+        with patch("app.routers.sync_couchdb.PULL_PAGE_SIZE", 3):
+            for streamed in (True, False):
+                with patch("app.routers.sync_couchdb.settings.sync_stream_pulls", streamed):
+                    response = await client.get(
+                        "/api/v2/sync/pull/wishlists",
+                        headers={"Authorization": f"Bearer {auth_token}"},
+                    )
+                assert response.status_code == 200
+                bodies[streamed] = response.json()
+
+        assert bodies[True] == bodies[False]
+        assert bodies[True]["documents"] == [docs[1]]
+        assert bodies[True]["next_cursor"]
+        assert mock_db.stream_view.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_couchdb_error_before_streaming(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+    ):
+        """A failing view query is still an error response, not a broken stream."""
+        client, mock_db = client_with_mock_db
+        mock_db.view = AsyncMock(side_effect=CouchDBError("missing", 404, "not_found"))
+
+        response = await client.get(
+            "/api/v2/sync/pull/wishlists",
+            headers={"Authorization": f"Bearer {auth_token}"},
+        )
+
+        assert response.status_code == 500
+        assert response.json() == {"detail": "Failed to pull wishlists"}
+
+
 # =============================================================================
 # PUSH ENDPOINT TESTS
 # =============================================================================
@@ -610,6 +1059,48 @@ class TestPushEndpoint:
         data = response.json()
         assert data["conflicts"] == []
 
+    @pytest.mark.asyncio
+    async def test_push_records_removed_access(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+        user_id: str,
+        wishlist_doc: dict[str, Any],
+    ):
+        """Users dropped from access are kept in access_removed so their delta pulls get a tombstone."""
+        client, mock_db = client_with_mock_db
+        wishlist_doc["updated_at"] = (datetime.now(UTC) - timedelta(hours=1)).isoformat()
+        wishlist_doc["access"] = [user_id, "user:viewer", "user:other"]
+        wishlist_doc["access_removed"] = ["user:earlier"]
+        updated_wishlist = {
+            **wishlist_doc,
+            "access": [user_id, "user:other"],
+            "access_removed": [],
+            "updated_at": datetime.now(UTC).isoformat(),
+        }
+
+        async def mock_get(doc_id: str) -> dict[str, Any]:
+            if doc_id == user_id:
+                return {"_id": user_id, "type": "user"}
+            if doc_id == wishlist_doc["_id"]:
+                return wishlist_doc
+            raise DocumentNotFoundError(doc_id)
+
+        mock_db.get = AsyncMock(side_effect=mock_get)
+
+        response = await client.post(
+            "/api/v2/sync/push/wishlists",
+            headers={"Authorization": f"Bearer {auth_token}"},
+            json={"documents": [updated_wishlist]},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["conflicts"] == []
+        saved = mock_db.put.call_args.args[0]
+        assert saved["access"] == [user_id, "user:other"]
+        # The client cannot clear the list; only regaining access does
+        assert saved["access_removed"] == ["user:earlier", "user:viewer"]
+
     # -------------------------------------------------------------------------
     # Test 11: Push wishlists by non-owner returns conflict
     # -------------------------------------------------------------------------
@@ -1151,6 +1642,302 @@ class TestPushEndpoint:
         assert "concurrent" in data["conflicts"][0]["error"].lower()
 
 
+class TestBulkPush:
+    """Tests for the batched push pipeline."""
+
+    @pytest.mark.asyncio
+    async def test_batch_uses_one_read_and_one_write(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+        user_id: str,
+        wishlist_doc: dict[str, Any],
+    ):
+        """A large offline queue costs two CouchDB round trips."""
+        client, mock_db = client_with_mock_db
+        items = [
+            {
+                "_id": f"item:{uuid4()}",
+                "type": "item",
+                "wishlist_id": wishlist_doc["_id"],
+                "title": f"Item {i}",
+                "updated_at": datetime.now(UTC).isoformat(),
+            }
+            for i in range(100)
+        ]
+        mock_db.get_many = AsyncMock(return_value={wishlist_doc["_id"]: wishlist_doc})
+        mock_db.bulk_docs = AsyncMock(return_value=[{"ok": True, "id": d["_id"], "rev": "1-x"} for d in items])
+
+        response = await client.post(
+            "/api/v2/sync/push/items",
+            headers={"Authorization": f"Bearer {auth_token}"},
+            json={"documents": items},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["conflicts"] == []
+        mock_db.get_many.assert_awaited_once()
+        keys = mock_db.get_many.call_args[0][0]
+        assert set(keys) == {d["_id"] for d in items} | {wishlist_doc["_id"]}
+        mock_db.bulk_docs.assert_awaited_once()
+        written = mock_db.bulk_docs.call_args[0][0]
+        assert len(written) == 100
+        assert all(d["access"] == [user_id] for d in written)
+        mock_db.put.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_conflicts_keep_request_order(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+        user_id: str,
+        another_user_id: str,
+        wishlist_doc: dict[str, Any],
+    ):
+        """Conflicts from every stage are reported per document, in request order."""
+        client, mock_db = client_with_mock_db
+        now = datetime.now(UTC)
+        server_newer = {**wishlist_doc, "updated_at": (now + timedelta(hours=1)).isoformat()}
+        raced_id = f"wishlist:{uuid4()}"
+        raced_server = {"_id": raced_id, "_rev": "1-a", "type": "wishlist", "owner_id": user_id, "updated_at": ""}
+        documents = [
+            {"_id": raced_id, "type": "wishlist", "owner_id": user_id, "updated_at": now.isoformat()},
+            {"type": "wishlist"},
+            {**wishlist_doc, "updated_at": now.isoformat()},
+            {"_id": f"wishlist:{uuid4()}", "type": "wishlist", "owner_id": another_user_id},
+            {"_id": f"wishlist:{uuid4()}", "type": "wishlist", "owner_id": user_id},
+        ]
+        mock_db.get_many = AsyncMock(side_effect=[
+            {wishlist_doc["_id"]: server_newer, raced_id: raced_server},
+            {raced_id: {**raced_server, "_rev": "2-b", "name": "Someone else"}},
+        ])
+        mock_db.bulk_docs = AsyncMock(return_value=[
+            {"id": raced_id, "error": "conflict", "reason": "Document update conflict."},
+            {"ok": True, "id": documents[4]["_id"], "rev": "1-c"},
+        ])
+
+        response = await client.post(
+            "/api/v2/sync/push/wishlists",
+            headers={"Authorization": f"Bearer {auth_token}"},
+            json={"documents": documents},
+        )
+
+        assert response.status_code == 200
+        conflicts = response.json()["conflicts"]
+        assert [(c["document_id"], c["error"]) for c in conflicts] == [
+            (raced_id, "Concurrent modification"),
+            ("unknown", "Document missing _id"),
+            (wishlist_doc["_id"], "Server has newer version"),
+            (documents[3]["_id"], "Unauthorized: not the wishlist owner"),
+        ]
+        assert conflicts[0]["server_document"]["name"] == "Someone else"
+        assert conflicts[2]["server_document"]["updated_at"] == server_newer["updated_at"]
+
+    @pytest.mark.asyncio
+    async def test_raced_document_deleted_meanwhile(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+        user_id: str,
+    ):
+        """A conflict on a document that is gone on refetch reports the deletion."""
+        client, mock_db = client_with_mock_db
+        doc = {"_id": f"bookmark:{uuid4()}", "type": "bookmark", "owner_id": user_id}
+        mock_db.get_many = AsyncMock(return_value={})
+        mock_db.bulk_docs = AsyncMock(return_value=[{"id": doc["_id"], "error": "conflict"}])
+
+        response = await client.post(
+            "/api/v2/sync/push/bookmarks",
+            headers={"Authorization": f"Bearer {auth_token}"},
+            json={"documents": [doc]},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["conflicts"] == [
+            {"document_id": doc["_id"], "error": "Document was deleted", "server_document": None}
+        ]
+
+
+    @pytest.mark.asyncio
+    async def test_create_then_delete_in_one_batch(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+        user_id: str,
+    ):
+        """A document created and deleted offline is not written at all."""
+        client, mock_db = client_with_mock_db
+        doc = {"_id": f"bookmark:{uuid4()}", "type": "bookmark", "owner_id": user_id}
+        mock_db.get_many = AsyncMock(return_value={})
+        mock_db.bulk_docs = AsyncMock(return_value=[])
+
+        response = await client.post(
+            "/api/v2/sync/push/bookmarks",
+            headers={"Authorization": f"Bearer {auth_token}"},
+            json={"documents": [doc, {**doc, "_deleted": True}]},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["conflicts"] == []
+        mock_db.bulk_docs.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_update_then_delete_in_one_batch(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+        user_id: str,
+    ):
+        """Only the last entry for an _id is written, with the server's revision."""
+        client, mock_db = client_with_mock_db
+        stored = {
+            "_id": f"bookmark:{uuid4()}",
+            "_rev": "3-server",
+            "type": "bookmark",
+            "owner_id": user_id,
+            "access": [user_id],
+            "updated_at": (datetime.now(UTC) - timedelta(hours=1)).isoformat(),
+        }
+        update = {**stored, "note": "edited", "updated_at": datetime.now(UTC).isoformat()}
+        mock_db.get_many = AsyncMock(return_value={stored["_id"]: stored})
+        mock_db.bulk_docs = AsyncMock(return_value=[{"ok": True, "id": stored["_id"], "rev": "4-x"}])
+
+        response = await client.post(
+            "/api/v2/sync/push/bookmarks",
+            headers={"Authorization": f"Bearer {auth_token}"},
+            json={"documents": [update, {**update, "_deleted": True}]},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["conflicts"] == []
+        mock_db.bulk_docs.assert_awaited_once()
+        written = mock_db.bulk_docs.call_args[0][0]
+        assert len(written) == 1
+        assert written[0]["_deleted"] is True
+        assert written[0]["_rev"] == "3-server"
+
+    @pytest.mark.asyncio
+    async def test_pushed_items_update_their_images(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+        user_id: str,
+        wishlist_doc: dict[str, Any],
+    ):
+        """Written items are handed on so their full-size image documents follow them."""
+        client, mock_db = client_with_mock_db
+        item = {
+            "_id": f"item:{uuid4()}",
+            "type": "item",
+            "wishlist_id": wishlist_doc["_id"],
+            "owner_id": user_id,
+            "title": "Lamp",
+            "updated_at": datetime.now(UTC).isoformat(),
+        }
+
+        async def mock_get(doc_id: str) -> dict[str, Any]:
+            if doc_id == user_id:
+                return {"_id": user_id, "type": "user"}
+            if doc_id == wishlist_doc["_id"]:
+                return wishlist_doc
+            raise DocumentNotFoundError(doc_id)
+
+        mock_db.get = AsyncMock(side_effect=mock_get)
+
+        response = await client.post(
+            "/api/v2/sync/push/items",
+            headers={"Authorization": f"Bearer {auth_token}"},
+            json={"documents": [item]},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["conflicts"] == []
+        mock_db.sync_item_images.assert_awaited_once()
+        assert [doc["_id"] for doc in mock_db.sync_item_images.call_args[0][0]] == [item["_id"]]
+
+
+class TestSetAccess:
+    """Tests for the access_removed bookkeeping behind revocation tombstones."""
+
+    NOW = datetime(2026, 6, 1, tzinfo=UTC)
+
+    def test_removed_users_are_remembered_with_the_time(self):
+        doc = {"access": ["u1", "u2"]}
+
+        set_access(doc, ["u1"], now=self.NOW)
+
+        assert doc["access_removed"] == ["u2"]
+        assert doc["access_removed_at"] == {"u2": self.NOW.isoformat()}
+
+    def test_entries_past_the_retention_are_dropped(self):
+        old = (self.NOW - timedelta(days=settings.sync_access_removed_retention_days + 1)).isoformat()
+        recent = (self.NOW - timedelta(days=1)).isoformat()
+        doc = {
+            "access": ["u1"],
+            "access_removed": ["old", "recent"],
+            "access_removed_at": {"old": old, "recent": recent},
+        }
+
+        set_access(doc, ["u1"], now=self.NOW)
+
+        assert doc["access_removed"] == ["recent"]
+        assert doc["access_removed_at"] == {"recent": recent}
+
+    def test_regaining_access_clears_the_entry(self):
+        doc = {"access": ["u1"], "access_removed": ["u2"], "access_removed_at": {"u2": self.NOW.isoformat()}}
+
+        set_access(doc, ["u1", "u2"], now=self.NOW)
+
+        assert "access_removed" not in doc
+        assert "access_removed_at" not in doc
+
+
+class TestItemImageSync:
+    """Tests for keeping item_image documents in step with their items."""
+
+    @staticmethod
+    def _db(images: dict[str, dict[str, Any]]) -> CouchDBClient:
+        db = CouchDBClient(url="http://couchdb", database="test", username="", password="")
+        db.view = AsyncMock(  # type: ignore[method-assign]
+            return_value={"rows": [{"key": item_id, "doc": doc} for item_id, doc in images.items()]}
+        )
+        db.bulk_docs = AsyncMock(return_value=[])  # type: ignore[method-assign]
+        return db
+
+    @pytest.mark.asyncio
+    async def test_deleted_item_deletes_its_image(self):
+        db = self._db({"item:abc": {"_id": "item_image:abc", "_rev": "1-a", "access": ["u1"]}})
+
+        await db.sync_item_images([{"_id": "item:abc", "_deleted": True}])
+
+        db.view.assert_awaited_once_with("app", "item_images", keys=["item:abc"], include_docs=True)
+        db.bulk_docs.assert_awaited_once_with([{"_id": "item_image:abc", "_rev": "1-a", "_deleted": True}])
+
+    @pytest.mark.asyncio
+    async def test_access_change_is_copied_to_the_image(self):
+        image = {
+            "_id": "item_image:abc",
+            "_rev": "1-a",
+            "access": ["u1", "u2"],
+            "_attachments": {"image": {"stub": True}},
+        }
+        db = self._db({"item:abc": image})
+
+        await db.sync_item_images([{"_id": "item:abc", "access": ["u1"]}])
+
+        written = db.bulk_docs.call_args[0][0]
+        assert written[0]["access"] == ["u1"]
+        assert written[0]["_attachments"] == {"image": {"stub": True}}
+
+    @pytest.mark.asyncio
+    async def test_unchanged_or_missing_images_are_not_written(self):
+        db = self._db({"item:abc": {"_id": "item_image:abc", "_rev": "1-a", "access": ["u1"]}})
+
+        await db.sync_item_images([{"_id": "item:abc", "access": ["u1"]}, {"_id": "item:def", "access": ["u1"]}])
+
+        db.bulk_docs.assert_not_called()
+
+
 # =============================================================================
 # Additional Edge Case Tests
 # =============================================================================
@@ -1334,13 +2121,13 @@ class TestEdgeCases:
         mock_db.put.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_pull_sorts_by_updated_at_descending(
+    async def test_pull_sorts_by_updated_at_ascending(
         self,
         client_with_mock_db: tuple[AsyncClient, MagicMock],
         auth_token: str,
         user_id: str,
     ):
-        """Pull results should be sorted by updated_at descending."""
+        """Pull results keep the view's oldest-first order, each document once."""
         client, mock_db = client_with_mock_db
 
         now = datetime.now(timezone.utc)
@@ -1348,13 +2135,12 @@ class TestEdgeCases:
         mid_time = (now - timedelta(days=3)).isoformat()
         new_time = now.isoformat()
 
-        wishlists = [
-            {"_id": "wishlist:old", "type": "wishlist", "updated_at": old_time},
-            {"_id": "wishlist:new", "type": "wishlist", "updated_at": new_time},
-            {"_id": "wishlist:mid", "type": "wishlist", "updated_at": mid_time},
-        ]
+        new = {"_id": "wishlist:new", "type": "wishlist", "updated_at": new_time}
+        mid = {"_id": "wishlist:mid", "type": "wishlist", "updated_at": mid_time}
+        old = {"_id": "wishlist:old", "type": "wishlist", "updated_at": old_time}
 
-        mock_db.find = AsyncMock(return_value=wishlists)
+        # A doc listing the user twice in its access array has two view rows
+        mock_db.view = AsyncMock(return_value=_view_rows([old, mid, mid, new]))
 
         response = await client.get(
             "/api/v2/sync/pull/wishlists",
@@ -1365,10 +2151,10 @@ class TestEdgeCases:
         data = response.json()
         docs = data["documents"]
         assert len(docs) == 3
-        # Should be sorted newest first
-        assert docs[0]["_id"] == "wishlist:new"
+        # Should be sorted oldest first
+        assert docs[0]["_id"] == "wishlist:old"
         assert docs[1]["_id"] == "wishlist:mid"
-        assert docs[2]["_id"] == "wishlist:old"
+        assert docs[2]["_id"] == "wishlist:new"
 
 
 # =============================================================================
@@ -1391,8 +2177,9 @@ class TestUserSync:
         """Pull users should only return the current user's document."""
         client, mock_db = client_with_mock_db
 
-        # Mock returns only the user's own document (selector uses _id = user_id)
-        mock_db.find = AsyncMock(return_value=[user_doc])
+        # A user doc can carry other users in its access list, so the access
+        # view may hold them; the user's own document is read by ID instead
+        mock_db.view = AsyncMock(return_value=_view_rows([another_user_doc, user_doc]))
 
         response = await client.get(
             "/api/v2/sync/pull/users",
@@ -1403,12 +2190,29 @@ class TestUserSync:
         data = response.json()
         assert len(data["documents"]) == 1
         assert data["documents"][0]["_id"] == user_id
+        assert data["checkpoint"] == {"seq": "10-seq"}
+        mock_db.view.assert_not_called()
+        mock_db.stream_view.assert_not_called()
 
-        # Verify selector was correct (should query by _id, not access array)
-        call_args = mock_db.find.call_args
-        selector = call_args.kwargs.get("selector") or call_args[0][0]
-        assert selector.get("_id") == user_id
-        assert selector.get("type") == "user"
+    @pytest.mark.asyncio
+    async def test_pull_users_without_access_field(
+        self,
+        client_with_mock_db: tuple[AsyncClient, MagicMock],
+        auth_token: str,
+        user_id: str,
+        user_doc: dict[str, Any],
+    ):
+        """OAuth-created users have no access array and still get their document."""
+        client, mock_db = client_with_mock_db
+        user_doc.pop("access", None)
+
+        response = await client.get(
+            "/api/v2/sync/pull/users",
+            headers={"Authorization": f"Bearer {auth_token}"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["documents"] == [user_doc]
 
     @pytest.mark.asyncio
     async def test_push_users_update_own_document(
@@ -1628,7 +2432,7 @@ class TestShareSync:
             "updated_at": datetime.now(timezone.utc).isoformat(),
         }
 
-        mock_db.find = AsyncMock(return_value=[user_share])
+        mock_db.view = AsyncMock(return_value=_view_rows([user_share]))
 
         response = await client.get(
             "/api/v2/sync/pull/shares",
@@ -1640,13 +2444,11 @@ class TestShareSync:
         assert len(data["documents"]) == 1
         assert data["documents"][0]["_id"] == user_share["_id"]
 
-        # Verify correct selector was used
-        mock_db.find.assert_called_once()
-        call_kwargs = mock_db.find.call_args[1]
-        selector = call_kwargs["selector"]
-        assert selector["type"] == "share"
-        assert selector["owner_id"] == user_id
-        assert selector["revoked"] == {"$ne": True}
+        # Verify the shares range of this user was queried
+        mock_db.view.assert_called_once()
+        call_kwargs = mock_db.view.call_args.kwargs
+        assert call_kwargs["startkey"] == [user_id, "share"]
+        assert call_kwargs["endkey"] == [user_id, "share", {}]
 
     @pytest.mark.asyncio
     async def test_pull_shares_excludes_revoked(
@@ -1656,11 +2458,28 @@ class TestShareSync:
         user_id: str,
         wishlist_id: str,
     ):
-        """Pull shares excludes revoked shares."""
+        """Pull shares excludes revoked shares and shares owned by others."""
         client, mock_db = client_with_mock_db
 
-        # Only non-revoked share should be returned by the find query
-        mock_db.find = AsyncMock(return_value=[])
+        revoked_share = {
+            "_id": f"share:{uuid4()}",
+            "type": "share",
+            "wishlist_id": wishlist_id,
+            "owner_id": user_id,
+            "token": "revoked123",
+            "link_type": "mark",
+            "revoked": True,
+            "access": [user_id],
+            "updated_at": datetime.now(UTC).isoformat(),
+        }
+        # Another user's share that lists this user in its access array
+        foreign_share = {
+            **revoked_share,
+            "_id": f"share:{uuid4()}",
+            "owner_id": f"user:{uuid4()}",
+            "revoked": False,
+        }
+        mock_db.view = AsyncMock(return_value=_view_rows([revoked_share, foreign_share]))
 
         response = await client.get(
             "/api/v2/sync/pull/shares",
@@ -256,16 +256,98 @@ function setSyncStatus(status: SyncStatus): void {
 // These are documents that had conflicts without a server_document response
 let failedPushDocIds: Set<string> = new Set();
 
+type SyncCollection = 'wishlists' | 'items' | 'marks' | 'bookmarks' | 'users' | 'shares';
+
+// Pull checkpoint per collection, kept in a local (never synced) document
+type PullCheckpointDoc = {
+  _id: string;
+  _rev?: string;
+  user_id: string | null;
+  seq: string;
+};
+
+function pullCheckpointId(collection: SyncCollection): string {
+  return `_local/pull-checkpoint-${collection}`;
+}
+
+/**
+ * Load the checkpoint of the last pull of a collection for the current user.
+ */
+async function loadPullCheckpoint(collection: SyncCollection): Promise<string | null> {
+  try {
+    const doc = (await getDatabase().get(pullCheckpointId(collection))) as unknown as PullCheckpointDoc;
+    return doc.user_id === currentSyncUserId ? doc.seq : null;
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * Remember where the next pull of a collection should continue from.
+ */
+async function savePullCheckpoint(collection: SyncCollection, seq: string | null): Promise<void> {
+  const localDb = getDatabase();
+  const id = pullCheckpointId(collection);
+  let rev: string | undefined;
+  try {
+    rev = (await localDb.get(id))._rev;
+  } catch {
+    // No checkpoint yet
+  }
+  if (seq === null) {
+    if (rev) {
+      await localDb.remove(id, rev);
+    }
+    return;
+  }
+  const doc: PullCheckpointDoc = { _id: id, _rev: rev, user_id: currentSyncUserId, seq };
+  await localDb.put(doc as unknown as CouchDBDoc);
+}
+
+/**
+ * Fetch one page of a collection from the server: a delta since `since`, or everything.
+ * `cursor` is the `next_cursor` of the previous page.
+ */
+async function fetchPull(
+  baseUrl: string,
+  collection: SyncCollection,
+  since: string | null,
+  cursor: string | null = null
+): Promise<Response> {
+  const params = new URLSearchParams();
+  if (since) {
+    params.set('since', since);
+  }
+  if (cursor) {
+    params.set('cursor', cursor);
+  }
+  const query = params.toString() ? `?${params.toString()}` : '';
+  return fetchWithTokenRefresh(
+    `${baseUrl}/api/v2/sync/pull/${collection}${query}`,
+    {
+      method: 'GET',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+    },
+    syncAbortController?.signal
+  );
+}
+
 /**
- * Pull documents from the server.
- * Fetches all documents the user has access to.
- * Uses reconciliation: server is source of truth, local docs not in server response are deleted.
+ * Pull documents from the server, following `next_cursor` until the last page.
+ * With a checkpoint from a previous pull, only documents changed since then are
+ * fetched. Deletions, revoked shares and documents the user was removed from
+ * arrive as explicit tombstones: the server keeps former readers in a
+ * document's `access_removed`, so its changes still reach them.
+ * Without one, fetches all documents the user has access to and reconciles:
+ * server is source of truth, local docs not in server response are deleted.
  * Only reconciles documents that were included in the push batch (pushedDocIds).
  * Documents not in the push batch are preserved — they may have been created locally
  * after the push phase read the changes feed, and haven't been synced yet.
  */
 async function pullFromServer(
-  collections: Array<'wishlists' | 'items' | 'marks' | 'bookmarks' | 'users' | 'shares'>,
+  collections: SyncCollection[],
   pushedDocIds: Map<string, Set<string>>
 ): Promise<void> {
   const localDb = getDatabase();
@@ -285,37 +367,57 @@ async function pullFromServer(
   // This reduces pull latency from 6 round-trips to 1 (network-wise).
   const fetchResults = await Promise.all(
     collections.map(async (collection) => {
-      const response = await fetchWithTokenRefresh(
-        `${baseUrl}/api/v2/sync/pull/${collection}`,
-        {
-          method: 'GET',
-          headers: {
-            'Content-Type': 'application/json',
-          },
-        },
-        syncAbortController?.signal
-      );
+      let since = await loadPullCheckpoint(collection);
+      const serverDocs: CouchDBDoc[] = [];
+      let checkpoint: string | null = null;
+      let cursor: string | null = null;
+
+      // Large collections come in pages; reconciliation needs all of them
+      do {
+        let response = await fetchPull(baseUrl, collection, since, cursor);
+
+        // The server no longer understands the checkpoint: start over with a full pull
+        if (response.status === 400 && since && !cursor) {
+          since = null;
+          response = await fetchPull(baseUrl, collection, since);
+        }
 
-      if (!response.ok) {
-        if (response.status === 401) {
-          throw new Error('Authentication expired');
+        if (!response.ok) {
+          if (response.status === 401) {
+            throw new Error('Authentication expired');
+          }
+          throw new Error(`Pull failed for ${collection}: ${response.status}`);
         }
-        throw new Error(`Pull failed for ${collection}: ${response.status}`);
-      }
 
-      const data = await response.json();
-      return { collection, serverDocs: (data.documents || []) as CouchDBDoc[] };
+        const data = await response.json();
+        for (const doc of (data.documents || []) as CouchDBDoc[]) {
+          serverDocs.push(doc);
+        }
+        checkpoint = (data.checkpoint?.seq ?? null) as string | null;
+        cursor = (data.next_cursor ?? null) as string | null;
+      } while (cursor);
+
+      return {
+        collection,
+        isDelta: since !== null,
+        serverDocs,
+        checkpoint,
+      };
     })
   );
 
   // Process upserts and reconciliation for each collection
-  for (const { collection, serverDocs } of fetchResults) {
+  for (const { collection, isDelta, serverDocs, checkpoint } of fetchResults) {
     try {
       // Build set of IDs from server (non-deleted docs user has access to)
       const serverDocIds = new Set(serverDocs.map((d: CouchDBDoc) => d._id));
 
       // Upsert documents from server
       for (const doc of serverDocs) {
+        if (doc._deleted) {
+          await applyServerTombstone(localDb, doc);
+          continue;
+        }
         try {
           let existingRev: string | undefined;
           try {
@@ -343,63 +445,14 @@ async function pullFromServer(
         }
       }
 
-      // Reconciliation: find local docs not in server response and mark as deleted
-      // This handles items deleted by other users (e.g., wishlist owner)
-      // EXCEPTION: Skip documents that failed to push (preserve local changes)
-      const docType = typeMap[collection];
-      try {
-        const localResult = await localDb.find({
-          selector: {
-            $and: [
-              { type: docType },
-              {
-                $or: [
-                  { _deleted: { $exists: false } },
-                  { _deleted: false },
-                ],
-              },
-            ],
-          },
-        });
-
-        const collectionPushedIds = pushedDocIds.get(collection);
-        for (const localDoc of localResult.docs) {
-          if (!serverDocIds.has(localDoc._id)) {
-            // Skip if this doc wasn't in the push batch — it was created locally
-            // after push read the changes feed and hasn't been synced yet
-            if (!collectionPushedIds?.has(localDoc._id)) {
-              continue;
-            }
-            // Skip if this doc failed to push - preserve local changes
-            if (failedPushDocIds.has(localDoc._id)) {
-              console.log(`[PouchDB] Preserving ${localDoc._id} - failed to push, will retry later`);
-              continue;
-            }
-            // This doc exists locally but not on server - it was deleted or access revoked
-            try {
-              await localDb.put({
-                ...localDoc,
-                _deleted: true,
-                updated_at: new Date().toISOString(),
-              });
-              // Notify about deletion
-              syncCallbacks.onChange?.({
-                id: localDoc._id,
-                seq: 0,
-                changes: [{ rev: localDoc._rev || '' }],
-                doc: localDoc,
-                deleted: true,
-              });
-            } catch (error) {
-              console.warn(`[PouchDB] Failed to delete ${localDoc._id}:`, error);
-            }
-          }
-        }
-      } catch (error) {
-        console.warn(`[PouchDB] Reconciliation query failed for ${collection}:`, error);
+      // A delta carries its deletions explicitly; only a full pull needs reconciliation
+      if (!isDelta) {
+        await reconcileCollection(localDb, typeMap[collection], serverDocIds, pushedDocIds.get(collection));
       }
 
-      console.log(`[PouchDB] Pulled and reconciled ${serverDocs.length} ${collection}`);
+      await savePullCheckpoint(collection, checkpoint);
+
+      console.log(`[PouchDB] Pulled ${isDelta ? 'changes to' : 'and reconciled'} ${serverDocs.length} ${collection}`);
     } catch (error) {
       if ((error as Error).name === 'AbortError') {
         throw error;
@@ -410,6 +463,104 @@ async function pullFromServer(
   }
 }
 
+/**
+ * Delete a local document the server reported as deleted or no longer accessible.
+ */
+async function applyServerTombstone(
+  localDb: PouchDB.Database<CouchDBDoc>,
+  tombstone: CouchDBDoc
+): Promise<void> {
+  // Skip if this doc failed to push - preserve local changes
+  if (failedPushDocIds.has(tombstone._id)) {
+    return;
+  }
+  let localDoc: CouchDBDoc;
+  try {
+    localDoc = await localDb.get(tombstone._id);
+  } catch {
+    return; // Never pulled or already deleted locally
+  }
+  try {
+    await localDb.put({
+      ...localDoc,
+      _deleted: true,
+      updated_at: new Date().toISOString(),
+    });
+    syncCallbacks.onChange?.({
+      id: localDoc._id,
+      seq: 0,
+      changes: [{ rev: localDoc._rev || '' }],
+      doc: localDoc,
+      deleted: true,
+    });
+  } catch (error) {
+    console.warn(`[PouchDB] Failed to delete ${localDoc._id}:`, error);
+  }
+}
+
+/**
+ * Reconciliation after a full pull: find local docs not in server response and mark as deleted.
+ * This handles items deleted by other users (e.g., wishlist owner)
+ * EXCEPTION: Skip documents that failed to push (preserve local changes)
+ */
+async function reconcileCollection(
+  localDb: PouchDB.Database<CouchDBDoc>,
+  docType: string,
+  serverDocIds: Set<string>,
+  collectionPushedIds: Set<string> | undefined
+): Promise<void> {
+  try {
+    const localResult = await localDb.find({
+      selector: {
+        $and: [
+          { type: docType },
+          {
+            $or: [
+              { _deleted: { $exists: false } },
+              { _deleted: false },
+            ],
+          },
+        ],
+      },
+    });
+
+    for (const localDoc of localResult.docs) {
+      if (!serverDocIds.has(localDoc._id)) {
+        // Skip if this doc wasn't in the push batch — it was created locally
+        // after push read the changes feed and hasn't been synced yet
+        if (!collectionPushedIds?.has(localDoc._id)) {
+          continue;
+        }
+        // Skip if this doc failed to push - preserve local changes
+        if (failedPushDocIds.has(localDoc._id)) {
+          console.log(`[PouchDB] Preserving ${localDoc._id} - failed to push, will retry later`);
+          continue;
+        }
+        // This doc exists locally but not on server - it was deleted or access revoked
+        try {
+          await localDb.put({
+            ...localDoc,
+            _deleted: true,
+            updated_at: new Date().toISOString(),
+          });
+          // Notify about deletion
+          syncCallbacks.onChange?.({
+            id: localDoc._id,
+            seq: 0,
+            changes: [{ rev: localDoc._rev || '' }],
+            doc: localDoc,
+            deleted: true,
+          });
+        } catch (error) {
+          console.warn(`[PouchDB] Failed to delete ${localDoc._id}:`, error);
+        }
+      }
+    }
+  } catch (error) {
+    console.warn(`[PouchDB] Reconciliation query failed for ${docType}:`, error);
+  }
+}
+
 /**
  * Push local changes to the server.
  * Gets documents modified since last push and sends them.
@@ -801,6 +952,11 @@ export async function clearDatabase(): Promise<void> {
   if (toDelete.length > 0) {
     await localDb.bulkDocs(toDelete as unknown as CouchDBDoc[]);
   }
+  // Without local documents the next pull must be a full one
+  const collections: SyncCollection[] = ['wishlists', 'items', 'marks', 'bookmarks', 'users', 'shares'];
+  for (const collection of collections) {
+    await savePullCheckpoint(collection, null);
+  }
   console.log('[PouchDB] Database cleared');
 }
 
@@ -0,0 +1,91 @@
+"""Compare page capture with and without resource blocking.
+
+Usage (inside the resolver container):
+
+    python -m app.blocking_benchmark https://www.ozon.ru/product/... [--runs 3]
+
+Each URL is captured `--runs` times in a fresh context per mode and the
+median navigation time, request count and transferred bytes are printed as
+JSON, so a blocking rule change can be checked against real sites.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+from .browser_manager import load_manager_from_env, new_context, open_browser
+from .resource_blocking import ResourceBlocker, load_resource_blocker_from_env
+from .scrape import PageCaptureConfig, capture_page_source
+
+
+async def _capture_once(browser, url: str, *, blocker: Optional[ResourceBlocker], cfg: PageCaptureConfig) -> Dict[str, Any]:
+    context = await new_context(browser, url, blocker=blocker)
+    page = await context.new_page()
+    requests = 0
+    pending: List[asyncio.Task] = []
+
+    def on_finished(request) -> None:
+        nonlocal requests
+        requests += 1
+        pending.append(asyncio.ensure_future(request.sizes()))
+
+    page.on("requestfinished", on_finished)
+    start = time.perf_counter()
+    try:
+        await capture_page_source(page, url, cfg=cfg)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+    finally:
+        sizes = await asyncio.gather(*pending, return_exceptions=True)
+        await context.close()
+
+    transferred = sum(
+        int(s.get("responseBodySize") or 0) + int(s.get("responseHeadersSize") or 0)
+        for s in sizes
+        if isinstance(s, dict)
+    )
+    return {"navigation_ms": elapsed_ms, "requests": requests, "bytes": transferred}
+
+
+def _summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {key: round(statistics.median(r[key] for r in runs), 1) for key in ("navigation_ms", "requests", "bytes")}
+
+
+async def compare(urls: List[str], *, runs: int) -> List[Dict[str, Any]]:
+    manager = load_manager_from_env()
+    blocker = load_resource_blocker_from_env() or ResourceBlocker()
+    cfg = PageCaptureConfig.from_env()
+    report: List[Dict[str, Any]] = []
+
+    async with open_browser(headless=manager.headless, channel=manager.channel) as (_pw, browser):
+        for url in urls:
+            results: Dict[str, Any] = {"url": url}
+            for mode, mode_blocker in (("unblocked", None), ("blocked", blocker)):
+                samples = [await _capture_once(browser, url, blocker=mode_blocker, cfg=cfg) for _ in range(runs)]
+                results[mode] = _summarize(samples)
+            before, after = results["unblocked"], results["blocked"]
+            results["navigation_saved_pct"] = (
+                round(100 * (1 - after["navigation_ms"] / before["navigation_ms"]), 1) if before["navigation_ms"] else 0.0
+            )
+            results["bytes_saved_pct"] = round(100 * (1 - after["bytes"] / before["bytes"]), 1) if before["bytes"] else 0.0
+            report.append(results)
+
+    report.append({"blocking_stats": blocker.metrics()})
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    report = asyncio.run(compare(args.urls, runs=max(1, args.runs)))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,18 @@ import logging
 import os
 import random
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import AsyncIterator, Dict, List, Literal, Optional, Tuple, Union
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Literal, Optional, Set, Tuple, Union
 from urllib.parse import urlparse
 
 from playwright.async_api import Browser, BrowserContext, Playwright, async_playwright
 from playwright_stealth import Stealth
 
+from .capture_profiles import CaptureProfiles, load_capture_profiles_from_env
+from .resource_blocking import ResourceBlocker, load_resource_blocker_from_env
+from .scrape import READINESS_INIT_SCRIPT, registrable_domain
+
 
 # Keep aligned with repo defaults (RU locale).
 STEALTH = Stealth(navigator_languages_override=("ru-RU", "ru", "en-US", "en"))
@@ -158,6 +162,7 @@ async def new_context(
     profile: BrowserProfile = DEFAULT_PROFILE,
     extra_headers: Optional[Dict[str, str]] = None,
     storage_state_path: Optional[Union[str, Path]] = None,
+    blocker: Optional[ResourceBlocker] = None,
 ) -> BrowserContext:
     storage_state: Optional[str] = None
     if storage_state_path is not None:
@@ -179,6 +184,9 @@ async def new_context(
         ctx_kwargs["geolocation"] = profile.geolocation
 
     ctx = await browser.new_context(**ctx_kwargs)
+    await ctx.add_init_script(READINESS_INIT_SCRIPT)
+    if blocker is not None:
+        await blocker.install(ctx, url)
 
     headers = default_headers()
     if extra_headers:
@@ -202,6 +210,488 @@ async def new_context(
     return ctx
 
 
+def _origin(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme or 'https'}://{parsed.hostname or ''}"
+
+
+@dataclass
+class _PooledContext:
+    context: BrowserContext
+    browser: Browser
+    key: Tuple[int, str]
+    profile: BrowserProfile
+    created_at: float
+    last_used: float
+    uses: int = 1
+    closed: bool = False
+    origins: Set[str] = field(default_factory=set)
+
+
+class ContextPool:
+    """
+    Warm BrowserContexts keyed by (browser, registrable domain).
+
+    Repeat requests to the same site reuse a context that already has headers,
+    cookies, geolocation grants and the site's session loaded instead of
+    paying for context setup again. Idle contexts are evicted after
+    `idle_ttl_s`, recycled after `max_uses` and health-checked before reuse.
+    """
+
+    def __init__(self, *, max_idle_per_domain: int = 2, idle_ttl_s: float = 300.0, max_uses: int = 20) -> None:
+        self.max_idle_per_domain = max(1, int(max_idle_per_domain))
+        self.idle_ttl_s = float(idle_ttl_s)
+        self.max_uses = max(1, int(max_uses))
+        self._idle: Dict[Tuple[int, str], List[_PooledContext]] = {}
+        self._leased: Dict[int, _PooledContext] = {}
+        self.created = 0
+        self.reused = 0
+        self.recycled = 0
+        self.evicted_idle = 0
+        self.unhealthy = 0
+
+    @staticmethod
+    def site_key(url: str) -> str:
+        return registrable_domain(urlparse(url).hostname or "")
+
+    async def acquire(
+        self,
+        browser: Browser,
+        *,
+        url: str,
+        profile: BrowserProfile,
+        storage_state_path: Optional[Union[str, Path]] = None,
+        blocker: Optional[ResourceBlocker] = None,
+    ) -> BrowserContext:
+        await self.evict_idle()
+        key = (id(browser), self.site_key(url))
+
+        idle = self._idle.get(key) or []
+        while idle:
+            entry = idle.pop()
+            if await self._is_healthy(entry):
+                entry.uses += 1
+                self.reused += 1
+                self._leased[id(entry.context)] = entry
+                await self._grant_origin(entry, url)
+                return entry.context
+            self.unhealthy += 1
+            await self._close(entry)
+
+        ctx = await new_context(
+            browser,
+            url,
+            profile=profile,
+            storage_state_path=storage_state_path,
+            blocker=blocker,
+        )
+        now = time.monotonic()
+        entry = _PooledContext(context=ctx, browser=browser, key=key, profile=profile, created_at=now, last_used=now)
+        entry.origins.add(_origin(url))
+        try:
+            ctx.on("close", lambda _ctx: setattr(entry, "closed", True))
+        except Exception:
+            pass
+        self.created += 1
+        self._leased[id(ctx)] = entry
+        return ctx
+
+    async def release(self, context: BrowserContext, *, keep: bool = True) -> None:
+        """Return a leased context; `keep=False` closes it instead of pooling it."""
+        entry = self._leased.pop(id(context), None)
+        if entry is None:
+            await self._close_context(context)
+            return
+
+        entry.last_used = time.monotonic()
+        # Leave a clean context behind: pages from the previous request are closed.
+        for page in list(getattr(context, "pages", []) or []):
+            try:
+                await page.close()
+            except Exception:
+                pass
+
+        if entry.closed or not self._browser_connected(entry.browser):
+            self.unhealthy += 1
+            await self._close(entry)
+            return
+        if not keep:
+            await self._close(entry)
+            return
+        if entry.uses >= self.max_uses:
+            self.recycled += 1
+            await self._close(entry)
+            return
+
+        idle = self._idle.setdefault(entry.key, [])
+        if len(idle) >= self.max_idle_per_domain:
+            await self._close(entry)
+            return
+        idle.append(entry)
+
+    async def evict_idle(self) -> int:
+        now = time.monotonic()
+        evicted = 0
+        for key in list(self._idle):
+            keep: List[_PooledContext] = []
+            for entry in self._idle[key]:
+                if now - entry.last_used >= self.idle_ttl_s:
+                    await self._close(entry)
+                    evicted += 1
+                else:
+                    keep.append(entry)
+            if keep:
+                self._idle[key] = keep
+            else:
+                del self._idle[key]
+        self.evicted_idle += evicted
+        return evicted
+
+    async def close_all(self) -> None:
+        for entries in list(self._idle.values()):
+            for entry in entries:
+                await self._close(entry)
+        self._idle.clear()
+
+    def idle_count(self) -> int:
+        return sum(len(v) for v in self._idle.values())
+
+    def metrics(self) -> Dict[str, object]:
+        return {
+            "idle": self.idle_count(),
+            "leased": len(self._leased),
+            "created": self.created,
+            "reused": self.reused,
+            "recycled": self.recycled,
+            "evicted_idle": self.evicted_idle,
+            "unhealthy": self.unhealthy,
+            "idle_by_domain": {key[1]: len(v) for key, v in self._idle.items()},
+        }
+
+    @staticmethod
+    def _browser_connected(browser: Browser) -> bool:
+        try:
+            return bool(browser.is_connected())
+        except Exception:
+            return False
+
+    async def _is_healthy(self, entry: _PooledContext) -> bool:
+        if entry.closed or not self._browser_connected(entry.browser):
+            return False
+        try:
+            # Cheap round trip that fails if the context died underneath us.
+            await entry.context.cookies()
+        except Exception:
+            return False
+        return True
+
+    async def _grant_origin(self, entry: _PooledContext, url: str) -> None:
+        origin = _origin(url)
+        if origin in entry.origins or not entry.profile.geolocation:
+            return
+        entry.origins.add(origin)
+        try:
+            await entry.context.grant_permissions(["geolocation"], origin=origin)
+        except Exception:
+            pass
+
+    async def _close(self, entry: _PooledContext) -> None:
+        entry.closed = True
+        await self._close_context(entry.context)
+
+    @staticmethod
+    async def _close_context(context: BrowserContext) -> None:
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+
+def _read_rss_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii", errors="ignore") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+async def browser_rss_bytes(browser: Browser) -> Optional[int]:
+    """
+    Resident memory of one Chromium instance (browser, renderer, GPU and utility processes).
+
+    The process list comes from the CDP SystemInfo domain and RSS from /proc,
+    so this only reports on Linux; returns None when either is unavailable.
+    """
+    try:
+        session = await browser.new_browser_cdp_session()
+        try:
+            info = await session.send("SystemInfo.getProcessInfo")
+        finally:
+            await session.detach()
+    except Exception:
+        return None
+    pids = [p.get("id") for p in (info.get("processInfo") or []) if isinstance(p.get("id"), int)]
+    total = sum(_read_rss_bytes(pid) for pid in pids)
+    return total or None
+
+
+@dataclass(frozen=True)
+class BrowserPoolConfig:
+    size: int = 1
+    max_contexts_per_browser: int = 500  # 0 disables count-based restarts
+    max_memory_mb: int = 0  # 0 disables memory-based restarts
+    monitor_interval_s: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "BrowserPoolConfig":
+        return cls(
+            size=max(1, int(os.environ.get("BROWSER_POOL_SIZE") or "1")),
+            max_contexts_per_browser=int(os.environ.get("BROWSER_MAX_CONTEXTS") or "500"),
+            max_memory_mb=int(os.environ.get("BROWSER_MAX_MEMORY_MB") or "0"),
+            monitor_interval_s=float(os.environ.get("BROWSER_MONITOR_INTERVAL_S") or "30"),
+        )
+
+
+@dataclass
+class _BrowserHandle:
+    browser: Browser
+    slot: int
+    launched_at: float
+    active: int = 0
+    contexts: int = 0
+    retiring: bool = False
+    rss_bytes: Optional[int] = None
+
+
+@dataclass
+class _SlotStats:
+    launches: int = 0
+    restarts: int = 0
+    crashes: int = 0
+    launch_failures: int = 0
+    contexts: int = 0
+    last_restart_reason: Optional[str] = None
+
+
+class BrowserPool:
+    """
+    Several browser processes behind one `acquire_context` call site.
+
+    Contexts go to the connected browser with the fewest active contexts. A
+    browser is retired after `max_contexts_per_browser` contexts, when its RSS
+    goes above `max_memory_mb`, or when it crashes: its slot immediately gets
+    a fresh browser while the old one finishes its in-flight contexts and is
+    closed once the last one is released.
+    """
+
+    def __init__(
+        self,
+        launcher: Callable[[], Awaitable[Browser]],
+        *,
+        size: int = 1,
+        max_contexts_per_browser: int = 500,
+        max_memory_mb: int = 0,
+        monitor_interval_s: float = 30.0,
+    ) -> None:
+        self._launcher = launcher
+        self.size = max(1, int(size))
+        self.max_contexts_per_browser = max(0, int(max_contexts_per_browser))
+        self.max_memory_mb = max(0, int(max_memory_mb))
+        self.monitor_interval_s = float(monitor_interval_s)
+        self._slots: List[Optional[_BrowserHandle]] = [None] * self.size
+        self._stats: List[_SlotStats] = [_SlotStats() for _ in range(self.size)]
+        self._handles: Dict[int, _BrowserHandle] = {}
+        self._launching: Dict[int, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._monitor_task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    async def start(self) -> None:
+        await asyncio.gather(*(self._launch(slot) for slot in range(self.size)))
+        if not any(self._slots):
+            raise RuntimeError("Failed to launch any browser")
+        if self.monitor_interval_s > 0:
+            self._monitor_task = asyncio.create_task(self._monitor_loop())
+
+    async def close(self) -> None:
+        self._closing = True
+        tasks = [t for t in (self._monitor_task, *self._launching.values(), *self._background) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for handle in list(self._handles.values()):
+            await self._close_browser(handle)
+        self._slots = [None] * self.size
+
+    async def checkout(self) -> Browser:
+        """Pick the least-loaded browser and count a new context against it. Pair with `checkin`."""
+        for _ in range(2):
+            handle = self._pick()
+            if handle is not None:
+                handle.active += 1
+                handle.contexts += 1
+                self._stats[handle.slot].contexts += 1
+                if self.max_contexts_per_browser and handle.contexts >= self.max_contexts_per_browser:
+                    self._retire(handle, "max_contexts")
+                return handle.browser
+            # Every slot is empty or dead: wait for (re)launches before giving up.
+            tasks = [self._schedule_launch(slot) for slot in range(self.size) if self._slots[slot] is None]
+            if tasks:
+                await asyncio.wait(tasks)
+        raise RuntimeError("No browser available")
+
+    async def checkin(self, browser: Browser) -> None:
+        handle = self._handles.get(id(browser))
+        if handle is None or handle.browser is not browser:
+            return
+        handle.active = max(0, handle.active - 1)
+        if handle.retiring and handle.active == 0:
+            await self._close_browser(handle)
+
+    def is_retiring(self, browser: Browser) -> bool:
+        handle = self._handles.get(id(browser))
+        return handle is not None and handle.browser is browser and handle.retiring
+
+    def _pick(self) -> Optional[_BrowserHandle]:
+        live = [h for h in self._slots if h is not None and not h.retiring and self._connected(h.browser)]
+        if not live:
+            return None
+        return min(live, key=lambda h: (h.active, h.contexts))
+
+    def _retire(self, handle: _BrowserHandle, reason: str) -> None:
+        if handle.retiring:
+            return
+        handle.retiring = True
+        LOGGER.info(
+            "Retiring browser slot=%d reason=%s contexts=%d active=%d",
+            handle.slot,
+            reason,
+            handle.contexts,
+            handle.active,
+        )
+        self._stats[handle.slot].last_restart_reason = reason
+        if self._slots[handle.slot] is handle:
+            self._slots[handle.slot] = None
+            if not self._closing:
+                self._schedule_launch(handle.slot)
+        if handle.active == 0:
+            self._spawn(self._close_browser(handle))
+
+    def _schedule_launch(self, slot: int) -> asyncio.Task:
+        task = self._launching.get(slot)
+        if task is None:
+            task = asyncio.create_task(self._launch(slot))
+            self._launching[slot] = task
+            task.add_done_callback(lambda _t: self._launching.pop(slot, None))
+        return task
+
+    async def _launch(self, slot: int) -> None:
+        stats = self._stats[slot]
+        try:
+            browser = await self._launcher()
+        except Exception as e:
+            stats.launch_failures += 1
+            LOGGER.warning("Browser launch failed for slot=%d: %s", slot, e)
+            return
+        if self._closing:
+            await browser.close()
+            return
+
+        handle = _BrowserHandle(browser=browser, slot=slot, launched_at=time.monotonic())
+        self._handles[id(browser)] = handle
+        self._slots[slot] = handle
+        if stats.launches:
+            stats.restarts += 1
+        stats.launches += 1
+        try:
+            browser.on("disconnected", lambda _b: self._on_disconnected(handle))
+        except Exception:
+            pass
+
+    def _on_disconnected(self, handle: _BrowserHandle) -> None:
+        if self._closing or handle.retiring:
+            return
+        self._stats[handle.slot].crashes += 1
+        LOGGER.warning("Browser slot=%d disconnected unexpectedly", handle.slot)
+        self._retire(handle, "crashed")
+
+    async def _close_browser(self, handle: _BrowserHandle) -> None:
+        if self._handles.get(id(handle.browser)) is handle:
+            del self._handles[id(handle.browser)]
+        handle.retiring = True
+        try:
+            await handle.browser.close()
+        except Exception:
+            pass
+
+    def _spawn(self, coro: Awaitable[None]) -> None:
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def check_health(self) -> None:
+        """Refresh RSS, retire browsers above the memory threshold and relaunch empty slots."""
+        for slot, handle in enumerate(list(self._slots)):
+            if handle is None:
+                self._schedule_launch(slot)
+                continue
+            if not self._connected(handle.browser):
+                self._on_disconnected(handle)
+                continue
+            handle.rss_bytes = await browser_rss_bytes(handle.browser)
+            if self.max_memory_mb and handle.rss_bytes and handle.rss_bytes > self.max_memory_mb * 1024 * 1024:
+                self._retire(handle, "memory")
+
+    async def _monitor_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.monitor_interval_s)
+            try:
+                await self.check_health()
+            except Exception as e:
+                LOGGER.warning("Browser pool health check failed: %s", e)
+
+    @staticmethod
+    def _connected(browser: Browser) -> bool:
+        try:
+            return bool(browser.is_connected())
+        except Exception:
+            return False
+
+    def metrics(self) -> Dict[str, object]:
+        now = time.monotonic()
+        browsers: List[Dict[str, object]] = []
+        for slot, handle in enumerate(self._slots):
+            stats = self._stats[slot]
+            browsers.append(
+                {
+                    "slot": slot,
+                    "connected": handle is not None and self._connected(handle.browser),
+                    "active": handle.active if handle is not None else 0,
+                    "contexts": handle.contexts if handle is not None else 0,
+                    "total_contexts": stats.contexts,
+                    "rss_mb": round(handle.rss_bytes / (1024 * 1024), 1) if handle and handle.rss_bytes else None,
+                    "uptime_s": round(now - handle.launched_at, 1) if handle is not None else None,
+                    "launches": stats.launches,
+                    "restarts": stats.restarts,
+                    "crashes": stats.crashes,
+                    "launch_failures": stats.launch_failures,
+                    "last_restart_reason": stats.last_restart_reason,
+                }
+            )
+        retiring = [h for h in self._handles.values() if h.retiring]
+        return {
+            "size": self.size,
+            "max_contexts_per_browser": self.max_contexts_per_browser,
+            "max_memory_mb": self.max_memory_mb,
+            "retiring": len(retiring),
+            "retiring_active": sum(h.active for h in retiring),
+            "browsers": browsers,
+        }
+
+
 class BrowserManager:
     def __init__(
         self,
@@ -209,15 +699,27 @@ class BrowserManager:
         channel: Literal["chromium", "chrome"],
         headless: bool,
         max_concurrency: int,
+        context_pool: Optional[ContextPool] = None,
+        resource_blocker: Optional[ResourceBlocker] = None,
+        capture_profiles: Optional[CaptureProfiles] = None,
     ) -> None:
         self._channel = channel
         self._headless = headless
-        self._sema = asyncio.Semaphore(max(1, int(max_concurrency)))
+        self._max_concurrency = max(1, int(max_concurrency))
+        self._sema = asyncio.Semaphore(self._max_concurrency)
+        self._pool = context_pool
+        self._browser_leases: Dict[int, Tuple[BrowserPool, Browser]] = {}
+        self._blocker = resource_blocker
+        self._profiles = capture_profiles
 
     @property
     def semaphore(self) -> asyncio.Semaphore:
         return self._sema
 
+    @property
+    def max_concurrency(self) -> int:
+        return self._max_concurrency
+
     @property
     def channel(self) -> Literal["chromium", "chrome"]:
         return self._channel
@@ -226,18 +728,113 @@ class BrowserManager:
     def headless(self) -> bool:
         return bool(self._headless)
 
-    async def make_context(self, browser: Browser, *, url: str, storage_state_path: Path) -> BrowserContext:
-        profile = DEFAULT_PROFILE
+    @property
+    def context_pool(self) -> Optional[ContextPool]:
+        return self._pool
+
+    @property
+    def resource_blocker(self) -> Optional[ResourceBlocker]:
+        return self._blocker
+
+    @property
+    def capture_profiles(self) -> Optional[CaptureProfiles]:
+        return self._profiles
+
+    @staticmethod
+    def _pick_profile() -> BrowserProfile:
         if (os.environ.get("RANDOM_UA") or "").strip().lower() in ("1", "true", "yes"):
-            profile = random.choice(ROTATING_PROFILES)
+            return random.choice(ROTATING_PROFILES)
+        return DEFAULT_PROFILE
+
+    async def make_context(self, browser: Browser, *, url: str, storage_state_path: Path) -> BrowserContext:
         return await new_context(
             browser,
             url,
-            profile=profile,
+            profile=self._pick_profile(),
             extra_headers=None,
             storage_state_path=storage_state_path,
+            blocker=self._blocker,
         )
 
+    async def acquire_context(
+        self,
+        browser: Union[Browser, BrowserPool],
+        *,
+        url: str,
+        storage_state_path: Path,
+    ) -> BrowserContext:
+        """
+        Get a context for `url`, warm from the pool when possible. Pair with `release_context`.
+
+        `browser` may be a BrowserPool, in which case the least-loaded browser is used.
+        """
+        target = browser
+        if isinstance(browser, BrowserPool):
+            target = await browser.checkout()
+        try:
+            if self._pool is None:
+                ctx = await self.make_context(target, url=url, storage_state_path=storage_state_path)
+            else:
+                ctx = await self._pool.acquire(
+                    target,
+                    url=url,
+                    profile=self._pick_profile(),
+                    storage_state_path=storage_state_path,
+                    blocker=self._blocker,
+                )
+        except BaseException:
+            if isinstance(browser, BrowserPool):
+                await browser.checkin(target)
+            raise
+        if isinstance(browser, BrowserPool):
+            self._browser_leases[id(ctx)] = (browser, target)
+        return ctx
+
+    async def release_context(self, context: BrowserContext) -> None:
+        """Return a context to the pool (or close it when pooling is off)."""
+        lease = self._browser_leases.pop(id(context), None)
+        # Contexts of a retiring browser are not worth keeping warm.
+        keep = lease is None or not lease[0].is_retiring(lease[1])
+        if self._pool is None:
+            try:
+                await context.close()
+            except Exception:
+                pass
+        else:
+            await self._pool.release(context, keep=keep)
+        if lease is not None:
+            await lease[0].checkin(lease[1])
+
+    async def close_contexts(self) -> None:
+        if self._pool is not None:
+            await self._pool.close_all()
+
+
+def _launch_kwargs(*, headless: bool, channel: Literal["chromium", "chrome"]) -> dict:
+    args = chromium_launch_args()
+    launch_kwargs: dict = {"headless": bool(headless), "args": args}
+    proxy = proxy_from_env()
+    if proxy:
+        server = str(proxy.get("server") or "")
+        parsed = urlparse(server)
+        if not parsed.scheme or not parsed.netloc:
+            LOGGER.warning("Playwright proxy server looks invalid: %s", server)
+        LOGGER.info(
+            "Playwright proxy enabled: server=%s username=%s bypass=%s",
+            server,
+            "set" if proxy.get("username") else "none",
+            proxy.get("bypass") or "none",
+        )
+        launch_kwargs["proxy"] = proxy
+    else:
+        LOGGER.info("Playwright proxy disabled")
+    if channel == "chrome":
+        launch_kwargs["channel"] = "chrome"
+        launch_kwargs["ignore_default_args"] = ["--enable-automation"]
+        if "--disable-infobars" not in args:
+            args.append("--disable-infobars")
+    return launch_kwargs
+
 
 @asynccontextmanager
 async def open_browser(
@@ -250,36 +847,39 @@ async def open_browser(
     Copied/adapted from repo `parser/browser.py`.
     """
     async with STEALTH.use_async(async_playwright()) as pw:
-        args = chromium_launch_args()
-        launch_kwargs: dict = {"headless": bool(headless), "args": args}
-        proxy = proxy_from_env()
-        if proxy:
-            server = str(proxy.get("server") or "")
-            parsed = urlparse(server)
-            if not parsed.scheme or not parsed.netloc:
-                LOGGER.warning("Playwright proxy server looks invalid: %s", server)
-            LOGGER.info(
-                "Playwright proxy enabled: server=%s username=%s bypass=%s",
-                server,
-                "set" if proxy.get("username") else "none",
-                proxy.get("bypass") or "none",
-            )
-            launch_kwargs["proxy"] = proxy
-        else:
-            LOGGER.info("Playwright proxy disabled")
-        if channel == "chrome":
-            launch_kwargs["channel"] = "chrome"
-            launch_kwargs["ignore_default_args"] = ["--enable-automation"]
-            if "--disable-infobars" not in args:
-                args.append("--disable-infobars")
-
-        browser = await pw.chromium.launch(**launch_kwargs)
+        browser = await pw.chromium.launch(**_launch_kwargs(headless=headless, channel=channel))
         try:
             yield pw, browser
         finally:
             await browser.close()
 
 
+@asynccontextmanager
+async def open_browser_pool(
+    *,
+    headless: bool,
+    channel: Literal["chromium", "chrome"],
+    cfg: Optional[BrowserPoolConfig] = None,
+) -> AsyncIterator[Tuple[Playwright, BrowserPool]]:
+    """Like `open_browser`, but runs `cfg.size` browsers behind a BrowserPool."""
+    cfg = cfg or BrowserPoolConfig.from_env()
+    async with STEALTH.use_async(async_playwright()) as pw:
+        launch_kwargs = _launch_kwargs(headless=headless, channel=channel)
+        pool = BrowserPool(
+            lambda: pw.chromium.launch(**launch_kwargs),
+            size=cfg.size,
+            max_contexts_per_browser=cfg.max_contexts_per_browser,
+            max_memory_mb=cfg.max_memory_mb,
+            monitor_interval_s=cfg.monitor_interval_s,
+        )
+        await pool.start()
+        LOGGER.info("Browser pool started: size=%d", pool.size)
+        try:
+            yield pw, pool
+        finally:
+            await pool.close()
+
+
 def load_manager_from_env() -> BrowserManager:
     channel = (os.environ.get("BROWSER_CHANNEL") or "chromium").strip().lower()
     if channel not in ("chromium", "chrome"):
@@ -288,4 +888,19 @@ def load_manager_from_env() -> BrowserManager:
     headless = (os.environ.get("HEADLESS") or "true").strip().lower() not in ("0", "false", "no")
     max_concurrency = int(os.environ.get("MAX_CONCURRENCY") or "2")
 
-    return BrowserManager(channel=channel, headless=headless, max_concurrency=max_concurrency)
+    context_pool: Optional[ContextPool] = None
+    if (os.environ.get("CONTEXT_POOL_ENABLED") or "true").strip().lower() not in ("0", "false", "no"):
+        context_pool = ContextPool(
+            max_idle_per_domain=int(os.environ.get("CONTEXT_POOL_MAX_IDLE_PER_DOMAIN") or "2"),
+            idle_ttl_s=float(os.environ.get("CONTEXT_POOL_IDLE_TTL_S") or "300"),
+            max_uses=int(os.environ.get("CONTEXT_POOL_MAX_USES") or "20"),
+        )
+
+    return BrowserManager(
+        channel=channel,
+        headless=headless,
+        max_concurrency=max_concurrency,
+        context_pool=context_pool,
+        resource_blocker=load_resource_blocker_from_env(),
+        capture_profiles=load_capture_profiles_from_env(),
+    )
@@ -0,0 +1,248 @@
+"""Per-domain capture timing learned from previous page captures.
+
+`PageCaptureConfig` is tuned for the slowest marketplaces. For each
+registrable domain we keep exponentially weighted estimates of how long
+the page takes to go quiet after navigation, how much extra settle time
+actually caught late DOM updates, and how often captures hit challenges or
+fail. Once a domain has enough samples and behaves well, its settle and
+extra-wait budgets are tightened; domains that keep timing out get longer
+budgets, and challenge-heavy or flaky domains keep the defaults. Every
+`explore_every`-th capture of a tuned domain runs with the defaults so a
+site that got slower is noticed.
+
+Profiles are persisted as JSON next to the storage state so that restarts
+do not reset what was learned. Captures only mark them dirty; the file is
+written from a worker thread at most every `save_interval_s`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, fields, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlparse
+
+from .ewma import ewma
+from .scrape import PageCaptureConfig, registrable_domain
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DomainProfile:
+    samples: int = 0
+    success_rate: float = 1.0
+    challenge_rate: float = 0.0
+    quiet_timeout_rate: float = 0.0
+    ready_samples: int = 0
+    ready_ms: float = 0.0
+    ready_dev_ms: float = 0.0
+    settle_samples: int = 0
+    settle_needed_ms: float = 0.0
+    settle_dev_ms: float = 0.0
+    updated_at: str = ""
+
+    def observe(
+        self,
+        *,
+        success: bool,
+        challenge: bool,
+        quiet_timed_out: bool,
+        ready_ms: float | None,
+        settle_needed_ms: float | None,
+    ) -> None:
+        n = self.samples
+        self.success_rate = ewma(self.success_rate, 1.0 if success else 0.0, n)
+        self.challenge_rate = ewma(self.challenge_rate, 1.0 if challenge else 0.0, n)
+        self.quiet_timeout_rate = ewma(self.quiet_timeout_rate, 1.0 if quiet_timed_out else 0.0, n)
+        if ready_ms is not None:
+            k = self.ready_samples
+            self.ready_dev_ms = ewma(self.ready_dev_ms, abs(ready_ms - self.ready_ms) if k else 0.0, k)
+            self.ready_ms = ewma(self.ready_ms, ready_ms, k)
+            self.ready_samples = k + 1
+        if settle_needed_ms is not None:
+            k = self.settle_samples
+            self.settle_dev_ms = ewma(self.settle_dev_ms, abs(settle_needed_ms - self.settle_needed_ms) if k else 0.0, k)
+            self.settle_needed_ms = ewma(self.settle_needed_ms, settle_needed_ms, k)
+            self.settle_samples = k + 1
+        self.samples = n + 1
+        self.updated_at = datetime.now(timezone.utc).isoformat()
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "DomainProfile":
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+class CaptureProfiles:
+    def __init__(
+        self,
+        *,
+        path: Path | None = None,
+        min_samples: int = 5,
+        min_settle_ms: int = 500,
+        min_extra_wait_ms: int = 5_000,
+        max_domains: int = 5_000,
+        save_interval_s: float = 60.0,
+        explore_every: int = 10,
+    ) -> None:
+        self.path = path
+        self.min_samples = max(1, int(min_samples))
+        self.min_settle_ms = int(min_settle_ms)
+        self.min_extra_wait_ms = int(min_extra_wait_ms)
+        self.max_domains = max(1, int(max_domains))
+        self.save_interval_s = float(save_interval_s)
+        self.explore_every = max(0, int(explore_every))
+        self._profiles: dict[str, DomainProfile] = {}
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        self.tuned = 0
+        self.defaulted = 0
+        self.explored = 0
+
+    @staticmethod
+    def domain_for(url: str) -> str:
+        return registrable_domain(urlparse(url).hostname or "")
+
+    def profile(self, url: str) -> DomainProfile | None:
+        return self._profiles.get(self.domain_for(url))
+
+    def config_for(self, url: str, base: PageCaptureConfig) -> PageCaptureConfig:
+        """Capture config for `url`: `base` tightened or relaxed by what the domain has shown."""
+        p = self.profile(url)
+        if p is None or p.samples < self.min_samples or p.challenge_rate >= 0.2 or p.success_rate < 0.8:
+            self.defaulted += 1
+            return base
+        if self.explore_every and p.samples % self.explore_every == 0:
+            self.explored += 1
+            return base
+
+        settle_ms = p.settle_needed_ms + 2 * p.settle_dev_ms + 250
+        settle_ms = int(min(base.settle_ms, max(self.min_settle_ms, settle_ms)))
+
+        if p.quiet_timeout_rate > 0.3:
+            # The page rarely goes quiet within budget: give it more room.
+            extra_ms = min(base.max_extra_wait_ms * 2, base.timeout_ms)
+        else:
+            extra_ms = p.ready_ms + 3 * p.ready_dev_ms
+            extra_ms = int(min(base.max_extra_wait_ms, max(self.min_extra_wait_ms, extra_ms)))
+
+        self.tuned += 1
+        return replace(base, settle_ms=settle_ms, max_extra_wait_ms=extra_ms)
+
+    def record(
+        self,
+        url: str,
+        *,
+        success: bool,
+        challenge: bool = False,
+        quiet_timed_out: bool = False,
+        ready_ms: float | None = None,
+        settle_needed_ms: float | None = None,
+    ) -> None:
+        domain = self.domain_for(url)
+        if not domain:
+            return
+        p = self._profiles.get(domain)
+        if p is None:
+            if len(self._profiles) >= self.max_domains:
+                oldest = min(self._profiles, key=lambda d: self._profiles[d].updated_at)
+                del self._profiles[oldest]
+            p = self._profiles[domain] = DomainProfile()
+        p.observe(
+            success=success,
+            challenge=challenge,
+            quiet_timed_out=quiet_timed_out,
+            ready_ms=ready_ms,
+            settle_needed_ms=settle_needed_ms,
+        )
+        self._dirty = True
+
+    def save_due(self) -> bool:
+        return self._dirty and time.monotonic() - self._saved_at >= self.save_interval_s
+
+    def load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self._profiles = {d: DomainProfile.from_dict(v) for d, v in (data.get("domains") or {}).items()}
+        except Exception as e:
+            logger.warning("Failed to load capture profiles from %s: %s", self.path, e)
+            return
+        logger.info("Loaded capture profiles for %d domains", len(self._profiles))
+
+    def _snapshot(self) -> dict[str, Any] | None:
+        """Copy of the profiles to write, taken on the caller's thread; None when there is nothing to save."""
+        self._saved_at = time.monotonic()
+        if self.path is None or not self._dirty:
+            return None
+        self._dirty = False
+        return {"version": 1, "domains": {d: asdict(p) for d, p in self._profiles.items()}}
+
+    def _write(self, data: dict[str, Any]) -> None:
+        assert self.path is not None
+        tmp = self.path.with_suffix(".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(self.path)
+        except Exception as e:
+            self._dirty = True
+            logger.warning("Failed to save capture profiles to %s: %s", self.path, e)
+
+    def save(self) -> None:
+        data = self._snapshot()
+        if data is not None:
+            self._write(data)
+
+    async def save_async(self) -> None:
+        """Like `save`, but the file is written in a worker thread to keep the event loop free."""
+        data = self._snapshot()
+        if data is not None:
+            await asyncio.to_thread(self._write, data)
+
+    def metrics(self, *, top: int = 20) -> dict[str, Any]:
+        busiest = sorted(self._profiles.items(), key=lambda kv: kv[1].samples, reverse=True)[:top]
+        return {
+            "domains": len(self._profiles),
+            "tuned": self.tuned,
+            "defaulted": self.defaulted,
+            "explored": self.explored,
+            "profiles": {
+                d: {
+                    "samples": p.samples,
+                    "success_rate": round(p.success_rate, 3),
+                    "challenge_rate": round(p.challenge_rate, 3),
+                    "quiet_timeout_rate": round(p.quiet_timeout_rate, 3),
+                    "ready_ms": round(p.ready_ms),
+                    "settle_needed_ms": round(p.settle_needed_ms),
+                }
+                for d, p in busiest
+            },
+        }
+
+
+def load_capture_profiles_from_env() -> CaptureProfiles | None:
+    enabled = (os.environ.get("CAPTURE_PROFILES_ENABLED") or "true").strip().lower() not in ("0", "false", "no")
+    if not enabled:
+        return None
+
+    raw_path = (os.environ.get("CAPTURE_PROFILES_PATH") or "").strip()
+    if raw_path:
+        path = Path(raw_path)
+    else:
+        path = Path(os.environ.get("STORAGE_STATE_DIR") or "storage_state") / "_capture_profiles.json"
+
+    profiles = CaptureProfiles(
+        path=path,
+        min_samples=int(os.environ.get("CAPTURE_PROFILES_MIN_SAMPLES") or "5"),
+    )
+    profiles.load()
+    return profiles
@@ -5,6 +5,8 @@ import base64
 import logging
 import os
 import socket
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from urllib.parse import urljoin
@@ -12,13 +14,20 @@ from urllib.parse import urljoin
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from .browser_manager import BrowserManager
-from .couchdb import CouchDBClient, ConflictError, DocumentNotFoundError, get_couchdb
+from .couchdb import CouchDBClient, CouchDBError, ConflictError, DocumentNotFoundError, get_couchdb
 from .html_optimizer import format_html_for_llm
-from .html_parser import extract_images_from_html, format_images_for_llm
-from .image_utils import crop_screenshot_to_content, image_data_url
+from .html_parser import format_images_for_llm
+from .html_preprocessor import preprocess_html
+from .html_pruner import HtmlPruner
+from .image_fetch import DirectImageFetcher
+from .image_pipeline import ImagePipeline, ProcessedImage
+from .image_utils import crop_screenshot, image_data_url
 from .llm import LLMClient
+from .resolution_cache import ResolutionCache, is_cacheable, normalize_url
 from .scrape import PageCaptureConfig, capture_page_source, looks_like_interstitial_or_challenge, storage_state_path
+from .single_flight import SingleFlight
 from .ssrf import validate_public_http_url
+from .structured_data import StructuredExtractor
 from .errors import ResolverError
 
 logger = logging.getLogger(__name__)
@@ -28,6 +37,44 @@ INSTANCE_ID = os.environ.get("INSTANCE_ID") or os.environ.get("HOSTNAME") or soc
 LEASE_DURATION_SECONDS = int(os.environ.get("LEASE_DURATION_SECONDS", "300"))  # 5 minutes
 SWEEP_INTERVAL_SECONDS = int(os.environ.get("SWEEP_INTERVAL_SECONDS", "60"))  # 1 minute
 
+# Worker pool configuration (0 workers = match BrowserManager concurrency)
+WATCHER_WORKERS = int(os.environ.get("WATCHER_WORKERS", "0"))
+WATCHER_QUEUE_SIZE = int(os.environ.get("WATCHER_QUEUE_SIZE", "100"))
+CLAIM_BATCH_SIZE = int(os.environ.get("CLAIM_BATCH_SIZE", "10"))
+
+# Changes feed checkpointing and cold-start backfill
+CHECKPOINT_INTERVAL_SECONDS = int(os.environ.get("CHECKPOINT_INTERVAL_SECONDS", "10"))
+BACKFILL_LIMIT = int(os.environ.get("BACKFILL_LIMIT", "500"))
+
+
+def checkpoint_doc_id(instance_id: str | None = None) -> str:
+    """Local (non-replicated) document holding this instance's last processed seq."""
+    return f"_local/item-resolver-checkpoint-{instance_id or INSTANCE_ID}"
+
+
+def image_doc_id(item_id: str) -> str:
+    """Document holding an item's full-size image; its type is not part of the sync pull.
+
+    This is the only place the ID is derived: core-api finds the document by
+    its `item_id` through the `app/item_images` view.
+    """
+    return f"item_image:{item_id.split(':', 1)[-1]}"
+
+
+def resolved_image_fields(image: ProcessedImage | None) -> dict:
+    """The item document carries the thumbnail; the full image is kept for its own document."""
+    if image is None:
+        return {"image_base64": None, "image_full": None}
+    full = image.full
+    full_b64 = base64.b64encode(full.data).decode("ascii")
+    if image.thumbnail is None:
+        return {"image_base64": image_data_url(full_b64, full.mime), "image_full": None}
+    thumbnail_b64 = base64.b64encode(image.thumbnail.data).decode("ascii")
+    return {
+        "image_base64": image_data_url(thumbnail_b64, image.thumbnail.mime),
+        "image_full": {"content_type": full.mime, "data": full_b64, "width": full.width, "height": full.height},
+    }
+
 
 def is_valid_public_url(url: str) -> bool:
     """Check if a URL is valid and publicly accessible (non-throwing)."""
@@ -38,23 +85,11 @@ def is_valid_public_url(url: str) -> bool:
         return False
 
 
-async def try_claim_item(couchdb: CouchDBClient, doc: dict) -> bool:
-    """
-    Attempt to claim an item for processing using optimistic locking.
-
-    Uses CouchDB's _rev field for conflict detection. Only the first instance
-    to successfully update the document will proceed with processing.
-
-    Returns True if claim succeeded, False if another instance claimed it.
-    """
-    item_id = doc["_id"]
-    current_rev = doc["_rev"]
-    now = datetime.now(timezone.utc)
+def _claim_doc(doc: dict, now: datetime) -> dict:
+    """Build the in_progress version of a pending item owned by this instance."""
     lease_expires = now + timedelta(seconds=LEASE_DURATION_SECONDS)
-
-    claim_doc = {
+    return {
         **doc,
-        "_rev": current_rev,
         "status": "in_progress",
         "claimed_by": INSTANCE_ID,
         "claimed_at": now.isoformat(),
@@ -62,18 +97,108 @@ async def try_claim_item(couchdb: CouchDBClient, doc: dict) -> bool:
         "updated_at": now.isoformat(),
     }
 
+
+def _reset_doc(doc: dict, now: datetime) -> dict:
+    """Build the pending version of an item whose lease expired."""
+    return {
+        **doc,
+        "status": "pending",
+        "claimed_by": None,
+        "claimed_at": None,
+        "lease_expires_at": None,
+        "updated_at": now.isoformat(),
+    }
+
+
+async def _bulk_update(couchdb: CouchDBClient, docs: list[dict], action: str) -> list[dict]:
+    """Write docs in one _bulk_docs call and return those that were accepted.
+
+    Accepted docs are returned with their new _rev. Conflicts mean another
+    instance got there first and are expected; other per-doc errors are logged.
+    """
+    if not docs:
+        return []
+
     try:
-        await couchdb.put(claim_doc)
-        logger.info(f"Claimed item {item_id} (lease expires: {lease_expires.isoformat()})")
-        return True
-    except ConflictError:
-        # Another instance claimed it first - this is expected behavior
-        logger.debug(f"Item {item_id} already claimed by another instance")
-        return False
+        results = await couchdb.bulk_docs(docs)
+    except CouchDBError as e:
+        logger.error(f"Bulk {action} of {len(docs)} items failed: {e}")
+        return []
+
+    by_id = {r.get("id"): r for r in results if isinstance(r, dict)}
+    accepted: list[dict] = []
+    for doc in docs:
+        result = by_id.get(doc["_id"], {})
+        if result.get("rev") and not result.get("error"):
+            accepted.append({**doc, "_rev": result["rev"]})
+        elif result.get("error") == "conflict":
+            logger.debug(f"Conflict on {action} of item {doc['_id']}, already handled by another instance")
+        else:
+            logger.warning(
+                f"Failed to {action} item {doc['_id']}: "
+                f"{result.get('error', 'no result')} {result.get('reason', '')}".rstrip()
+            )
+    return accepted
+
+
+async def try_claim_items(couchdb: CouchDBClient, docs: list[dict]) -> list[dict]:
+    """
+    Claim several pending items with a single _bulk_docs request.
+
+    Each document is claimed against its own _rev (optimistic locking), so only
+    the first instance to update a given item wins it; a conflict means another
+    instance claimed it first. Returns the claimed documents (with their new
+    _rev); items claimed by another instance are left out.
+    """
+    now = datetime.now(timezone.utc)
+    claimed = await _bulk_update(couchdb, [_claim_doc(doc, now) for doc in docs], "claim")
+    for doc in claimed:
+        logger.info(f"Claimed item {doc['_id']} (lease expires: {doc['lease_expires_at']})")
+    return claimed
+
+
+async def reset_stale_items(couchdb: CouchDBClient, docs: list[dict]) -> list[str]:
+    """
+    Reset items with expired leases back to pending with a single _bulk_docs request.
+
+    Returns the ids of the items that were reset.
+    """
+    now = datetime.now(timezone.utc)
+    reset = await _bulk_update(couchdb, [_reset_doc(doc, now) for doc in docs], "reset")
+    for doc in reset:
+        logger.info(f"Reset stale item {doc['_id']} to pending")
+    return [doc["_id"] for doc in reset]
+
+
+@dataclass
+class WorkerStats:
+    """Counters for a single watcher worker."""
+
+    processed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    current_item: str | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "current_item": self.current_item,
+        }
 
 
 class ChangesWatcher:
-    """Watches CouchDB changes feed for pending items and resolves them."""
+    """Watches CouchDB changes feed for pending items and resolves them.
+
+    The changes feed only enqueues pending items. A claim stage takes queued
+    items in batches, claims them with one _bulk_docs request and hands them
+    to a bounded pool of workers that resolve them in parallel. When the queue
+    is full the feed reader blocks (backpressure) instead of dropping items.
+
+    A batch never exceeds the number of idle workers, so claimed items do not
+    sit in memory while their lease runs out.
+    """
 
     def __init__(
         self,
@@ -82,34 +207,82 @@ class ChangesWatcher:
         manager: BrowserManager,
         browser,
         storage_state_dir: str,
+        workers: int | None = None,
+        queue_size: int | None = None,
+        claim_batch_size: int | None = None,
+        cache: ResolutionCache | None = None,
+        flights: SingleFlight | None = None,
+        structured: StructuredExtractor | None = None,
+        pruner: HtmlPruner | None = None,
+        image_fetcher: DirectImageFetcher | None = None,
+        image_pipeline: ImagePipeline | None = None,
     ):
         self.couchdb = couchdb
         self.llm_client = llm_client
         self.manager = manager
         self.browser = browser
         self.storage_state_dir = storage_state_dir
+        self.cache = cache
+        self.flights = flights or SingleFlight()
+        self.structured = structured
+        self.pruner = pruner
+        self.image_fetcher = image_fetcher
+        self.image_pipeline = image_pipeline or (image_fetcher.pipeline if image_fetcher else ImagePipeline())
         self.cfg = PageCaptureConfig.from_env()
         self._running = False
         self._task: asyncio.Task | None = None
         self._sweep_task: asyncio.Task | None = None
         self._last_seq: str = "now"
-        # Track if currently processing an item (one at a time)
-        self._processing = False
-        logger.info(f"ChangesWatcher initialized with instance_id={INSTANCE_ID}, lease={LEASE_DURATION_SECONDS}s, sweep={SWEEP_INTERVAL_SECONDS}s")
+        self._checkpoint_rev: str | None = None
+        self._checkpoint_seq: str | None = None
+        self._checkpoint_saved_at = 0.0
+        self._backfilled = 0
+
+        # Size the pool against the browser semaphore so workers never sit
+        # idle waiting for a browser slot they cannot get.
+        self.workers = max(1, workers or WATCHER_WORKERS or manager.max_concurrency)
+        self.queue_size = max(1, queue_size or WATCHER_QUEUE_SIZE)
+        self.claim_batch_size = max(1, claim_batch_size or CLAIM_BATCH_SIZE)
+        self._queue: asyncio.Queue[str] = asyncio.Queue(maxsize=self.queue_size)
+        # Claimed docs waiting for a worker; every entry holds a worker slot.
+        self._claimed: asyncio.Queue[tuple[dict, float]] = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        # Latest pending doc per item id plus its enqueue time; the queue only
+        # carries ids so repeated changes for one item collapse into one entry.
+        self._pending: dict[str, tuple[dict, float]] = {}
+        self._worker_tasks: list[asyncio.Task] = []
+        self._claim_task: asyncio.Task | None = None
+        self._worker_stats: list[WorkerStats] = [WorkerStats() for _ in range(self.workers)]
+        self._in_flight = 0
+        self._enqueued = 0
+        self._claim_batches = 0
+        self._claim_conflicts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_count = 0
+        logger.info(
+            f"ChangesWatcher initialized with instance_id={INSTANCE_ID}, lease={LEASE_DURATION_SECONDS}s, "
+            f"sweep={SWEEP_INTERVAL_SECONDS}s, workers={self.workers}, queue={self.queue_size}"
+        )
 
     async def start(self) -> None:
-        """Start watching for changes and stale lease sweep."""
+        """Start watching for changes, worker pool and stale lease sweep."""
         if self._running:
             logger.warning("Changes watcher already running")
             return
 
         self._running = True
+        self._claim_task = asyncio.create_task(self._claim_loop())
+        self._worker_tasks = [
+            asyncio.create_task(self._worker_loop(worker_id))
+            for worker_id in range(self.workers)
+        ]
         self._task = asyncio.create_task(self._watch_loop())
         self._sweep_task = asyncio.create_task(self._sweep_loop())
-        logger.info(f"Started CouchDB changes watcher (instance: {INSTANCE_ID})")
+        logger.info(f"Started CouchDB changes watcher (instance: {INSTANCE_ID}, workers: {self.workers})")
 
     async def stop(self) -> None:
-        """Stop watching for changes and sweep loop."""
+        """Stop watching for changes, worker pool and sweep loop."""
         self._running = False
 
         # Stop watch task
@@ -121,6 +294,9 @@ class ChangesWatcher:
                 pass
             self._task = None
 
+        # Persist the final position so a restart resumes from here
+        await self._save_checkpoint(force=True)
+
         # Stop sweep task
         if self._sweep_task:
             self._sweep_task.cancel()
@@ -130,10 +306,260 @@ class ChangesWatcher:
                 pass
             self._sweep_task = None
 
+        # Stop claim stage and workers; unclaimed queued items stay pending in
+        # CouchDB and claimed ones are reset by the stale lease sweep.
+        tasks = [t for t in (self._claim_task, *self._worker_tasks) if t is not None]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._claim_task = None
+        self._worker_tasks = []
+        self._pending.clear()
+
         logger.info("Stopped CouchDB changes watcher")
 
+    def metrics(self) -> dict:
+        """Snapshot of queue and worker metrics for sizing instances."""
+        return {
+            "instance_id": INSTANCE_ID,
+            "last_seq": self._last_seq,
+            "checkpoint_seq": self._checkpoint_seq,
+            "backfilled": self._backfilled,
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self.queue_size,
+            "claimed_waiting": self._claimed.qsize(),
+            "in_flight": self._in_flight,
+            "enqueued": self._enqueued,
+            "claim_batches": self._claim_batches,
+            "claim_conflicts": self._claim_conflicts,
+            "processed": sum(w.processed for w in self._worker_stats),
+            "failed": sum(w.failed for w in self._worker_stats),
+            "wait_avg_seconds": round(self._wait_total / self._wait_count, 3) if self._wait_count else 0.0,
+            "wait_max_seconds": round(self._wait_max, 3),
+            "per_worker": [w.to_dict() for w in self._worker_stats],
+        }
+
+    async def enqueue(self, doc: dict) -> None:
+        """Queue a pending item for the worker pool.
+
+        If the item is already queued, only its document is refreshed so the
+        worker claims against the latest revision. Blocks while the queue is full.
+        """
+        item_id = doc["_id"]
+        if item_id in self._pending:
+            _, enqueued_at = self._pending[item_id]
+            self._pending[item_id] = (doc, enqueued_at)
+            return
+
+        self._pending[item_id] = (doc, time.monotonic())
+        self._enqueued += 1
+        await self._queue.put(item_id)
+
+    async def join(self) -> None:
+        """Wait until every queued item has been claimed and processed."""
+        await self._queue.join()
+        await self._claimed.join()
+
+    async def _claim_loop(self) -> None:
+        """Claim queued items in batches sized to the idle workers."""
+        while self._running:
+            # Wait for an idle worker before taking anything off the queue
+            await self._slots.acquire()
+            try:
+                item_ids = [await self._queue.get()]
+            except BaseException:
+                self._slots.release()
+                raise
+
+            # Grab more queued items while there are idle workers for them
+            while (
+                len(item_ids) < self.claim_batch_size
+                and not self._queue.empty()
+                and not self._slots.locked()
+            ):
+                await self._slots.acquire()
+                item_ids.append(self._queue.get_nowait())
+
+            held = len(item_ids)
+            try:
+                entries = [e for e in (self._pending.pop(i, None) for i in item_ids) if e is not None]
+                enqueued_at = {doc["_id"]: ts for doc, ts in entries}
+
+                claimed = await try_claim_items(self.couchdb, [doc for doc, _ in entries])
+                self._claim_batches += 1
+                # Another instance claimed it, skip
+                self._claim_conflicts += len(entries) - len(claimed)
+
+                for doc in claimed:
+                    self._claimed.put_nowait((doc, enqueued_at[doc["_id"]]))
+                    held -= 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Claim stage error: {e}", exc_info=True)
+            finally:
+                # Slots of items that were not handed to a worker are free again
+                for _ in range(held):
+                    self._slots.release()
+                for _ in item_ids:
+                    self._queue.task_done()
+
+    async def _worker_loop(self, worker_id: int) -> None:
+        """Resolve claimed items until cancelled."""
+        stats = self._worker_stats[worker_id]
+
+        while self._running:
+            doc, enqueued_at = await self._claimed.get()
+            item_id = doc["_id"]
+            try:
+                wait = time.monotonic() - enqueued_at
+                self._wait_total += wait
+                self._wait_count += 1
+                self._wait_max = max(self._wait_max, wait)
+
+                logger.info(
+                    f"Worker {worker_id} processing claimed item: {item_id} from {doc.get('source_url')} "
+                    f"(waited {wait:.2f}s)"
+                )
+
+                self._in_flight += 1
+                stats.current_item = item_id
+                started = time.monotonic()
+                try:
+                    ok = await self._resolve_item(doc)
+                finally:
+                    stats.busy_seconds += time.monotonic() - started
+                    stats.current_item = None
+                    self._in_flight -= 1
+
+                if ok:
+                    stats.processed += 1
+                else:
+                    stats.failed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                stats.failed += 1
+                logger.error(f"Worker {worker_id} error on item {item_id}: {e}", exc_info=True)
+            finally:
+                self._claimed.task_done()
+                self._slots.release()
+
+    async def _load_checkpoint(self) -> None:
+        """Resume from the persisted changes feed position, if any."""
+        try:
+            doc = await self.couchdb.get(checkpoint_doc_id())
+        except DocumentNotFoundError:
+            await self._start_from_current_seq()
+            return
+        except Exception as e:
+            logger.error(f"Failed to load changes feed checkpoint: {e}")
+            return
+
+        self._checkpoint_rev = doc.get("_rev")
+        seq = doc.get("seq")
+        if seq:
+            self._last_seq = seq
+            self._checkpoint_seq = seq
+            logger.info(f"Resuming changes feed from checkpoint seq: {seq}")
+
+    async def _start_from_current_seq(self) -> None:
+        """Pin the feed start to the database's current seq before the backfill runs.
+
+        The backfill can take minutes on a large queue; starting the feed from
+        "now" afterwards would miss items that went pending meanwhile.
+        """
+        try:
+            seq = (await self.couchdb.info()).get("update_seq")
+        except Exception as e:
+            logger.error(f"Failed to read database update_seq: {e}")
+            seq = None
+        if seq:
+            self._last_seq = seq
+            logger.info(f"No changes feed checkpoint for {INSTANCE_ID}, starting from seq: {seq}")
+        else:
+            logger.info(f"No changes feed checkpoint for {INSTANCE_ID}, starting from now")
+
+    async def _save_checkpoint(self, force: bool = False) -> None:
+        """Persist the last processed seq, at most every CHECKPOINT_INTERVAL_SECONDS."""
+        if self._last_seq == "now" or self._last_seq == self._checkpoint_seq:
+            return
+        now = time.monotonic()
+        if not force and now - self._checkpoint_saved_at < CHECKPOINT_INTERVAL_SECONDS:
+            return
+
+        seq = self._last_seq
+        doc = {
+            "_id": checkpoint_doc_id(),
+            "seq": seq,
+            "instance_id": INSTANCE_ID,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        for _ in range(2):
+            if self._checkpoint_rev:
+                doc["_rev"] = self._checkpoint_rev
+            try:
+                result = await self.couchdb.put(doc)
+                self._checkpoint_rev = result.get("rev")
+                self._checkpoint_seq = seq
+                self._checkpoint_saved_at = now
+                return
+            except ConflictError:
+                # Stale rev (e.g. written by a previous process) - refresh and retry once
+                try:
+                    self._checkpoint_rev = (await self.couchdb.get(doc["_id"])).get("_rev")
+                except Exception:
+                    self._checkpoint_rev = None
+            except Exception as e:
+                logger.error(f"Failed to save changes feed checkpoint: {e}")
+                return
+        logger.warning("Could not save changes feed checkpoint after conflict")
+
+    async def _backfill_pending(self) -> None:
+        """Enqueue items that are already pending (e.g. went pending while we were down).
+
+        Pages of BACKFILL_LIMIT are read until a short page: the feed
+        checkpoint is already past these items, so anything left out here
+        would never be picked up. The selector is served by item-pending-index.
+        """
+        count = 0
+        bookmark = None
+        while self._running:
+            try:
+                pending, bookmark = await self.couchdb.find_page(
+                    selector={"type": "item", "status": "pending"},
+                    limit=BACKFILL_LIMIT,
+                    bookmark=bookmark,
+                )
+            except Exception as e:
+                logger.error(f"Pending items backfill failed: {e}")
+                break
+
+            for doc in pending:
+                if not self._running:
+                    break
+                if not doc.get("source_url"):
+                    continue
+                await self.enqueue(doc)
+                count += 1
+
+            if len(pending) < BACKFILL_LIMIT or not bookmark:
+                break
+
+        self._backfilled += count
+        if count:
+            logger.info(f"Backfilled {count} pending items")
+
     async def _watch_loop(self) -> None:
         """Main watch loop with automatic reconnection."""
+        await self._load_checkpoint()
+        await self._backfill_pending()
+
         reconnect_delay = 1  # Start with 1 second
         max_reconnect_delay = 60  # Max 60 seconds
 
@@ -183,26 +609,13 @@ class ChangesWatcher:
             )
 
             for item in stale_items:
-                item_id = item["_id"]
-                claimed_by = item.get("claimed_by", "unknown")
-
                 logger.warning(
-                    f"Resetting stale item {item_id} (was claimed by {claimed_by}, lease expired)"
+                    f"Resetting stale item {item['_id']} "
+                    f"(was claimed by {item.get('claimed_by', 'unknown')}, lease expired)"
                 )
 
-                # Reset to pending for re-processing
-                item["status"] = "pending"
-                item["claimed_by"] = None
-                item["claimed_at"] = None
-                item["lease_expires_at"] = None
-                item["updated_at"] = datetime.now(timezone.utc).isoformat()
-
-                try:
-                    await self.couchdb.put(item)
-                    logger.info(f"Reset stale item {item_id} to pending")
-                except ConflictError:
-                    # Another process already handled it
-                    logger.debug(f"Conflict resetting item {item_id}, already handled")
+            # Reset to pending for re-processing in one round trip
+            await reset_stale_items(self.couchdb, stale_items)
         except Exception as e:
             logger.error(f"Error sweeping stale leases: {e}")
 
@@ -225,9 +638,10 @@ class ChangesWatcher:
             if not self._running:
                 break
 
-            # Update last sequence for reconnection
+            # Update last sequence for reconnection and restarts
             if "seq" in change:
                 self._last_seq = change["seq"]
+                await self._save_checkpoint()
 
             # Skip deletions
             if change.get("deleted"):
@@ -241,11 +655,6 @@ class ChangesWatcher:
             if doc.get("type") != "item" or doc.get("status") != "pending":
                 continue
 
-            # Skip if we're already processing an item (one at a time)
-            if self._processing:
-                logger.debug(f"Already processing an item, skipping {doc.get('_id')}")
-                continue
-
             item_id = doc.get("_id", "unknown")
             source_url = doc.get("source_url")
 
@@ -253,23 +662,14 @@ class ChangesWatcher:
                 logger.warning(f"Item {item_id} has no source_url, skipping")
                 continue
 
-            # Try to claim the item before processing
-            claimed = await try_claim_item(self.couchdb, doc)
-            if not claimed:
-                # Another instance claimed it, skip
-                continue
+            # Hand off to the worker pool (blocks while the queue is full)
+            await self.enqueue(doc)
 
-            logger.info(f"Processing claimed item: {item_id} from {source_url}")
-
-            # Process item inline (one at a time, blocking)
-            self._processing = True
-            try:
-                await self._resolve_item(doc)
-            finally:
-                self._processing = False
+    async def _resolve_item(self, doc: dict) -> bool:
+        """Resolve a pending item and update CouchDB.
 
-    async def _resolve_item(self, doc: dict) -> None:
-        """Resolve a pending item and update CouchDB."""
+        Returns True if the item was resolved, False if it was marked as error.
+        """
         item_id = doc.get("_id", "unknown")
         source_url = doc.get("source_url", "")
 
@@ -278,7 +678,7 @@ class ChangesWatcher:
             if not is_valid_public_url(source_url):
                 logger.warning(f"Item {item_id} has invalid URL: {source_url}")
                 await self._update_item_status(doc, "error", error="Invalid or private URL")
-                return
+                return False
 
             # Resolve the URL
             resolved = await self._resolve_url(source_url)
@@ -286,11 +686,12 @@ class ChangesWatcher:
             if resolved is None:
                 logger.error(f"Failed to resolve item {item_id}")
                 await self._update_item_status(doc, "error", error="Resolution failed")
-                return
+                return False
 
             # Update item with resolved data
             await self._update_item_resolved(doc, resolved)
             logger.info(f"Successfully resolved item {item_id}")
+            return True
 
         except Exception as e:
             logger.exception(f"Error resolving item {item_id}: {e}")
@@ -298,13 +699,38 @@ class ChangesWatcher:
                 await self._update_item_status(doc, "error", error=str(e)[:200])
             except Exception:
                 pass
+            return False
 
     async def _resolve_url(self, url: str) -> dict | None:
-        """Resolve a URL to extract product metadata."""
+        """Resolve a URL, serving recently resolved URLs from the resolution cache."""
+        if self.cache is not None:
+            cached = await self.cache.get(url)
+            if cached is not None:
+                logger.info(f"Resolution cache hit for {url}")
+                if cached.get("image_url"):
+                    try:
+                        image = await self._fetch_image(cached["image_url"], url)
+                    except Exception as e:
+                        logger.warning(f"Failed to fetch image for cached {url}: {e}")
+                        image = None
+                    cached.update(resolved_image_fields(image))
+                return cached
+
+        # Items with the same product URL claimed at the same time share one run
+        return await self.flights.do(f"watcher:{normalize_url(url)}", lambda: self._fetch_and_cache(url))
+
+    async def _fetch_and_cache(self, url: str) -> dict | None:
+        resolved = await self._fetch_and_extract(url)
+        if resolved is not None and self.cache is not None and is_cacheable(resolved):
+            await self.cache.set(url, resolved)
+        return resolved
+
+    async def _fetch_and_extract(self, url: str) -> dict | None:
+        """Load a URL in the browser and extract product metadata with the LLM."""
         state_path = storage_state_path(Path(self.storage_state_dir), url)
 
         async with self.manager.semaphore:
-            context = await self.manager.make_context(
+            context = await self.manager.acquire_context(
                 self.browser,
                 url=url,
                 storage_state_path=state_path,
@@ -312,7 +738,9 @@ class ChangesWatcher:
             try:
                 page = await context.new_page()
                 try:
-                    final_url, page_title, html = await capture_page_source(page, url, cfg=self.cfg)
+                    final_url, page_title, html = await capture_page_source(
+                        page, url, cfg=self.cfg, profiles=self.manager.capture_profiles
+                    )
                 except PlaywrightTimeoutError:
                     logger.warning(f"Page load timed out: {url}")
                     return None
@@ -332,82 +760,67 @@ class ChangesWatcher:
                         logger.warning(f"Page appears blocked: {url}")
                         return None
 
-                # Take screenshot
-                page_shot = await page.screenshot(full_page=False, type="jpeg", quality=75)
-                page_b64 = base64.b64encode(page_shot).decode("ascii")
-                page_mime = "image/jpeg"
-
                 # Save storage state
                 try:
                     await context.storage_state(path=str(state_path))
                 except Exception:
                     pass
 
-                # Extract images from HTML
-                images = extract_images_from_html(html, base_url=final_url or url)
-                image_candidates = format_images_for_llm(images, max_images=20)
-
-                # Format HTML for LLM
-                max_chars = int(os.environ.get("LLM_MAX_CHARS") or 50000)
-                html_content = format_html_for_llm(
-                    html=html,
-                    url=final_url or url,
-                    title=page_title,
-                    max_chars=max_chars,
+                # Clean HTML, structured data and image candidates in one pass, off the event loop
+                if self.pruner is not None:
+                    max_chars = self.pruner.source_chars
+                else:
+                    max_chars = int(os.environ.get("LLM_MAX_CHARS") or 50000)
+                preprocessed = await asyncio.to_thread(
+                    preprocess_html, html, base_url=final_url or url, max_chars=max_chars
                 )
 
-                # Call LLM for extraction
-                try:
-                    llm_out = await self.llm_client.extract(
+                # Structured data first; the LLM only runs when it is incomplete
+                llm_out = None
+                if self.structured is not None:
+                    llm_out = self.structured.extract(
+                        html, url=final_url or url, preprocessed=preprocessed
+                    )
+
+                if llm_out is None:
+                    # Take screenshot
+                    page_shot = await page.screenshot(full_page=False, type="jpeg", quality=75)
+                    page_b64 = base64.b64encode(page_shot).decode("ascii")
+                    page_mime = "image/jpeg"
+
+                    image_candidates = format_images_for_llm(preprocessed.images, max_images=20)
+                    html_content = await asyncio.to_thread(
+                        format_html_for_llm,
+                        html=html,
                         url=final_url or url,
                         title=page_title,
-                        image_candidates=image_candidates,
-                        image_base64=page_b64,
-                        image_mime=page_mime,
-                        html_content=html_content,
+                        preprocessed=preprocessed,
+                        pruner=self.pruner,
                     )
-                except Exception as e:
-                    logger.exception(f"LLM extraction failed for {url}: {e}")
-                    return None
+
+                    # Call LLM for extraction
+                    try:
+                        llm_out = await self.llm_client.extract(
+                            url=final_url or url,
+                            title=page_title,
+                            image_candidates=image_candidates,
+                            image_base64=page_b64,
+                            image_mime=page_mime,
+                            html_content=html_content,
+                        )
+                    except Exception as e:
+                        logger.exception(f"LLM extraction failed for {url}: {e}")
+                        return None
 
                 # Fetch product image if available
-                image_b64: str | None = None
-                image_mime: str | None = None
+                image: ProcessedImage | None = None
                 resolved_image_url: str | None = None
 
                 if llm_out.image_url:
                     resolved = urljoin(final_url or url, llm_out.image_url)
                     if is_valid_public_url(resolved):
                         resolved_image_url = resolved
-                        image_page = await context.new_page()
-                        try:
-                            try:
-                                await image_page.goto(
-                                    resolved,
-                                    wait_until="load",
-                                    timeout=self.cfg.timeout_ms,
-                                )
-                                await image_page.wait_for_load_state(
-                                    "networkidle",
-                                    timeout=self.cfg.timeout_ms,
-                                )
-                            except PlaywrightTimeoutError:
-                                logger.warning(f"Image load timed out: {resolved}")
-                            else:
-                                image_shot = await image_page.screenshot(full_page=True, type="png")
-                                cropped = crop_screenshot_to_content(image_shot)
-                                image_b64 = base64.b64encode(cropped).decode("ascii")
-                                image_mime = "image/jpeg"
-
-                                try:
-                                    await context.storage_state(path=str(state_path))
-                                except Exception:
-                                    pass
-                        finally:
-                            try:
-                                await image_page.close()
-                            except Exception:
-                                pass
+                        image = await self._load_image(context, resolved, final_url or url, state_path)
 
                 return {
                     "title": llm_out.title,
@@ -417,14 +830,66 @@ class ChangesWatcher:
                     "canonical_url": llm_out.canonical_url,
                     "confidence": llm_out.confidence if llm_out.confidence is not None else 0.0,
                     "image_url": resolved_image_url,
-                    "image_base64": image_data_url(image_b64, image_mime),
+                    **resolved_image_fields(image),
                 }
 
             finally:
-                try:
-                    await context.close()
-                except Exception:
-                    pass
+                await self.manager.release_context(context)
+
+    async def _load_image(self, context, url: str, referer: str, state_path: Path) -> ProcessedImage | None:
+        """Download the image directly, falling back to a screenshot."""
+        fetched = None
+        if self.image_fetcher is not None:
+            fetched = await self.image_fetcher.fetch(context, url, referer=referer)
+        if fetched is not None:
+            return fetched.image
+        return await self._screenshot_image(context, url, state_path)
+
+    async def _fetch_image(self, url: str, referer: str) -> ProcessedImage | None:
+        """Fetch the image of a cached resolution, whose image payload is not cached."""
+        state_path = storage_state_path(Path(self.storage_state_dir), referer)
+
+        async with self.manager.semaphore:
+            context = await self.manager.acquire_context(
+                self.browser,
+                url=referer,
+                storage_state_path=state_path,
+            )
+            try:
+                return await self._load_image(context, url, referer, state_path)
+            finally:
+                await self.manager.release_context(context)
+
+    async def _screenshot_image(self, context, url: str, state_path: Path) -> ProcessedImage | None:
+        """Open the image URL as a page and screenshot it; for CDNs that refuse direct downloads."""
+        image_page = await context.new_page()
+        try:
+            try:
+                await image_page.goto(
+                    url,
+                    wait_until="load",
+                    timeout=self.cfg.timeout_ms,
+                )
+                await image_page.wait_for_load_state(
+                    "networkidle",
+                    timeout=self.cfg.timeout_ms,
+                )
+            except PlaywrightTimeoutError:
+                logger.warning(f"Image load timed out: {url}")
+                return None
+
+            image_shot = await image_page.screenshot(full_page=True, type="png")
+            image = await asyncio.to_thread(lambda: self.image_pipeline.process_image(crop_screenshot(image_shot)))
+            try:
+                await context.storage_state(path=str(state_path))
+            except Exception:
+                pass
+            return image
+        finally:
+            try:
+                await image_page.close()
+            except Exception:
+                pass
 
     async def _update_item_resolved(self, doc: dict, resolved: dict, retries: int = 0) -> None:
         """Update item document with resolved data."""
@@ -484,6 +949,41 @@ class ChangesWatcher:
                 return
             logger.warning(f"Conflict updating item {doc['_id']}, retry {retries + 1}")
             await self._update_item_resolved(doc, resolved, retries + 1)
+            return
+
+        if resolved.get("image_full"):
+            await self._store_full_image(current_doc, resolved["image_full"])
+
+    async def _store_full_image(self, item: dict, image: dict) -> None:
+        """Store the full-size image as an attachment of its own document, outside the synced item.
+
+        The document takes the item's access as it is now; core-api copies later access
+        changes to it and deletes it with the item.
+        """
+        image_doc = {
+            "_id": image_doc_id(item["_id"]),
+            "type": "item_image",
+            "item_id": item["_id"],
+            "access": item.get("access", []),
+            "width": image["width"],
+            "height": image["height"],
+            "updated_at": item["updated_at"],
+            "_attachments": {"image": {"content_type": image["content_type"], "data": image["data"]}},
+        }
+        for _ in range(2):
+            try:
+                try:
+                    image_doc["_rev"] = (await self.couchdb.get(image_doc["_id"]))["_rev"]
+                except DocumentNotFoundError:
+                    image_doc.pop("_rev", None)
+                await self.couchdb.put(image_doc)
+                return
+            except ConflictError:
+                continue
+            except CouchDBError as e:
+                logger.error(f"Failed to store full image for {item['_id']}: {e}")
+                return
+        logger.warning(f"Conflict storing full image for {item['_id']}, giving up")
 
     async def _update_item_status(
         self,
@@ -532,11 +1032,22 @@ class ChangesWatcher:
 _watcher: ChangesWatcher | None = None
 
 
+def get_watcher() -> ChangesWatcher | None:
+    """Get the global changes watcher, if running."""
+    return _watcher
+
+
 async def start_watcher(
     llm_client: LLMClient,
     manager: BrowserManager,
     browser,
     storage_state_dir: str,
+    cache: ResolutionCache | None = None,
+    flights: SingleFlight | None = None,
+    structured: StructuredExtractor | None = None,
+    pruner: HtmlPruner | None = None,
+    image_fetcher: DirectImageFetcher | None = None,
+    image_pipeline: ImagePipeline | None = None,
 ) -> ChangesWatcher:
     """Start the global changes watcher."""
     global _watcher
@@ -551,6 +1062,12 @@ async def start_watcher(
         manager=manager,
         browser=browser,
         storage_state_dir=storage_state_dir,
+        cache=cache,
+        flights=flights,
+        structured=structured,
+        pruner=pruner,
+        image_fetcher=image_fetcher,
+        image_pipeline=image_pipeline,
     )
     await _watcher.start()
     return _watcher
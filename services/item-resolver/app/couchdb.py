@@ -118,6 +118,10 @@ class CouchDBClient:
             logger.error(f"CouchDB request error: {e}")
             raise CouchDBError(str(e), 503, "connection_error")
 
+    async def info(self) -> dict:
+        """Get database information (doc_count, update_seq, ...)."""
+        return await self._request("GET", self.db_url)
+
     async def get(self, doc_id: str) -> dict:
         """Get a document by ID."""
         return await self._request("GET", f"{self.db_url}/{doc_id}")
@@ -129,6 +133,19 @@ class CouchDBClient:
             raise ValueError("Document must have an _id field")
         return await self._request("PUT", f"{self.db_url}/{doc_id}", json=doc)
 
+    async def bulk_docs(self, docs: list[dict]) -> list[dict]:
+        """Bulk create/update documents.
+
+        Returns one result per document, in request order. Successful entries
+        carry ``ok`` and the new ``rev``; failed entries carry ``error``
+        (e.g. "conflict") and ``reason`` instead of raising.
+        """
+        return await self._request(
+            "POST",
+            f"{self.db_url}/_bulk_docs",
+            json={"docs": docs},
+        )
+
     async def find(
         self,
         selector: dict,
@@ -145,6 +162,20 @@ class CouchDBClient:
         result = await self._request("POST", f"{self.db_url}/_find", json=query)
         return result.get("docs", [])
 
+    async def find_page(
+        self,
+        selector: dict,
+        limit: int,
+        bookmark: str | None = None,
+    ) -> tuple[list[dict], str | None]:
+        """Find one page of documents; pass the returned bookmark to get the next page."""
+        query: dict[str, Any] = {"selector": selector, "limit": limit}
+        if bookmark:
+            query["bookmark"] = bookmark
+
+        result = await self._request("POST", f"{self.db_url}/_find", json=query)
+        return result.get("docs", []), result.get("bookmark")
+
     async def create_index(self, index: dict, name: str, ddoc: str | None = None) -> dict:
         """Create a Mango index.
 
@@ -183,6 +214,11 @@ class CouchDBClient:
                 "name": "item-pending-index",
                 "index": {"fields": ["type", "status"]},
             },
+            # Index for purging expired shared resolution cache entries
+            {
+                "name": "resolver-cache-expiry-index",
+                "index": {"fields": ["type", "expires_at"]},
+            },
         ]
 
         for idx in indexes:
@@ -0,0 +1,11 @@
+"""Exponentially weighted moving averages for latency and rate estimates."""
+
+from __future__ import annotations
+
+ALPHA = 0.2
+
+
+def ewma(current: float, value: float, samples: int, alpha: float = ALPHA) -> float:
+    """Fold `value` into the average `current` built from `samples` earlier values."""
+    # The first sample seeds the average instead of being diluted by zero.
+    return value if samples == 0 else current + alpha * (value - current)
@@ -8,7 +8,8 @@ from typing import Literal, Protocol
 
 from playwright.async_api import Browser
 
-from .browser_manager import BrowserManager
+from .browser_manager import BrowserManager, BrowserPool
+from .image_fetch import DirectImageFetcher
 from .image_utils import crop_screenshot_to_content
 from .scrape import PageCaptureConfig, capture_page_source, storage_state_path
 
@@ -40,18 +41,21 @@ class StubFetcher:
 @dataclass
 class PlaywrightFetcher:
     manager: BrowserManager
-    browser: Browser
+    browser: Browser | BrowserPool
     storage_state_dir: Path
     cfg: PageCaptureConfig
+    image_fetcher: DirectImageFetcher | None = None
 
     async def fetch_page_source(self, *, url: str) -> tuple[str, str, str, bool]:
         state_path = storage_state_path(self.storage_state_dir, url)
 
         async with self.manager.semaphore:
-            context = await self.manager.make_context(self.browser, url=url, storage_state_path=state_path)
+            context = await self.manager.acquire_context(self.browser, url=url, storage_state_path=state_path)
             page = await context.new_page()
             try:
-                final_url, title, html = await capture_page_source(page, url, cfg=self.cfg)
+                final_url, title, html = await capture_page_source(
+                    page, url, cfg=self.cfg, profiles=self.manager.capture_profiles
+                )
                 try:
                     await context.storage_state(path=str(state_path))
                     saved = True
@@ -59,19 +63,18 @@ class PlaywrightFetcher:
                     saved = False
                 return final_url, title, html, saved
             finally:
-                try:
-                    await context.close()
-                except Exception:
-                    pass
+                await self.manager.release_context(context)
 
     async def fetch_page_snapshot(self, *, url: str) -> tuple[str, str, str, str, str, bool]:
         state_path = storage_state_path(self.storage_state_dir, url)
 
         async with self.manager.semaphore:
-            context = await self.manager.make_context(self.browser, url=url, storage_state_path=state_path)
+            context = await self.manager.acquire_context(self.browser, url=url, storage_state_path=state_path)
             page = await context.new_page()
             try:
-                final_url, title, html = await capture_page_source(page, url, cfg=self.cfg)
+                final_url, title, html = await capture_page_source(
+                    page, url, cfg=self.cfg, profiles=self.manager.capture_profiles
+                )
                 screenshot = await page.screenshot(full_page=True, type="jpeg", quality=75)
                 b64 = base64.b64encode(screenshot).decode("ascii")
                 try:
@@ -81,19 +84,21 @@ class PlaywrightFetcher:
                     saved = False
                 return final_url, title, html, "image/jpeg", b64, saved
             finally:
-                try:
-                    await context.close()
-                except Exception:
-                    pass
+                await self.manager.release_context(context)
 
     async def fetch_image_base64(self, *, url: str, session_url: str | None = None) -> tuple[str, str, str]:
         # Reuse the page session when provided (some CDNs gate by cookies).
         state_path = storage_state_path(self.storage_state_dir, session_url or url)
 
         async with self.manager.semaphore:
-            context = await self.manager.make_context(self.browser, url=url, storage_state_path=state_path)
-            page = await context.new_page()
+            context = await self.manager.acquire_context(self.browser, url=url, storage_state_path=state_path)
             try:
+                if self.image_fetcher is not None:
+                    fetched = await self.image_fetcher.fetch(context, url, referer=session_url)
+                    if fetched is not None:
+                        return fetched.final_url, fetched.mime, base64.b64encode(fetched.data).decode("ascii")
+
+                page = await context.new_page()
                 resp = await page.goto(url, wait_until="load", timeout=self.cfg.timeout_ms)
                 if resp is None:
                     return page.url, "", ""
@@ -111,10 +116,7 @@ class PlaywrightFetcher:
                     pass
                 return page.url, "image/jpeg", b64
             finally:
-                try:
-                    await context.close()
-                except Exception:
-                    pass
+                await self.manager.release_context(context)
 
 
 def fetcher_mode_from_env() -> Literal["playwright", "stub"]:
@@ -0,0 +1,138 @@
+"""Compare the single-pass HTML preprocessor with the previous three-pass pipeline.
+
+Usage (save pages with `page.content()` or the browser's "Save page as"):
+
+    python -m app.html_benchmark saved/ozon.html saved/wb.html [--runs 5] [--max-chars 100000]
+
+For every file the previous pipeline (regex cleanup, regex hints and the
+HTMLParser image pass) and `preprocess_html` are run `--runs` times. The
+median CPU time, the peak traced memory and whether both produced the same
+cleaned HTML, hints and images are printed as JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from .html_parser import extract_images_from_html
+from .html_preprocessor import _add_jsonld_hints, preprocess_html
+
+
+def _legacy_optimize_html(html: str, max_chars: int) -> str:
+    html = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.DOTALL | re.IGNORECASE)
+    html = re.sub(r'<style[^>]*>.*?</style>', '', html, flags=re.DOTALL | re.IGNORECASE)
+    html = re.sub(r'<noscript[^>]*>.*?</noscript>', '', html, flags=re.DOTALL | re.IGNORECASE)
+    html = re.sub(r'<svg[^>]*>.*?</svg>', '', html, flags=re.DOTALL | re.IGNORECASE)
+    html = re.sub(r'<!--.*?-->', '', html, flags=re.DOTALL)
+    html = re.sub(r'\s+', ' ', html)
+    if len(html) > max_chars:
+        html = html[:max_chars] + "\n[truncated]"
+    return html.strip()
+
+
+_LEGACY_OG_PATTERNS = {
+    key: re.compile(pattern, re.IGNORECASE | re.DOTALL)
+    for key, pattern in {
+        'og_title': r'<meta\s+(?:property=["\']og:title["\'].*?content=["\']([^"\']*)["\']|content=["\']([^"\']*)["\'].*?property=["\']og:title["\'])',
+        'og_description': r'<meta\s+(?:property=["\']og:description["\'].*?content=["\']([^"\']*)["\']|content=["\']([^"\']*)["\'].*?property=["\']og:description["\'])',
+        'og_image': r'<meta\s+(?:property=["\']og:image["\'].*?content=["\']([^"\']*)["\']|content=["\']([^"\']*)["\'].*?property=["\']og:image["\'])',
+        'og_price': r'<meta\s+property=["\'](?:og:price:amount|product:price:amount)["\'].*?content=["\']([^"\']*)["\']',
+        'og_currency': r'<meta\s+property=["\'](?:og:price:currency|product:price:currency)["\'].*?content=["\']([^"\']*)["\']',
+    }.items()
+}
+
+
+def _legacy_structured_hints(html: str) -> Dict[str, Any]:
+    hints: Dict[str, Any] = {}
+    for key, pattern in _LEGACY_OG_PATTERNS.items():
+        match = pattern.search(html)
+        value = next((g for g in match.groups() if g), None) if match else None
+        if value:
+            hints[key] = value
+    schema: Dict[str, Any] = {}
+    for raw in re.findall(
+        r'<script\s+type=["\']application/ld\+json["\']\s*>(.*?)</script>', html, re.DOTALL | re.IGNORECASE
+    ):
+        _add_jsonld_hints(raw, schema)
+    hints.update((k, v) for k, v in schema.items() if v)
+    return hints
+
+
+def _legacy(html: str, *, base_url: str, max_chars: int) -> Dict[str, Any]:
+    return {
+        "html": _legacy_optimize_html(html, max_chars),
+        "hints": _legacy_structured_hints(html),
+        "images": extract_images_from_html(html, base_url=base_url),
+    }
+
+
+def _single_pass(html: str, *, base_url: str, max_chars: int) -> Dict[str, Any]:
+    page = preprocess_html(html, base_url=base_url, max_chars=max_chars)
+    return {"html": page.html, "hints": page.hints, "images": page.images}
+
+
+def _measure(fn: Callable[[], Dict[str, Any]], runs: int) -> Dict[str, Any]:
+    cpu_ms: List[float] = []
+    for _ in range(runs):
+        start = time.process_time()
+        fn()
+        cpu_ms.append((time.process_time() - start) * 1000)
+
+    # Memory is traced in a separate run: tracing slows the CPU numbers down.
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"cpu_ms": round(statistics.median(cpu_ms), 1), "peak_kb": round(peak / 1024), "result": result}
+
+
+def _saved_pct(before: float, after: float) -> float:
+    return round(100 * (1 - after / before), 1) if before else 0.0
+
+
+def compare(paths: List[Path], *, runs: int, max_chars: int, base_url: str) -> List[Dict[str, Any]]:
+    report: List[Dict[str, Any]] = []
+    for path in paths:
+        html = path.read_text(encoding="utf-8", errors="replace")
+        legacy = _measure(lambda: _legacy(html, base_url=base_url, max_chars=max_chars), runs)
+        single = _measure(lambda: _single_pass(html, base_url=base_url, max_chars=max_chars), runs)
+        before, after = legacy.pop("result"), single.pop("result")
+        report.append(
+            {
+                "file": str(path),
+                "size_kb": round(len(html.encode("utf-8")) / 1024),
+                "legacy": legacy,
+                "single_pass": single,
+                "cpu_saved_pct": _saved_pct(legacy["cpu_ms"], single["cpu_ms"]),
+                "memory_saved_pct": _saved_pct(legacy["peak_kb"], single["peak_kb"]),
+                "cleaned_chars": {"legacy": len(before["html"]), "single_pass": len(after["html"])},
+                "same_html": before["html"] == after["html"],
+                "same_hints": before["hints"] == after["hints"],
+                "same_images": before["images"] == after["images"],
+            }
+        )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", type=Path)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-chars", type=int, default=100000)
+    parser.add_argument("--base-url", default="https://example.com/")
+    args = parser.parse_args()
+    report = compare(args.files, runs=max(1, args.runs), max_chars=args.max_chars, base_url=args.base_url)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,10 +7,11 @@ while preserving the content structure that LLM can understand.
 
 from __future__ import annotations
 
-import json
-import re
 from typing import Optional
 
+from .html_preprocessor import PreprocessedHtml, preprocess_html
+from .html_pruner import HtmlPruner
+
 
 def optimize_html(html: str, max_chars: int = 100000) -> str:
     """
@@ -28,85 +29,15 @@ def optimize_html(html: str, max_chars: int = 100000) -> str:
     """
     if not html:
         return ""
-
-    # Remove scripts, styles, and other non-content elements
-    html = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.DOTALL | re.IGNORECASE)
-    html = re.sub(r'<style[^>]*>.*?</style>', '', html, flags=re.DOTALL | re.IGNORECASE)
-    html = re.sub(r'<noscript[^>]*>.*?</noscript>', '', html, flags=re.DOTALL | re.IGNORECASE)
-    html = re.sub(r'<svg[^>]*>.*?</svg>', '', html, flags=re.DOTALL | re.IGNORECASE)
-    html = re.sub(r'<!--.*?-->', '', html, flags=re.DOTALL)
-
-    # Collapse whitespace
-    html = re.sub(r'\s+', ' ', html)
-
-    # Truncate if needed
-    if len(html) > max_chars:
-        html = html[:max_chars] + "\n[truncated]"
-
-    return html.strip()
+    return preprocess_html(html, max_chars=max_chars).html
 
 
 def extract_structured_hints(html: str) -> dict[str, Optional[str]]:
     """
     Extract structured data from JSON-LD and Open Graph tags.
     """
-    hints: dict[str, Optional[str]] = {}
-
-    # Open Graph tags
-    og_patterns = {
-        'og_title': r'<meta\s+(?:property=["\']og:title["\'].*?content=["\']([^"\']*)["\']|content=["\']([^"\']*)["\'].*?property=["\']og:title["\'])',
-        'og_description': r'<meta\s+(?:property=["\']og:description["\'].*?content=["\']([^"\']*)["\']|content=["\']([^"\']*)["\'].*?property=["\']og:description["\'])',
-        'og_image': r'<meta\s+(?:property=["\']og:image["\'].*?content=["\']([^"\']*)["\']|content=["\']([^"\']*)["\'].*?property=["\']og:image["\'])',
-        'og_price': r'<meta\s+property=["\'](?:og:price:amount|product:price:amount)["\'].*?content=["\']([^"\']*)["\']',
-        'og_currency': r'<meta\s+property=["\'](?:og:price:currency|product:price:currency)["\'].*?content=["\']([^"\']*)["\']',
-    }
-
-    for key, pattern in og_patterns.items():
-        match = re.search(pattern, html, re.IGNORECASE | re.DOTALL)
-        if match:
-            # Get first non-None group
-            value = next((g for g in match.groups() if g), None)
-            if value:
-                hints[key] = value
-
-    # JSON-LD schema.org data
-    jsonld_matches = re.findall(
-        r'<script\s+type=["\']application/ld\+json["\']\s*>(.*?)</script>',
-        html,
-        re.DOTALL | re.IGNORECASE
-    )
-    for jsonld_content in jsonld_matches:
-        try:
-            data = json.loads(jsonld_content)
-
-            # Handle @graph wrapper
-            if isinstance(data, dict) and '@graph' in data:
-                data = data['@graph']
-
-            items = data if isinstance(data, list) else [data]
-
-            for item in items:
-                if not isinstance(item, dict):
-                    continue
-
-                item_type = str(item.get('@type', ''))
-                if 'Product' in item_type:
-                    hints['schema_name'] = hints.get('schema_name') or item.get('name')
-                    hints['schema_description'] = hints.get('schema_description') or item.get('description')
-
-                    offers = item.get('offers') or item.get('Offers')
-                    if offers:
-                        if isinstance(offers, list) and offers:
-                            offers = offers[0]
-                        if isinstance(offers, dict):
-                            price = offers.get('price') or offers.get('lowPrice') or offers.get('highPrice')
-                            if price:
-                                hints['schema_price'] = str(price)
-                            hints['schema_currency'] = hints.get('schema_currency') or offers.get('priceCurrency')
-        except Exception:
-            pass
-
-    return {k: v for k, v in hints.items() if v}
+    # Nothing of the cleaned HTML is needed, so let the scan stop collecting it at once.
+    return preprocess_html(html, max_chars=0).hints
 
 
 def format_html_for_llm(
@@ -114,6 +45,9 @@ def format_html_for_llm(
     url: str,
     title: str,
     max_chars: int = 100000,
+    *,
+    preprocessed: Optional[PreprocessedHtml] = None,
+    pruner: Optional[HtmlPruner] = None,
 ) -> str:
     """
     Format HTML content for LLM extraction.
@@ -123,12 +57,17 @@ def format_html_for_llm(
         url: Page URL
         title: Page title
         max_chars: Maximum characters for content
+        preprocessed: Result of `preprocess_html` for this page, when the
+            caller already has it (e.g. for the image candidates)
+        pruner: Shrinks the cleaned HTML to its token budget, keeping the
+            product-relevant parts, instead of plain truncation
 
     Returns:
         Formatted content for LLM
     """
-    # Extract structured hints first
-    hints = extract_structured_hints(html)
+    if preprocessed is None:
+        preprocessed = preprocess_html(html, max_chars=pruner.source_chars if pruner is not None else max_chars)
+    hints = preprocessed.hints
 
     # Build the prompt content
     parts = [f"URL: {url}", f"Page title: {title}"]
@@ -146,7 +85,7 @@ def format_html_for_llm(
         parts.append('\n'.join(hint_lines))
 
     # Add cleaned HTML - LLM will extract from this
-    content = optimize_html(html, max_chars=max_chars)
+    content = pruner.prune(preprocessed.html).html if pruner is not None else preprocessed.html
     parts.append(f"\nPage HTML:\n{content}")
 
     return '\n'.join(parts)
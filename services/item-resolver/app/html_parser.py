@@ -46,45 +46,10 @@ class ImageCandidate:
         return f"ImageCandidate(src={self.src!r}, alt={self.alt!r})"
 
 
-class ImageExtractor(HTMLParser):
-    """Fast HTML parser to extract image tags and their attributes."""
-
-    def __init__(self) -> None:
-        super().__init__()
-        self.images: list[ImageCandidate] = []
-
-    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
-        if tag == "img":
-            attrs_dict = {k: v or "" for k, v in attrs}
-            src = attrs_dict.get("src", "").strip()
-            if src and not self._is_excluded(src, attrs_dict):
-                # Remove 'src' from attrs_dict to avoid passing it twice
-                other_attrs = {k: v for k, v in attrs_dict.items() if k != "src"}
-                self.images.append(ImageCandidate(src, **other_attrs))
-
-    def _is_excluded(self, src: str, attrs: dict[str, str]) -> bool:
-        """Filter out non-product images like icons, badges, tracking pixels."""
-        src_lower = src.lower()
-
-        # Exclude tiny images (likely icons/badges)
-        try:
-            width = int(attrs.get("width", "0") or "0")
-            height = int(attrs.get("height", "0") or "0")
-
-            # If only width is set and it's tiny, exclude
-            if width > 0 and width < MIN_PRODUCT_IMAGE_SIZE and height == 0:
-                return True
-            # If only height is set and it's tiny, exclude
-            if height > 0 and height < MIN_PRODUCT_IMAGE_SIZE and width == 0:
-                return True
-            # If both are set, exclude only if BOTH are tiny
-            if width > 0 and height > 0 and width < MIN_PRODUCT_IMAGE_SIZE and height < MIN_PRODUCT_IMAGE_SIZE:
-                return True
-        except (ValueError, TypeError):
-            pass
-
-        # Exclude common non-product patterns using word boundaries
-        excluded_patterns = [
+# Common non-product patterns, matched with word boundaries
+_EXCLUDED_RE = re.compile(
+    "|".join(
+        [
             r'\bicon\b',
             r'\blogo\b',
             r'\bbadge\b',
@@ -102,16 +67,82 @@ class ImageExtractor(HTMLParser):
             r'\buser\b',
             r'\bprofile\b',
         ]
+    )
+)
+
+
+def is_excluded_image(src: str, attrs: dict[str, str]) -> bool:
+    """Filter out non-product images like icons, badges, tracking pixels."""
+    # Exclude tiny images (likely icons/badges)
+    try:
+        width = int(attrs.get("width", "0") or "0")
+        height = int(attrs.get("height", "0") or "0")
+
+        # If only width is set and it's tiny, exclude
+        if width > 0 and width < MIN_PRODUCT_IMAGE_SIZE and height == 0:
+            return True
+        # If only height is set and it's tiny, exclude
+        if height > 0 and height < MIN_PRODUCT_IMAGE_SIZE and width == 0:
+            return True
+        # If both are set, exclude only if BOTH are tiny
+        if width > 0 and height > 0 and width < MIN_PRODUCT_IMAGE_SIZE and height < MIN_PRODUCT_IMAGE_SIZE:
+            return True
+    except (ValueError, TypeError):
+        pass
+
+    for value in (src, attrs.get("class", ""), attrs.get("alt", "")):
+        if value and _EXCLUDED_RE.search(value.lower()):
+            return True
+    return False
+
+
+def image_candidate_from_attrs(attrs: dict[str, str]) -> ImageCandidate | None:
+    """Candidate for an <img> tag's attributes, or None when it has no usable src."""
+    src = attrs.get("src", "").strip()
+    if not src or is_excluded_image(src, attrs):
+        return None
+    # Remove 'src' from attrs to avoid passing it twice
+    return ImageCandidate(src, **{k: v for k, v in attrs.items() if k != "src"})
+
+
+def candidate_to_dict(img: ImageCandidate, base_url: str | None = None) -> dict[str, Any] | None:
+    """Image dict with `src` resolved against `base_url`; None for data URIs and malformed URLs."""
+    src = img.src
+
+    # Skip data URIs - they're already embedded and can be huge
+    if src.startswith("data:"):
+        return None
+
+    # Resolve relative URLs if base_url provided
+    if base_url and not src.startswith(("http://", "https://")):
+        try:
+            src = urljoin(base_url, src)
+            # Validate the resolved URL is well-formed
+            parsed = urlparse(src)
+            if not parsed.scheme or not parsed.netloc:
+                logger.debug("Skipping malformed URL after resolution: %s", src)
+                return None
+        except Exception as e:
+            logger.debug("Failed to resolve URL %s: %s", src, str(e))
+            return None
+
+    img_dict = img.to_dict()
+    img_dict["src"] = src
+    return img_dict
+
+
+class ImageExtractor(HTMLParser):
+    """Fast HTML parser to extract image tags and their attributes."""
 
-        for pattern in excluded_patterns:
-            if re.search(pattern, src_lower):
-                return True
-            if re.search(pattern, attrs.get("class", "").lower()):
-                return True
-            if re.search(pattern, attrs.get("alt", "").lower()):
-                return True
+    def __init__(self) -> None:
+        super().__init__()
+        self.images: list[ImageCandidate] = []
 
-        return False
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "img":
+            candidate = image_candidate_from_attrs({k: v or "" for k, v in attrs})
+            if candidate is not None:
+                self.images.append(candidate)
 
 
 def extract_images_from_html(html: str, base_url: str | None = None) -> list[dict[str, Any]]:
@@ -130,28 +161,9 @@ def extract_images_from_html(html: str, base_url: str | None = None) -> list[dic
 
     images = []
     for img in parser.images:
-        src = img.src
-
-        # Skip data URIs - they're already embedded and can be huge
-        if src.startswith("data:"):
-            continue
-
-        # Resolve relative URLs if base_url provided
-        if base_url and not src.startswith(("http://", "https://")):
-            try:
-                src = urljoin(base_url, src)
-                # Validate the resolved URL is well-formed
-                parsed = urlparse(src)
-                if not parsed.scheme or not parsed.netloc:
-                    logger.debug("Skipping malformed URL after resolution: %s", src)
-                    continue
-            except Exception as e:
-                logger.debug("Failed to resolve URL %s: %s", src, str(e))
-                continue
-
-        img_dict = img.to_dict()
-        img_dict["src"] = src
-        images.append(img_dict)
+        img_dict = candidate_to_dict(img, base_url)
+        if img_dict is not None:
+            images.append(img_dict)
 
     return images
 
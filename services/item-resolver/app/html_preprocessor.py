@@ -0,0 +1,286 @@
+"""
+Single-pass HTML preprocessing for LLM extraction.
+
+Marketplace pages are 2-5 MB, most of it inline scripts, styles and SVG.
+Instead of regex-substituting each kind of element out of the whole
+document and then re-scanning it for metadata and images, the page is
+scanned once: dropped elements are skipped by searching for their closing
+tag, and only the tags that matter (<meta>, <img>, <link>, JSON-LD
+scripts, microdata properties) are parsed on the way. Kept text is
+whitespace-collapsed as it is appended and appending stops once
+`max_chars` is reached, so the cleaned copy never grows past the LLM
+budget.
+
+The scan is pure Python and CPU-bound on multi-megabyte pages, so async
+callers run it with `asyncio.to_thread`.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from html import unescape
+from typing import Any, Optional
+
+from .html_parser import ImageCandidate, candidate_to_dict, image_candidate_from_attrs
+
+TRUNCATED_MARKER = "\n[truncated]"
+
+# Tags the scanner stops at; everything else is copied through untouched.
+_START_RE = re.compile(
+    r"""<!--|<(script|style|noscript|svg|meta|img|link)\b((?:[^>"']|"[^"]*"|'[^']*')*)>""",
+    re.IGNORECASE,
+)
+_CLOSE_RE = {
+    name: re.compile(rf"</{name}\s*>", re.IGNORECASE) for name in ("script", "style", "noscript")
+}
+_SVG_TAG_RE = re.compile(r"""<(/?)svg\b((?:[^>"']|"[^"]*"|'[^']*')*)>""", re.IGNORECASE)
+_IMG_RE = re.compile(r"""<img\b((?:[^>"']|"[^"]*"|'[^']*')*)>""", re.IGNORECASE)
+_ATTR_RE = re.compile(r"""([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?""")
+_WS_RE = re.compile(r"\s+")
+_MICRODATA_PRODUCT_RE = re.compile(r"""itemtype=["']https?://schema\.org/Product["']""", re.IGNORECASE)
+_TAG_WITH_TEXT_RE = re.compile(r"""<(\w+)\b((?:[^>"']|"[^"]*"|'[^']*')*)>([^<]*)""")
+_MICRODATA_PROPS = frozenset({"name", "description", "price", "pricecurrency", "image"})
+
+_OG_HINTS = {
+    "og:title": "og_title",
+    "og:description": "og_description",
+    "og:image": "og_image",
+    "og:price:amount": "og_price",
+    "product:price:amount": "og_price",
+    "og:price:currency": "og_currency",
+    "product:price:currency": "og_currency",
+}
+_OG_ORDER = ("og_title", "og_description", "og_image", "og_price", "og_currency")
+
+
+@dataclass
+class PreprocessedHtml:
+    """Everything the LLM prompt needs from one page, produced by a single scan."""
+
+    html: str
+    hints: dict[str, Any] = field(default_factory=dict)
+    images: list[dict[str, Any]] = field(default_factory=list)
+    # Raw structured data for the structured data fast path
+    jsonld: list[Any] = field(default_factory=list)
+    meta: dict[str, str] = field(default_factory=dict)
+    canonical_url: Optional[str] = None
+    # (lowercased itemprop, value) after the first schema.org/Product itemtype, in page order
+    microdata: list[tuple[str, str]] = field(default_factory=list)
+
+
+def _attrs(raw: str) -> dict[str, str]:
+    # Later duplicates win, as with HTMLParser attrs turned into a dict.
+    attrs: dict[str, str] = {}
+    for m in _ATTR_RE.finditer(raw):
+        value = m.group(2) if m.group(2) is not None else m.group(3) if m.group(3) is not None else m.group(4)
+        attrs[m.group(1).lower()] = unescape(value) if value else ""
+    return attrs
+
+
+class _CollapsedText:
+    """Whitespace-collapsing accumulator that stops growing past `limit`."""
+
+    # Raw text is collapsed in slices so a huge kept span is not copied whole.
+    SLICE = 64 * 1024
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.parts: list[str] = []
+        self.length = 0
+        self._space = False
+
+    @property
+    def full(self) -> bool:
+        return self.length > self.limit
+
+    def add(self, html: str, start: int, end: int) -> None:
+        while start < end and not self.full:
+            stop = min(end, start + max(self.SLICE, self.limit - self.length + 1))
+            text = _WS_RE.sub(" ", html[start:stop])
+            start = stop
+            if self._space and text.startswith(" "):
+                text = text[1:]
+            if text:
+                self.parts.append(text)
+                self.length += len(text)
+                self._space = text.endswith(" ")
+
+    def result(self) -> str:
+        text = "".join(self.parts)
+        if len(text) > self.limit:
+            text = text[: self.limit] + TRUNCATED_MARKER
+        return text.strip()
+
+
+class _Microdata:
+    """Collects product microdata properties from the parts of the page that are kept."""
+
+    def __init__(self) -> None:
+        self.product = False
+        self.props: list[tuple[str, str]] = []
+
+    def add(self, attrs: dict[str, str], text: str = "") -> None:
+        prop = attrs.get("itemprop", "").lower()
+        if not self.product or prop not in _MICRODATA_PROPS:
+            return
+        value = attrs.get("content") or attrs.get("src") or attrs.get("href") or text
+        if value:
+            self.props.append((prop, value))
+
+    def scan(self, html: str, start: int, end: int) -> None:
+        if not self.product:
+            m = _MICRODATA_PRODUCT_RE.search(html, start, end)
+            if m is None:
+                return
+            self.product = True
+            start = m.end()
+        # str.find skips to the next candidate; only tags carrying itemprop are parsed.
+        while (i := html.find("itemprop", start, end)) >= 0:
+            tag_start = html.rfind("<", start, i)
+            tag = _TAG_WITH_TEXT_RE.match(html, tag_start, end) if tag_start >= 0 else None
+            if tag is None or tag.end(2) < i:
+                start = i + len("itemprop")
+                continue
+            self.add(_attrs(tag.group(2)), unescape(tag.group(3).strip()))
+            start = tag.end()
+
+
+def _add_meta(attrs: dict[str, str], og: dict[str, str], meta: dict[str, str]) -> None:
+    key = _OG_HINTS.get(attrs.get("property", "").lower())
+    if key and key not in og and attrs.get("content"):
+        og[key] = attrs["content"]
+    name = (attrs.get("property") or attrs.get("name") or "").lower()
+    if name and "content" in attrs and name not in meta:
+        meta[name] = attrs["content"]
+
+
+def _add_jsonld_hints(raw: str, hints: dict[str, Any]) -> Any:
+    """Add product hints from one JSON-LD script; returns the parsed data, or None if it is invalid."""
+    try:
+        document = json.loads(raw)
+    except ValueError:
+        return None
+
+    # Handle @graph wrapper
+    data = document["@graph"] if isinstance(document, dict) and "@graph" in document else document
+
+    for item in data if isinstance(data, list) else [data]:
+        if not isinstance(item, dict) or "Product" not in str(item.get("@type", "")):
+            continue
+        hints["schema_name"] = hints.get("schema_name") or item.get("name")
+        hints["schema_description"] = hints.get("schema_description") or item.get("description")
+
+        offers = item.get("offers") or item.get("Offers")
+        if isinstance(offers, list) and offers:
+            offers = offers[0]
+        if isinstance(offers, dict):
+            price = offers.get("price") or offers.get("lowPrice") or offers.get("highPrice")
+            if price:
+                hints["schema_price"] = str(price)
+            hints["schema_currency"] = hints.get("schema_currency") or offers.get("priceCurrency")
+    return document
+
+
+def _svg_end(html: str, start: int) -> Optional[re.Match[str]]:
+    depth = 1
+    for m in _SVG_TAG_RE.finditer(html, start):
+        if m.group(1):
+            depth -= 1
+            if depth == 0:
+                return m
+        elif not m.group(2).rstrip().endswith("/"):
+            depth += 1
+    return None
+
+
+def preprocess_html(html: str, *, base_url: str | None = None, max_chars: int = 100000) -> PreprocessedHtml:
+    """
+    Clean `html` for the LLM and collect structured hints and image candidates in one scan.
+
+    The cleaned HTML drops scripts, styles, noscript, SVG and comments and
+    collapses whitespace, matching what the LLM prompt has always used.
+    Images inside <noscript> (lazy-loading fallbacks) are still collected.
+    """
+    if not html:
+        return PreprocessedHtml("")
+
+    text = _CollapsedText(max_chars)
+    og: dict[str, str] = {}
+    schema: dict[str, Any] = {}
+    candidates: list[ImageCandidate] = []
+    jsonld: list[Any] = []
+    meta: dict[str, str] = {}
+    canonical_url: Optional[str] = None
+    microdata = _Microdata()
+
+    def add_image(attrs: dict[str, str]) -> None:
+        candidate = image_candidate_from_attrs(attrs)
+        if candidate is not None:
+            candidates.append(candidate)
+
+    keep_from = 0
+    pos = 0
+    # Microdata is read from kept markup between the tags handled below, in page order
+    microdata_from = 0
+    end_of_doc = len(html)
+    while True:
+        m = _START_RE.search(html, pos)
+        if m is None:
+            break
+        name = (m.group(1) or "").lower()
+        microdata.scan(html, microdata_from, m.start())
+        microdata_from = m.end()
+
+        if name in ("img", "meta", "link"):
+            attrs = _attrs(m.group(2))
+            microdata.add(attrs)
+            if name == "img":
+                add_image(attrs)
+            elif name == "meta":
+                _add_meta(attrs, og, meta)
+            elif canonical_url is None and attrs.get("rel", "").lower() == "canonical":
+                canonical_url = attrs.get("href")
+            pos = m.end()
+            continue
+
+        text.add(html, keep_from, m.start())
+        if not name:
+            # Comment; an unclosed one runs to the end of the document, as in a browser.
+            close = html.find("-->", m.end())
+            end = end_of_doc if close < 0 else close + 3
+        elif name == "svg" and m.group(2).rstrip().endswith("/"):
+            end = m.end()
+        else:
+            close_m = _svg_end(html, m.end()) if name == "svg" else _CLOSE_RE[name].search(html, m.end())
+            if close_m is None:
+                # Unclosed element: drop only the opening tag.
+                end = m.end()
+            else:
+                end = close_m.end()
+                if name == "script":
+                    if _attrs(m.group(2)).get("type", "").strip().lower() == "application/ld+json":
+                        data = _add_jsonld_hints(html[m.end() : close_m.start()], schema)
+                        if data is not None:
+                            jsonld.append(data)
+                elif name == "noscript":
+                    for img in _IMG_RE.finditer(html, m.end(), close_m.start()):
+                        add_image(_attrs(img.group(1)))
+        keep_from = pos = microdata_from = end
+
+    text.add(html, keep_from, end_of_doc)
+    microdata.scan(html, microdata_from, end_of_doc)
+
+    hints: dict[str, Any] = {k: og[k] for k in _OG_ORDER if k in og}
+    hints.update((k, v) for k, v in schema.items() if v)
+    images = [d for d in (candidate_to_dict(c, base_url) for c in candidates) if d is not None]
+    return PreprocessedHtml(
+        text.result(),
+        hints,
+        images,
+        jsonld=jsonld,
+        meta=meta,
+        canonical_url=canonical_url,
+        microdata=microdata.props,
+    )
@@ -0,0 +1,463 @@
+"""
+Content-aware pruning of cleaned page HTML before it goes into the LLM prompt.
+
+Hard truncation at `LLM_MAX_CHARS` sends 50-100k characters of markup and
+still cuts off the price block on long pages. The pruner works on the
+whole cleaned document instead:
+
+1. Attributes that carry nothing for extraction are dropped. Classes and
+   ids are kept only when they name something product-like ("price",
+   "title", "buy"...), and attribute-less wrapper divs/spans are unwrapped.
+2. Runs of look-alike listing items (recommendation and "similar
+   products" carousels) are collapsed to their first two items.
+3. The tree is cut into blocks of bounded size, each block is scored by
+   product signals (prices with a currency, <h1>, add-to-cart buttons,
+   schema.org itemprops) and the best blocks are kept, in document order,
+   until the token budget is spent. Blocks without any signal are dropped
+   even when budget is left.
+
+When the stripped document already fits the budget it is sent whole.
+
+Parsing is pure Python and CPU-bound on large pages; async callers run
+`format_html_for_llm` (and with it `HtmlPruner.prune`) via `asyncio.to_thread`.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+from dataclasses import dataclass
+from html import escape
+from html.parser import HTMLParser
+from typing import Any, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Rough characters per token for mixed Cyrillic/Latin markup.
+CHARS_PER_TOKEN = 3
+
+VOID_TAGS = frozenset({"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"})
+# Elements with no value for extraction; dropped together with their content.
+DROPPED_TAGS = frozenset({"head", "link", "input", "select", "option", "iframe", "template", "canvas", "br", "hr", "wbr"})
+# Wrappers that are replaced by their children when they keep no attributes.
+UNWRAPPED_TAGS = frozenset({"div", "span", "section", "article", "main", "font", "body", "html", "picture", "figure"})
+
+KEPT_ATTRS = frozenset({"itemprop", "itemtype", "content", "href", "src", "alt", "title", "aria-label", "datetime"})
+
+_SIGNAL_NAME_RE = re.compile(
+    r"price|cost|sum|currency|title|name|product|brand|sku|article|buy|cart|basket|order|offer|"
+    r"sale|discount|old|stock|avail|gallery|image|photo|descr|spec|char|param|rating",
+    re.IGNORECASE,
+)
+_NOISE_NAME_RE = re.compile(
+    r"recommend|similar|related|also|banner|cookie|footer|header|menu|nav|breadcrumb|advert|promo|popup|modal|"
+    r"review|comment|subscribe|social",
+    re.IGNORECASE,
+)
+_LISTING_NAME_RE = re.compile(r"recommend|similar|related|also|upsell|cross-?sell", re.IGNORECASE)
+_PRICE_RE = re.compile(
+    # \s also covers the no-break and thin spaces used as digit group separators.
+    r"\d[\d\s]{0,9}(?:[.,]\d{1,2})?\s*(?:₽|руб|р\.|\$|€|₸|usd|eur|rub|byn|kzt)|[$€₽]\s?\d",
+    re.IGNORECASE,
+)
+_CURRENCY_RE = re.compile(r"[₽$€₸]|руб")
+_CART_RE = re.compile(
+    r"в\s+корзину|купить|оформить|add\s+to\s+(?:cart|bag|basket)|buy\s+now|в\s+наличии|нет\s+в\s+наличии",
+    re.IGNORECASE,
+)
+_DETAILS_RE = re.compile(r"характеристик|описани|specification|description|артикул|sku", re.IGNORECASE)
+_PRODUCT_ITEMPROPS = frozenset({"name", "price", "pricecurrency", "image", "description", "offers", "brand", "sku"})
+_NOISE_TAGS = frozenset({"nav", "footer", "header", "aside"})
+
+
+class _Element:
+    __slots__ = ("tag", "attrs", "children")
+
+    def __init__(self, tag: str, attrs: list[tuple[str, str]]) -> None:
+        self.tag = tag
+        self.attrs = attrs
+        self.children: list[Union[_Element, str]] = []
+
+
+Node = Union[_Element, str]
+
+
+def _signal_tokens(value: str) -> str:
+    # Noise names are kept too: they tell both the ranking and the LLM what a block is.
+    return " ".join(
+        t for t in value.split() if len(t) <= 40 and (_SIGNAL_NAME_RE.search(t) or _NOISE_NAME_RE.search(t))
+    )
+
+
+def _keep_attrs(attrs: list[tuple[str, Optional[str]]]) -> list[tuple[str, str]]:
+    kept: list[tuple[str, str]] = []
+    for name, value in attrs:
+        value = (value or "").strip()
+        if not value:
+            continue
+        if name in ("class", "id"):
+            value = _signal_tokens(value)
+            if value:
+                kept.append((name, value))
+        elif name in KEPT_ATTRS or ("price" in name and name.startswith("data-")):
+            if name == "src" and value.startswith("data:"):
+                continue
+            if name == "content" and not any(n == "itemprop" for n, _ in attrs):
+                continue
+            kept.append((name, value[:300]))
+    return kept
+
+
+class _TreeBuilder(HTMLParser):
+    """Builds a stripped tree: irrelevant attributes and elements never enter it."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.root = _Element("#root", [])
+        self._stack: list[_Element] = [self.root]
+        self._dropping = 0
+        self._dropped_tag: Optional[str] = None
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        if self._dropping:
+            if tag == self._dropped_tag and tag not in VOID_TAGS:
+                self._dropping += 1
+            return
+        if tag in DROPPED_TAGS:
+            if tag not in VOID_TAGS:
+                self._dropping, self._dropped_tag = 1, tag
+            return
+        el = _Element(tag, _keep_attrs(attrs))
+        self._stack[-1].children.append(el)
+        if tag not in VOID_TAGS:
+            self._stack.append(el)
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        if self._dropping or tag in DROPPED_TAGS:
+            return
+        self._stack[-1].children.append(_Element(tag, _keep_attrs(attrs)))
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._dropping:
+            if tag == self._dropped_tag:
+                self._dropping -= 1
+            return
+        # Close up to the matching open element; stray end tags are ignored.
+        for i in range(len(self._stack) - 1, 0, -1):
+            if self._stack[i].tag == tag:
+                del self._stack[i:]
+                return
+
+    def handle_data(self, data: str) -> None:
+        if not self._dropping and data.strip():
+            self._stack[-1].children.append(data)
+
+
+def _simplify(el: _Element) -> list[Node]:
+    """Unwrap attribute-less wrappers and drop empty elements; returns the nodes replacing `el`."""
+    children: list[Node] = []
+    for child in el.children:
+        if isinstance(child, str):
+            children.append(child)
+        else:
+            children.extend(_simplify(child))
+    el.children = children
+    if el.tag in VOID_TAGS:
+        # Images, and microdata carried in <meta itemprop content>.
+        names = {n for n, _ in el.attrs}
+        keep = "src" in names if el.tag == "img" else el.tag == "meta" and {"itemprop", "content"} <= names
+        return [el] if keep else []
+    if not children and not el.attrs:
+        return []
+    if el.tag in UNWRAPPED_TAGS and not el.attrs:
+        # Keep a separator so unwrapped neighbours do not glue together ("Товар 1" + "1000 ₽").
+        return [" ", *children, " "]
+    if not children and not any(n in ("content", "href", "src") for n, _ in el.attrs):
+        return []
+    return [el]
+
+
+def _signature(node: Node) -> Optional[tuple[str, str]]:
+    if isinstance(node, str):
+        return None
+    return node.tag, dict(node.attrs).get("class", "")
+
+
+def _has_link_or_image(el: _Element) -> bool:
+    stack: list[Node] = [el]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, _Element):
+            if node.tag == "img" or (node.tag == "a" and node.attrs):
+                return True
+            stack.extend(node.children)
+    return False
+
+
+def _collapse_carousels(el: _Element, min_run: int = 4, keep: int = 2) -> int:
+    """Collapse runs of look-alike listing items to their first `keep`; returns the number of runs collapsed."""
+    collapsed = 0
+    for child in el.children:
+        if isinstance(child, _Element):
+            collapsed += _collapse_carousels(child, min_run, keep)
+
+    # Whitespace between items does not break a run.
+    children = el.children
+    out: list[Node] = []
+    i = 0
+    while i < len(children):
+        sig = _signature(children[i])
+        run, last, j = [children[i]], i, i + 1
+        while sig is not None and j < len(children):
+            node = children[j]
+            if isinstance(node, str) and not node.strip():
+                j += 1
+            elif _signature(node) == sig:
+                run.append(node)
+                last, j = j, j + 1
+            else:
+                break
+        if len(run) >= min_run and all(_has_link_or_image(n) for n in run if isinstance(n, _Element)):
+            for node in run[:keep]:
+                out.extend((node, " "))
+            out.append(f"[{len(run) - keep} similar items omitted]")
+            collapsed += 1
+            i = last + 1
+        else:
+            out.append(children[i])
+            i += 1
+    el.children = out
+    return collapsed
+
+
+def _serialize(node: Node) -> str:
+    if isinstance(node, str):
+        return escape(node, quote=False)
+    attrs = "".join(f' {n}="{escape(v)}"' for n, v in node.attrs)
+    if node.tag in VOID_TAGS:
+        return f"<{node.tag}{attrs}>"
+    inner = "".join(_serialize(c) for c in node.children)
+    return f"<{node.tag}{attrs}>{inner}</{node.tag}>"
+
+
+def _collapse_ws(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+# Length of a whitespace-collapsed (not yet stripped) serialization, and
+# whether it starts / ends with a collapsed space.
+_Measure = tuple[int, bool, bool]
+
+
+def _measure_text(text: str) -> _Measure:
+    collapsed = re.sub(r"\s+", " ", text)
+    return len(collapsed), collapsed[:1] == " ", collapsed[-1:] == " "
+
+
+def _join_measures(parts: list[_Measure]) -> _Measure:
+    length, starts, ends, empty = 0, False, False, True
+    for n, part_starts, part_ends in parts:
+        if n == 0:
+            continue
+        if empty:
+            starts, empty = part_starts, False
+        elif ends and part_starts:
+            # Adjacent whitespace runs collapse into one space.
+            length -= 1
+        length += n
+        ends = part_ends
+    return length, starts, ends
+
+
+def _measure(node: Node, sizes: dict[int, int]) -> _Measure:
+    """
+    Measure `_serialize(node)` bottom-up in one traversal.
+
+    Stores `len(_collapse_ws(_serialize(el)))` for every element in `sizes`
+    (keyed by `id(el)`), reusing the children's measures instead of
+    serializing each subtree again at every depth.
+    """
+    if isinstance(node, str):
+        return _measure_text(escape(node, quote=False))
+    attrs = "".join(f' {n}="{escape(v)}"' for n, v in node.attrs)
+    parts = [_measure_text(f"<{node.tag}{attrs}>")]
+    if node.tag not in VOID_TAGS:
+        parts.extend(_measure(c, sizes) for c in node.children)
+        parts.append(_measure_text(f"</{node.tag}>"))
+    measured = _join_measures(parts)
+    n, starts, ends = measured
+    sizes[id(node)] = max(0, n - starts - ends)
+    return measured
+
+
+@dataclass
+class _Block:
+    index: int
+    html: str
+    score: float
+
+
+def _score(node: Node, html: str) -> float:
+    text = html if isinstance(node, str) else re.sub(r"<[^>]+>", " ", html)
+    score = 0.0
+    score += 3 * min(3, len(_PRICE_RE.findall(text)))
+    if _CURRENCY_RE.search(text):
+        score += 1
+    if _CART_RE.search(text):
+        score += 3
+    if _DETAILS_RE.search(text):
+        score += 1
+    if "<h1" in html:
+        score += 6
+    score += 3 * min(3, sum(1 for p in re.findall(r'itemprop="([^"]+)"', html) if p.lower() in _PRODUCT_ITEMPROPS))
+    if 'class="' in html or 'id="' in html:
+        score += min(3, len(re.findall(r'(?:class|id)="[^"]*(?:price|title|product|buy|cart)', html, re.IGNORECASE)))
+    if "<img" in html:
+        score += 1
+    return score
+
+
+def _context(node: Node, inherited: Optional[str]) -> Optional[str]:
+    """"noise" for navigation/footer/recommendation containers, "product" for product containers."""
+    if inherited == "noise" or isinstance(node, str):
+        return inherited
+    names = " ".join(v for n, v in node.attrs if n in ("class", "id", "itemtype"))
+    if node.tag in _NOISE_TAGS:
+        return "noise"
+    if names:
+        # "product-header" is the product; "similar-products" is not.
+        if _LISTING_NAME_RE.search(names):
+            return "noise"
+        if "product" in names.lower():
+            return "product"
+        if _NOISE_NAME_RE.search(names):
+            return "noise"
+    return inherited
+
+
+def _blocks(root: _Element, max_block_chars: int) -> list[_Block]:
+    """
+    Split the tree into document-ordered, scored blocks of at most `max_block_chars`.
+
+    Blocks inside navigation, footers or recommendation-like containers
+    score below zero and are never kept; blocks inside a product container
+    get a bonus. Each block also gets a share of the previous block's
+    score, so the text under a "Характеристики" heading rides along with
+    the heading.
+    """
+    found: list[tuple[Node, str, Optional[str]]] = []
+    sizes: dict[int, int] = {}
+    _measure(root, sizes)
+
+    def visit(node: Node, context: Optional[str]) -> None:
+        context = _context(node, context)
+        if isinstance(node, str) or len(node.children) == 0 or sizes[id(node)] <= max_block_chars:
+            # Only the nodes that become blocks are serialized, each once.
+            html = _collapse_ws(_serialize(node))
+            if html:
+                found.append((node, html[:max_block_chars], context))
+            return
+        for child in node.children:
+            visit(child, context)
+
+    for child in root.children:
+        visit(child, None)
+
+    base = [_score(node, html) for node, html, _ in found]
+    blocks: list[_Block] = []
+    for i, (_, html, context) in enumerate(found):
+        if context == "noise":
+            score = -1.0
+        else:
+            score = base[i] + 0.25 * (base[i - 1] if i else 0.0) + (2 if context == "product" else 0)
+        blocks.append(_Block(i, html, score))
+    return blocks
+
+
+@dataclass
+class PrunedHtml:
+    html: str
+    chars_in: int
+    chars_out: int
+    blocks_total: int = 0
+    blocks_kept: int = 0
+    carousels_collapsed: int = 0
+
+
+class HtmlPruner:
+    """Shrinks cleaned page HTML to `token_budget` tokens, keeping the product-relevant parts."""
+
+    def __init__(self, *, token_budget: int = 4000, source_chars: int = 1_000_000) -> None:
+        self.token_budget = max(500, int(token_budget))
+        self.source_chars = int(source_chars)
+        self.calls = 0
+        self.failures = 0
+        self.chars_in = 0
+        self.chars_out = 0
+
+    @property
+    def budget_chars(self) -> int:
+        return self.token_budget * CHARS_PER_TOKEN
+
+    def prune(self, html: str) -> PrunedHtml:
+        try:
+            result = self._prune(html)
+        except Exception as e:  # e.g. RecursionError on pathological nesting
+            logger.warning("HTML pruning failed, truncating instead: %s", e)
+            self.failures += 1
+            text = html[: self.budget_chars]
+            result = PrunedHtml(text, len(html), len(text))
+        self.calls += 1
+        self.chars_in += result.chars_in
+        self.chars_out += result.chars_out
+        return result
+
+    def _prune(self, html: str) -> PrunedHtml:
+        builder = _TreeBuilder()
+        builder.feed(html)
+        builder.close()
+        root = builder.root
+        _simplify(root)
+        carousels = _collapse_carousels(root)
+
+        whole = _collapse_ws(_serialize(root)[len("<#root>") : -len("</#root>")])
+        if len(whole) <= self.budget_chars:
+            return PrunedHtml(whole, len(html), len(whole), carousels_collapsed=carousels)
+
+        max_block_chars = max(600, self.budget_chars // 8)
+        blocks = _blocks(root, max_block_chars)
+        # Early blocks win ties: product pages lead with the product.
+        ranked = sorted(blocks, key=lambda b: (-b.score, b.index))
+        kept: list[_Block] = []
+        used = 0
+        for block in ranked:
+            if block.score <= 0:
+                break
+            if used + len(block.html) + 1 > self.budget_chars:
+                continue
+            kept.append(block)
+            used += len(block.html) + 1
+        kept.sort(key=lambda b: b.index)
+        text = "\n".join(b.html for b in kept)
+        return PrunedHtml(text, len(html), len(text), len(blocks), len(kept), carousels)
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "token_budget": self.token_budget,
+            "chars_in": self.chars_in,
+            "chars_out": self.chars_out,
+            "reduction": round(self.chars_in / self.chars_out, 1) if self.chars_out else 0.0,
+        }
+
+
+def load_html_pruner_from_env() -> Optional[HtmlPruner]:
+    enabled = (os.environ.get("HTML_PRUNING_ENABLED") or "true").strip().lower() not in ("0", "false", "no")
+    if not enabled:
+        return None
+    return HtmlPruner(
+        token_budget=int(os.environ.get("HTML_PRUNING_TOKEN_BUDGET") or "4000"),
+        source_chars=int(os.environ.get("HTML_PRUNING_SOURCE_CHARS") or "1000000"),
+    )
@@ -0,0 +1,128 @@
+"""Compare the NumPy and pure-Python screenshot cropping paths.
+
+Usage (full-page PNG screenshots, e.g. saved with `page.screenshot(full_page=True)`):
+
+    python -m app.image_benchmark shots/ozon.png shots/wb.png [--runs 5]
+    python -m app.image_benchmark --synthetic 5
+
+For every image the edge-projection and largest-component bounding boxes
+are computed `--runs` times with each implementation on the same
+downscaled input. The median CPU time of the shared downscale and of each
+implementation, and whether both returned the same box, are printed as
+JSON. `--synthetic N` generates N product-page-like screenshots instead
+of reading files.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from .image_utils import (
+    NUMPY_AVAILABLE,
+    _component_bbox_numpy,
+    _component_bbox_python,
+    _downscale,
+    _edge_bbox_numpy,
+    _edge_bbox_python,
+)
+
+
+def synthetic_screenshot(seed: int, width: int = 1280, height: int = 4000) -> Image.Image:
+    """A long page: header bar, product photo and price block, then rows of cards and text lines."""
+    rnd = random.Random(seed)
+    image = Image.new("RGB", (width, height), (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, width, 80), fill=(rnd.randint(0, 80),) * 3)
+    draw.rectangle((80, 140, 680, 740), fill=tuple(rnd.randint(60, 220) for _ in range(3)))
+    for i in range(12):
+        draw.line((740, 160 + i * 40, 740 + rnd.randint(150, 420), 160 + i * 40), fill=(30, 30, 30), width=6)
+    y = 820
+    while y < height - 300:
+        for x in range(80, width - 260, 290):
+            draw.rectangle((x, y, x + 250, y + 250), outline=(200, 200, 200), width=2)
+            draw.rectangle((x + 20, y + 20, x + 230, y + 170), fill=tuple(rnd.randint(0, 255) for _ in range(3)))
+            draw.line((x + 20, y + 200, x + rnd.randint(80, 230), y + 200), fill=(60, 60, 60), width=4)
+        y += 300
+    return image
+
+
+def _edge_input(image: Image.Image) -> Image.Image:
+    small, _ = _downscale(image, 300)
+    return small.convert("L").filter(ImageFilter.FIND_EDGES)
+
+
+def _component_input(image: Image.Image) -> Image.Image:
+    small, _ = _downscale(image, 220)
+    return small
+
+
+# step -> (input preparation shared by both paths, pure-Python bbox, NumPy bbox)
+STEPS: Dict[str, Tuple[Callable[[Image.Image], Image.Image], Callable, Callable]] = {
+    "edge_projection": (_edge_input, lambda im: _edge_bbox_python(im, 40), lambda im: _edge_bbox_numpy(im, 40)),
+    "largest_component": (
+        _component_input,
+        lambda im: _component_bbox_python(im, 30),
+        lambda im: _component_bbox_numpy(im, 30),
+    ),
+}
+
+
+def _measure(fn: Callable[[Image.Image], Any], image: Image.Image, runs: int) -> Tuple[float, Any]:
+    cpu_ms: List[float] = []
+    result = None
+    for _ in range(runs):
+        start = time.process_time()
+        result = fn(image)
+        cpu_ms.append((time.process_time() - start) * 1000)
+    return round(statistics.median(cpu_ms), 2), result
+
+
+def compare(images: List[Tuple[str, Image.Image]], *, runs: int) -> List[Dict[str, Any]]:
+    report: List[Dict[str, Any]] = []
+    for name, image in images:
+        entry: Dict[str, Any] = {"image": name, "size": list(image.size)}
+        for step, (prepare, python_fn, numpy_fn) in STEPS.items():
+            prepare_ms, small = _measure(prepare, image, runs)
+            python_ms, python_bbox = _measure(python_fn, small, runs)
+            numpy_ms, numpy_bbox = _measure(numpy_fn, small, runs)
+            entry[step] = {
+                "downscale_ms": prepare_ms,
+                "python_ms": python_ms,
+                "numpy_ms": numpy_ms,
+                "speedup": round(python_ms / numpy_ms, 1) if numpy_ms else None,
+                "same_bbox": python_bbox == numpy_bbox,
+            }
+        report.append(entry)
+    return report
+
+
+def _load(paths: List[Path], synthetic: Optional[int]) -> List[Tuple[str, Image.Image]]:
+    if synthetic:
+        return [(f"synthetic-{i}", synthetic_screenshot(i)) for i in range(synthetic)]
+    return [(str(path), Image.open(path).convert("RGB")) for path in paths]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", type=Path)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--synthetic", type=int, default=0, metavar="N")
+    args = parser.parse_args()
+    if not NUMPY_AVAILABLE:
+        parser.error("numpy is not installed")
+    if not args.files and not args.synthetic:
+        parser.error("pass screenshot files or --synthetic N")
+    report = compare(_load(args.files, args.synthetic), runs=max(1, args.runs))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Direct download of product images.
+
+Getting the product image used to mean opening a new page on the image
+URL, waiting for `networkidle`, taking a full-page PNG screenshot and
+cropping it back to the image. The image file is usually reachable
+directly, so it is now downloaded with the browser context's request API
+(same cookies, proxy and user agent as the product page). Its content type
+and size are checked, and it is decoded and encoded once by the image
+pipeline.
+The screenshot path is kept for CDNs that refuse the direct request or
+serve something that is not a decodable image (challenge pages, SVG).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from .image_pipeline import ImagePipeline, ProcessedImage
+
+logger = logging.getLogger(__name__)
+
+ACCEPT = "image/avif,image/webp,image/apng,image/*,*/*;q=0.8"
+
+
+@dataclass
+class FetchedImage:
+    final_url: str
+    image: ProcessedImage
+
+    @property
+    def mime(self) -> str:
+        return self.image.full.mime
+
+    @property
+    def data(self) -> bytes:
+        return self.image.full.data
+
+
+class DirectImageFetcher:
+    """Downloads and encodes product images; `fetch()` returns None when the caller should screenshot instead."""
+
+    def __init__(
+        self,
+        *,
+        pipeline: Optional[ImagePipeline] = None,
+        max_bytes: int = 10_000_000,
+        timeout_ms: int = 15000,
+    ) -> None:
+        self.pipeline = pipeline or ImagePipeline()
+        self.max_bytes = max_bytes
+        self.timeout_ms = timeout_ms
+        self.hits = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.fallbacks: Counter[str] = Counter()
+
+    def _fallback(self, url: str, reason: str) -> None:
+        self.fallbacks[reason] += 1
+        logger.info("Direct image fetch fell back to screenshot (%s): %s", reason, url)
+
+    async def fetch(self, context: Any, url: str, *, referer: Optional[str] = None) -> Optional[FetchedImage]:
+        headers = {"Accept": ACCEPT}
+        if referer:
+            # Hotlink protection checks the referer against the shop's own pages.
+            headers["Referer"] = referer
+        try:
+            resp = await context.request.get(
+                url, headers=headers, timeout=self.timeout_ms, fail_on_status_code=False, max_redirects=5
+            )
+        except Exception as e:
+            logger.debug("Direct image request failed for %s: %s", url, e)
+            self._fallback(url, "request_error")
+            return None
+
+        try:
+            if resp.status in (401, 403, 429):
+                self._fallback(url, "blocked")
+                return None
+            if resp.status >= 400:
+                self._fallback(url, "http_error")
+                return None
+            content_type = (resp.headers.get("content-type") or "").split(";")[0].strip().lower()
+            if not content_type.startswith("image/") or content_type == "image/svg+xml":
+                self._fallback(url, "not_image")
+                return None
+            declared = resp.headers.get("content-length") or ""
+            if declared.isdigit() and int(declared) > self.max_bytes:
+                self._fallback(url, "too_large")
+                return None
+            body = await resp.body()
+            final_url = resp.url
+        except Exception as e:
+            logger.debug("Reading direct image response failed for %s: %s", url, e)
+            self._fallback(url, "request_error")
+            return None
+        finally:
+            try:
+                await resp.dispose()
+            except Exception:
+                pass
+
+        if len(body) > self.max_bytes:
+            self._fallback(url, "too_large")
+            return None
+        try:
+            image = await asyncio.to_thread(self.pipeline.process, body)
+        except Exception:
+            self._fallback(url, "undecodable")
+            return None
+
+        self.hits += 1
+        self.bytes_in += len(body)
+        self.bytes_out += len(image.full.data)
+        return FetchedImage(final_url=final_url, image=image)
+
+    def metrics(self) -> dict[str, Any]:
+        fallbacks = sum(self.fallbacks.values())
+        total = self.hits + fallbacks
+        return {
+            "hits": self.hits,
+            "fallbacks": fallbacks,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "fallback_reasons": dict(self.fallbacks),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
+
+
+def load_image_fetcher_from_env(pipeline: Optional[ImagePipeline] = None) -> Optional[DirectImageFetcher]:
+    enabled = (os.environ.get("IMAGE_DIRECT_FETCH_ENABLED") or "true").strip().lower() not in ("0", "false", "no")
+    if not enabled:
+        return None
+    return DirectImageFetcher(
+        pipeline=pipeline,
+        max_bytes=int(os.environ.get("IMAGE_MAX_BYTES") or "10000000"),
+        timeout_ms=int(os.environ.get("IMAGE_FETCH_TIMEOUT_MS") or "15000"),
+    )
@@ -0,0 +1,184 @@
+"""
+Size normalization and encoding of stored product images.
+
+Item documents used to carry the product image as a JPEG data URL of up to
+1600px, which made them large to store, replicate and sync to every device.
+Every image now goes through one pipeline:
+
+- the image is downscaled to `max_dim` and encoded as WebP (AVIF when the
+  installed Pillow can write it, JPEG to keep the old output);
+- when the encoding is larger than `max_bytes`, the highest quality down to
+  `min_quality` that fits is found by binary search, and if even that does
+  not fit the image is shrunk further;
+- an optional small thumbnail (`IMAGE_THUMBNAIL_DIM`, off by default) is
+  encoded the same way with its own budget.
+
+With a thumbnail, the watcher puts it into the item document and stores the
+full image separately (see `changes_watcher.image_doc_id`), which core-api
+serves at `/api/v2/items/{item_id}/image`. Without one, the item
+document carries the normalized full image.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from PIL import Image
+
+from .image_utils import decode_image
+
+logger = logging.getLogger(__name__)
+
+MIME_TYPES = {"webp": "image/webp", "avif": "image/avif", "jpeg": "image/jpeg"}
+
+# Below this size shrinking further to meet the byte budget is not worth it.
+MIN_DIM = 64
+SHRINK_FACTOR = 0.75
+
+
+@dataclass
+class EncodedImage:
+    mime: str
+    data: bytes
+    width: int
+    height: int
+    quality: int
+
+
+@dataclass
+class ProcessedImage:
+    full: EncodedImage
+    thumbnail: Optional[EncodedImage] = None
+
+
+def _can_save(fmt: str) -> bool:
+    Image.init()
+    return fmt.upper() in Image.SAVE
+
+
+class ImagePipeline:
+    """Downscales and encodes product images within a byte budget; optionally adds a thumbnail."""
+
+    def __init__(
+        self,
+        *,
+        fmt: str = "webp",
+        max_dim: int = 1600,
+        max_bytes: int = 250_000,
+        quality: int = 80,
+        min_quality: int = 40,
+        thumbnail_dim: int = 0,
+        thumbnail_max_bytes: int = 20_000,
+    ) -> None:
+        fmt = fmt.lower()
+        if fmt == "jpg":
+            fmt = "jpeg"
+        if fmt not in MIME_TYPES:
+            raise ValueError(f"Unsupported image format: {fmt}")
+        if not _can_save(fmt):
+            logger.warning("Pillow cannot write %s here, storing WebP instead", fmt.upper())
+            fmt = "webp"
+        self.fmt = fmt
+        self.max_dim = max_dim
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self.min_quality = min(min_quality, quality)
+        self.thumbnail_dim = thumbnail_dim
+        self.thumbnail_max_bytes = thumbnail_max_bytes
+        self.images = 0
+        self.bytes_out = 0
+        self.thumbnail_bytes_out = 0
+        self.reencodes = 0
+        self.shrunk = 0
+        self.over_budget = 0
+
+    @property
+    def mime(self) -> str:
+        return MIME_TYPES[self.fmt]
+
+    def _encode(self, image: Image.Image, quality: int) -> bytes:
+        out = io.BytesIO()
+        if self.fmt == "jpeg":
+            image.save(out, format="JPEG", quality=quality, optimize=True)
+        elif self.fmt == "webp":
+            image.save(out, format="WEBP", quality=quality, method=4)
+        else:
+            image.save(out, format=self.fmt.upper(), quality=quality)
+        return out.getvalue()
+
+    def _encode_within(self, image: Image.Image, max_dim: int, max_bytes: int) -> EncodedImage:
+        if max(image.size) > max_dim:
+            image = image.copy()
+            image.thumbnail((max_dim, max_dim), Image.LANCZOS)
+        while True:
+            data = self._encode(image, self.quality)
+            if max_bytes <= 0 or len(data) <= max_bytes:
+                return EncodedImage(self.mime, data, image.width, image.height, self.quality)
+
+            # Highest quality that still fits the budget.
+            best: Optional[tuple[bytes, int]] = None
+            low, high = self.min_quality, self.quality - 1
+            while low <= high:
+                mid = (low + high) // 2
+                candidate = self._encode(image, mid)
+                self.reencodes += 1
+                if len(candidate) <= max_bytes:
+                    best = (candidate, mid)
+                    low = mid + 1
+                else:
+                    high = mid - 1
+            if best is not None:
+                return EncodedImage(self.mime, best[0], image.width, image.height, best[1])
+
+            if min(image.size) * SHRINK_FACTOR < MIN_DIM:
+                self.over_budget += 1
+                data = self._encode(image, self.min_quality)
+                return EncodedImage(self.mime, data, image.width, image.height, self.min_quality)
+            self.shrunk += 1
+            size = (max(1, int(image.width * SHRINK_FACTOR)), max(1, int(image.height * SHRINK_FACTOR)))
+            image = image.resize(size, Image.LANCZOS)
+
+    def process_image(self, image: Image.Image) -> ProcessedImage:
+        """Encode an already decoded RGB image (e.g. a cropped screenshot)."""
+        full = self._encode_within(image, self.max_dim, self.max_bytes)
+        thumbnail = None
+        if self.thumbnail_dim > 0:
+            thumbnail = self._encode_within(image, self.thumbnail_dim, self.thumbnail_max_bytes)
+            self.thumbnail_bytes_out += len(thumbnail.data)
+        self.images += 1
+        self.bytes_out += len(full.data)
+        return ProcessedImage(full=full, thumbnail=thumbnail)
+
+    def process(self, data: bytes) -> ProcessedImage:
+        """Decode downloaded image bytes and encode them; raises for data Pillow cannot decode."""
+        return self.process_image(decode_image(data))
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "format": self.fmt,
+            "max_dim": self.max_dim,
+            "max_bytes": self.max_bytes,
+            "thumbnail_dim": self.thumbnail_dim,
+            "images": self.images,
+            "avg_bytes": round(self.bytes_out / self.images) if self.images else 0,
+            "avg_thumbnail_bytes": round(self.thumbnail_bytes_out / self.images) if self.images else 0,
+            "reencodes": self.reencodes,
+            "shrunk": self.shrunk,
+            "over_budget": self.over_budget,
+        }
+
+
+def load_image_pipeline_from_env() -> ImagePipeline:
+    return ImagePipeline(
+        fmt=(os.environ.get("IMAGE_FORMAT") or "webp").strip(),
+        max_dim=int(os.environ.get("IMAGE_MAX_DIM") or "1600"),
+        max_bytes=int(os.environ.get("IMAGE_TARGET_BYTES") or "250000"),
+        quality=int(os.environ.get("IMAGE_QUALITY") or "80"),
+        min_quality=int(os.environ.get("IMAGE_MIN_QUALITY") or "40"),
+        thumbnail_dim=int(os.environ.get("IMAGE_THUMBNAIL_DIM") or "0"),
+        thumbnail_max_bytes=int(os.environ.get("IMAGE_THUMBNAIL_MAX_BYTES") or "20000"),
+    )
@@ -2,23 +2,38 @@ from __future__ import annotations
 
 import io
 
-from PIL import Image, ImageChops, ImageFilter
+from PIL import Image, ImageChops, ImageFilter, ImageOps
 
+try:
+    import numpy as np
 
-def _bbox_from_edge_projection(image: Image.Image) -> tuple[int, int, int, int] | None:
+    NUMPY_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on the installed packages
+    np = None
+    NUMPY_AVAILABLE = False
+
+
+BBox = tuple[int, int, int, int]
+
+
+def _downscale(image: Image.Image, max_dim: int) -> tuple[Image.Image, float]:
     width, height = image.size
-    max_dim = 300
     scale = min(1.0, max_dim / max(width, height))
     if scale < 1.0:
-        small = image.resize((max(1, int(width * scale)), max(1, int(height * scale))), Image.BILINEAR)
-    else:
-        small = image
+        return image.resize((max(1, int(width * scale)), max(1, int(height * scale))), Image.BILINEAR), scale
+    return image, scale
+
 
-    gray = small.convert("L")
-    edges = gray.filter(ImageFilter.FIND_EDGES)
+def _upscale_bbox(bbox: BBox | None, scale: float) -> BBox | None:
+    if bbox is None or scale >= 1.0:
+        return bbox
+    x0, y0, x1, y1 = bbox
+    return (int(x0 / scale), int(y0 / scale), int(x1 / scale), int(y1 / scale))
+
+
+def _edge_bbox_python(edges: Image.Image, edge_threshold: int) -> BBox | None:
     pixels = edges.load()
     sw, sh = edges.size
-    edge_threshold = 40
 
     row_counts = [0] * sh
     col_counts = [0] * sw
@@ -34,38 +49,30 @@ def _bbox_from_edge_projection(image: Image.Image) -> tuple[int, int, int, int]
     cols = [i for i, count in enumerate(col_counts) if count >= col_thresh]
     if not rows or not cols:
         return None
+    return (cols[0], rows[0], cols[-1] + 1, rows[-1] + 1)
 
-    x0, x1 = cols[0], cols[-1] + 1
-    y0, y1 = rows[0], rows[-1] + 1
 
-    pad = 0
-    x0 = max(0, x0 - pad)
-    y0 = max(0, y0 - pad)
-    x1 = min(sw, x1 + pad)
-    y1 = min(sh, y1 + pad)
-
-    if scale < 1.0:
-        x0 = int(x0 / scale)
-        y0 = int(y0 / scale)
-        x1 = int(x1 / scale)
-        y1 = int(y1 / scale)
+def _edge_bbox_numpy(edges: Image.Image, edge_threshold: int) -> BBox | None:
+    sw, sh = edges.size
+    strong = np.asarray(edges) > edge_threshold
+    rows = np.flatnonzero(strong.sum(axis=1) >= max(2, int(sw * 0.02)))
+    cols = np.flatnonzero(strong.sum(axis=0) >= max(2, int(sh * 0.02)))
+    if rows.size == 0 or cols.size == 0:
+        return None
+    return (int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1)
 
-    return (x0, y0, x1, y1)
 
+def _bbox_from_edge_projection(image: Image.Image) -> BBox | None:
+    small, scale = _downscale(image, 300)
+    edges = small.convert("L").filter(ImageFilter.FIND_EDGES)
+    edge_bbox = _edge_bbox_numpy if NUMPY_AVAILABLE else _edge_bbox_python
+    return _upscale_bbox(edge_bbox(edges, 40), scale)
 
-def _bbox_from_largest_component(image: Image.Image) -> tuple[int, int, int, int] | None:
-    width, height = image.size
-    max_dim = 220
-    scale = min(1.0, max_dim / max(width, height))
-    if scale < 1.0:
-        small = image.resize((max(1, int(width * scale)), max(1, int(height * scale))), Image.BILINEAR)
-    else:
-        small = image
 
+def _component_bbox_python(small: Image.Image, threshold: int) -> BBox | None:
     sw, sh = small.size
     pixels = small.load()
     bg = pixels[0, 0]
-    threshold = 30
 
     mask = [bytearray(sw) for _ in range(sh)]
     for y in range(sh):
@@ -122,33 +129,105 @@ def _bbox_from_largest_component(image: Image.Image) -> tuple[int, int, int, int
                 best_area = area
                 best_bbox = (min_x, min_y, max_x + 1, max_y + 1)
 
-    if best_bbox is None:
+    return best_bbox
+
+
+def _component_bbox_numpy(small: Image.Image, threshold: int) -> BBox | None:
+    """
+    Same result as `_component_bbox_python`, labelling horizontal runs instead of pixels.
+
+    Foreground pixels are grouped into per-row runs; runs in adjacent rows
+    that share a column are 4-connected. Run labels are merged by repeated
+    min-propagation over those links plus pointer jumping, and area and
+    bounds are aggregated per label. Ties on area go to the component met
+    first in raster order, as in the flood fill.
+    """
+    sw, sh = small.size
+    pixels = np.asarray(small, dtype=np.int16)
+    mask = np.abs(pixels - pixels[0, 0]).sum(axis=2) > threshold
+    min_keep = max(10, int(sw * sh * 0.002))
+
+    padded = np.zeros((sh, sw + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    step = np.diff(padded, axis=1)
+    run_row, run_start = np.nonzero(step == 1)
+    _, run_end = np.nonzero(step == -1)  # exclusive; pairs up with starts in row-major order
+    n = run_row.size
+    if n == 0:
         return None
 
-    x0, y0, x1, y1 = best_bbox
-    pad = 0
-    x0 = max(0, x0 - pad)
-    y0 = max(0, y0 - pad)
-    x1 = min(sw, x1 + pad)
-    y1 = min(sh, y1 + pad)
+    # Runs of row r-1 overlapping run j of row r form the index range [lo, hi):
+    # keys put each row in its own band so the search never leaves row r-1.
+    band = sw + 1
+    above = (run_row - 1) * band
+    lo = np.searchsorted(run_row * band + run_end, above + run_start, side="right")
+    hi = np.searchsorted(run_row * band + run_start, above + run_end, side="left")
+    counts = np.maximum(hi - lo, 0)
+    below = np.repeat(np.arange(n), counts)
+    offsets = np.arange(below.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    upper = np.repeat(lo, counts) + offsets
+
+    labels = np.arange(n)
+    while True:
+        linked = np.minimum(labels[upper], labels[below])
+        merged = labels.copy()
+        np.minimum.at(merged, upper, linked)
+        np.minimum.at(merged, below, linked)
+        while True:
+            jumped = merged[merged]
+            if np.array_equal(jumped, merged):
+                break
+            merged = jumped
+        if np.array_equal(merged, labels):
+            break
+        labels = merged
+
+    roots, component = np.unique(labels, return_inverse=True)
+    area = np.bincount(component, weights=run_end - run_start, minlength=roots.size).astype(np.int64)
+    if area.max() < min_keep:
+        return None
+    # Runs are in raster order, so a component's smallest run index is where the flood fill would meet it.
+    first = np.full(roots.size, n)
+    np.minimum.at(first, component, np.arange(n))
+    best = int(np.argmin(np.where(area == area.max(), first, n)))
 
-    if scale < 1.0:
-        x0 = int(x0 / scale)
-        y0 = int(y0 / scale)
-        x1 = int(x1 / scale)
-        y1 = int(y1 / scale)
+    members = component == best
+    return (
+        int(run_start[members].min()),
+        int(run_row[members].min()),
+        int(run_end[members].max()),
+        int(run_row[members].max()) + 1,
+    )
 
-    return (x0, y0, x1, y1)
 
+def _bbox_from_largest_component(image: Image.Image) -> BBox | None:
+    small, scale = _downscale(image, 220)
+    component_bbox = _component_bbox_numpy if NUMPY_AVAILABLE else _component_bbox_python
+    return _upscale_bbox(component_bbox(small, 30), scale)
 
-def crop_screenshot_to_content(data: bytes) -> bytes:
-    image = Image.open(io.BytesIO(data))
+
+def _flatten_to_rgb(image: Image.Image) -> Image.Image:
+    # Transparent areas become white, as they look on the product page.
     if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
         alpha = image.convert("RGBA")
         background = Image.new("RGBA", alpha.size, (255, 255, 255, 255))
-        image = Image.alpha_composite(background, alpha).convert("RGB")
-    else:
-        image = image.convert("RGB")
+        return Image.alpha_composite(background, alpha).convert("RGB")
+    return image.convert("RGB")
+
+
+def decode_image(data: bytes) -> Image.Image:
+    """
+    Decode a downloaded image upright and flattened to RGB.
+
+    Raises for data Pillow cannot decode (HTML error pages, SVG).
+    """
+    image = Image.open(io.BytesIO(data))
+    image = ImageOps.exif_transpose(image)
+    return _flatten_to_rgb(image)
+
+
+def crop_screenshot(data: bytes) -> Image.Image:
+    image = _flatten_to_rgb(Image.open(io.BytesIO(data)))
     bbox = _bbox_from_edge_projection(image)
     if bbox is None:
         bbox = _bbox_from_largest_component(image)
@@ -158,8 +237,12 @@ def crop_screenshot_to_content(data: bytes) -> bytes:
         bbox = diff.getbbox()
     if bbox:
         image = image.crop(bbox)
+    return image
+
+
+def crop_screenshot_to_content(data: bytes) -> bytes:
     out = io.BytesIO()
-    image.save(out, format="JPEG", quality=75)
+    crop_screenshot(data).save(out, format="JPEG", quality=75)
     return out.getvalue()
 
 
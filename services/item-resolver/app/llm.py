@@ -1,14 +1,28 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
 import os
-from dataclasses import dataclass
-from typing import Optional, Protocol
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Optional, Protocol
 from urllib.parse import urlparse
 
 import httpx
 from pydantic import BaseModel
 
+from .llm_fallback import FallbackLLMClient
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on the installed extras
+    HTTP2_AVAILABLE = False
+
 
 class LLMOutput(BaseModel):
     title: Optional[str] = None
@@ -61,6 +75,435 @@ def _extract_json(text: str) -> dict:
     return json.loads(text[start : end + 1])
 
 
+class _RequestTimer:
+    """httpx trace hook splitting one request into connect, time-to-first-byte and total."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.connect_ms: Optional[float] = None
+        self.ttfb_ms: Optional[float] = None
+        self._connect_started: Optional[float] = None
+
+    async def trace(self, event: str, info: dict) -> None:
+        now = time.perf_counter()
+        if event == "connection.connect_tcp.started":
+            self._connect_started = now
+        elif event in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            if self._connect_started is not None:
+                self.connect_ms = (now - self._connect_started) * 1000
+        elif event.endswith("receive_response_headers.complete") and self.ttfb_ms is None:
+            self.ttfb_ms = (now - self.started) * 1000
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+
+@dataclass
+class LLMHttpStats:
+    requests: int = 0
+    failures: int = 0
+    new_connections: int = 0
+    connect_ms_total: float = 0.0
+    ttfb_ms_total: float = 0.0
+    ttfb_samples: int = 0
+    total_ms_total: float = 0.0
+    total_ms_max: float = 0.0
+    streamed: int = 0
+    early_stops: int = 0
+    budget_aborts: int = 0
+
+    def record(self, timer: _RequestTimer, *, ok: bool) -> None:
+        total_ms = timer.total_ms
+        self.requests += 1
+        if not ok:
+            self.failures += 1
+        if timer.connect_ms is not None:
+            self.new_connections += 1
+            self.connect_ms_total += timer.connect_ms
+        if timer.ttfb_ms is not None:
+            self.ttfb_samples += 1
+            self.ttfb_ms_total += timer.ttfb_ms
+        self.total_ms_total += total_ms
+        self.total_ms_max = max(self.total_ms_max, total_ms)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "new_connections": self.new_connections,
+            "reused_connections": self.requests - self.new_connections,
+            "avg_connect_ms": round(self.connect_ms_total / self.new_connections, 1) if self.new_connections else 0.0,
+            "avg_ttfb_ms": round(self.ttfb_ms_total / self.ttfb_samples, 1) if self.ttfb_samples else 0.0,
+            "avg_total_ms": round(self.total_ms_total / self.requests, 1) if self.requests else 0.0,
+            "max_total_ms": round(self.total_ms_max, 1),
+            "streamed": self.streamed,
+            "early_stops": self.early_stops,
+            "budget_aborts": self.budget_aborts,
+        }
+
+
+@dataclass
+class LLMPricing:
+    """Provider prices in USD per million tokens; all zero means cost is not tracked."""
+
+    input_per_mtok: float = 0.0
+    cached_input_per_mtok: float = 0.0
+    output_per_mtok: float = 0.0
+
+    def cost(self, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> float:
+        uncached = max(0, prompt_tokens - cached_tokens)
+        return (
+            uncached * self.input_per_mtok
+            + cached_tokens * self.cached_input_per_mtok
+            + completion_tokens * self.output_per_mtok
+        ) / 1_000_000
+
+
+def _usage_tokens(usage: dict) -> tuple[int, int, int]:
+    """(prompt, cached prompt, completion) tokens from an OpenAI- or DeepSeek-style usage object."""
+    prompt = int(usage.get("prompt_tokens") or 0)
+    # DeepSeek reports prompt_cache_hit_tokens, OpenAI prompt_tokens_details.cached_tokens.
+    cached = usage.get("prompt_cache_hit_tokens")
+    if cached is None:
+        cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+    return prompt, min(prompt, int(cached or 0)), int(usage.get("completion_tokens") or 0)
+
+
+@dataclass
+class LLMUsageStats:
+    """
+    Prompt-cache effectiveness and spend, from the `usage` field of responses.
+
+    Streams cancelled at the end of the JSON object never receive the final
+    usage chunk; they are counted in `usage_missing` and left out of the
+    token and cost figures.
+    """
+
+    responses: int = 0
+    usage_missing: int = 0
+    prompt_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+
+    def record(self, usage: Optional[dict], pricing: LLMPricing) -> None:
+        if not isinstance(usage, dict):
+            self.usage_missing += 1
+            return
+        prompt, cached, completion = _usage_tokens(usage)
+        self.responses += 1
+        self.prompt_tokens += prompt
+        self.cached_prompt_tokens += cached
+        self.completion_tokens += completion
+        self.cost_usd += pricing.cost(prompt, cached, completion)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "responses": self.responses,
+            "usage_missing": self.usage_missing,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_prompt_tokens": self.cached_prompt_tokens,
+            "uncached_prompt_tokens": self.prompt_tokens - self.cached_prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "prompt_cache_hit_ratio": (
+                round(self.cached_prompt_tokens / self.prompt_tokens, 3) if self.prompt_tokens else 0.0
+            ),
+            "cost_usd": round(self.cost_usd, 6),
+            "avg_cost_per_call_usd": round(self.cost_usd / self.responses, 6) if self.responses else 0.0,
+        }
+
+
+@dataclass
+class _PooledLLMClient:
+    """
+    Base for OpenAI-compatible clients: one long-lived pooled `httpx.AsyncClient`.
+
+    The connection (TCP + TLS, and with HTTP/2 a single multiplexed
+    connection) is reused across extractions instead of being set up per
+    item. The pool is created on first use and closed with `aclose()` from
+    the app lifespan.
+    """
+
+    base_url: str
+    api_key: str
+    model: str
+    timeout_s: float
+    max_chars: int
+    http2: bool = True
+    max_connections: int = 20
+    keepalive_s: float = 60.0
+    stream: bool = False
+    max_output_tokens: int = 1024
+    usage_grace_s: float = 0.25
+    pricing: LLMPricing = field(default_factory=LLMPricing)
+    http_stats: LLMHttpStats = field(default_factory=LLMHttpStats, init=False, repr=False, compare=False)
+    usage_stats: LLMUsageStats = field(default_factory=LLMUsageStats, init=False, repr=False, compare=False)
+    _client: Optional[httpx.AsyncClient] = field(default=None, init=False, repr=False, compare=False)
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            http2 = self.http2 and HTTP2_AVAILABLE
+            if self.http2 and not HTTP2_AVAILABLE:
+                logger.warning("HTTP/2 requested for LLM calls but the h2 package is missing; using HTTP/1.1")
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout_s, connect=self.timeout_s),
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=self.keepalive_s,
+                ),
+            )
+        return self._client
+
+    async def _post_chat(self, payload: dict) -> dict:
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        timer = _RequestTimer()
+        try:
+            resp = await self._http().post(
+                "/v1/chat/completions", json=payload, headers=headers, extensions={"trace": timer.trace}
+            )
+            resp.raise_for_status()
+            body = resp.json()
+        except Exception:
+            self.http_stats.record(timer, ok=False)
+            raise
+        self.http_stats.record(timer, ok=True)
+        return body
+
+    async def _stream_chat(self, payload: dict) -> str:
+        """
+        Stream the completion over SSE and return as soon as the JSON object is complete.
+
+        The stream is cancelled once the object's closing brace arrives (the
+        model may keep explaining itself afterwards), when no object starts
+        within the preamble limit, or when more than `max_output_tokens`
+        content chunks arrive. After the object, the stream gets
+        `usage_grace_s` to deliver its final usage chunk: a model that stops
+        at the object sends it within milliseconds.
+        """
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        payload = {
+            **payload,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+            "max_tokens": self.max_output_tokens,
+        }
+        scanner = _JsonObjectScanner()
+        timer = _RequestTimer()
+        chunks = 0
+        usage: Optional[dict] = None
+        ok = False
+        try:
+            async with self._http().stream(
+                "POST", "/v1/chat/completions", json=payload, headers=headers, extensions={"trace": timer.trace}
+            ) as resp:
+                resp.raise_for_status()
+                events = _sse_events(resp.aiter_lines())
+                async for event in events:
+                    # The usage chunk comes last, with an empty choices list.
+                    usage = event.get("usage") or usage
+                    piece = _delta_content(event)
+                    if not piece:
+                        continue
+                    chunks += 1
+                    found = scanner.feed(piece)
+                    if found is not None:
+                        ok = True
+                        usage = await self._read_usage(events, usage)
+                        return found
+                    if chunks > self.max_output_tokens:
+                        self.http_stats.budget_aborts += 1
+                        raise ValueError("LLM response exceeded the output token budget")
+            # Stream ended without a complete object; let the regular parser report it.
+            ok = True
+            return scanner.text
+        finally:
+            self.http_stats.streamed += 1
+            self.http_stats.record(timer, ok=ok)
+            if ok or usage is not None:
+                self.usage_stats.record(usage, self.pricing)
+
+    async def _read_usage(self, events: AsyncIterator[dict], usage: Optional[dict]) -> Optional[dict]:
+        """Read the rest of the stream for its usage chunk, giving up after `usage_grace_s`."""
+
+        async def rest() -> Optional[dict]:
+            found = usage
+            async for event in events:
+                found = event.get("usage") or found
+            return found
+
+        try:
+            return await asyncio.wait_for(rest(), timeout=self.usage_grace_s)
+        except asyncio.TimeoutError:
+            # Still generating past the object: cut it off.
+            self.http_stats.early_stops += 1
+            return usage
+
+    async def _complete(self, payload: dict) -> str:
+        """The model's message content for `payload`, streamed when enabled."""
+        if self.stream:
+            return await self._stream_chat(payload)
+        body = await self._post_chat(payload)
+        self.usage_stats.record(body.get("usage"), self.pricing)
+        try:
+            return body["choices"][0]["message"]["content"]
+        except Exception as exc:
+            raise ValueError("LLM response missing content") from exc
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "http2": self.http2 and HTTP2_AVAILABLE,
+            **self.http_stats.to_dict(),
+            "usage": self.usage_stats.to_dict(),
+        }
+
+
+async def _sse_events(lines: AsyncIterator[str]) -> AsyncIterator[dict]:
+    """Parsed `data:` events of a chat completion stream, up to `[DONE]`."""
+    async for line in lines:
+        if not line.startswith("data:"):
+            continue
+        data = line[len("data:") :].strip()
+        if data == "[DONE]":
+            return
+        try:
+            event = json.loads(data)
+        except ValueError:
+            continue
+        if isinstance(event, dict):
+            yield event
+
+
+def _delta_content(event: dict) -> Optional[str]:
+    try:
+        return event["choices"][0]["delta"].get("content")
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return None
+
+
+class _JsonObjectScanner:
+    """
+    Incremental scanner for the first top-level JSON object in streamed text.
+
+    `feed()` returns the object's text as soon as its closing brace arrives;
+    braces inside strings are ignored. Anything before the object (a
+    markdown fence, a preamble) is skipped, up to `max_preamble_chars`.
+    """
+
+    def __init__(self, *, max_preamble_chars: int = 2000) -> None:
+        self.max_preamble_chars = max_preamble_chars
+        self.text = ""
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> Optional[str]:
+        self.text += chunk
+        text = self.text
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._start < 0:
+                if ch == "{":
+                    self._start, self._depth = i, 1
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._pos = i + 1
+                    return text[self._start : i + 1]
+        self._pos = len(text)
+        if self._start < 0 and len(text) > self.max_preamble_chars:
+            raise ValueError("no json object found")
+        return None
+
+
+# Prompt layout: everything static (system prompt, then the fixed instruction
+# that opens the user message) comes first and is byte-identical across calls,
+# so providers with automatic prefix caching (DeepSeek, OpenAI) bill it as
+# cached input. Per-page data (URL, title, candidates, HTML) always goes last.
+VISION_SYSTEM_PROMPT = (
+    "Return ONLY a single JSON object and nothing else. "
+    "Use the exact schema and keys:\n"
+    "{\n"
+    '  "title": "string|null",\n'
+    '  "description": "string|null",\n'
+    '  "price_amount": "number|null",\n'
+    '  "price_currency": "string|null",\n'
+    '  "canonical_url": "string|null",\n'
+    '  "confidence": "number",\n'
+    '  "image_url": "string|null"\n'
+    "}\n"
+    "Rules:\n"
+    "- Output valid JSON with double quotes.\n"
+    "- Do not wrap in markdown.\n"
+    "- If a field is missing, use null.\n"
+    "- confidence is 0.0 to 1.0.\n"
+    "- Use the image candidates list to determine image_url only.\n"
+    "- Use the screenshot to determine all other fields.\n"
+    "- image_url must be the main product image URL selected from the candidates.\n"
+    "- Prefer the highest-resolution/original product image URL when multiple sizes exist.\n"
+    "- Choose the image that most directly matches the product shown in the screenshot.\n"
+    "- If no suitable candidate exists, return null for image_url.\n"
+)
+
+TEXT_SYSTEM_PROMPT = (
+    "You are a product data extraction assistant. "
+    "Extract product information from the provided HTML content and return ONLY a single JSON object.\n\n"
+    "Use the exact schema and keys:\n"
+    "{\n"
+    '  "title": "string|null",\n'
+    '  "description": "string|null",\n'
+    '  "price_amount": "number|null",\n'
+    '  "price_currency": "string|null",\n'
+    '  "canonical_url": "string|null",\n'
+    '  "confidence": "number",\n'
+    '  "image_url": "string|null"\n'
+    "}\n\n"
+    "Rules:\n"
+    "- Output valid JSON with double quotes only, no markdown formatting.\n"
+    "- If a field is missing or unclear, use null.\n"
+    "- confidence is 0.0 to 1.0 based on how certain you are about the extraction.\n"
+    "- For title, use the main product name, not marketing slogans.\n"
+    "- For description, extract a concise product description (1-3 sentences).\n"
+    "- For image_url, select the best main product image URL from the image candidates list.\n"
+    "- Prefer high-resolution product images, not thumbnails or icons.\n"
+    "- canonical_url should be the clean product page URL without tracking parameters.\n\n"
+    "IMPORTANT - Price extraction:\n"
+    "- ALWAYS look carefully for the product price. It is usually prominently displayed.\n"
+    "- Prices may have spaces as thousand separators: '93 499' means 93499.\n"
+    "- Prices may have dots or commas: '1.299,00' or '1,299.00' - extract as number.\n"
+    "- Look for the CURRENT/SALE price, not the crossed-out old price.\n"
+    "- Russian sites use ₽ or 'руб' for rubles (RUB).\n"
+    "- For price_amount, return ONLY the numeric value (e.g., 93499 not '93 499 ₽').\n"
+    "- For price_currency, use ISO code: RUB, USD, EUR, etc.\n"
+    "- Check 'Structured metadata' section first - it may contain the price.\n"
+)
+
+VISION_USER_PREFIX = "Extract the product from the attached screenshot and the image candidates below.\n\n"
+TEXT_USER_PREFIX = "Extract product information from this page.\n\n"
+
+
 def _default_canonical_url(url: str) -> str:
     parsed = urlparse(url)
     if not parsed.scheme or not parsed.netloc:
@@ -93,13 +536,7 @@ class StubLLMClient:
 
 
 @dataclass
-class OpenAILikeClient:
-    base_url: str
-    api_key: str
-    model: str
-    timeout_s: float
-    max_chars: int
-
+class OpenAILikeClient(_PooledLLMClient):
     async def extract(
         self,
         *,
@@ -112,42 +549,17 @@ class OpenAILikeClient:
     ) -> LLMOutput:
         _ = html_content  # Not used by vision client
         truncated_candidates = _truncate_text(image_candidates, self.max_chars)
-        system = (
-            "Return ONLY a single JSON object and nothing else. "
-            "Use the exact schema and keys:\n"
-            "{\n"
-            '  "title": "string|null",\n'
-            '  "description": "string|null",\n'
-            '  "price_amount": "number|null",\n'
-            '  "price_currency": "string|null",\n'
-            '  "canonical_url": "string|null",\n'
-            '  "confidence": "number",\n'
-            '  "image_url": "string|null"\n'
-            "}\n"
-            "Rules:\n"
-            "- Output valid JSON with double quotes.\n"
-            "- Do not wrap in markdown.\n"
-            "- If a field is missing, use null.\n"
-            "- confidence is 0.0 to 1.0.\n"
-            "- Use the image candidates list to determine image_url only.\n"
-            "- Use the screenshot to determine all other fields.\n"
-            "- image_url must be the main product image URL selected from the candidates.\n"
-            "- Prefer the highest-resolution/original product image URL when multiple sizes exist.\n"
-            "- Choose the image that most directly matches the product shown in the screenshot.\n"
-            "- If no suitable candidate exists, return null for image_url.\n"
-        )
         user = (
+            VISION_USER_PREFIX + "Image candidates (choose the main product image):\n"
+            f"{truncated_candidates}\n\n"
             f"URL: {url}\n"
             f"Page title: {title}\n"
-            "Image candidates (choose the main product image):\n"
-            f"{truncated_candidates}\n"
-            "Screenshot of the page is attached.\n"
         )
         payload = {
             "model": self.model,
             "temperature": 0,
             "messages": [
-                {"role": "system", "content": system},
+                {"role": "system", "content": VISION_SYSTEM_PROMPT},
                 {
                     "role": "user",
                     "content": [
@@ -160,25 +572,14 @@ class OpenAILikeClient:
                 },
             ],
         }
-        headers = {"Authorization": f"Bearer {self.api_key}"}
-        timeout = httpx.Timeout(self.timeout_s, connect=self.timeout_s)
-        async with httpx.AsyncClient(base_url=self.base_url, timeout=timeout) as client:
-            resp = await client.post("/v1/chat/completions", json=payload, headers=headers)
-            resp.raise_for_status()
-            body = resp.json()
-
-        try:
-            content = body["choices"][0]["message"]["content"]
-        except Exception as exc:
-            raise ValueError("LLM response missing content") from exc
-
+        content = await self._complete(payload)
         parsed = _extract_json(content)
         out = LLMOutput.model_validate(parsed)
         return out
 
 
 @dataclass
-class DeepSeekTextClient:
+class DeepSeekTextClient(_PooledLLMClient):
     """
     LLM client for DeepSeek text-only models.
 
@@ -186,12 +587,6 @@ class DeepSeekTextClient:
     Designed for models without vision capabilities.
     """
 
-    base_url: str
-    api_key: str
-    model: str
-    timeout_s: float
-    max_chars: int
-
     async def extract(
         self,
         *,
@@ -207,71 +602,25 @@ class DeepSeekTextClient:
         truncated_candidates = _truncate_text(image_candidates, min(self.max_chars // 4, 10000))
         truncated_html = _truncate_text(html_content, self.max_chars)
 
-        system = (
-            "You are a product data extraction assistant. "
-            "Extract product information from the provided HTML content and return ONLY a single JSON object.\n\n"
-            "Use the exact schema and keys:\n"
-            "{\n"
-            '  "title": "string|null",\n'
-            '  "description": "string|null",\n'
-            '  "price_amount": "number|null",\n'
-            '  "price_currency": "string|null",\n'
-            '  "canonical_url": "string|null",\n'
-            '  "confidence": "number",\n'
-            '  "image_url": "string|null"\n'
-            "}\n\n"
-            "Rules:\n"
-            "- Output valid JSON with double quotes only, no markdown formatting.\n"
-            "- If a field is missing or unclear, use null.\n"
-            "- confidence is 0.0 to 1.0 based on how certain you are about the extraction.\n"
-            "- For title, use the main product name, not marketing slogans.\n"
-            "- For description, extract a concise product description (1-3 sentences).\n"
-            "- For image_url, select the best main product image URL from the image candidates list.\n"
-            "- Prefer high-resolution product images, not thumbnails or icons.\n"
-            "- canonical_url should be the clean product page URL without tracking parameters.\n\n"
-            "IMPORTANT - Price extraction:\n"
-            "- ALWAYS look carefully for the product price. It is usually prominently displayed.\n"
-            "- Prices may have spaces as thousand separators: '93 499' means 93499.\n"
-            "- Prices may have dots or commas: '1.299,00' or '1,299.00' - extract as number.\n"
-            "- Look for the CURRENT/SALE price, not the crossed-out old price.\n"
-            "- Russian sites use ₽ or 'руб' for rubles (RUB).\n"
-            "- For price_amount, return ONLY the numeric value (e.g., 93499 not '93 499 ₽').\n"
-            "- For price_currency, use ISO code: RUB, USD, EUR, etc.\n"
-            "- Check 'Structured metadata' section first - it may contain the price.\n"
-        )
-
         user = (
-            f"Extract product information from this page:\n\n"
-            f"URL: {url}\n"
-            f"Page title: {title}\n\n"
-            f"Image candidates (select the main product image from these):\n"
+            TEXT_USER_PREFIX + "Image candidates (select the main product image from these):\n"
             f"{truncated_candidates}\n\n"
             f"Page content:\n"
-            f"{truncated_html}\n"
+            f"{truncated_html}\n\n"
+            f"URL: {url}\n"
+            f"Page title: {title}\n"
         )
 
         payload = {
             "model": self.model,
             "temperature": 0,
             "messages": [
-                {"role": "system", "content": system},
+                {"role": "system", "content": TEXT_SYSTEM_PROMPT},
                 {"role": "user", "content": user},
             ],
         }
 
-        headers = {"Authorization": f"Bearer {self.api_key}"}
-        timeout = httpx.Timeout(self.timeout_s, connect=self.timeout_s)
-
-        async with httpx.AsyncClient(base_url=self.base_url, timeout=timeout) as client:
-            resp = await client.post("/v1/chat/completions", json=payload, headers=headers)
-            resp.raise_for_status()
-            body = resp.json()
-
-        try:
-            content = body["choices"][0]["message"]["content"]
-        except Exception as exc:
-            raise ValueError("LLM response missing content") from exc
-
+        content = await self._complete(payload)
         parsed = _extract_json(content)
         out = LLMOutput.model_validate(parsed)
         return out
@@ -290,9 +639,71 @@ def load_llm_client_from_env() -> LLMClient:
 
     timeout_s = float(os.environ.get("LLM_TIMEOUT_S") or 60)
     max_chars = int(os.environ.get("LLM_MAX_CHARS") or 100_000)
+    pool = {
+        "http2": (os.environ.get("LLM_HTTP2") or "true").strip().lower() not in ("0", "false", "no"),
+        "max_connections": int(os.environ.get("LLM_MAX_CONNECTIONS") or 20),
+        "keepalive_s": float(os.environ.get("LLM_KEEPALIVE_S") or 60),
+        "stream": (os.environ.get("LLM_STREAM") or "true").strip().lower() not in ("0", "false", "no"),
+        "max_output_tokens": int(os.environ.get("LLM_MAX_OUTPUT_TOKENS") or 1024),
+    }
 
-    # Determine client type based on LLM_CLIENT_TYPE or model name
     client_type = (os.environ.get("LLM_CLIENT_TYPE") or "").strip().lower()
+    pricing = _pricing_from_env("LLM_", LLMPricing())
+    primary = _build_live_client(
+        base_url, api_key, model, client_type, timeout_s, max_chars, {**pool, "pricing": pricing}
+    )
+
+    # Optional fallback chain: LLM_FALLBACK_1_MODEL, LLM_FALLBACK_2_MODEL, ...
+    # Unset BASE_URL/API_KEY/CLIENT_TYPE/PRICE_* of a fallback default to the primary's.
+    providers: list[tuple[str, LLMClient]] = [(f"primary:{model}", primary)]
+    for i in range(1, 10):
+        prefix = f"LLM_FALLBACK_{i}_"
+        fallback_model = (os.environ.get(prefix + "MODEL") or "").strip()
+        if not fallback_model:
+            break
+        fallback = _build_live_client(
+            (os.environ.get(prefix + "BASE_URL") or "").strip() or base_url,
+            (os.environ.get(prefix + "API_KEY") or "").strip() or api_key,
+            fallback_model,
+            (os.environ.get(prefix + "CLIENT_TYPE") or "").strip().lower() or client_type,
+            timeout_s,
+            max_chars,
+            {**pool, "pricing": _pricing_from_env(prefix, pricing)},
+        )
+        providers.append((f"fallback_{i}:{fallback_model}", fallback))
+    if len(providers) == 1:
+        return primary
+
+    return FallbackLLMClient(
+        providers,
+        hedge_quantile=float(os.environ.get("LLM_HEDGE_QUANTILE") or 0.95),
+        hedge_after_s=float(os.environ.get("LLM_HEDGE_AFTER_S") or 15),
+        failure_threshold=int(os.environ.get("LLM_CIRCUIT_FAILURES") or 3),
+        cooldown_s=float(os.environ.get("LLM_CIRCUIT_COOLDOWN_S") or 30),
+    )
+
+
+def _pricing_from_env(prefix: str, default: LLMPricing) -> LLMPricing:
+    def price(name: str, fallback: float) -> float:
+        return float(os.environ.get(f"{prefix}PRICE_{name}_PER_MTOK") or fallback)
+
+    return LLMPricing(
+        input_per_mtok=price("INPUT", default.input_per_mtok),
+        cached_input_per_mtok=price("CACHED_INPUT", default.cached_input_per_mtok),
+        output_per_mtok=price("OUTPUT", default.output_per_mtok),
+    )
+
+
+def _build_live_client(
+    base_url: str,
+    api_key: str,
+    model: str,
+    client_type: str,
+    timeout_s: float,
+    max_chars: int,
+    pool: dict[str, Any],
+) -> _PooledLLMClient:
+    # Determine client type based on LLM_CLIENT_TYPE or model name
 
     # Auto-detect DeepSeek models (text-only)
     if not client_type:
@@ -314,6 +725,7 @@ def load_llm_client_from_env() -> LLMClient:
             model=model,
             timeout_s=timeout_s,
             max_chars=max_chars,
+            **pool,
         )
     else:
         return OpenAILikeClient(
@@ -322,4 +734,5 @@ def load_llm_client_from_env() -> LLMClient:
             model=model,
             timeout_s=timeout_s,
             max_chars=max_chars,
+            **pool,
         )
@@ -0,0 +1,279 @@
+"""
+Ordered LLM provider chain with hedged requests and per-provider circuit breakers.
+
+A single provider makes every resolution wait out its slow tail (up to
+`LLM_TIMEOUT_S`). `FallbackLLMClient` wraps several clients in priority
+order:
+
+- The first healthy provider gets the request. If it has not answered
+  after its own recent latency percentile (`hedge_quantile`, the
+  `hedge_after_s` default until enough samples exist), the same request
+  is also sent to the next provider. The first successful answer wins
+  and the other in-flight calls are cancelled.
+- A provider that fails moves the request on to the next one at once.
+- Each provider keeps an EWMA of its latency and a consecutive-failure
+  count. After `failure_threshold` failures in a row its circuit opens and
+  it is skipped for `cooldown_s`; then a single probe request is let
+  through (half-open) and its outcome closes or re-opens the circuit.
+  Concurrent extractions skip the provider while that probe is running.
+
+When every circuit is open the chain is tried in order anyway: failing
+fast with no provider at all is never better than trying one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Optional
+
+from .ewma import ewma
+
+if TYPE_CHECKING:
+    from .llm import LLMClient, LLMOutput
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass
+class ProviderHealth:
+    """Latency and circuit state of one provider."""
+
+    name: str
+    window: int = 100
+    samples: int = 0
+    latency_ewma_ms: float = 0.0
+    requests: int = 0
+    failures: int = 0
+    wins: int = 0
+    hedged: int = 0
+    cancelled: int = 0
+    consecutive_failures: int = 0
+    state: str = CLOSED
+    opened_at: float = 0.0
+    probe_in_flight: bool = False
+    _recent_ms: deque[float] = field(default_factory=deque, repr=False)
+
+    def latency_quantile(self, q: float) -> Optional[float]:
+        if not self._recent_ms:
+            return None
+        ordered = sorted(self._recent_ms)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def available(self, now: float, cooldown_s: float) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and now - self.opened_at >= cooldown_s:
+            self.state = HALF_OPEN
+        return self.state == HALF_OPEN and not self.probe_in_flight
+
+    def record_success(self, latency_ms: float) -> None:
+        self.latency_ewma_ms = ewma(self.latency_ewma_ms, latency_ms, self.samples)
+        self.samples += 1
+        self._recent_ms.append(latency_ms)
+        while len(self._recent_ms) > self.window:
+            self._recent_ms.popleft()
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            logger.info("LLM provider %s recovered; closing circuit", self.name)
+        self.state = CLOSED
+
+    def record_failure(self, now: float, failure_threshold: int) -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= failure_threshold:
+            if self.state != OPEN:
+                logger.warning(
+                    "LLM provider %s failed %d times in a row; opening circuit", self.name, self.consecutive_failures
+                )
+            self.state = OPEN
+            self.opened_at = now
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "requests": self.requests,
+            "failures": self.failures,
+            "wins": self.wins,
+            "hedged": self.hedged,
+            "cancelled": self.cancelled,
+            "latency_ewma_ms": round(self.latency_ewma_ms, 1),
+        }
+
+
+class FallbackLLMClient:
+    """`LLMClient` that spreads one extraction over an ordered list of providers."""
+
+    def __init__(
+        self,
+        providers: list[tuple[str, LLMClient]],
+        *,
+        hedge_quantile: float = 0.95,
+        hedge_after_s: float = 15.0,
+        min_hedge_s: float = 1.0,
+        min_samples: int = 20,
+        failure_threshold: int = 3,
+        cooldown_s: float = 30.0,
+    ) -> None:
+        if not providers:
+            raise ValueError("at least one LLM provider is required")
+        self.providers = providers
+        self.health = {name: ProviderHealth(name) for name, _ in providers}
+        self.hedge_quantile = hedge_quantile
+        self.hedge_after_s = hedge_after_s
+        self.min_hedge_s = min_hedge_s
+        self.min_samples = min_samples
+        self.failure_threshold = failure_threshold
+        self.cooldown_s = cooldown_s
+        self.calls = 0
+        self.exhausted = 0
+
+    def hedge_delay_s(self, name: str) -> float:
+        """How long to wait for `name` before also asking the next provider."""
+        health = self.health[name]
+        quantile_ms = health.latency_quantile(self.hedge_quantile)
+        if health.samples < self.min_samples or quantile_ms is None:
+            return self.hedge_after_s
+        return max(self.min_hedge_s, quantile_ms / 1000)
+
+    def _candidates(self) -> tuple[list[tuple[str, LLMClient]], bool]:
+        """Providers to try in order, and whether they are forced because every circuit is open."""
+        now = time.monotonic()
+        ready = [
+            (name, client) for name, client in self.providers if self.health[name].available(now, self.cooldown_s)
+        ]
+        if ready:
+            return ready, False
+        return list(self.providers), True
+
+    def _admit(self, name: str, *, forced: bool) -> Optional[bool]:
+        """Claim `name` for a request right before it is sent.
+
+        Returns False for a normal call, True when the call is the half-open
+        probe, and None when the provider must be skipped (its circuit opened
+        meanwhile, or another call's probe is still in flight).
+        """
+        health = self.health[name]
+        # No await between the check and the claim, so no other call can slip in.
+        if forced or health.state == CLOSED:
+            return False
+        if not health.available(time.monotonic(), self.cooldown_s):
+            return None
+        health.probe_in_flight = True
+        return True
+
+    async def _call(self, name: str, client: LLMClient, kwargs: dict[str, Any], *, probe: bool = False) -> LLMOutput:
+        health = self.health[name]
+        health.requests += 1
+        started = time.monotonic()
+        try:
+            out = await client.extract(**kwargs)
+        except asyncio.CancelledError:
+            # Lost the race; says nothing about the provider's health.
+            health.cancelled += 1
+            raise
+        except Exception:
+            health.record_failure(time.monotonic(), self.failure_threshold)
+            raise
+        finally:
+            if probe:
+                health.probe_in_flight = False
+        health.record_success((time.monotonic() - started) * 1000)
+        return out
+
+    async def extract(
+        self,
+        *,
+        url: str,
+        title: str,
+        image_candidates: str,
+        image_base64: str = "",
+        image_mime: str = "",
+        html_content: str = "",
+    ) -> LLMOutput:
+        kwargs = {
+            "url": url,
+            "title": title,
+            "image_candidates": image_candidates,
+            "image_base64": image_base64,
+            "image_mime": image_mime,
+            "html_content": html_content,
+        }
+        self.calls += 1
+        waiting, forced = self._candidates()
+        running: dict[asyncio.Task[LLMOutput], str] = {}
+        last_error: Optional[BaseException] = None
+
+        def start_next(*, hedge: bool) -> float:
+            """Start the next provider that admits the request; returns when to hedge past it."""
+            while waiting:
+                name, client = waiting.pop(0)
+                probe = self._admit(name, forced=forced)
+                if probe is None:
+                    continue
+                if hedge:
+                    self.health[name].hedged += 1
+                    logger.info("Hedging LLM request for %s to provider %s", url, name)
+                running[asyncio.ensure_future(self._call(name, client, kwargs, probe=probe))] = name
+                return time.monotonic() + self.hedge_delay_s(name)
+            return time.monotonic()
+
+        deadline = start_next(hedge=False)
+        if not running:
+            # Every admitted provider was claimed by concurrent calls meanwhile.
+            waiting, forced = list(self.providers), True
+            deadline = start_next(hedge=False)
+        try:
+            while running:
+                timeout = max(0.0, deadline - time.monotonic()) if waiting else None
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # The newest request is slower than its usual tail: ask the next provider too.
+                    deadline = start_next(hedge=True)
+                    continue
+                for task in done:
+                    name = running.pop(task)
+                    if task.exception() is None:
+                        self.health[name].wins += 1
+                        return task.result()
+                    last_error = task.exception()
+                    logger.warning("LLM provider %s failed for %s: %s", name, url, last_error)
+                if waiting:
+                    deadline = start_next(hedge=False)
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        self.exhausted += 1
+        assert last_error is not None
+        raise last_error
+
+    async def aclose(self) -> None:
+        for name, client in self.providers:
+            aclose = getattr(client, "aclose", None)
+            if aclose is None:
+                continue
+            try:
+                await aclose()
+            except Exception as e:
+                logger.warning("Failed to close LLM provider %s: %s", name, e)
+
+    def metrics(self) -> dict[str, Any]:
+        providers: dict[str, Any] = {}
+        for name, client in self.providers:
+            entry = self.health[name].to_dict()
+            entry["hedge_after_ms"] = round(self.hedge_delay_s(name) * 1000)
+            client_metrics = getattr(client, "metrics", None)
+            if client_metrics is not None:
+                entry["http"] = client_metrics()
+            providers[name] = entry
+        return {"calls": self.calls, "exhausted": self.exhausted, "providers": providers}
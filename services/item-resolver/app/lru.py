@@ -0,0 +1,47 @@
+"""Bounded least-recently-used mapping for per-domain state.
+
+Metrics and rule caches keyed by registrable domain would otherwise grow
+with every site the resolver ever sees. `LRUDict` keeps the most recently
+used keys last and drops the least recently used one when it is full.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Callable, Optional, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class LRUDict(OrderedDict[K, V]):
+    """OrderedDict holding at most `maxsize` keys; assigning a key marks it as most recently used."""
+
+    def __init__(self, maxsize: int) -> None:
+        super().__init__()
+        self.maxsize = max(1, int(maxsize))
+
+    def __setitem__(self, key: K, value: V) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+    def touch(self, key: K) -> Optional[V]:
+        """The value for `key` (None when missing), marked as most recently used."""
+        if key not in self:
+            return None
+        self.move_to_end(key)
+        return super().__getitem__(key)
+
+    def setdefault_recent(self, key: K, factory: Callable[[], V]) -> V:
+        """Like `touch`, but stores `factory()` for a missing key."""
+        value = self.touch(key)
+        if value is None:
+            value = factory()
+            self[key] = value
+        return value
+
+    def increment(self, key: K, amount: int = 1) -> None:
+        """Add `amount` to an integer counter, starting missing keys at zero."""
+        self[key] = (self.touch(key) or 0) + amount  # type: ignore[assignment,operator]
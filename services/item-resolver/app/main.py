@@ -13,18 +13,25 @@ from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from pydantic import BaseModel, Field
 
 from .auth import require_bearer_token
-from .browser_manager import load_manager_from_env, open_browser
-from .changes_watcher import start_watcher, stop_watcher
+from .browser_manager import load_manager_from_env, open_browser_pool
+from .changes_watcher import get_watcher, start_watcher, stop_watcher
 from .errors import blocked_or_unavailable, llm_parse_failed, timeout, unknown_error
 from .fetcher import PlaywrightFetcher, StubFetcher, fetcher_mode_from_env
 from .html_optimizer import format_html_for_llm
-from .html_parser import extract_images_from_html, format_images_for_llm
-from .image_utils import crop_screenshot_to_content, image_data_url
+from .html_parser import format_images_for_llm
+from .html_preprocessor import preprocess_html
+from .html_pruner import load_html_pruner_from_env
+from .image_fetch import load_image_fetcher_from_env
+from .image_pipeline import load_image_pipeline_from_env
+from .image_utils import crop_screenshot, image_data_url
 from .llm import load_llm_client_from_env
 from .logging_config import configure_logging
 from .middleware import setup_middleware
+from .resolution_cache import is_cacheable, load_resolution_cache_from_env, normalize_url
 from .scrape import PageCaptureConfig, capture_page_source, looks_like_interstitial_or_challenge, storage_state_path
+from .single_flight import SingleFlight
 from .ssrf import validate_public_http_url
+from .structured_data import load_structured_extractor_from_env
 from .timing import TimingStats, measure_time
 
 
@@ -58,6 +65,16 @@ def _storage_dir() -> Path:
     return Path(os.environ.get("STORAGE_STATE_DIR") or "storage_state")
 
 
+async def _close_llm_client(app: FastAPI) -> None:
+    # Live clients keep a pooled HTTP connection to the provider open.
+    aclose = getattr(getattr(app.state, "llm_client", None), "aclose", None)
+    if aclose is not None:
+        try:
+            await aclose()
+        except Exception as e:
+            logger.warning(f"Failed to close LLM client: {e}")
+
+
 def create_app(*, fetcher_mode: str | None = None) -> FastAPI:
     configure_logging()
     mode = (fetcher_mode or fetcher_mode_from_env()).strip().lower()
@@ -65,16 +82,28 @@ def create_app(*, fetcher_mode: str | None = None) -> FastAPI:
     manager = load_manager_from_env()
     cfg = PageCaptureConfig()
     storage_dir = _storage_dir()
+    resolution_cache = load_resolution_cache_from_env()
+    flights = SingleFlight()
+    structured = load_structured_extractor_from_env()
+    pruner = load_html_pruner_from_env()
+    image_pipeline = load_image_pipeline_from_env()
+    image_fetcher = load_image_fetcher_from_env(image_pipeline)
 
     @asynccontextmanager
     async def lifespan(app: FastAPI):
         if mode == "stub":
             app.state.fetcher = StubFetcher()
-            yield
+            try:
+                yield
+            finally:
+                await _close_llm_client(app)
             return
 
-        async with open_browser(headless=manager.headless, channel=manager.channel) as (_pw, browser):
-            app.state.fetcher = PlaywrightFetcher(manager=manager, browser=browser, storage_state_dir=storage_dir, cfg=cfg)
+        async with open_browser_pool(headless=manager.headless, channel=manager.channel) as (_pw, browser):
+            app.state.browser_pool = browser
+            app.state.fetcher = PlaywrightFetcher(
+                manager=manager, browser=browser, storage_state_dir=storage_dir, cfg=cfg, image_fetcher=image_fetcher
+            )
 
             # Start CouchDB changes watcher if enabled
             watcher_enabled = os.environ.get("COUCHDB_WATCHER_ENABLED", "true").lower() == "true"
@@ -92,6 +121,12 @@ def create_app(*, fetcher_mode: str | None = None) -> FastAPI:
                         manager=manager,
                         browser=browser,
                         storage_state_dir=str(storage_dir),
+                        cache=resolution_cache,
+                        flights=flights,
+                        structured=structured,
+                        pruner=pruner,
+                        image_fetcher=image_fetcher,
+                        image_pipeline=image_pipeline,
                     )
                     logger.info("CouchDB changes watcher started")
                 except Exception as e:
@@ -104,9 +139,18 @@ def create_app(*, fetcher_mode: str | None = None) -> FastAPI:
                 if watcher_enabled:
                     await stop_watcher()
                     logger.info("CouchDB changes watcher stopped")
+                await manager.close_contexts()
+                if manager.capture_profiles is not None:
+                    await manager.capture_profiles.save_async()
+                await _close_llm_client(app)
 
     app = FastAPI(title="item-resolver", version="0.1.0", lifespan=lifespan)
     setup_middleware(app)
+    app.state.resolution_cache = resolution_cache
+    app.state.single_flight = flights
+    app.state.structured_extractor = structured
+    app.state.html_pruner = pruner
+    app.state.image_pipeline = image_pipeline
     if mode == "stub":
         app.state.fetcher = StubFetcher()
 
@@ -114,6 +158,26 @@ def create_app(*, fetcher_mode: str | None = None) -> FastAPI:
     async def healthz() -> dict:
         return {"status": "ok"}
 
+    @app.get("/v1/metrics", dependencies=[Depends(require_bearer_token)])
+    async def metrics() -> dict:
+        watcher = get_watcher()
+        browser_pool = getattr(app.state, "browser_pool", None)
+        llm_metrics = getattr(getattr(app.state, "llm_client", None), "metrics", None)
+        return {
+            "watcher": watcher.metrics() if watcher is not None else None,
+            "resolution_cache": resolution_cache.metrics() if resolution_cache is not None else None,
+            "single_flight": flights.metrics(),
+            "structured_fast_path": structured.metrics() if structured is not None else None,
+            "llm_http": llm_metrics() if llm_metrics is not None else None,
+            "html_pruning": pruner.metrics() if pruner is not None else None,
+            "image_fetch": image_fetcher.metrics() if image_fetcher is not None else None,
+            "image_pipeline": image_pipeline.metrics(),
+            "context_pool": manager.context_pool.metrics() if manager.context_pool is not None else None,
+            "browser_pool": browser_pool.metrics() if browser_pool is not None else None,
+            "resource_blocking": manager.resource_blocker.metrics() if manager.resource_blocker is not None else None,
+            "capture_profiles": manager.capture_profiles.metrics() if manager.capture_profiles is not None else None,
+        }
+
     @app.post("/v1/page_source", response_model=PageSourceOut, dependencies=[Depends(require_bearer_token)])
     async def page_source(payload: UrlIn) -> PageSourceOut:
         validate_public_http_url(payload.url)
@@ -168,61 +232,217 @@ def create_app(*, fetcher_mode: str | None = None) -> FastAPI:
                 raise unknown_error(str(exc)) from exc
             app.state.llm_client = llm_client
 
-        if isinstance(fetcher, PlaywrightFetcher):
-            state_path = storage_state_path(fetcher.storage_state_dir, payload.url)
-            async with fetcher.manager.semaphore:
-                async with measure_time(stats, "browser_context_create"):
-                    context = await fetcher.manager.make_context(
-                        fetcher.browser,
-                        url=payload.url,
-                        storage_state_path=state_path,
-                    )
-                try:
-                    page = await context.new_page()
-                    try:
-                        async with measure_time(stats, "page_navigation"):
-                            final_url, page_title, html = await capture_page_source(page, payload.url, cfg=fetcher.cfg)
-                    except PlaywrightTimeoutError as exc:
-                        raise timeout(f"Page load timed out: {payload.url}") from exc
-                    except asyncio.TimeoutError as exc:
-                        raise timeout(f"Page load timed out: {payload.url}") from exc
-
-                    # Check for challenge pages but be lenient if there's actual content
-                    if looks_like_interstitial_or_challenge(page_title, html):
-                        # Check if there's actually substantial content despite challenge indicators
-                        # Some sites leave challenge traces in the HTML even after loading real content
-                        body_text_len = len(html) if html else 0
-                        has_product_indicators = any(ind in html.lower() for ind in [
-                            'price', 'цена', 'корзин', 'cart', 'buy', 'купить', 'добавить',
-                            'product', 'товар', '₽', 'руб', 'rub'
-                        ]) if html else False
-
-                        if body_text_len < 5000 and not has_product_indicators:
-                            logger.warning("Page appears blocked or shows challenge: %s (html_len=%d)", payload.url, body_text_len)
-                            raise blocked_or_unavailable(f"Page blocked or requires verification: {payload.url}")
-                        else:
-                            logger.info("Challenge indicators found but page has content, proceeding: %s (html_len=%d)", payload.url, body_text_len)
-
-                    async with measure_time(stats, "page_screenshot"):
-                        page_shot = await page.screenshot(full_page=False, type="jpeg", quality=75)
-                        page_b64 = base64.b64encode(page_shot).decode("ascii")
-                        page_mime = "image/jpeg"
-
+        cache = getattr(app.state, "resolution_cache", None)
+        if cache is not None:
+            async with measure_time(stats, "cache_lookup"):
+                cached = await cache.get(payload.url)
+            if cached is not None:
+                if cached.get("image_url"):
+                    # The cache keeps only the image URL
                     try:
-                        await context.storage_state(path=str(state_path))
+                        async with measure_time(stats, "image_fetch"):
+                            _img_final, content_type, b64 = await fetcher.fetch_image_base64(
+                                url=cached["image_url"],
+                                session_url=payload.url,
+                            )
+                        cached["image_base64"] = image_data_url(b64, content_type)
                     except Exception:
-                        pass
+                        logger.warning("Failed to fetch image: %s", cached["image_url"], exc_info=True)
+                stats.log_summary(payload.url)
+                return ResolveOut(**cached)
+
+        async def _resolve_uncached() -> ResolveOut:
+            if isinstance(fetcher, PlaywrightFetcher):
+                state_path = storage_state_path(fetcher.storage_state_dir, payload.url)
+                async with fetcher.manager.semaphore:
+                    async with measure_time(stats, "browser_context_create"):
+                        context = await fetcher.manager.acquire_context(
+                            fetcher.browser,
+                            url=payload.url,
+                            storage_state_path=state_path,
+                        )
+                    try:
+                        page = await context.new_page()
+                        capture_phases: dict[str, float] = {}
+                        try:
+                            async with measure_time(stats, "page_navigation"):
+                                final_url, page_title, html = await capture_page_source(
+                                    page,
+                                    payload.url,
+                                    cfg=fetcher.cfg,
+                                    timings=capture_phases,
+                                    profiles=fetcher.manager.capture_profiles,
+                                )
+                        except PlaywrightTimeoutError as exc:
+                            raise timeout(f"Page load timed out: {payload.url}") from exc
+                        except asyncio.TimeoutError as exc:
+                            raise timeout(f"Page load timed out: {payload.url}") from exc
+                        for phase, seconds in capture_phases.items():
+                            stats.record(f"page_navigation.{phase}", seconds)
+
+                        # Check for challenge pages but be lenient if there's actual content
+                        if looks_like_interstitial_or_challenge(page_title, html):
+                            # Check if there's actually substantial content despite challenge indicators
+                            # Some sites leave challenge traces in the HTML even after loading real content
+                            body_text_len = len(html) if html else 0
+                            has_product_indicators = any(ind in html.lower() for ind in [
+                                'price', 'цена', 'корзин', 'cart', 'buy', 'купить', 'добавить',
+                                'product', 'товар', '₽', 'руб', 'rub'
+                            ]) if html else False
+
+                            if body_text_len < 5000 and not has_product_indicators:
+                                logger.warning("Page appears blocked or shows challenge: %s (html_len=%d)", payload.url, body_text_len)
+                                raise blocked_or_unavailable(f"Page blocked or requires verification: {payload.url}")
+                            else:
+                                logger.info("Challenge indicators found but page has content, proceeding: %s (html_len=%d)", payload.url, body_text_len)
+
+                        try:
+                            await context.storage_state(path=str(state_path))
+                        except Exception:
+                            pass
+
+                        # One scan serves the structured data fast path and the LLM prompt
+                        async with measure_time(stats, "html_preprocessing"):
+                            preprocessed = await asyncio.to_thread(
+                                preprocess_html,
+                                html,
+                                base_url=final_url or payload.url,
+                                max_chars=pruner.source_chars if pruner else int(os.environ.get("LLM_MAX_CHARS") or 100000),
+                            )
 
-                    async with measure_time(stats, "image_extraction"):
-                        images = extract_images_from_html(html, base_url=final_url or payload.url)
-                        image_candidates = format_images_for_llm(images, max_images=20)
+                        llm_out = None
+                        if structured is not None:
+                            async with measure_time(stats, "structured_extraction"):
+                                llm_out = structured.extract(
+                                    html, url=final_url or payload.url, preprocessed=preprocessed
+                                )
+
+                        if llm_out is None:
+                            async with measure_time(stats, "page_screenshot"):
+                                page_shot = await page.screenshot(full_page=False, type="jpeg", quality=75)
+                                page_b64 = base64.b64encode(page_shot).decode("ascii")
+                                page_mime = "image/jpeg"
+
+                            async with measure_time(stats, "html_formatting"):
+                                image_candidates = format_images_for_llm(preprocessed.images, max_images=20)
+                                html_content = await asyncio.to_thread(
+                                    format_html_for_llm,
+                                    html=html,
+                                    url=final_url or payload.url,
+                                    title=page_title,
+                                    preprocessed=preprocessed,
+                                    pruner=pruner,
+                                )
 
-                    async with measure_time(stats, "html_optimization"):
-                        html_content = format_html_for_llm(
+                            try:
+                                async with measure_time(stats, "llm_extraction"):
+                                    llm_out = await llm_client.extract(
+                                        url=final_url or payload.url,
+                                        title=page_title,
+                                        image_candidates=image_candidates,
+                                        image_base64=page_b64,
+                                        image_mime=page_mime,
+                                        html_content=html_content,
+                                    )
+                            except ValueError as exc:
+                                raise llm_parse_failed(str(exc)) from exc
+                            except Exception as exc:
+                                logger.exception("LLM extraction failed for %s", payload.url)
+                                raise unknown_error("LLM extraction failed") from exc
+
+                        image_b64: str | None = None
+                        image_mime: str | None = None
+                        image_url = llm_out.image_url
+                        resolved_image_url: str | None = None
+                        if image_url:
+                            resolved = urljoin(final_url or payload.url, image_url)
+                            validate_public_http_url(resolved)
+                            resolved_image_url = resolved
+                            fetched = None
+                            if fetcher.image_fetcher is not None:
+                                async with measure_time(stats, "image_fetch"):
+                                    fetched = await fetcher.image_fetcher.fetch(
+                                        context, resolved, referer=final_url or payload.url
+                                    )
+                            if fetched is not None:
+                                image_b64 = base64.b64encode(fetched.data).decode("ascii")
+                                image_mime = fetched.mime
+                            else:
+                                image_page = await context.new_page()
+                                try:
+                                    try:
+                                        async with measure_time(stats, "image_navigation"):
+                                            await image_page.goto(
+                                                resolved,
+                                                wait_until="load",
+                                                timeout=fetcher.cfg.timeout_ms,
+                                            )
+                                            await image_page.wait_for_load_state(
+                                                "networkidle",
+                                                timeout=fetcher.cfg.timeout_ms,
+                                            )
+                                    except PlaywrightTimeoutError:
+                                        logger.warning("Image load timed out: %s", resolved)
+                                    else:
+                                        async with measure_time(stats, "image_screenshot"):
+                                            image_shot = await image_page.screenshot(full_page=True, type="png")
+
+                                        # Same encoding and size limits as directly fetched images
+                                        pipeline = app.state.image_pipeline
+                                        async with measure_time(stats, "image_crop"):
+                                            processed = await asyncio.to_thread(
+                                                lambda: pipeline.process_image(crop_screenshot(image_shot))
+                                            )
+                                            image_b64 = base64.b64encode(processed.full.data).decode("ascii")
+                                            image_mime = processed.full.mime
+
+                                        try:
+                                            await context.storage_state(path=str(state_path))
+                                        except Exception:
+                                            pass
+                                finally:
+                                    try:
+                                        await image_page.close()
+                                    except Exception:
+                                        pass
+                    finally:
+                        await fetcher.manager.release_context(context)
+            else:
+                try:
+                    async with measure_time(stats, "page_snapshot"):
+                        final_url, page_title, html, image_mime, screenshot_b64, _saved = await fetcher.fetch_page_snapshot(
+                            url=payload.url
+                        )
+                except PlaywrightTimeoutError as exc:
+                    raise timeout(f"Page load timed out: {payload.url}") from exc
+                except asyncio.TimeoutError as exc:
+                    raise timeout(f"Page load timed out: {payload.url}") from exc
+
+                async with measure_time(stats, "html_preprocessing"):
+                    preprocessed = await asyncio.to_thread(
+                        preprocess_html,
+                        html,
+                        base_url=final_url or payload.url,
+                        max_chars=pruner.source_chars if pruner else int(os.environ.get("LLM_MAX_CHARS") or 50000),
+                    )
+
+                llm_out = None
+                if structured is not None:
+                    async with measure_time(stats, "structured_extraction"):
+                        llm_out = structured.extract(
+                            html, url=final_url or payload.url, preprocessed=preprocessed
+                        )
+
+                if llm_out is None:
+                    async with measure_time(stats, "html_formatting"):
+                        image_candidates = format_images_for_llm(preprocessed.images, max_images=20)
+                        html_content = await asyncio.to_thread(
+                            format_html_for_llm,
                             html=html,
                             url=final_url or payload.url,
                             title=page_title,
-                            max_chars=int(os.environ.get("LLM_MAX_CHARS") or 100000),
+                            preprocessed=preprocessed,
+                            pruner=pruner,
                         )
 
                     try:
@@ -231,8 +451,8 @@ def create_app(*, fetcher_mode: str | None = None) -> FastAPI:
                                 url=final_url or payload.url,
                                 title=page_title,
                                 image_candidates=image_candidates,
-                                image_base64=page_b64,
-                                image_mime=page_mime,
+                                image_base64=screenshot_b64,
+                                image_mime=image_mime,
                                 html_content=html_content,
                             )
                     except ValueError as exc:
@@ -241,126 +461,50 @@ def create_app(*, fetcher_mode: str | None = None) -> FastAPI:
                         logger.exception("LLM extraction failed for %s", payload.url)
                         raise unknown_error("LLM extraction failed") from exc
 
-                    image_b64: str | None = None
-                    image_mime: str | None = None
-                    image_url = llm_out.image_url
-                    resolved_image_url: str | None = None
-                    if image_url:
-                        resolved = urljoin(final_url or payload.url, image_url)
-                        validate_public_http_url(resolved)
-                        resolved_image_url = resolved
-                        image_page = await context.new_page()
-                        try:
-                            try:
-                                async with measure_time(stats, "image_navigation"):
-                                    await image_page.goto(
-                                        resolved,
-                                        wait_until="load",
-                                        timeout=fetcher.cfg.timeout_ms,
-                                    )
-                                    await image_page.wait_for_load_state(
-                                        "networkidle",
-                                        timeout=fetcher.cfg.timeout_ms,
-                                    )
-                            except PlaywrightTimeoutError:
-                                logger.warning("Image load timed out: %s", resolved)
-                            else:
-                                async with measure_time(stats, "image_screenshot"):
-                                    image_shot = await image_page.screenshot(full_page=True, type="png")
-
-                                async with measure_time(stats, "image_crop"):
-                                    cropped = crop_screenshot_to_content(image_shot)
-                                    image_b64 = base64.b64encode(cropped).decode("ascii")
-                                    image_mime = "image/jpeg"
-
-                                try:
-                                    await context.storage_state(path=str(state_path))
-                                except Exception:
-                                    pass
-                        finally:
-                            try:
-                                await image_page.close()
-                            except Exception:
-                                pass
-                finally:
+                image_b64 = None
+                image_mime = None
+                image_url = llm_out.image_url
+                resolved_image_url = None
+                if image_url:
+                    resolved = urljoin(final_url or payload.url, image_url)
+                    validate_public_http_url(resolved)
+                    resolved_image_url = resolved
                     try:
-                        await context.close()
+                        async with measure_time(stats, "image_fetch"):
+                            _img_final, content_type, b64 = await fetcher.fetch_image_base64(
+                                url=resolved,
+                                session_url=final_url or payload.url,
+                            )
+                            image_mime = content_type or None
+                            image_b64 = b64 or None
                     except Exception:
-                        pass
-        else:
-            try:
-                async with measure_time(stats, "page_snapshot"):
-                    final_url, page_title, html, image_mime, screenshot_b64, _saved = await fetcher.fetch_page_snapshot(
-                        url=payload.url
-                    )
-            except PlaywrightTimeoutError as exc:
-                raise timeout(f"Page load timed out: {payload.url}") from exc
-            except asyncio.TimeoutError as exc:
-                raise timeout(f"Page load timed out: {payload.url}") from exc
-
-            async with measure_time(stats, "image_extraction"):
-                images = extract_images_from_html(html, base_url=final_url or payload.url)
-                image_candidates = format_images_for_llm(images, max_images=20)
-
-            async with measure_time(stats, "html_optimization"):
-                html_content = format_html_for_llm(
-                    html=html,
-                    url=final_url or payload.url,
-                    title=page_title,
-                    max_chars=int(os.environ.get("LLM_MAX_CHARS") or 50000),
-                )
-
-            try:
-                async with measure_time(stats, "llm_extraction"):
-                    llm_out = await llm_client.extract(
-                        url=final_url or payload.url,
-                        title=page_title,
-                        image_candidates=image_candidates,
-                        image_base64=screenshot_b64,
-                        image_mime=image_mime,
-                        html_content=html_content,
-                    )
-            except ValueError as exc:
-                raise llm_parse_failed(str(exc)) from exc
-            except Exception as exc:
-                logger.exception("LLM extraction failed for %s", payload.url)
-                raise unknown_error("LLM extraction failed") from exc
-
-            image_b64 = None
-            image_mime = None
-            image_url = llm_out.image_url
-            resolved_image_url = None
-            if image_url:
-                resolved = urljoin(final_url or payload.url, image_url)
-                validate_public_http_url(resolved)
-                resolved_image_url = resolved
-                try:
-                    async with measure_time(stats, "image_fetch"):
-                        _img_final, content_type, b64 = await fetcher.fetch_image_base64(
-                            url=resolved,
-                            session_url=final_url or payload.url,
-                        )
-                        image_mime = content_type or None
-                        image_b64 = b64 or None
-                except Exception:
-                    logger.warning("Failed to fetch image: %s", resolved, exc_info=True)
-
-        stats.log_summary(payload.url)
-
-        async with measure_time(stats, "response_preparation"):
-            confidence = llm_out.confidence if llm_out.confidence is not None else 0.0
-            image_data = image_data_url(image_b64, image_mime)
-
-        return ResolveOut(
-            title=llm_out.title,
-            description=llm_out.description,
-            price_amount=llm_out.price_amount,
-            price_currency=llm_out.price_currency,
-            canonical_url=llm_out.canonical_url,
-            confidence=confidence,
-            image_url=resolved_image_url,
-            image_base64=image_data,
-        )
+                        logger.warning("Failed to fetch image: %s", resolved, exc_info=True)
+
+            stats.log_summary(payload.url)
+
+            async with measure_time(stats, "response_preparation"):
+                confidence = llm_out.confidence if llm_out.confidence is not None else 0.0
+                image_data = image_data_url(image_b64, image_mime)
+
+            out = ResolveOut(
+                title=llm_out.title,
+                description=llm_out.description,
+                price_amount=llm_out.price_amount,
+                price_currency=llm_out.price_currency,
+                canonical_url=llm_out.canonical_url,
+                confidence=confidence,
+                image_url=resolved_image_url,
+                image_base64=image_data,
+            )
+            if cache is not None and is_cacheable(out.model_dump()):
+                await cache.set(payload.url, out.model_dump())
+            return out
+
+        flights = getattr(app.state, "single_flight", None)
+        if flights is None:
+            return await _resolve_uncached()
+        # Concurrent requests for the same product share one browser + LLM run
+        return await flights.do(f"api:{normalize_url(payload.url)}", _resolve_uncached)
 
     return app
 
@@ -0,0 +1,313 @@
+"""Cache of resolved product metadata keyed by canonical URL.
+
+Two tiers:
+- an in-process LRU with per-entry TTL (always on when the cache is enabled)
+- an optional CouchDB-backed shared tier so that resolver instances reuse
+  each other's results
+
+TTLs can be tuned per registrable domain since marketplace prices change
+faster than the rest of the product data.
+
+Image payloads are not cached: an entry keeps `image_url` and callers
+download the image again on a hit. Expired shared-tier documents are
+deleted in batches, at most once per purge interval, when results are
+stored.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .couchdb import CouchDBClient, ConflictError, DocumentNotFoundError
+from .lru import LRUDict
+from .scrape import registrable_domain
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only carry attribution/tracking and never change the product.
+TRACKING_PARAMS = frozenset(
+    {
+        "fbclid",
+        "gclid",
+        "dclid",
+        "msclkid",
+        "yclid",
+        "ysclid",
+        "_openstat",
+        "ref",
+        "ref_",
+        "spm",
+        "scm",
+    }
+)
+TRACKING_PREFIXES = ("utm_", "_ga", "_gl", "mc_", "pk_")
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Result fields holding image data; cached as None.
+IMAGE_FIELDS = ("image_base64", "image_full")
+
+# Expired shared-tier documents deleted per _bulk_docs request
+PURGE_BATCH_SIZE = 200
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical cache key for a product URL.
+
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    query parameters, and sorts the remaining query parameters.
+    """
+    parts = urlsplit((url or "").strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower().rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+
+    netloc = host
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parts.port}"
+
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/")
+
+    query = [
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query.sort()
+
+    return urlunsplit((scheme, netloc, path, urlencode(query), ""))
+
+
+def _parse_domain_ttls(raw: str) -> dict[str, int]:
+    """Parse "ozon.ru=900,wildberries.ru=600" into a domain -> seconds map."""
+    ttls: dict[str, int] = {}
+    for entry in (raw or "").split(","):
+        domain, sep, value = entry.partition("=")
+        domain = domain.strip().lower()
+        if not sep or not domain:
+            continue
+        try:
+            ttls[domain] = int(value.strip())
+        except ValueError:
+            logger.warning("Ignoring invalid resolution cache TTL entry: %s", entry)
+    return ttls
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    shared_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    purged: int = 0
+    max_domains: int = 5_000
+    hits_by_domain: LRUDict[str, int] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.hits_by_domain = LRUDict(self.max_domains)
+
+    def to_dict(self) -> dict[str, Any]:
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "purged": self.purged,
+            "hit_ratio": round((self.hits + self.shared_hits) / lookups, 3) if lookups else 0.0,
+            "hits_by_domain": dict(self.hits_by_domain),
+        }
+
+
+class ResolutionCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1000,
+        default_ttl_s: int = 3600,
+        domain_ttls: dict[str, int] | None = None,
+        shared: CouchDBClient | None = None,
+        purge_interval_s: int = 600,
+        max_domains: int = 5_000,
+    ) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.default_ttl_s = int(default_ttl_s)
+        self.domain_ttls = dict(domain_ttls or {})
+        self.shared = shared
+        self.purge_interval_s = int(purge_interval_s)
+        self._next_purge = 0.0
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.stats = CacheStats(max_domains=max(1, int(max_domains)))
+
+    def ttl_for(self, url: str) -> int:
+        """TTL in seconds for a URL: exact host first, then registrable domain, then default."""
+        host = (urlsplit(url).hostname or "").lower()
+        if host in self.domain_ttls:
+            return self.domain_ttls[host]
+        return self.domain_ttls.get(registrable_domain(host), self.default_ttl_s)
+
+    @staticmethod
+    def shared_doc_id(key: str) -> str:
+        return "resolver_cache:" + hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    async def get(self, url: str) -> dict | None:
+        key = normalize_url(url)
+        domain = registrable_domain(urlsplit(key).hostname or "")
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                self.stats.hits_by_domain.increment(domain)
+                return dict(result)
+            del self._entries[key]
+
+        shared = await self._shared_get(key)
+        if shared is not None:
+            result, remaining_s = shared
+            self.stats.shared_hits += 1
+            self.stats.hits_by_domain.increment(domain)
+            self._remember(key, result, remaining_s)
+            return dict(result)
+
+        self.stats.misses += 1
+        return None
+
+    async def set(self, url: str, result: dict) -> None:
+        key = normalize_url(url)
+        ttl = self.ttl_for(key)
+        if ttl <= 0:
+            return
+        result = {**result, **{name: None for name in IMAGE_FIELDS if name in result}}
+        self._remember(key, result, ttl)
+        self.stats.stores += 1
+        await self._shared_set(key, result, ttl)
+        if self.shared is not None and time.monotonic() >= self._next_purge:
+            self._next_purge = time.monotonic() + self.purge_interval_s
+            await self.purge_expired()
+
+    def _remember(self, key: str, result: dict, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, dict(result))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _shared_get(self, key: str) -> tuple[dict, float] | None:
+        """Returns (result, remaining TTL seconds) from the shared tier."""
+        if self.shared is None:
+            return None
+        try:
+            doc = await self.shared.get(self.shared_doc_id(key))
+        except DocumentNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Shared resolution cache read failed: %s", e)
+            return None
+
+        try:
+            expires_at = datetime.fromisoformat(doc["expires_at"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        remaining_s = (expires_at - datetime.now(timezone.utc)).total_seconds()
+        if remaining_s <= 0 or doc.get("url") != key:
+            return None
+        result = doc.get("result")
+        if not isinstance(result, dict):
+            return None
+        return result, remaining_s
+
+    async def _shared_set(self, key: str, result: dict, ttl: int) -> None:
+        if self.shared is None:
+            return
+        now = datetime.now(timezone.utc)
+        doc: dict[str, Any] = {
+            "_id": self.shared_doc_id(key),
+            "type": "resolver_cache",
+            "url": key,
+            "result": result,
+            "created_at": now.isoformat(),
+            "expires_at": (now + timedelta(seconds=ttl)).isoformat(),
+        }
+        try:
+            try:
+                await self.shared.put(doc)
+            except ConflictError:
+                current = await self.shared.get(doc["_id"])
+                doc["_rev"] = current.get("_rev")
+                await self.shared.put(doc)
+        except Exception as e:
+            # Best effort: another instance may have written it concurrently.
+            logger.debug("Shared resolution cache write failed for %s: %s", key, e)
+
+    async def purge_expired(self) -> int:
+        """Delete expired shared-tier documents; returns how many were deleted."""
+        if self.shared is None:
+            return 0
+        selector = {"type": "resolver_cache", "expires_at": {"$lt": datetime.now(timezone.utc).isoformat()}}
+        purged = 0
+        try:
+            while True:
+                docs = await self.shared.find(selector, fields=["_id", "_rev"], limit=PURGE_BATCH_SIZE)
+                if not docs:
+                    break
+                results = await self.shared.bulk_docs(
+                    [{"_id": doc["_id"], "_rev": doc["_rev"], "_deleted": True} for doc in docs]
+                )
+                purged += sum(1 for result in results if result.get("ok"))
+                if len(docs) < PURGE_BATCH_SIZE:
+                    break
+        except Exception as e:
+            logger.warning("Shared resolution cache purge failed: %s", e)
+        self.stats.purged += purged
+        return purged
+
+    def size(self) -> int:
+        return len(self._entries)
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            **self.stats.to_dict(),
+            "size": self.size(),
+            "max_entries": self.max_entries,
+            "shared": self.shared is not None,
+        }
+
+
+def is_cacheable(result: dict) -> bool:
+    """Only cache results that actually identified a product."""
+    return bool(result.get("title"))
+
+
+def load_resolution_cache_from_env() -> ResolutionCache | None:
+    enabled = (os.environ.get("RESOLUTION_CACHE_ENABLED") or "true").strip().lower() not in ("0", "false", "no")
+    if not enabled:
+        return None
+
+    shared: CouchDBClient | None = None
+    if (os.environ.get("RESOLUTION_CACHE_SHARED") or "").strip().lower() in ("1", "true", "yes"):
+        from .couchdb import get_couchdb
+
+        shared = get_couchdb()
+
+    return ResolutionCache(
+        max_entries=int(os.environ.get("RESOLUTION_CACHE_MAX_ENTRIES") or 1000),
+        default_ttl_s=int(os.environ.get("RESOLUTION_CACHE_TTL_S") or 3600),
+        domain_ttls=_parse_domain_ttls(os.environ.get("RESOLUTION_CACHE_DOMAIN_TTLS") or ""),
+        shared=shared,
+        purge_interval_s=int(os.environ.get("RESOLUTION_CACHE_PURGE_INTERVAL_S") or 600),
+        max_domains=int(os.environ.get("RESOLUTION_CACHE_MAX_DOMAINS") or 5000),
+    )
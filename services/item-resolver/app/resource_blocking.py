@@ -0,0 +1,231 @@
+"""Request interception that keeps heavy and tracking resources out of page captures.
+
+Product extraction only needs the document, its scripts/XHR and enough CSS
+and images for the viewport screenshot. Fonts, media and analytics beacons
+just keep the network busy and delay `wait_for_page_quiet`, so they are
+aborted in a context-level route handler.
+
+Rules are resolved per registrable domain of the page being captured (the
+same key the context pool uses), so a site that breaks without a resource
+type or tracker host can be allowed individually:
+
+    RESOURCE_BLOCKING_RULES='{"ozon.ru": {"allow_hosts": ["mc.yandex.ru"]},
+                              "example.com": {"deny_types": ["image"]}}'
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+from urllib.parse import urlparse
+
+from .lru import LRUDict
+from .scrape import registrable_domain
+
+logger = logging.getLogger(__name__)
+
+# Navigations are never blocked: the image fetcher navigates straight to image URLs.
+NEVER_BLOCKED_TYPES = frozenset({"document"})
+
+DEFAULT_BLOCKED_TYPES = frozenset({"font", "media", "texttrack"})
+
+DEFAULT_TRACKER_HOSTS: Tuple[str, ...] = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "connect.facebook.net",
+    "analytics.tiktok.com",
+    "mc.yandex.ru",
+    "mc.yandex.com",
+    "an.yandex.ru",
+    "top-fwz1.mail.ru",
+    "counter.yadro.ru",
+    "hotjar.com",
+    "criteo.com",
+    "criteo.net",
+    "mindbox.ru",
+    "flocktory.com",
+    "adriver.ru",
+    "mediatoday.ru",
+)
+
+
+def _host_matches(host: str, hosts: FrozenSet[str]) -> bool:
+    """True when `host` equals one of `hosts` or is a subdomain of one."""
+    host = host.lower().rstrip(".")
+    while host:
+        if host in hosts:
+            return True
+        _, sep, host = host.partition(".")
+        if not sep:
+            return False
+    return False
+
+
+def _frozen(values: Any) -> FrozenSet[str]:
+    if isinstance(values, str):
+        values = values.split(",")
+    return frozenset(str(v).strip().lower() for v in (values or []) if str(v).strip())
+
+
+@dataclass(frozen=True)
+class SiteRules:
+    """Blocking rules resolved for one site."""
+
+    blocked_types: FrozenSet[str]
+    blocked_hosts: FrozenSet[str]
+    allowed_hosts: FrozenSet[str] = frozenset()
+
+    def block_reason(self, resource_type: str, url: str) -> Optional[str]:
+        """Why a request should be aborted ("type" or "tracker"), or None to let it through."""
+        if resource_type in NEVER_BLOCKED_TYPES:
+            return None
+        host = (urlparse(url).hostname or "").lower()
+        if host and self.allowed_hosts and _host_matches(host, self.allowed_hosts):
+            return None
+        if resource_type in self.blocked_types:
+            return "type"
+        if host and _host_matches(host, self.blocked_hosts):
+            return "tracker"
+        return None
+
+
+@dataclass
+class BlockingStats:
+    allowed: int = 0
+    blocked: int = 0
+    blocked_by_type: Dict[str, int] = field(default_factory=dict)
+    blocked_trackers: int = 0
+    max_sites: int = 5_000
+    blocked_by_site: LRUDict[str, int] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.blocked_by_site = LRUDict(self.max_sites)
+
+    def record(self, site: str, resource_type: str, reason: Optional[str]) -> None:
+        if reason is None:
+            self.allowed += 1
+            return
+        self.blocked += 1
+        self.blocked_by_site.increment(site)
+        if reason == "tracker":
+            self.blocked_trackers += 1
+        else:
+            self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = self.allowed + self.blocked
+        return {
+            "allowed": self.allowed,
+            "blocked": self.blocked,
+            "blocked_ratio": round(self.blocked / total, 3) if total else 0.0,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "blocked_trackers": self.blocked_trackers,
+            "blocked_by_site": dict(self.blocked_by_site),
+        }
+
+
+class ResourceBlocker:
+    """
+    Default blocking policy plus per-domain overrides.
+
+    Each override may carry `allow_types` / `deny_types` (resource types to
+    unblock / additionally block) and `allow_hosts` / `deny_hosts`.
+    """
+
+    def __init__(
+        self,
+        *,
+        blocked_types: FrozenSet[str] = DEFAULT_BLOCKED_TYPES,
+        tracker_hosts: Tuple[str, ...] = DEFAULT_TRACKER_HOSTS,
+        domain_rules: Optional[Dict[str, Dict[str, Any]]] = None,
+        max_sites: int = 5_000,
+    ) -> None:
+        self.blocked_types = frozenset(blocked_types)
+        self.tracker_hosts = frozenset(h.lower() for h in tracker_hosts)
+        self.domain_rules = {k.lower(): v for k, v in (domain_rules or {}).items()}
+        self.max_sites = max(1, int(max_sites))
+        self.stats = BlockingStats(max_sites=self.max_sites)
+        self._resolved: LRUDict[str, SiteRules] = LRUDict(self.max_sites)
+
+    def rules_for(self, url: str) -> SiteRules:
+        site = registrable_domain(urlparse(url).hostname or "")
+        rules = self._resolved.touch(site)
+        if rules is None:
+            override = self.domain_rules.get(site) or {}
+            rules = SiteRules(
+                blocked_types=(self.blocked_types | _frozen(override.get("deny_types")))
+                - _frozen(override.get("allow_types")),
+                blocked_hosts=self.tracker_hosts | _frozen(override.get("deny_hosts")),
+                allowed_hosts=_frozen(override.get("allow_hosts")),
+            )
+            self._resolved[site] = rules
+        return rules
+
+    async def install(self, context, url: str) -> None:
+        """
+        Route every request of `context` through the rules for `url`'s site.
+
+        Note that Playwright disables the HTTP cache for contexts with routes;
+        for one-shot captures that costs far less than the blocked resources.
+        """
+        site = registrable_domain(urlparse(url).hostname or "")
+        rules = self.rules_for(url)
+        stats = self.stats
+
+        async def handle(route, request) -> None:
+            reason = rules.block_reason(request.resource_type, request.url)
+            stats.record(site, request.resource_type, reason)
+            try:
+                if reason is None:
+                    await route.continue_()
+                else:
+                    await route.abort("blockedbyclient")
+            except Exception:
+                # The page or context went away mid-request.
+                pass
+
+        await context.route("**/*", handle)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            **self.stats.to_dict(),
+            "blocked_types": sorted(self.blocked_types),
+            "tracker_hosts": len(self.tracker_hosts),
+        }
+
+
+def _parse_domain_rules(raw: str) -> Dict[str, Dict[str, Any]]:
+    if not raw.strip():
+        return {}
+    try:
+        rules = json.loads(raw)
+    except json.JSONDecodeError as e:
+        logger.warning("Ignoring invalid RESOURCE_BLOCKING_RULES: %s", e)
+        return {}
+    if not isinstance(rules, dict):
+        logger.warning("Ignoring RESOURCE_BLOCKING_RULES: expected a JSON object")
+        return {}
+    return {str(k): v for k, v in rules.items() if isinstance(v, dict)}
+
+
+def load_resource_blocker_from_env() -> Optional[ResourceBlocker]:
+    enabled = (os.environ.get("RESOURCE_BLOCKING_ENABLED") or "true").strip().lower() not in ("0", "false", "no")
+    if not enabled:
+        return None
+
+    raw_types = os.environ.get("RESOURCE_BLOCK_TYPES")
+    blocked_types = _frozen(raw_types) if raw_types is not None else DEFAULT_BLOCKED_TYPES
+    extra_hosts = tuple(_frozen(os.environ.get("RESOURCE_BLOCK_HOSTS") or ""))
+
+    return ResourceBlocker(
+        blocked_types=blocked_types,
+        tracker_hosts=DEFAULT_TRACKER_HOSTS + extra_hosts,
+        domain_rules=_parse_domain_rules(os.environ.get("RESOURCE_BLOCKING_RULES") or ""),
+        max_sites=int(os.environ.get("RESOURCE_BLOCKING_MAX_SITES") or 5000),
+    )
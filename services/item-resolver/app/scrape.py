@@ -2,13 +2,19 @@ from __future__ import annotations
 
 import asyncio
 import json
+import logging
 import os
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from urllib.parse import urlparse
 
+if TYPE_CHECKING:
+    from .capture_profiles import CaptureProfiles
+
+LOGGER = logging.getLogger(__name__)
+
 
 def safe_host(url: str) -> str:
     host = urlparse(url).hostname or "unknown-host"
@@ -168,56 +174,168 @@ def looks_like_interstitial_or_challenge(title: str, html: str) -> bool:
     return any(n in s for n in needles)
 
 
-async def wait_for_network_quiet(page, *, quiet_ms: int, timeout_ms: int) -> None:
+# Injected into every document (see `new_context`). Activity timestamps are
+# recorded by observers, and `waitQuiet` resolves one promise once both the
+# network and the DOM have been idle long enough. Timers are re-armed only
+# for the remaining quiet window, so the page is not sampled.
+READINESS_INIT_SCRIPT = """
+(() => {
+  if (window.__ruReadiness) return;
+  const now = () => performance.now();
+  const state = { lastNet: now(), lastDom: now(), resources: 0, mutations: 0 };
+  try {
+    new PerformanceObserver((list) => {
+      state.resources += list.getEntries().length;
+      state.lastNet = now();
+    }).observe({ type: 'resource', buffered: false });
+  } catch (e) {}
+  const observeDom = () => {
+    const root = document.documentElement;
+    if (!root) return false;
+    new MutationObserver((records) => {
+      state.mutations += records.length;
+      state.lastDom = now();
+    }).observe(root, { childList: true, subtree: true, characterData: true });
+    return true;
+  };
+  if (!observeDom()) {
+    document.addEventListener('readystatechange', observeDom, { once: true });
+  }
+  Object.defineProperty(window, '__ruReadiness', {
+    enumerable: false,
+    value: {
+      waitQuiet(netQuietMs, domQuietMs, timeoutMs) {
+        const start = now();
+        return new Promise((resolve) => {
+          let timer = null;
+          const finish = (timedOut) => {
+            clearTimeout(timer);
+            clearTimeout(deadline);
+            const t = now();
+            resolve({
+              timed_out: timedOut,
+              elapsed_ms: t - start,
+              network_ms: Math.max(0, state.lastNet - start),
+              dom_ms: Math.max(0, state.lastDom - start),
+              dom_idle_ms: t - state.lastDom,
+              resources: state.resources,
+              mutations: state.mutations,
+            });
+          };
+          const check = () => {
+            const t = now();
+            const wait = Math.max(netQuietMs - (t - state.lastNet), domQuietMs - (t - state.lastDom));
+            if (wait <= 0) return finish(false);
+            timer = setTimeout(check, wait);
+          };
+          const deadline = setTimeout(() => finish(true), timeoutMs);
+          check();
+        });
+      },
+      idleMs() {
+        const t = now();
+        return { network: t - state.lastNet, dom: t - state.lastDom };
+      },
+    },
+  });
+})();
+"""
+
+
+@dataclass
+class ReadinessResult:
+    """How long the page took to go quiet, relative to the start of the wait."""
+
+    elapsed_ms: float = 0.0
+    network_ms: float = 0.0
+    dom_ms: float = 0.0
+    dom_idle_ms: float = 0.0
+    timed_out: bool = False
+    resources: int = 0
+    mutations: int = 0
+
+
+async def wait_for_page_quiet(page, *, network_quiet_ms: int, dom_quiet_ms: int, timeout_ms: int) -> ReadinessResult:
     """
-    Wait until there are no in-flight requests and there has been no request activity for `quiet_ms`.
-    Copied/adapted from repo `run.py` for pages that long-poll (networkidle is unreliable).
+    Wait until there are no in-flight requests, no resource has finished for
+    `network_quiet_ms` and the DOM has not mutated for `dom_quiet_ms`.
+
+    The quiet windows are tracked in the page by READINESS_INIT_SCRIPT. The
+    page cannot see requests that have not finished yet, so in-flight
+    requests are counted from Playwright events and awaited before the
+    in-page quiet window is confirmed again.
     """
     loop = asyncio.get_running_loop()
+    start = loop.time()
+    deadline = start + timeout_ms / 1000.0
     inflight = 0
-    last_activity = loop.time()
-
-    def bump() -> None:
-        nonlocal last_activity
-        last_activity = loop.time()
+    idle = asyncio.Event()
+    idle.set()
 
     def on_request(_req) -> None:
         nonlocal inflight
         inflight += 1
-        bump()
+        idle.clear()
 
     def on_done(_req) -> None:
         nonlocal inflight
         inflight = max(0, inflight - 1)
-        bump()
+        if inflight == 0:
+            idle.set()
 
     page.on("request", on_request)
     page.on("requestfinished", on_done)
     page.on("requestfailed", on_done)
+    result = ReadinessResult()
+    failures = 0
     try:
-        start = loop.time()
-        quiet_s = quiet_ms / 1000.0
-        timeout_s = timeout_ms / 1000.0
         while True:
-            now = loop.time()
-            if now - start > timeout_s:
-                return
-            if inflight == 0 and (now - last_activity) >= quiet_s:
-                return
-            await asyncio.sleep(0.05)
+            remaining_s = deadline - loop.time()
+            if remaining_s <= 0:
+                result.timed_out = True
+                break
+            offset_ms = (loop.time() - start) * 1000
+            try:
+                if not await page.evaluate("() => !!window.__ruReadiness"):
+                    # Context created without the init script: observe from now on.
+                    await page.evaluate(READINESS_INIT_SCRIPT)
+                raw = await page.evaluate(
+                    "([n, d, t]) => window.__ruReadiness.waitQuiet(n, d, t)",
+                    [network_quiet_ms, dom_quiet_ms, int(remaining_s * 1000)],
+                )
+            except Exception:
+                # Usually a navigation replaced the document mid-wait; try again on the new one.
+                failures += 1
+                if failures >= 3:
+                    break
+                continue
+
+            # Phase times are relative to the start of this call; activity seen
+            # in an earlier round is kept when the page stayed quiet since.
+            if raw.get("network_ms"):
+                result.network_ms = offset_ms + float(raw["network_ms"])
+            if raw.get("dom_ms"):
+                result.dom_ms = offset_ms + float(raw["dom_ms"])
+            result.dom_idle_ms = float(raw.get("dom_idle_ms") or 0)
+            result.timed_out = bool(raw.get("timed_out"))
+            result.resources = int(raw.get("resources") or 0)
+            result.mutations = int(raw.get("mutations") or 0)
+            if result.timed_out or inflight == 0:
+                break
+            try:
+                await asyncio.wait_for(idle.wait(), timeout=max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                result.timed_out = True
+                break
     finally:
-        try:
-            page.remove_listener("request", on_request)
-        except Exception:
-            pass
-        try:
-            page.remove_listener("requestfinished", on_done)
-        except Exception:
-            pass
-        try:
-            page.remove_listener("requestfailed", on_done)
-        except Exception:
-            pass
+        for event, handler in (("request", on_request), ("requestfinished", on_done), ("requestfailed", on_done)):
+            try:
+                page.remove_listener(event, handler)
+            except Exception:
+                pass
+
+    result.elapsed_ms = (loop.time() - start) * 1000
+    return result
 
 
 async def dismiss_common_popups(page, *, timeout_ms: int = 5000) -> int:
@@ -285,40 +403,6 @@ async def dismiss_common_popups(page, *, timeout_ms: int = 5000) -> int:
     return dismissed
 
 
-async def wait_for_dom_stable(page, *, samples: int, interval_ms: int, timeout_ms: int) -> None:
-    """
-    Sample DOM size and wait until it stays stable for N samples.
-    Copied/adapted from repo `run.py`.
-    """
-    loop = asyncio.get_running_loop()
-    start = loop.time()
-    timeout_s = timeout_ms / 1000.0
-
-    last = None
-    stable = 0
-    while True:
-        if loop.time() - start > timeout_s:
-            return
-        try:
-            cur = await page.evaluate(
-                "() => ({ htmlLen: document.documentElement?.outerHTML?.length || 0, "
-                "textLen: document.body?.innerText?.length || 0 })"
-            )
-            cur = (int(cur.get("htmlLen", 0)), int(cur.get("textLen", 0)))
-        except Exception:
-            cur = None
-
-        if cur is not None and cur == last and cur != (0, 0):
-            stable += 1
-            if stable >= samples:
-                return
-        else:
-            stable = 0
-            last = cur
-
-        await asyncio.sleep(interval_ms / 1000.0)
-
-
 def _challenge_title_patterns() -> list[str]:
     """
     Patterns that indicate a challenge/interstitial page in the title.
@@ -451,6 +535,11 @@ class PageCaptureConfig:
     challenge_extra_wait_ms: int = 120_000
     post_challenge_settle_ms: int = 3_000  # Extra settle after challenge clears
 
+    @property
+    def dom_quiet_ms(self) -> int:
+        """How long the DOM must go without mutations to count as stable."""
+        return self.dom_sample_interval_ms * self.dom_stable_samples
+
     @classmethod
     def from_env(cls) -> "PageCaptureConfig":
         """Create config with environment variable overrides."""
@@ -458,13 +547,79 @@ class PageCaptureConfig:
         return cls(timeout_ms=_default_timeout_ms(), wait_until=wait_until)
 
 
-async def capture_page_source(page, url: str, *, cfg: PageCaptureConfig) -> tuple[str, str, str]:
+@dataclass
+class CaptureOutcome:
+    """What a capture observed, for tuning per-domain timing."""
+
+    ready_ms: Optional[float] = None
+    settle_needed_ms: Optional[float] = None
+    quiet_timed_out: bool = False
+    challenge: bool = False
+    challenge_cleared: bool = False
+
+
+async def capture_page_source(
+    page,
+    url: str,
+    *,
+    cfg: PageCaptureConfig,
+    timings: Optional[dict[str, float]] = None,
+    profiles: Optional["CaptureProfiles"] = None,
+) -> tuple[str, str, str]:
     """
     Returns: (final_url, title, html)
 
     Waits for JS content to load, then captures the HTML for LLM extraction.
+    When `timings` is given it is filled with per-phase durations in seconds.
+    When `profiles` is given the waits are tuned for the URL's domain and the
+    outcome is recorded back into the profile.
     """
+    if profiles is None:
+        return await _capture_page_source(page, url, cfg=cfg, timings=timings, outcome=CaptureOutcome())
+
+    outcome = CaptureOutcome()
+    try:
+        try:
+            result = await _capture_page_source(
+                page, url, cfg=profiles.config_for(url, cfg), timings=timings, outcome=outcome
+            )
+        except Exception:
+            profiles.record(url, success=False)
+            raise
+        profiles.record(
+            url,
+            success=not (outcome.challenge and not outcome.challenge_cleared),
+            challenge=outcome.challenge,
+            quiet_timed_out=outcome.quiet_timed_out,
+            ready_ms=outcome.ready_ms,
+            settle_needed_ms=outcome.settle_needed_ms,
+        )
+    finally:
+        if profiles.save_due():
+            await profiles.save_async()
+    return result
+
+
+async def _capture_page_source(
+    page,
+    url: str,
+    *,
+    cfg: PageCaptureConfig,
+    timings: Optional[dict[str, float]],
+    outcome: CaptureOutcome,
+) -> tuple[str, str, str]:
+    loop = asyncio.get_running_loop()
+    phases: dict[str, float] = timings if timings is not None else {}
+    phase_start = loop.time()
+
+    def phase_done(name: str) -> None:
+        nonlocal phase_start
+        now = loop.time()
+        phases[name] = phases.get(name, 0.0) + (now - phase_start)
+        phase_start = now
+
     await page.goto(url, wait_until=cfg.wait_until, timeout=cfg.timeout_ms)
+    phase_done("goto")
 
     extra_budget = min(cfg.max_extra_wait_ms, cfg.timeout_ms)
 
@@ -476,6 +631,7 @@ async def capture_page_source(page, url: str, *, cfg: PageCaptureConfig) -> tupl
         )
     except Exception:
         pass
+    phase_done("content")
 
     # Dismiss common popups/overlays that may block content
     try:
@@ -484,19 +640,35 @@ async def capture_page_source(page, url: str, *, cfg: PageCaptureConfig) -> tupl
             await asyncio.sleep(1.0)
     except Exception:
         pass
+    phase_done("popups")
 
-    # Wait for network and DOM to stabilize
-    await wait_for_network_quiet(page, quiet_ms=cfg.network_quiet_ms, timeout_ms=extra_budget)
-    await wait_for_dom_stable(
+    # Wait for network and DOM to go quiet
+    ready = await wait_for_page_quiet(
         page,
-        samples=cfg.dom_stable_samples,
-        interval_ms=cfg.dom_sample_interval_ms,
+        network_quiet_ms=cfg.network_quiet_ms,
+        dom_quiet_ms=cfg.dom_quiet_ms,
         timeout_ms=extra_budget,
     )
-
-    # Settle time for JS to finish rendering
-    if cfg.settle_ms > 0:
-        await asyncio.sleep(cfg.settle_ms / 1000.0)
+    phase_done("quiet")
+    phases["network_settled"] = ready.network_ms / 1000.0
+    phases["dom_settled"] = ready.dom_ms / 1000.0
+    outcome.quiet_timed_out = ready.timed_out
+    outcome.ready_ms = sum(phases.get(k, 0.0) for k in ("content", "popups", "quiet")) * 1000
+
+    # Settle time for JS to finish rendering; the DOM has already been quiet
+    # for `dom_idle_ms` of it.
+    settle_s = max(0.0, cfg.settle_ms - ready.dom_idle_ms) / 1000.0
+    if settle_s > 0:
+        await asyncio.sleep(settle_s)
+        # A mutation during settle means this much DOM quiet was not enough.
+        try:
+            idle = await page.evaluate("() => window.__ruReadiness && window.__ruReadiness.idleMs()")
+        except Exception:
+            idle = None
+        if idle:
+            quiet_seen_ms = ready.dom_idle_ms + settle_s * 1000
+            outcome.settle_needed_ms = max(0.0, quiet_seen_ms - float(idle.get("dom") or 0))
+    phase_done("settle")
 
     final_url = page.url
     html = await page.content()
@@ -507,17 +679,18 @@ async def capture_page_source(page, url: str, *, cfg: PageCaptureConfig) -> tupl
 
     if looks_like_interstitial_or_challenge(title, html):
         challenge_cleared = await wait_for_challenge_to_clear(page, timeout_ms=cfg.challenge_extra_wait_ms)
+        outcome.challenge = True
+        outcome.challenge_cleared = challenge_cleared
 
         # Extra settle time after challenge clears for page to fully render
         if challenge_cleared and cfg.post_challenge_settle_ms > 0:
             await asyncio.sleep(cfg.post_challenge_settle_ms / 1000.0)
 
-        # Wait for network and DOM to stabilize again after challenge
-        await wait_for_network_quiet(page, quiet_ms=cfg.network_quiet_ms, timeout_ms=10_000)
-        await wait_for_dom_stable(
+        # Wait for network and DOM to go quiet again after challenge
+        await wait_for_page_quiet(
             page,
-            samples=cfg.dom_stable_samples,
-            interval_ms=cfg.dom_sample_interval_ms,
+            network_quiet_ms=cfg.network_quiet_ms,
+            dom_quiet_ms=cfg.dom_quiet_ms,
             timeout_ms=10_000,
         )
 
@@ -527,7 +700,14 @@ async def capture_page_source(page, url: str, *, cfg: PageCaptureConfig) -> tupl
             title = await page.title()
         except Exception:
             pass
-
+        phase_done("challenge")
+
+    LOGGER.debug(
+        "Capture phases for %s: %s (resources=%d mutations=%d quiet_timed_out=%s)",
+        url,
+        " ".join(f"{k}={v:.2f}s" for k, v in phases.items()),
+        ready.resources,
+        ready.mutations,
+        ready.timed_out,
+    )
     return final_url, title, html
-
-
@@ -0,0 +1,56 @@
+"""Single-flight deduplication of concurrent work for the same key.
+
+When several callers ask for the same normalized URL at once, only the
+first one (the leader) runs the browser + LLM resolution; the others await
+the leader's result. The shared task is shielded, so a leader whose request
+is cancelled does not cancel the work the followers are waiting on.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Future[Any]] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn` unless a call for `key` is already in flight, in which case join it."""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.followers += 1
+            logger.debug("Joining in-flight resolution for %s", key)
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        self.leaders += 1
+
+        def _forget(done: asyncio.Future[Any]) -> None:
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+            # Retrieve the exception so an abandoned task does not warn on GC.
+            if not done.cancelled():
+                done.exception()
+
+        task.add_done_callback(_forget)
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    def metrics(self) -> dict[str, int]:
+        return {
+            "in_flight": self.in_flight(),
+            "leaders": self.leaders,
+            "deduplicated": self.followers,
+        }
@@ -0,0 +1,329 @@
+"""
+Deterministic product extraction from structured data.
+
+Many product pages already publish everything the LLM is asked for in
+schema.org JSON-LD, microdata or OpenGraph tags. When those sources are
+complete and agree with each other (and the price is actually shown on
+the page), an `LLMOutput` is built from them directly and the LLM call is
+skipped. Anything missing, conflicting or low-confidence falls back to the
+LLM.
+
+The sources are read from `preprocess_html`'s single scan of the page,
+which the LLM path reuses, and the price is looked for in its cleaned text.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from urllib.parse import urljoin, urlparse
+
+from .html_preprocessor import PreprocessedHtml, preprocess_html
+from .llm import LLMOutput
+from .lru import LRUDict
+from .scrape import registrable_domain
+
+logger = logging.getLogger(__name__)
+
+_TAG_RE = re.compile(r"<[^>]+>")
+# Digit groups are separated by spaces, no-break/thin spaces or their entities.
+_SPACE_RE = re.compile(r"\s+|&nbsp;|&thinsp;|&#160;|&#8201;|&#8239;", re.IGNORECASE)
+
+_CURRENCY_ALIASES = {
+    "₽": "RUB",
+    "РУБ": "RUB",
+    "РУБ.": "RUB",
+    "RUR": "RUB",
+    "$": "USD",
+    "€": "EUR",
+    "₸": "KZT",
+    "BR": "BYN",
+}
+
+
+def parse_price(value: Any) -> Optional[float]:
+    """Parse '93 499', '1.299,00', '1,299.00' or 93499 into a positive float."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value > 0 else None
+    text = re.sub(r"[^\d.,]", "", str(value))
+    if not text:
+        return None
+    if "," in text and "." in text:
+        # The right-most separator is the decimal one.
+        if text.rfind(",") > text.rfind("."):
+            text = text.replace(".", "").replace(",", ".")
+        else:
+            text = text.replace(",", "")
+    elif "," in text:
+        head, _, tail = text.rpartition(",")
+        text = f"{head.replace(',', '')}.{tail}" if len(tail) in (1, 2) else text.replace(",", "")
+    try:
+        amount = float(text)
+    except ValueError:
+        return None
+    return amount if amount > 0 else None
+
+
+def normalize_currency(value: Any) -> Optional[str]:
+    if not value:
+        return None
+    text = str(value).strip().upper()
+    text = _CURRENCY_ALIASES.get(text, text)
+    return text if re.fullmatch(r"[A-Z]{3}", text) else None
+
+
+@dataclass
+class SourceData:
+    """Product fields found in one structured source."""
+
+    source: str
+    title: Optional[str] = None
+    description: Optional[str] = None
+    prices: list[float] = field(default_factory=list)
+    currency: Optional[str] = None
+    image: Optional[str] = None
+    url: Optional[str] = None
+
+
+def _first_image(value: Any) -> Optional[str]:
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get("url") or value.get("contentUrl")
+    return str(value).strip() if value else None
+
+
+def _jsonld_products(data: Any) -> list[dict]:
+    items: list[Any] = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, dict):
+            if "@graph" in node:
+                stack.append(node["@graph"])
+            types = node.get("@type")
+            types = types if isinstance(types, list) else [types]
+            if any("Product" in str(t) for t in types):
+                items.append(node)
+    return items
+
+
+def _from_jsonld(documents: list[Any]) -> Optional[SourceData]:
+    for data in documents:
+        for product in _jsonld_products(data):
+            src = SourceData(
+                source="jsonld",
+                title=(str(product.get("name")).strip() if product.get("name") else None),
+                description=(str(product.get("description")).strip() if product.get("description") else None),
+                image=_first_image(product.get("image")),
+                url=product.get("url") if isinstance(product.get("url"), str) else None,
+            )
+            offers = product.get("offers") or product.get("Offers") or []
+            offers = offers if isinstance(offers, list) else [offers]
+            for offer in offers:
+                if not isinstance(offer, dict):
+                    continue
+                price = parse_price(offer.get("price"))
+                if price is None:
+                    price = parse_price(offer.get("lowPrice"))
+                if price is not None:
+                    src.prices.append(price)
+                src.currency = src.currency or normalize_currency(offer.get("priceCurrency"))
+            return src
+    return None
+
+
+def _from_meta(meta: dict[str, str]) -> Optional[SourceData]:
+    price = parse_price(meta.get("product:price:amount") or meta.get("og:price:amount"))
+    og = SourceData(
+        source="opengraph",
+        title=meta.get("og:title"),
+        description=meta.get("og:description"),
+        prices=[price] if price is not None else [],
+        currency=normalize_currency(meta.get("product:price:currency") or meta.get("og:price:currency")),
+        image=meta.get("og:image:secure_url") or meta.get("og:image"),
+        url=meta.get("og:url"),
+    )
+    if not (og.title or og.prices or og.image):
+        return None
+    return og
+
+
+def _from_microdata(props: list[tuple[str, str]]) -> Optional[SourceData]:
+    if not props:
+        return None
+    src = SourceData(source="microdata")
+    for prop, value in props:
+        if prop == "name" and src.title is None:
+            src.title = value
+        elif prop == "description" and src.description is None:
+            src.description = value
+        elif prop == "price":
+            price = parse_price(value)
+            if price is not None and not src.prices:
+                src.prices.append(price)
+        elif prop == "pricecurrency" and src.currency is None:
+            src.currency = normalize_currency(value)
+        elif prop == "image" and src.image is None:
+            src.image = value
+    return src if (src.title or src.prices) else None
+
+
+def _price_is_visible(cleaned_html: str, price: float) -> bool:
+    """Whether the price appears in the cleaned page text, with any digit grouping."""
+    text = _TAG_RE.sub("", cleaned_html)
+    text = _SPACE_RE.sub("", text)
+    integer = str(int(price))
+    return re.search(rf"(?<!\d){integer}(?!\d)", text) is not None
+
+
+@dataclass
+class FastPathResult:
+    output: Optional[LLMOutput]
+    confidence: float
+    reason: str
+    sources: list[str]
+
+
+@dataclass
+class _DomainCounts:
+    hits: int = 0
+    misses: int = 0
+
+
+class StructuredExtractor:
+    """Builds `LLMOutput` from structured data when it is complete and consistent."""
+
+    SOURCE_WEIGHT = {"jsonld": 0.7, "microdata": 0.65, "opengraph": 0.5}
+
+    def __init__(self, *, min_confidence: float = 0.8, max_domains: int = 5_000) -> None:
+        self.min_confidence = float(min_confidence)
+        self.max_domains = max(1, int(max_domains))
+        self.hits = 0
+        self.misses = 0
+        self.miss_reasons: dict[str, int] = {}
+        self._domains: LRUDict[str, _DomainCounts] = LRUDict(self.max_domains)
+
+    def evaluate(
+        self, html: str, *, url: str, preprocessed: Optional[PreprocessedHtml] = None
+    ) -> FastPathResult:
+        """Evaluate a page; pass `preprocessed` when the caller already has `preprocess_html(html)`."""
+        if not html:
+            return FastPathResult(None, 0.0, "empty", [])
+        if preprocessed is None:
+            preprocessed = preprocess_html(html, base_url=url)
+
+        sources: list[SourceData] = []
+        jsonld = _from_jsonld(preprocessed.jsonld)
+        if jsonld:
+            sources.append(jsonld)
+        microdata = _from_microdata(preprocessed.microdata)
+        if microdata:
+            sources.append(microdata)
+        og = _from_meta(preprocessed.meta)
+        if og:
+            sources.append(og)
+        names = [s.source for s in sources]
+        if not sources:
+            return FastPathResult(None, 0.0, "no_structured_data", names)
+
+        def first(attr: str) -> Any:
+            return next((getattr(s, attr) for s in sources if getattr(s, attr)), None)
+
+        product_title = first("title")
+        priced = [s for s in sources if s.prices]
+        currencies = {s.currency for s in sources if s.currency}
+        image = first("image")
+
+        if not product_title:
+            return FastPathResult(None, 0.0, "missing_title", names)
+        if not priced:
+            return FastPathResult(None, 0.0, "missing_price", names)
+        if not currencies:
+            return FastPathResult(None, 0.0, "missing_currency", names)
+        if not image:
+            return FastPathResult(None, 0.0, "missing_image", names)
+        if len(currencies) > 1:
+            return FastPathResult(None, 0.0, "currency_conflict", names)
+
+        lead = priced[0].prices[0]
+        for src in priced[1:]:
+            if abs(src.prices[0] - lead) > 0.01 * lead:
+                return FastPathResult(None, 0.0, "price_conflict", names)
+
+        confidence = self.SOURCE_WEIGHT.get(priced[0].source, 0.5)
+        confidence += 0.1 * min(2, len(priced) - 1)
+        if len({round(p, 2) for p in priced[0].prices}) > 1:
+            # Several offers with different prices (variants or sellers).
+            confidence -= 0.15
+        if _price_is_visible(preprocessed.html, lead):
+            confidence += 0.1
+        confidence = round(max(0.0, min(0.95, confidence)), 2)
+        if confidence < self.min_confidence:
+            return FastPathResult(None, confidence, "low_confidence", names)
+
+        canonical_url = first("url") or preprocessed.canonical_url or url
+        output = LLMOutput(
+            title=product_title,
+            description=first("description"),
+            price_amount=lead,
+            price_currency=currencies.pop(),
+            canonical_url=urljoin(url, canonical_url),
+            confidence=confidence,
+            image_url=urljoin(url, image),
+        )
+        return FastPathResult(output, confidence, "ok", names)
+
+    def extract(
+        self, html: str, *, url: str, preprocessed: Optional[PreprocessedHtml] = None
+    ) -> Optional[LLMOutput]:
+        """`LLMOutput` from structured data, or None when the LLM is needed. Counts per domain."""
+        try:
+            result = self.evaluate(html, url=url, preprocessed=preprocessed)
+        except Exception as e:
+            logger.warning("Structured data extraction failed for %s: %s", url, e)
+            result = FastPathResult(None, 0.0, "error", [])
+
+        domain = registrable_domain(urlparse(url).hostname or "")
+        counts = self._domains.setdefault_recent(domain, _DomainCounts)
+        if result.output is not None:
+            self.hits += 1
+            counts.hits += 1
+            logger.info("Structured data fast path for %s (confidence=%.2f, sources=%s)", url, result.confidence, result.sources)
+        else:
+            self.misses += 1
+            counts.misses += 1
+            self.miss_reasons[result.reason] = self.miss_reasons.get(result.reason, 0) + 1
+        return result.output
+
+    def metrics(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "min_confidence": self.min_confidence,
+            "miss_reasons": dict(self.miss_reasons),
+            "by_domain": {
+                d: {
+                    "hits": c.hits,
+                    "misses": c.misses,
+                    "hit_ratio": round(c.hits / (c.hits + c.misses), 3),
+                }
+                for d, c in self._domains.items()
+            },
+        }
+
+
+def load_structured_extractor_from_env() -> Optional[StructuredExtractor]:
+    enabled = (os.environ.get("STRUCTURED_FAST_PATH_ENABLED") or "true").strip().lower() not in ("0", "false", "no")
+    if not enabled:
+        return None
+    return StructuredExtractor(min_confidence=float(os.environ.get("STRUCTURED_FAST_PATH_MIN_CONFIDENCE") or "0.8"))
@@ -7,6 +7,8 @@ Tests cover:
 - Chromium launch arguments
 - Proxy configuration from environment
 - BrowserManager class
+- ContextPool reuse, recycling, eviction and health checks
+- BrowserPool least-load assignment, restarts and stats
 """
 
 from __future__ import annotations
@@ -21,7 +23,10 @@ from app.browser_manager import (
     DEFAULT_PROFILE,
     ROTATING_PROFILES,
     BrowserManager,
+    BrowserPool,
+    BrowserPoolConfig,
     BrowserProfile,
+    ContextPool,
     chromium_launch_args,
     cookies_for_host,
     default_headers,
@@ -438,3 +443,321 @@ class TestBrowserManager:
         assert manager.channel == "chrome"
         assert manager.headless is False
         assert manager.semaphore._value == 3
+
+
+# ---------------------------------------------------------------------------
+# ContextPool Tests
+# ---------------------------------------------------------------------------
+
+
+class FakeContext:
+    def __init__(self) -> None:
+        self.closed = False
+        self.pages: list = []
+        self.granted: list[str] = []
+        self.fail_health = False
+
+    def on(self, _event: str, _handler) -> None:
+        pass
+
+    async def cookies(self) -> list:
+        if self.fail_health:
+            raise RuntimeError("context gone")
+        return []
+
+    async def grant_permissions(self, _perms, origin: str) -> None:
+        self.granted.append(origin)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self) -> None:
+        self.connected = True
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+
+def _patched_new_context():
+    created: list[FakeContext] = []
+
+    async def fake_new_context(browser, url, **kwargs):
+        ctx = FakeContext()
+        created.append(ctx)
+        return ctx
+
+    return created, patch("app.browser_manager.new_context", fake_new_context)
+
+
+class TestContextPool:
+    """Tests for warm context pooling per registrable domain."""
+
+    @pytest.mark.anyio
+    async def test_reuses_context_for_same_registrable_domain(self) -> None:
+        pool = ContextPool()
+        browser = FakeBrowser()
+        created, patcher = _patched_new_context()
+        with patcher:
+            ctx1 = await pool.acquire(browser, url="https://www.ozon.ru/p/1", profile=DEFAULT_PROFILE)
+            await pool.release(ctx1)
+            ctx2 = await pool.acquire(browser, url="https://m.ozon.ru/p/2", profile=DEFAULT_PROFILE)
+
+        assert ctx1 is ctx2
+        assert len(created) == 1
+        assert pool.metrics()["reused"] == 1
+        # New origin on the same site gets its geolocation grant
+        assert "https://m.ozon.ru" in ctx2.granted
+
+    @pytest.mark.anyio
+    async def test_different_domains_get_different_contexts(self) -> None:
+        pool = ContextPool()
+        browser = FakeBrowser()
+        created, patcher = _patched_new_context()
+        with patcher:
+            ctx1 = await pool.acquire(browser, url="https://ozon.ru/p/1", profile=DEFAULT_PROFILE)
+            await pool.release(ctx1)
+            ctx2 = await pool.acquire(browser, url="https://wildberries.ru/p/1", profile=DEFAULT_PROFILE)
+
+        assert ctx1 is not ctx2
+        assert len(created) == 2
+
+    @pytest.mark.anyio
+    async def test_recycles_after_max_uses(self) -> None:
+        pool = ContextPool(max_uses=2)
+        browser = FakeBrowser()
+        created, patcher = _patched_new_context()
+        with patcher:
+            for _ in range(3):
+                ctx = await pool.acquire(browser, url="https://ozon.ru/p", profile=DEFAULT_PROFILE)
+                await pool.release(ctx)
+
+        assert len(created) == 2
+        assert created[0].closed is True
+        assert pool.metrics()["recycled"] == 1
+
+    @pytest.mark.anyio
+    async def test_evicts_idle_contexts(self) -> None:
+        pool = ContextPool(idle_ttl_s=0)
+        browser = FakeBrowser()
+        created, patcher = _patched_new_context()
+        with patcher:
+            ctx = await pool.acquire(browser, url="https://ozon.ru/p", profile=DEFAULT_PROFILE)
+            await pool.release(ctx)
+            evicted = await pool.evict_idle()
+
+        assert evicted == 1
+        assert created[0].closed is True
+        assert pool.idle_count() == 0
+
+    @pytest.mark.anyio
+    async def test_unhealthy_context_is_replaced(self) -> None:
+        pool = ContextPool()
+        browser = FakeBrowser()
+        created, patcher = _patched_new_context()
+        with patcher:
+            ctx1 = await pool.acquire(browser, url="https://ozon.ru/p", profile=DEFAULT_PROFILE)
+            await pool.release(ctx1)
+            ctx1.fail_health = True
+            ctx2 = await pool.acquire(browser, url="https://ozon.ru/p", profile=DEFAULT_PROFILE)
+
+        assert ctx2 is not ctx1
+        assert ctx1.closed is True
+        assert pool.metrics()["unhealthy"] == 1
+
+    @pytest.mark.anyio
+    async def test_idle_limit_per_domain(self) -> None:
+        pool = ContextPool(max_idle_per_domain=1)
+        browser = FakeBrowser()
+        created, patcher = _patched_new_context()
+        with patcher:
+            ctx1 = await pool.acquire(browser, url="https://ozon.ru/p", profile=DEFAULT_PROFILE)
+            ctx2 = await pool.acquire(browser, url="https://ozon.ru/p", profile=DEFAULT_PROFILE)
+            await pool.release(ctx1)
+            await pool.release(ctx2)
+
+        assert pool.idle_count() == 1
+        assert ctx2.closed is True
+
+    @pytest.mark.anyio
+    async def test_close_all(self) -> None:
+        pool = ContextPool()
+        browser = FakeBrowser()
+        created, patcher = _patched_new_context()
+        with patcher:
+            ctx = await pool.acquire(browser, url="https://ozon.ru/p", profile=DEFAULT_PROFILE)
+            await pool.release(ctx)
+        await pool.close_all()
+
+        assert created[0].closed is True
+        assert pool.idle_count() == 0
+
+    @pytest.mark.anyio
+    async def test_manager_without_pool_closes_context(self) -> None:
+        manager = BrowserManager(channel="chromium", headless=True, max_concurrency=1)
+        ctx = FakeContext()
+        await manager.release_context(ctx)  # type: ignore[arg-type]
+        assert ctx.closed is True
+
+    def test_load_manager_from_env_pool_settings(self) -> None:
+        with patch.dict(os.environ, {"CONTEXT_POOL_MAX_USES": "7", "CONTEXT_POOL_ENABLED": "true"}):
+            manager = load_manager_from_env()
+        assert manager.context_pool is not None
+        assert manager.context_pool.max_uses == 7
+
+        with patch.dict(os.environ, {"CONTEXT_POOL_ENABLED": "false"}):
+            manager = load_manager_from_env()
+        assert manager.context_pool is None
+
+
+# ---------------------------------------------------------------------------
+# BrowserPool Tests
+# ---------------------------------------------------------------------------
+
+
+class FakeLaunchedBrowser(FakeBrowser):
+    def __init__(self) -> None:
+        super().__init__()
+        self.closed = False
+        self.handlers: dict = {}
+
+    def on(self, event: str, handler) -> None:
+        self.handlers[event] = handler
+
+    async def close(self) -> None:
+        self.closed = True
+        self.connected = False
+
+    def crash(self) -> None:
+        self.connected = False
+        self.handlers["disconnected"](self)
+
+
+def _launcher():
+    launched: list[FakeLaunchedBrowser] = []
+
+    async def launch() -> FakeLaunchedBrowser:
+        browser = FakeLaunchedBrowser()
+        launched.append(browser)
+        return browser
+
+    return launched, launch
+
+
+class TestBrowserPool:
+    """Tests for sharding contexts across several browser processes."""
+
+    @pytest.mark.anyio
+    async def test_start_launches_all_browsers(self) -> None:
+        launched, launch = _launcher()
+        pool = BrowserPool(launch, size=3, monitor_interval_s=0)
+        await pool.start()
+
+        assert len(launched) == 3
+        assert [b["connected"] for b in pool.metrics()["browsers"]] == [True, True, True]
+        await pool.close()
+        assert all(b.closed for b in launched)
+
+    @pytest.mark.anyio
+    async def test_checkout_picks_least_loaded(self) -> None:
+        launched, launch = _launcher()
+        pool = BrowserPool(launch, size=2, monitor_interval_s=0)
+        await pool.start()
+
+        first = await pool.checkout()
+        second = await pool.checkout()
+        assert first is not second
+
+        await pool.checkin(first)
+        assert await pool.checkout() is first
+        await pool.close()
+
+    @pytest.mark.anyio
+    async def test_restarts_after_max_contexts(self) -> None:
+        launched, launch = _launcher()
+        pool = BrowserPool(launch, size=1, max_contexts_per_browser=2, monitor_interval_s=0)
+        await pool.start()
+
+        browser = await pool.checkout()
+        await pool.checkin(browser)
+        assert await pool.checkout() is browser
+        await asyncio.sleep(0)  # let the replacement launch
+
+        # The replacement takes new work while the old browser drains.
+        replacement = await pool.checkout()
+        assert replacement is not browser
+        assert pool.is_retiring(browser)
+        assert browser.closed is False
+
+        await pool.checkin(browser)
+        assert browser.closed is True
+        stats = pool.metrics()["browsers"][0]
+        assert stats["restarts"] == 1
+        assert stats["last_restart_reason"] == "max_contexts"
+        await pool.close()
+
+    @pytest.mark.anyio
+    async def test_crashed_browser_is_replaced(self) -> None:
+        launched, launch = _launcher()
+        pool = BrowserPool(launch, size=1, monitor_interval_s=0)
+        await pool.start()
+
+        launched[0].crash()
+        browser = await pool.checkout()
+
+        assert browser is launched[1]
+        assert pool.metrics()["browsers"][0]["crashes"] == 1
+        await pool.close()
+
+    @pytest.mark.anyio
+    async def test_memory_threshold_retires_browser(self) -> None:
+        launched, launch = _launcher()
+        pool = BrowserPool(launch, size=1, max_memory_mb=100, monitor_interval_s=0)
+        await pool.start()
+
+        async def fake_rss(_browser) -> int:
+            return 200 * 1024 * 1024
+
+        with patch("app.browser_manager.browser_rss_bytes", fake_rss):
+            await pool.check_health()
+        await asyncio.sleep(0)
+
+        assert launched[0].closed is True
+        assert await pool.checkout() is launched[1]
+        assert pool.metrics()["browsers"][0]["last_restart_reason"] == "memory"
+        await pool.close()
+
+    @pytest.mark.anyio
+    async def test_start_fails_when_no_browser_launches(self) -> None:
+        async def launch():
+            raise RuntimeError("no chromium")
+
+        pool = BrowserPool(launch, size=2, monitor_interval_s=0)
+        with pytest.raises(RuntimeError):
+            await pool.start()
+
+    @pytest.mark.anyio
+    async def test_manager_routes_contexts_through_pool(self) -> None:
+        launched, launch = _launcher()
+        pool = BrowserPool(launch, size=2, max_contexts_per_browser=1, monitor_interval_s=0)
+        await pool.start()
+        manager = BrowserManager(channel="chromium", headless=True, max_concurrency=2, context_pool=ContextPool())
+        created, patcher = _patched_new_context()
+        with patcher:
+            ctx = await manager.acquire_context(pool, url="https://ozon.ru/p", storage_state_path=None)
+            assert pool.metrics()["retiring_active"] == 1
+            await manager.release_context(ctx)
+
+        # The context belonged to a retiring browser, so it is closed rather than pooled.
+        assert ctx.closed is True
+        assert manager.context_pool.idle_count() == 0
+        assert launched[0].closed is True
+        await pool.close()
+
+    def test_pool_config_from_env(self) -> None:
+        with patch.dict(os.environ, {"BROWSER_POOL_SIZE": "4", "BROWSER_MAX_MEMORY_MB": "1500"}):
+            cfg = BrowserPoolConfig.from_env()
+        assert cfg.size == 4
+        assert cfg.max_memory_mb == 1500
+        assert cfg.max_contexts_per_browser == 500
@@ -0,0 +1,191 @@
+"""Unit tests for adaptive per-domain capture timing.
+
+Tests cover:
+- Defaults until a domain has enough samples
+- Tightening for fast, reliable domains and relaxing for slow ones
+- Challenge-heavy domains keep defaults
+- JSON persistence
+- capture_page_source() recording outcomes
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from app.capture_profiles import CaptureProfiles, DomainProfile
+from app.scrape import PageCaptureConfig, capture_page_source
+
+BASE = PageCaptureConfig()
+
+
+def _train(profiles: CaptureProfiles, url: str, n: int, **kwargs) -> None:
+    defaults = {"success": True, "ready_ms": 2_000.0, "settle_needed_ms": 300.0}
+    for _ in range(n):
+        profiles.record(url, **{**defaults, **kwargs})
+
+
+class TestConfigFor:
+    def test_defaults_until_min_samples(self) -> None:
+        profiles = CaptureProfiles(min_samples=5)
+        _train(profiles, "https://shop.example.com/p/1", 4)
+        assert profiles.config_for("https://shop.example.com/p/2", BASE) is BASE
+
+    def test_tightens_fast_reliable_domain(self) -> None:
+        profiles = CaptureProfiles(min_samples=3, explore_every=0)
+        _train(profiles, "https://www.ozon.ru/p/1", 5)
+
+        cfg = profiles.config_for("https://m.ozon.ru/p/2", BASE)
+
+        assert cfg.settle_ms == 550  # 300 needed + 250 margin, no deviation
+        assert cfg.max_extra_wait_ms == 5_000  # floor
+        assert cfg.timeout_ms == BASE.timeout_ms
+        assert profiles.metrics()["tuned"] == 1
+
+    def test_never_loosens_settle_beyond_base(self) -> None:
+        profiles = CaptureProfiles(min_samples=1, explore_every=0)
+        _train(profiles, "https://a.com/", 3, settle_needed_ms=60_000.0)
+        assert profiles.config_for("https://a.com/", BASE).settle_ms == BASE.settle_ms
+
+    def test_slow_domain_gets_more_room(self) -> None:
+        profiles = CaptureProfiles(min_samples=3, explore_every=0)
+        _train(profiles, "https://slow.example/", 5, quiet_timed_out=True)
+        cfg = profiles.config_for("https://slow.example/", BASE)
+        assert cfg.max_extra_wait_ms == BASE.max_extra_wait_ms * 2
+
+    def test_challenge_heavy_domain_keeps_defaults(self) -> None:
+        profiles = CaptureProfiles(min_samples=3, explore_every=0)
+        _train(profiles, "https://market.yandex.ru/", 5, challenge=True)
+        assert profiles.config_for("https://market.yandex.ru/", BASE) is BASE
+
+    def test_failing_domain_keeps_defaults(self) -> None:
+        profiles = CaptureProfiles(min_samples=3, explore_every=0)
+        _train(profiles, "https://a.com/", 5, success=False)
+        assert profiles.config_for("https://a.com/", BASE) is BASE
+
+    def test_explores_with_defaults_periodically(self) -> None:
+        profiles = CaptureProfiles(min_samples=3, explore_every=5)
+        _train(profiles, "https://a.com/", 5)
+        assert profiles.config_for("https://a.com/", BASE) is BASE
+        assert profiles.metrics()["explored"] == 1
+        _train(profiles, "https://a.com/", 1)
+        assert profiles.config_for("https://a.com/", BASE) is not BASE
+
+
+class TestDomainProfile:
+    def test_first_sample_seeds_averages(self) -> None:
+        p = DomainProfile()
+        p.observe(success=True, challenge=False, quiet_timed_out=False, ready_ms=1500.0, settle_needed_ms=None)
+        assert p.ready_ms == 1500.0
+        assert p.settle_needed_ms == 0.0
+        assert p.samples == 1
+
+    def test_from_dict_ignores_unknown_keys(self) -> None:
+        p = DomainProfile.from_dict({"samples": 3, "ready_ms": 10.0, "legacy": True})
+        assert p.samples == 3
+
+
+class TestPersistence:
+    def test_round_trip(self, tmp_path) -> None:
+        path = tmp_path / "profiles.json"
+        profiles = CaptureProfiles(path=path, save_interval_s=3600)
+        _train(profiles, "https://ozon.ru/p", 3)
+        assert not path.exists()
+        profiles.save()
+
+        loaded = CaptureProfiles(path=path)
+        loaded.load()
+        p = loaded.profile("https://www.ozon.ru/other")
+        assert p is not None
+        assert p.samples == 3
+
+    @pytest.mark.anyio
+    async def test_record_defers_write_to_save_async(self, tmp_path) -> None:
+        path = tmp_path / "profiles.json"
+        profiles = CaptureProfiles(path=path, save_interval_s=0)
+        _train(profiles, "https://ozon.ru/p", 2)
+        assert not path.exists()
+        assert profiles.save_due()
+
+        await profiles.save_async()
+
+        assert path.exists()
+        assert not profiles.save_due()
+
+    def test_corrupt_file_is_ignored(self, tmp_path) -> None:
+        path = tmp_path / "profiles.json"
+        path.write_text("{broken")
+        profiles = CaptureProfiles(path=path)
+        profiles.load()
+        assert profiles.metrics()["domains"] == 0
+
+    def test_evicts_least_recently_updated_domain(self) -> None:
+        profiles = CaptureProfiles(max_domains=2)
+        _train(profiles, "https://a.com/", 1)
+        _train(profiles, "https://b.com/", 1)
+        _train(profiles, "https://c.com/", 1)
+        assert profiles.profile("https://a.com/") is None
+        assert profiles.metrics()["domains"] == 2
+
+
+class FakeCapturePage:
+    url = "https://shop.example.com/p/1"
+
+    async def goto(self, url: str, **_kwargs) -> None:
+        self.url = url
+
+    async def wait_for_function(self, *_args, **_kwargs) -> None:
+        return None
+
+    def on(self, _event: str, _handler) -> None:
+        pass
+
+    def remove_listener(self, _event: str, _handler) -> None:
+        pass
+
+    async def evaluate(self, expression: str, arg=None):
+        if "!!window.__ruReadiness" in expression:
+            return True
+        if "idleMs" in expression:
+            return {"network": 5000.0, "dom": 100.0}
+        return {"timed_out": False, "network_ms": 50.0, "dom_ms": 40.0, "dom_idle_ms": 150.0}
+
+    async def content(self) -> str:
+        return "<html><body><h1>Product</h1></body></html>"
+
+    async def title(self) -> str:
+        return "Product"
+
+
+class TestCaptureRecording:
+    @pytest.mark.anyio
+    async def test_capture_records_outcome(self) -> None:
+        profiles = CaptureProfiles()
+        cfg = PageCaptureConfig(settle_ms=200)
+        timings: dict[str, float] = {}
+
+        _url, title, _html = await capture_page_source(
+            FakeCapturePage(), "https://shop.example.com/p/1", cfg=cfg, timings=timings, profiles=profiles
+        )
+
+        assert title == "Product"
+        assert {"goto", "content", "quiet", "settle"} <= set(timings)
+        p = profiles.profile("https://shop.example.com/")
+        assert p is not None
+        assert p.samples == 1
+        assert p.success_rate == 1.0
+        # DOM changed 100 ms before the end of a 150 + 50 ms quiet period
+        assert p.settle_needed_ms == pytest.approx(100.0)
+
+    @pytest.mark.anyio
+    async def test_capture_records_failure(self) -> None:
+        class TimeoutPage(FakeCapturePage):
+            async def goto(self, url: str, **_kwargs) -> None:
+                raise TimeoutError("navigation timeout")
+
+        profiles = CaptureProfiles()
+        with pytest.raises(TimeoutError):
+            await capture_page_source(TimeoutPage(), "https://a.com/p", cfg=BASE, profiles=profiles)
+
+        p = profiles.profile("https://a.com/")
+        assert p is not None
+        assert p.success_rate == 0.0
@@ -0,0 +1,498 @@
+"""Unit tests for the changes watcher worker pool.
+
+Tests cover:
+- Pool sizing against BrowserManager concurrency
+- Parallel resolution of queued items
+- Deduplication of repeated changes for the same item
+- Claim conflicts and metrics
+- Batched claims and stale lease resets via _bulk_docs
+- Changes feed checkpointing and pending backfill
+- Thumbnail in the item document, full image in its own document
+- Image refetched on resolution cache hits
+"""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.browser_manager import BrowserManager
+from app.changes_watcher import (
+    INSTANCE_ID,
+    ChangesWatcher,
+    checkpoint_doc_id,
+    image_doc_id,
+    reset_stale_items,
+    resolved_image_fields,
+    try_claim_items,
+)
+from app.couchdb import ConflictError, DocumentNotFoundError
+from app.image_pipeline import EncodedImage, ProcessedImage
+from app.llm import StubLLMClient
+from app.resolution_cache import ResolutionCache
+
+
+class FakeCouchDB:
+    """In-memory stand-in for CouchDBClient with rev-based conflicts."""
+
+    def __init__(self, docs: list[dict] | None = None, update_seq: str | None = None) -> None:
+        self.docs: dict[str, dict] = {d["_id"]: dict(d) for d in (docs or [])}
+        self.puts: list[dict] = []
+        self.bulk_calls: list[list[dict]] = []
+        self.find_pages = 0
+        self.update_seq = update_seq
+
+    async def info(self) -> dict:
+        return {"db_name": "wishwithme", "update_seq": self.update_seq}
+
+    async def get(self, doc_id: str) -> dict:
+        if doc_id not in self.docs:
+            raise DocumentNotFoundError(doc_id)
+        return dict(self.docs[doc_id])
+
+    async def find(self, selector: dict, fields=None, limit=None) -> list[dict]:
+        matches = [
+            dict(d) for d in self.docs.values()
+            if all(d.get(k) == v for k, v in selector.items())
+        ]
+        return matches[:limit] if limit else matches
+
+    async def find_page(self, selector: dict, limit: int, bookmark: str | None = None) -> tuple[list[dict], str]:
+        # The bookmark is the offset of the next page, as opaque to callers as CouchDB's.
+        matches = await self.find(selector)
+        start = int(bookmark or 0)
+        self.find_pages += 1
+        return matches[start : start + limit], str(start + limit)
+
+    async def put(self, doc: dict) -> dict:
+        current = self.docs.get(doc["_id"])
+        if current is not None and current.get("_rev") != doc.get("_rev"):
+            raise ConflictError(doc["_id"])
+        rev_num = int(str(doc.get("_rev") or "0").split("-")[0]) + 1
+        stored = {**doc, "_rev": f"{rev_num}-x"}
+        self.docs[doc["_id"]] = stored
+        self.puts.append(stored)
+        return {"ok": True, "id": doc["_id"], "rev": stored["_rev"]}
+
+    async def bulk_docs(self, docs: list[dict]) -> list[dict]:
+        self.bulk_calls.append(docs)
+        results = []
+        for doc in docs:
+            try:
+                results.append(await self.put(doc))
+            except ConflictError:
+                results.append({"id": doc["_id"], "error": "conflict", "reason": "Document update conflict."})
+        return results
+
+
+def _pending(item_id: str, rev: str = "1-a") -> dict:
+    return {
+        "_id": item_id,
+        "_rev": rev,
+        "type": "item",
+        "status": "pending",
+        "source_url": f"https://example.com/{item_id}",
+    }
+
+
+def _make_watcher(couchdb: FakeCouchDB, *, max_concurrency: int = 2, **kwargs) -> ChangesWatcher:
+    manager = BrowserManager(channel="chromium", headless=True, max_concurrency=max_concurrency)
+    return ChangesWatcher(
+        couchdb=couchdb,  # type: ignore[arg-type]
+        llm_client=StubLLMClient(),
+        manager=manager,
+        browser=None,
+        storage_state_dir="/tmp/storage_state",
+        **kwargs,
+    )
+
+
+class TestWorkerPoolSizing:
+    """Tests for worker pool sizing."""
+
+    def test_workers_default_to_browser_concurrency(self) -> None:
+        watcher = _make_watcher(FakeCouchDB(), max_concurrency=3)
+        assert watcher.workers == 3
+        assert len(watcher.metrics()["per_worker"]) == 3
+
+    def test_workers_explicit_override(self) -> None:
+        watcher = _make_watcher(FakeCouchDB(), max_concurrency=3, workers=5, queue_size=7)
+        assert watcher.workers == 5
+        assert watcher.metrics()["queue_capacity"] == 7
+
+
+class TestWorkerPool:
+    """Tests for queued, parallel item resolution."""
+
+    @pytest.mark.anyio
+    async def test_items_resolve_in_parallel(self) -> None:
+        docs = [_pending(f"item:{i}") for i in range(4)]
+        couchdb = FakeCouchDB(docs)
+        watcher = _make_watcher(couchdb, max_concurrency=2)
+
+        active = 0
+        peak = 0
+        resolved: list[str] = []
+
+        async def fake_resolve(doc: dict) -> bool:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+            resolved.append(doc["_id"])
+            return True
+
+        watcher._resolve_item = fake_resolve  # type: ignore[method-assign]
+        watcher._watch_loop = _idle  # type: ignore[method-assign]
+        watcher._sweep_loop = _idle  # type: ignore[method-assign]
+
+        await watcher.start()
+        try:
+            for doc in docs:
+                await watcher.enqueue(doc)
+            await asyncio.wait_for(watcher.join(), timeout=2)
+        finally:
+            await watcher.stop()
+
+        assert sorted(resolved) == sorted(d["_id"] for d in docs)
+        assert peak == 2
+        metrics = watcher.metrics()
+        assert metrics["processed"] == 4
+        assert metrics["failed"] == 0
+        assert metrics["in_flight"] == 0
+        assert metrics["enqueued"] == 4
+
+    @pytest.mark.anyio
+    async def test_repeated_changes_collapse_to_latest_doc(self) -> None:
+        couchdb = FakeCouchDB([_pending("item:1", rev="2-b")])
+        watcher = _make_watcher(couchdb, max_concurrency=1)
+
+        await watcher.enqueue(_pending("item:1", rev="1-a"))
+        await watcher.enqueue(_pending("item:1", rev="2-b"))
+
+        assert watcher._queue.qsize() == 1
+        doc, _ = watcher._pending["item:1"]
+        assert doc["_rev"] == "2-b"
+
+    @pytest.mark.anyio
+    async def test_claim_conflict_is_counted_and_skipped(self) -> None:
+        couchdb = FakeCouchDB([_pending("item:1", rev="3-c")])
+        watcher = _make_watcher(couchdb, max_concurrency=1)
+
+        calls: list[str] = []
+
+        async def fake_resolve(doc: dict) -> bool:
+            calls.append(doc["_id"])
+            return True
+
+        watcher._resolve_item = fake_resolve  # type: ignore[method-assign]
+        watcher._watch_loop = _idle  # type: ignore[method-assign]
+        watcher._sweep_loop = _idle  # type: ignore[method-assign]
+
+        await watcher.start()
+        try:
+            await watcher.enqueue(_pending("item:1", rev="1-a"))
+            await asyncio.wait_for(watcher.join(), timeout=2)
+        finally:
+            await watcher.stop()
+
+        assert calls == []
+        assert watcher.metrics()["claim_conflicts"] == 1
+
+    @pytest.mark.anyio
+    async def test_failed_resolution_is_counted(self) -> None:
+        couchdb = FakeCouchDB([_pending("item:1")])
+        watcher = _make_watcher(couchdb, max_concurrency=1)
+
+        async def fake_resolve(doc: dict) -> bool:
+            return False
+
+        watcher._resolve_item = fake_resolve  # type: ignore[method-assign]
+        watcher._watch_loop = _idle  # type: ignore[method-assign]
+        watcher._sweep_loop = _idle  # type: ignore[method-assign]
+
+        await watcher.start()
+        try:
+            await watcher.enqueue(_pending("item:1"))
+            await asyncio.wait_for(watcher.join(), timeout=2)
+        finally:
+            await watcher.stop()
+
+        metrics = watcher.metrics()
+        assert metrics["failed"] == 1
+        assert metrics["processed"] == 0
+        assert metrics["wait_max_seconds"] >= 0.0
+
+
+class TestSingleFlightResolution:
+    """Tests for deduplicated resolution of the same URL."""
+
+    @pytest.mark.anyio
+    async def test_same_url_resolved_once(self) -> None:
+        watcher = _make_watcher(FakeCouchDB())
+        calls = 0
+
+        async def fake_fetch(url: str) -> dict:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            return {"title": "Product"}
+
+        watcher._fetch_and_extract = fake_fetch  # type: ignore[method-assign]
+
+        results = await asyncio.gather(
+            watcher._resolve_url("https://example.com/p/1?utm_source=a"),
+            watcher._resolve_url("https://EXAMPLE.com/p/1"),
+            watcher._resolve_url("https://example.com/p/1#x"),
+        )
+
+        assert calls == 1
+        assert results == [{"title": "Product"}] * 3
+        assert watcher.flights.metrics()["deduplicated"] == 2
+
+
+class TestBulkClaims:
+    """Tests for batched claim and reset via _bulk_docs."""
+
+    @pytest.mark.anyio
+    async def test_try_claim_items_single_round_trip(self) -> None:
+        docs = [_pending(f"item:{i}") for i in range(5)]
+        couchdb = FakeCouchDB(docs)
+
+        claimed = await try_claim_items(couchdb, docs)
+
+        assert len(couchdb.bulk_calls) == 1
+        assert [d["_id"] for d in claimed] == [d["_id"] for d in docs]
+        for doc in claimed:
+            assert doc["status"] == "in_progress"
+            assert doc["lease_expires_at"]
+            assert doc["_rev"] == couchdb.docs[doc["_id"]]["_rev"]
+
+    @pytest.mark.anyio
+    async def test_try_claim_items_skips_conflicts(self) -> None:
+        couchdb = FakeCouchDB([_pending("item:1"), _pending("item:2", rev="5-z")])
+
+        claimed = await try_claim_items(couchdb, [_pending("item:1"), _pending("item:2")])
+
+        assert [d["_id"] for d in claimed] == ["item:1"]
+        assert couchdb.docs["item:2"]["status"] == "pending"
+
+    @pytest.mark.anyio
+    async def test_try_claim_items_empty(self) -> None:
+        couchdb = FakeCouchDB()
+        assert await try_claim_items(couchdb, []) == []
+        assert couchdb.bulk_calls == []
+
+    @pytest.mark.anyio
+    async def test_reset_stale_items(self) -> None:
+        stale = {**_pending("item:1"), "status": "in_progress", "claimed_by": "other"}
+        couchdb = FakeCouchDB([stale])
+
+        reset = await reset_stale_items(couchdb, [stale])
+
+        assert reset == ["item:1"]
+        assert couchdb.docs["item:1"]["status"] == "pending"
+        assert couchdb.docs["item:1"]["claimed_by"] is None
+        assert len(couchdb.bulk_calls) == 1
+
+    @pytest.mark.anyio
+    async def test_watcher_claims_burst_in_batches(self) -> None:
+        docs = [_pending(f"item:{i}") for i in range(6)]
+        couchdb = FakeCouchDB(docs)
+        watcher = _make_watcher(couchdb, max_concurrency=3)
+
+        async def fake_resolve(doc: dict) -> bool:
+            await asyncio.sleep(0.01)
+            return True
+
+        watcher._resolve_item = fake_resolve  # type: ignore[method-assign]
+        watcher._watch_loop = _idle  # type: ignore[method-assign]
+        watcher._sweep_loop = _idle  # type: ignore[method-assign]
+
+        # Queue the burst before the pool starts so the claim stage sees it at once
+        for doc in docs:
+            await watcher.enqueue(doc)
+        await watcher.start()
+        try:
+            await asyncio.wait_for(watcher.join(), timeout=2)
+        finally:
+            await watcher.stop()
+
+        # Batches never exceed the idle workers
+        assert all(len(batch) <= 3 for batch in couchdb.bulk_calls)
+        assert len(couchdb.bulk_calls) < len(docs)
+        metrics = watcher.metrics()
+        assert metrics["processed"] == 6
+        assert metrics["claim_batches"] == len(couchdb.bulk_calls)
+
+
+class TestCheckpointing:
+    """Tests for durable changes feed position and cold-start backfill."""
+
+    @pytest.mark.anyio
+    async def test_load_checkpoint_resumes_from_saved_seq(self) -> None:
+        couchdb = FakeCouchDB([{"_id": checkpoint_doc_id(), "_rev": "4-z", "seq": "42-abc"}])
+        watcher = _make_watcher(couchdb)
+
+        await watcher._load_checkpoint()
+
+        assert watcher._last_seq == "42-abc"
+        assert watcher._checkpoint_rev == "4-z"
+
+    @pytest.mark.anyio
+    async def test_load_checkpoint_missing_starts_from_current_seq(self) -> None:
+        # Items going pending while the backfill pages must still reach the feed
+        watcher = _make_watcher(FakeCouchDB(update_seq="99-xyz"))
+
+        await watcher._load_checkpoint()
+
+        assert watcher._last_seq == "99-xyz"
+        assert watcher._checkpoint_seq is None
+
+    @pytest.mark.anyio
+    async def test_load_checkpoint_missing_without_seq_starts_from_now(self) -> None:
+        watcher = _make_watcher(FakeCouchDB())
+
+        await watcher._load_checkpoint()
+
+        assert watcher._last_seq == "now"
+
+    @pytest.mark.anyio
+    async def test_save_checkpoint_writes_local_doc(self) -> None:
+        couchdb = FakeCouchDB()
+        watcher = _make_watcher(couchdb)
+        watcher._last_seq = "7-abc"
+
+        await watcher._save_checkpoint(force=True)
+        watcher._last_seq = "8-def"
+        await watcher._save_checkpoint(force=True)
+
+        saved = couchdb.docs[checkpoint_doc_id()]
+        assert saved["seq"] == "8-def"
+        assert len(couchdb.puts) == 2
+
+    @pytest.mark.anyio
+    async def test_save_checkpoint_recovers_from_stale_rev(self) -> None:
+        couchdb = FakeCouchDB([{"_id": checkpoint_doc_id(), "_rev": "9-q", "seq": "1-a"}])
+        watcher = _make_watcher(couchdb)
+        watcher._last_seq = "2-b"
+
+        await watcher._save_checkpoint(force=True)
+
+        assert couchdb.docs[checkpoint_doc_id()]["seq"] == "2-b"
+
+    @pytest.mark.anyio
+    async def test_save_checkpoint_is_rate_limited(self) -> None:
+        couchdb = FakeCouchDB()
+        watcher = _make_watcher(couchdb)
+        watcher._last_seq = "1-a"
+        await watcher._save_checkpoint(force=True)
+
+        watcher._last_seq = "2-b"
+        await watcher._save_checkpoint()
+
+        assert couchdb.docs[checkpoint_doc_id()]["seq"] == "1-a"
+
+    @pytest.mark.anyio
+    async def test_backfill_enqueues_pending_items(self) -> None:
+        couchdb = FakeCouchDB([
+            _pending("item:1"),
+            _pending("item:2"),
+            {**_pending("item:3"), "status": "resolved"},
+            {**_pending("item:4"), "source_url": None},
+        ])
+        watcher = _make_watcher(couchdb)
+        watcher._running = True
+
+        await watcher._backfill_pending()
+
+        assert set(watcher._pending) == {"item:1", "item:2"}
+        assert watcher.metrics()["backfilled"] == 2
+
+    @pytest.mark.anyio
+    async def test_backfill_reads_every_page(self) -> None:
+        couchdb = FakeCouchDB([_pending(f"item:{i}") for i in range(5)])
+        watcher = _make_watcher(couchdb, queue_size=10)
+        watcher._running = True
+
+        with patch("app.changes_watcher.BACKFILL_LIMIT", 2):
+            await watcher._backfill_pending()
+
+        assert set(watcher._pending) == {f"item:{i}" for i in range(5)}
+        assert watcher.metrics()["backfilled"] == 5
+        # Two full pages and the short one that ends the backfill
+        assert couchdb.find_pages == 3
+
+
+class TestImageStorage:
+    IMAGE = ProcessedImage(
+        full=EncodedImage("image/webp", b"full-image", 1200, 900, 80),
+        thumbnail=EncodedImage("image/webp", b"thumb", 320, 240, 80),
+    )
+
+    def _claimed(self) -> dict:
+        return {**_pending("item:1"), "status": "in_progress", "claimed_by": INSTANCE_ID, "access": ["user:1"]}
+
+    def test_thumbnail_goes_to_item_and_full_image_aside(self) -> None:
+        fields = resolved_image_fields(self.IMAGE)
+        assert fields["image_base64"] == "data:image/webp;base64,dGh1bWI="
+        assert fields["image_full"]["data"] == "ZnVsbC1pbWFnZQ=="
+
+        without_thumbnail = resolved_image_fields(ProcessedImage(full=self.IMAGE.full))
+        assert without_thumbnail == {"image_base64": "data:image/webp;base64,ZnVsbC1pbWFnZQ==", "image_full": None}
+        assert resolved_image_fields(None) == {"image_base64": None, "image_full": None}
+
+    @pytest.mark.anyio
+    async def test_full_image_is_stored_as_attachment_of_its_own_document(self) -> None:
+        couchdb = FakeCouchDB([self._claimed()])
+        watcher = _make_watcher(couchdb)
+        resolved = {"title": "Kettle", **resolved_image_fields(self.IMAGE)}
+
+        await watcher._update_item_resolved(couchdb.docs["item:1"], resolved)
+
+        item = couchdb.docs["item:1"]
+        assert item["status"] == "resolved"
+        assert item["image_base64"] == "data:image/webp;base64,dGh1bWI="
+        assert "image_full" not in item
+        image_doc = couchdb.docs[image_doc_id("item:1")]
+        assert image_doc["_id"] == "item_image:1"
+        assert image_doc["type"] == "item_image"
+        assert image_doc["item_id"] == "item:1"
+        assert image_doc["access"] == ["user:1"]
+        assert image_doc["_attachments"]["image"] == {"content_type": "image/webp", "data": "ZnVsbC1pbWFnZQ=="}
+
+    @pytest.mark.anyio
+    async def test_existing_image_document_is_replaced(self) -> None:
+        couchdb = FakeCouchDB([self._claimed(), {"_id": "item_image:1", "_rev": "3-old", "type": "item_image"}])
+        watcher = _make_watcher(couchdb)
+
+        await watcher._update_item_resolved(couchdb.docs["item:1"], resolved_image_fields(self.IMAGE))
+
+        assert couchdb.docs["item_image:1"]["_rev"] == "4-x"
+        assert couchdb.docs["item_image:1"]["width"] == 1200
+
+
+    @pytest.mark.anyio
+    async def test_cache_hit_fetches_the_image_again(self) -> None:
+        watcher = _make_watcher(FakeCouchDB(), cache=ResolutionCache())
+        resolved = {"title": "Kettle", "image_url": "https://cdn.example.com/k.png", **resolved_image_fields(self.IMAGE)}
+        await watcher.cache.set("https://example.com/k", resolved)
+        fetched: list[tuple[str, str]] = []
+
+        async def fake_fetch_image(url: str, referer: str) -> ProcessedImage:
+            fetched.append((url, referer))
+            return self.IMAGE
+
+        watcher._fetch_image = fake_fetch_image  # type: ignore[method-assign]
+
+        result = await watcher._resolve_url("https://example.com/k")
+
+        assert result == resolved
+        assert fetched == [("https://cdn.example.com/k.png", "https://example.com/k")]
+
+
+async def _idle() -> None:
+    await asyncio.Event().wait()
@@ -0,0 +1,153 @@
+"""
+Unit tests for the single-pass HTML preprocessor.
+
+Tests cover element removal, whitespace collapsing across removed elements,
+truncation, hint and image collection, and parity with the previous
+three-pass pipeline kept in the benchmark.
+"""
+
+from __future__ import annotations
+
+import json
+
+from app.html_benchmark import _legacy
+from app.html_preprocessor import TRUNCATED_MARKER, _CollapsedText, preprocess_html
+
+
+def _product_page(cards: int = 50) -> str:
+    jsonld = json.dumps({"@type": "Product", "name": "Телефон X", "offers": {"price": "93499", "priceCurrency": "RUB"}})
+    parts = [
+        "<!DOCTYPE html><html><head>",
+        '<meta property="og:title" content="Телефон X">',
+        '<meta content="https://cdn.example.com/x.jpg" property="og:image">',
+        f'<script type="application/ld+json">{jsonld}</script>',
+        "<script>var tpl = '<img src=\"/in-script.jpg\">';</script>",
+        "<style>.card { color: red }</style>",
+        "</head><body>",
+    ]
+    for i in range(cards):
+        parts.append(
+            f'<div class="card">\n  <img src="/p/{i}.jpg" alt="item {i}" width="200">'
+            f"  <span>Цена {i} ₽</span>\n<svg><path d=\"M0 0\"/></svg><!-- card {i} --></div>\n"
+        )
+    parts.append('<noscript><img src="/lazy/fallback.jpg"></noscript></body></html>')
+    return "".join(parts)
+
+
+class TestCleanedHtml:
+    def test_drops_non_content_elements(self) -> None:
+        html = (
+            "<div>a<script>x()</script><style>.x{}</style><noscript>js</noscript>"
+            "<svg><path/></svg><!-- note -->b</div>"
+        )
+        assert preprocess_html(html).html == "<div>ab</div>"
+
+    def test_collapses_whitespace_across_removed_elements(self) -> None:
+        html = "<p>a \n <script>x</script> \t <!-- c --> b</p>"
+        assert preprocess_html(html).html == "<p>a b</p>"
+
+    def test_nested_svg_is_removed_whole(self) -> None:
+        html = "<svg><svg><path/></svg><text>icon</text></svg><span>visible</span>"
+        assert preprocess_html(html).html == "<span>visible</span>"
+
+    def test_self_closing_svg_keeps_following_content(self) -> None:
+        assert preprocess_html("<svg/><p>content</p><svg><path/></svg>").html == "<p>content</p>"
+
+    def test_quoted_angle_bracket_in_attribute(self) -> None:
+        html = '<script data-x="a>b">hidden()</script><p>shown</p>'
+        assert preprocess_html(html).html == "<p>shown</p>"
+
+    def test_unclosed_comment_runs_to_end(self) -> None:
+        assert preprocess_html("<p>kept</p><!-- never closed <p>gone</p>").html == "<p>kept</p>"
+
+    def test_truncates_at_max_chars(self) -> None:
+        result = preprocess_html("<p>" + "x " * 1000 + "</p>", max_chars=100).html
+        assert result.endswith(TRUNCATED_MARKER.strip())
+        assert len(result) == 100 + len(TRUNCATED_MARKER)
+
+    def test_accumulator_stops_collecting_past_limit(self) -> None:
+        text = _CollapsedText(10)
+        text.SLICE = 4
+        html = "abcdefgh " * 100
+        text.add(html, 0, len(html))
+        assert text.full
+        assert text.length < 20
+
+
+class TestCollectedData:
+    def test_hints_and_images_come_from_the_same_scan(self) -> None:
+        page = preprocess_html(_product_page(cards=3), base_url="https://shop.example.com/item/1")
+
+        assert page.hints == {
+            "og_title": "Телефон X",
+            "og_image": "https://cdn.example.com/x.jpg",
+            "schema_name": "Телефон X",
+            "schema_price": "93499",
+            "schema_currency": "RUB",
+        }
+        assert [img["src"] for img in page.images] == [
+            "https://shop.example.com/p/0.jpg",
+            "https://shop.example.com/p/1.jpg",
+            "https://shop.example.com/p/2.jpg",
+            "https://shop.example.com/lazy/fallback.jpg",
+        ]
+        assert page.images[0]["alt"] == "item 0"
+
+    def test_jsonld_script_with_extra_attributes(self) -> None:
+        html = '<script id="ld" type="application/ld+json" nonce="x">{"@type": "Product", "name": "P"}</script>'
+        assert preprocess_html(html).hints == {"schema_name": "P"}
+
+    def test_meta_and_images_inside_comments_are_ignored(self) -> None:
+        html = '<!-- <meta property="og:title" content="Old"><img src="/old.jpg"> --><p>x</p>'
+        page = preprocess_html(html)
+        assert page.hints == {}
+        assert page.images == []
+
+    def test_excluded_images_are_filtered(self) -> None:
+        html = '<img src="/logo.png"><img src="/p.jpg" width="20" height="20"><img src="data:image/png;base64,AA"><img src="/ok.jpg">'
+        assert [img["src"] for img in preprocess_html(html).images] == ["/ok.jpg"]
+
+    def test_attribute_entities_are_unescaped(self) -> None:
+        page = preprocess_html('<img src="/a.jpg?x=1&amp;y=2" alt="Tom &amp; Jerry">')
+        assert page.images == [{"src": "/a.jpg?x=1&y=2", "alt": "Tom & Jerry"}]
+
+    def test_empty_input(self) -> None:
+        page = preprocess_html("")
+        assert (page.html, page.hints, page.images) == ("", {}, [])
+
+    def test_structured_data_comes_from_the_same_scan(self) -> None:
+        html = (
+            '<head><meta name="description" content="D"><meta property="og:price:amount" content="10">'
+            '<meta property="og:price:amount" content="99"><link rel="canonical" href="/p/1"></head>'
+            '<script type="application/ld+json">{"@type": "Product", "name": "P"}</script>'
+            '<script>var t = \'<span itemprop="name">In script</span>\';</script>'
+            '<div itemscope itemtype="https://schema.org/Product"><h1 itemprop="name">P &amp; Q</h1>'
+            '<script>var x = 1;</script><img itemprop="image" src="/p.jpg">'
+            '<span itemprop="price" content="10">10 ₽</span><meta itemprop="priceCurrency" content="RUB">'
+            '<span itemprop="brand">B</span> itemprop in text</div>'
+        )
+        page = preprocess_html(html, max_chars=10)
+
+        assert page.jsonld == [{"@type": "Product", "name": "P"}]
+        assert page.meta == {"description": "D", "og:price:amount": "10"}
+        assert page.canonical_url == "/p/1"
+        # In page order, past max_chars, and not from inside scripts
+        assert page.microdata == [("name", "P & Q"), ("image", "/p.jpg"), ("price", "10"), ("pricecurrency", "RUB")]
+
+    def test_microdata_before_product_itemtype_is_ignored(self) -> None:
+        html = '<span itemprop="name">Site</span><div itemtype="http://schema.org/Product"><b itemprop="name">P</b></div>'
+        assert preprocess_html(html).microdata == [("name", "P")]
+
+
+class TestParityWithPreviousPipeline:
+    def test_same_output_as_three_pass_pipeline(self) -> None:
+        html = _product_page()
+        for max_chars in (200, 100000):
+            page = preprocess_html(html, base_url="https://shop.example.com/", max_chars=max_chars)
+            legacy = _legacy(html, base_url="https://shop.example.com/", max_chars=max_chars)
+            assert page.html == legacy["html"]
+            assert page.images == legacy["images"]
+
+    def test_hints_match_for_canonical_markup(self) -> None:
+        html = _product_page(cards=1).replace('<meta content="https://cdn.example.com/x.jpg" property="og:image">', "")
+        assert preprocess_html(html).hints == _legacy(html, base_url="", max_chars=100)["hints"]
@@ -0,0 +1,186 @@
+"""
+Unit tests for content-aware HTML pruning.
+
+Tests cover attribute stripping and wrapper unwrapping, carousel
+collapsing, block ranking inside a token budget, and env configuration.
+"""
+
+from __future__ import annotations
+
+import os
+from unittest.mock import patch
+
+from app.html_optimizer import format_html_for_llm
+from app.html_preprocessor import preprocess_html
+from app.html_pruner import (
+    HtmlPruner,
+    _collapse_ws,
+    _Element,
+    _measure,
+    _serialize,
+    _simplify,
+    _TreeBuilder,
+    load_html_pruner_from_env,
+)
+
+
+def _product_page(filler: int = 40) -> str:
+    parts = ["<html><body>", '<header class="x1f3 site-header"><nav>']
+    parts += [f'<a href="/cat/{i}" class="a9b8c7">Категория {i}</a>' for i in range(40)]
+    parts.append("</nav></header>")
+    parts += [f'<div class="q{i}w"><p>Промо {i} ' + "лорем ипсум " * 30 + "</p></div>" for i in range(filler)]
+    parts.append('<div class="k2j3 product-page"><h1 class="h9x product-title">Смартфон Example X</h1>')
+    parts.append(
+        '<div class="z7 price-block"><span class="price-current">93&nbsp;499 ₽</span>'
+        '<button class="btn add-to-cart">В корзину</button></div>'
+    )
+    parts.append("<h2>Характеристики</h2><table>")
+    parts += [f"<tr><td>Параметр {i}</td><td>Значение {i}</td></tr>" for i in range(10)]
+    parts.append("</table></div>")
+    parts.append('<div class="similar-products"><ul>')
+    parts += [
+        f'<li class="card"><a href="/p/{i}"><img src="/r/{i}.jpg"><span>Товар {i}</span><span>{1000 + i} ₽</span></a></li>'
+        for i in range(20)
+    ]
+    parts.append("</ul></div>")
+    parts.append("<footer>" + "".join(f'<a href="/f/{i}">Ссылка {i}</a>' for i in range(40)) + "</footer>")
+    parts.append("</body></html>")
+    return preprocess_html("".join(parts), max_chars=1_000_000).html
+
+
+class TestStripping:
+    def test_keeps_signal_attributes_and_unwraps_plain_wrappers(self) -> None:
+        html = (
+            '<div class="a1b2c3"><div data-test="x" style="color:red">'
+            '<span class="price-current js-7f" onclick="f()">100 ₽</span></div></div>'
+        )
+        result = HtmlPruner().prune(html)
+        assert result.html == '<span class="price-current">100 ₽</span>'
+
+    def test_unwrapped_neighbours_stay_separated(self) -> None:
+        result = HtmlPruner().prune("<a href='/p'><span>Товар 1</span><span>1000 ₽</span></a>")
+        assert "Товар 1 1000 ₽" in result.html
+
+    def test_keeps_microdata_meta_and_images(self) -> None:
+        html = (
+            '<div itemscope itemtype="https://schema.org/Product"><meta itemprop="price" content="99">'
+            '<meta name="viewport" content="width=device-width"><img src="/a.jpg" alt="A" class="c-1">'
+            '<img src="data:image/gif;base64,AA"></div>'
+        )
+        result = HtmlPruner().prune(html).html
+        assert '<meta itemprop="price" content="99">' in result
+        assert "viewport" not in result
+        assert '<img src="/a.jpg" alt="A">' in result
+        assert "data:image" not in result
+
+    def test_drops_form_controls_but_keeps_buttons(self) -> None:
+        html = '<form><select><option>S</option></select><input type="hidden" value="1"><button>Купить</button></form>'
+        result = HtmlPruner().prune(html).html
+        assert "option" not in result and "input" not in result
+        assert "<button>Купить</button>" in result
+
+    def test_text_is_escaped_on_output(self) -> None:
+        assert HtmlPruner().prune("<p>a &lt;b&gt; &amp; c</p>").html == "<p>a &lt;b&gt; &amp; c</p>"
+
+
+class TestCarousels:
+    def test_collapses_runs_of_listing_items(self) -> None:
+        items = "".join(f'<li class="card"><a href="/p/{i}">Товар {i}</a></li>' for i in range(10))
+        result = HtmlPruner().prune(f"<ul>{items}</ul>")
+        assert result.carousels_collapsed == 1
+        assert "Товар 1" in result.html and "Товар 2" not in result.html
+        assert "[8 similar items omitted]" in result.html
+
+    def test_keeps_spec_rows_without_links_or_images(self) -> None:
+        rows = "".join(f"<tr><td>Параметр {i}</td><td>{i}</td></tr>" for i in range(10))
+        result = HtmlPruner().prune(f"<table>{rows}</table>")
+        assert result.carousels_collapsed == 0
+        assert "Параметр 9" in result.html
+
+
+class TestBudget:
+    def test_small_page_is_sent_whole(self) -> None:
+        html = "<h1>Title</h1><p>Some text</p>"
+        result = HtmlPruner().prune(html)
+        assert result.html == html
+        assert result.blocks_total == 0
+
+    def test_keeps_product_blocks_within_budget(self) -> None:
+        page = _product_page()
+        pruner = HtmlPruner(token_budget=1000)
+        result = pruner.prune(page)
+
+        assert len(result.html) <= pruner.budget_chars
+        assert result.chars_in > 5 * result.chars_out
+        assert '<h1 class="product-title">Смартфон Example X</h1>' in result.html
+        assert "93 499 ₽" in result.html
+        assert "В корзину" in result.html
+        assert "Параметр 9" in result.html
+        # Navigation, recommendations, footer and signal-less filler are dropped.
+        assert "Категория" not in result.html
+        assert "Товар 0" not in result.html
+        assert "Ссылка" not in result.html
+        assert "Промо" not in result.html
+
+    def test_blocks_are_emitted_in_document_order(self) -> None:
+        result = HtmlPruner(token_budget=1000).prune(_product_page())
+        assert result.html.index("Смартфон") < result.html.index("93 499") < result.html.index("Характеристики")
+
+    def test_metrics(self) -> None:
+        pruner = HtmlPruner(token_budget=1000)
+        pruner.prune(_product_page())
+        metrics = pruner.metrics()
+        assert metrics["calls"] == 1
+        assert metrics["failures"] == 0
+        assert metrics["reduction"] > 5
+
+    def test_format_html_for_llm_uses_pruner(self) -> None:
+        raw = _product_page()
+        pruner = HtmlPruner(token_budget=1000)
+        result = format_html_for_llm(raw, "https://shop.example.com/p/1", "Title", pruner=pruner)
+        assert "Смартфон Example X" in result
+        assert "Категория" not in result
+        assert pruner.calls == 1
+
+
+class TestBlockSizes:
+    def test_bottom_up_sizes_match_serialization(self) -> None:
+        builder = _TreeBuilder()
+        builder.feed(_product_page(filler=5) + '<p class="spec">  a \n <b class="price"> 1 ₽ </b>  </p>')
+        builder.close()
+        _simplify(builder.root)
+        sizes: dict[int, int] = {}
+        _measure(builder.root, sizes)
+
+        def check(el: _Element) -> int:
+            assert sizes[id(el)] == len(_collapse_ws(_serialize(el)))
+            return 1 + sum(check(c) for c in el.children if isinstance(c, _Element))
+
+        assert check(builder.root) > 50
+
+    def test_deep_nesting_is_split_into_blocks(self) -> None:
+        depth = 300
+        html = '<div class="spec"><p>Цена 100 ₽</p><span class="price">опция</span>' * depth + "</div>" * depth
+        pruner = HtmlPruner(token_budget=1000)
+        result = pruner.prune(html)
+
+        assert pruner.failures == 0
+        assert result.blocks_total >= depth
+        assert 0 < result.chars_out <= pruner.budget_chars
+
+
+class TestFromEnv:
+    def test_defaults(self) -> None:
+        with patch.dict(os.environ, {}, clear=True):
+            pruner = load_html_pruner_from_env()
+        assert pruner is not None
+        assert pruner.token_budget == 4000
+        assert pruner.source_chars == 1_000_000
+
+    def test_disabled(self) -> None:
+        with patch.dict(os.environ, {"HTML_PRUNING_ENABLED": "false"}, clear=True):
+            assert load_html_pruner_from_env() is None
+
+    def test_budget_from_env(self) -> None:
+        with patch.dict(os.environ, {"HTML_PRUNING_TOKEN_BUDGET": "8000"}, clear=True):
+            assert load_html_pruner_from_env().token_budget == 8000
@@ -0,0 +1,175 @@
+"""
+Unit tests for direct product image downloads.
+
+Tests cover:
+- Successful download, encoding through the pipeline and referer forwarding
+- Fallback reasons: blocked status, non-image and oversized responses,
+  undecodable bodies and request errors
+- PlaywrightFetcher using the direct path before the screenshot
+- Env configuration
+"""
+
+from __future__ import annotations
+
+import io
+import os
+from pathlib import Path
+from typing import Any, Optional
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from PIL import Image
+
+from app.fetcher import PlaywrightFetcher
+from app.image_fetch import DirectImageFetcher, load_image_fetcher_from_env
+from app.image_pipeline import ImagePipeline
+from app.scrape import PageCaptureConfig
+
+
+def _png(size: tuple[int, int] = (40, 30), mode: str = "RGB") -> bytes:
+    buf = io.BytesIO()
+    Image.new(mode, size, (200, 10, 10) if mode == "RGB" else (0, 0, 0, 0)).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class FakeResponse:
+    def __init__(self, body: bytes, *, status: int = 200, headers: Optional[dict[str, str]] = None) -> None:
+        self.status = status
+        self.headers = {"content-type": "image/png", **(headers or {})}
+        self.url = "https://cdn.shop.com/final.png"
+        self._body = body
+        self.disposed = False
+
+    async def body(self) -> bytes:
+        return self._body
+
+    async def dispose(self) -> None:
+        self.disposed = True
+
+
+class FakeContext:
+    def __init__(self, response: Optional[FakeResponse] = None, error: Optional[Exception] = None) -> None:
+        self.response = response
+        self.error = error
+        self.calls: list[dict[str, Any]] = []
+        self.request = self
+
+    async def get(self, url: str, **kwargs: Any) -> FakeResponse:
+        self.calls.append({"url": url, **kwargs})
+        if self.error is not None:
+            raise self.error
+        assert self.response is not None
+        return self.response
+
+
+class TestDirectImageFetcher:
+    @pytest.mark.anyio
+    async def test_downloads_and_normalizes(self) -> None:
+        response = FakeResponse(_png((3000, 1500)))
+        context = FakeContext(response)
+        fetcher = DirectImageFetcher(pipeline=ImagePipeline(max_dim=600, thumbnail_dim=100))
+
+        fetched = await fetcher.fetch(context, "https://cdn.shop.com/p.png", referer="https://shop.com/p/1")
+
+        assert fetched is not None
+        assert fetched.mime == "image/webp"
+        assert fetched.final_url == "https://cdn.shop.com/final.png"
+        image = Image.open(io.BytesIO(fetched.data))
+        assert image.format == "WEBP"
+        assert image.size == (600, 300)
+        assert Image.open(io.BytesIO(fetched.image.thumbnail.data)).size == (100, 50)
+        assert context.calls[0]["headers"]["Referer"] == "https://shop.com/p/1"
+        assert response.disposed
+        assert fetcher.metrics()["hits"] == 1
+
+    @pytest.mark.parametrize(
+        ("response", "reason"),
+        [
+            (FakeResponse(b"", status=403), "blocked"),
+            (FakeResponse(b"", status=404), "http_error"),
+            (FakeResponse(b"<html>captcha</html>", headers={"content-type": "text/html; charset=utf-8"}), "not_image"),
+            (FakeResponse(b"<svg/>", headers={"content-type": "image/svg+xml"}), "not_image"),
+            (FakeResponse(b"", headers={"content-length": "20000"}), "too_large"),
+            # No content-length: the body itself is checked.
+            (FakeResponse(b"x" * 20000), "too_large"),
+            (FakeResponse(b"not really a png"), "undecodable"),
+        ],
+    )
+    @pytest.mark.anyio
+    async def test_falls_back(self, response: FakeResponse, reason: str) -> None:
+        fetcher = DirectImageFetcher(max_bytes=10000)
+        assert await fetcher.fetch(FakeContext(response), "https://cdn.shop.com/p.png") is None
+        assert fetcher.metrics()["fallback_reasons"] == {reason: 1}
+        assert response.disposed
+
+    @pytest.mark.anyio
+    async def test_request_error_falls_back(self) -> None:
+        fetcher = DirectImageFetcher()
+        context = FakeContext(error=RuntimeError("net::ERR_CONNECTION_RESET"))
+        assert await fetcher.fetch(context, "https://cdn.shop.com/p.png") is None
+        assert fetcher.metrics()["fallback_reasons"] == {"request_error": 1}
+
+
+class TestPlaywrightFetcher:
+    def _fetcher(self, context: FakeContext, image_fetcher: Optional[DirectImageFetcher]) -> PlaywrightFetcher:
+        manager = MagicMock()
+        manager.semaphore = AsyncMock()
+        manager.acquire_context = AsyncMock(return_value=context)
+        manager.release_context = AsyncMock()
+        return PlaywrightFetcher(
+            manager=manager,
+            browser=MagicMock(),
+            storage_state_dir=Path("/tmp"),
+            cfg=PageCaptureConfig(),
+            image_fetcher=image_fetcher,
+        )
+
+    @pytest.mark.anyio
+    async def test_direct_fetch_skips_screenshot(self) -> None:
+        context = FakeContext(FakeResponse(_png()))
+        context.new_page = AsyncMock()
+        fetcher = self._fetcher(context, DirectImageFetcher())
+
+        final_url, mime, b64 = await fetcher.fetch_image_base64(url="https://cdn.shop.com/p.png")
+
+        assert (final_url, mime) == ("https://cdn.shop.com/final.png", "image/webp")
+        assert b64
+        context.new_page.assert_not_called()
+        fetcher.manager.release_context.assert_awaited_once_with(context)
+
+    @pytest.mark.anyio
+    async def test_blocked_download_falls_back_to_screenshot(self) -> None:
+        context = FakeContext(FakeResponse(b"", status=403))
+        page = MagicMock()
+        page.url = "https://cdn.shop.com/p.png"
+        page.goto = AsyncMock(return_value=MagicMock())
+        page.wait_for_load_state = AsyncMock()
+        page.screenshot = AsyncMock(return_value=_png())
+        context.new_page = AsyncMock(return_value=page)
+        context.storage_state = AsyncMock()
+        fetcher = self._fetcher(context, DirectImageFetcher())
+
+        _, mime, b64 = await fetcher.fetch_image_base64(url="https://cdn.shop.com/p.png")
+
+        assert mime == "image/jpeg" and b64
+        page.screenshot.assert_awaited_once()
+
+
+class TestFromEnv:
+    def test_defaults(self) -> None:
+        with patch.dict(os.environ, {}, clear=True):
+            fetcher = load_image_fetcher_from_env()
+        assert fetcher is not None
+        assert fetcher.max_bytes == 10_000_000
+        assert fetcher.pipeline.fmt == "webp"
+
+    def test_disabled(self) -> None:
+        with patch.dict(os.environ, {"IMAGE_DIRECT_FETCH_ENABLED": "no"}, clear=True):
+            assert load_image_fetcher_from_env() is None
+
+    def test_limits_from_env_and_shared_pipeline(self) -> None:
+        pipeline = ImagePipeline()
+        with patch.dict(os.environ, {"IMAGE_MAX_BYTES": "5000000"}, clear=True):
+            fetcher = load_image_fetcher_from_env(pipeline)
+        assert fetcher.max_bytes == 5_000_000
+        assert fetcher.pipeline is pipeline
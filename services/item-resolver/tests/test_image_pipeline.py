@@ -0,0 +1,132 @@
+"""
+Unit tests for the stored image pipeline.
+
+Tests cover:
+- Downscaling, WebP output and alpha flattening
+- Meeting the byte budget by lowering quality, then by shrinking
+- Optional thumbnails
+- Format fallback and env configuration
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import random
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from app.image_pipeline import ImagePipeline, load_image_pipeline_from_env
+
+
+def _noise(size: tuple[int, int], seed: int = 0) -> Image.Image:
+    # Random pixels do not compress, so any byte budget is hard to meet.
+    rnd = random.Random(seed)
+    return Image.frombytes("RGB", size, bytes(rnd.getrandbits(8) for _ in range(size[0] * size[1] * 3)))
+
+
+def _png(image: Image.Image) -> bytes:
+    buf = io.BytesIO()
+    image.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _open(data: bytes) -> Image.Image:
+    return Image.open(io.BytesIO(data))
+
+
+class TestEncoding:
+    def test_downscales_and_encodes_webp(self) -> None:
+        image = ImagePipeline(max_dim=400, thumbnail_dim=0).process(_png(Image.new("RGB", (1600, 800), (10, 120, 200))))
+
+        assert image.full.mime == "image/webp"
+        assert (image.full.width, image.full.height) == (400, 200)
+        decoded = _open(image.full.data)
+        assert decoded.format == "WEBP"
+        assert decoded.size == (400, 200)
+        assert image.thumbnail is None
+
+    def test_transparent_png_is_flattened_on_white(self) -> None:
+        image = ImagePipeline(fmt="jpeg").process(_png(Image.new("RGBA", (40, 30), (0, 0, 0, 0))))
+        decoded = _open(image.full.data)
+        assert decoded.mode == "RGB"
+        assert decoded.getpixel((5, 5))[0] > 240
+
+    def test_rejects_non_images(self) -> None:
+        with pytest.raises(Exception):
+            ImagePipeline().process(b"<html></html>")
+
+
+class TestByteBudget:
+    def test_lowers_quality_to_fit(self) -> None:
+        source = _noise((200, 200))
+        pipeline = ImagePipeline(quality=90, min_quality=10, thumbnail_dim=0)
+        unbounded = len(pipeline._encode(source, 90))
+        pipeline.max_bytes = unbounded * 2 // 3
+
+        image = pipeline.process_image(source)
+
+        assert len(image.full.data) <= pipeline.max_bytes
+        assert 10 <= image.full.quality < 90
+        assert (image.full.width, image.full.height) == (200, 200)
+        assert pipeline.metrics()["reencodes"] > 0
+
+    def test_shrinks_when_lowest_quality_is_too_large(self) -> None:
+        pipeline = ImagePipeline(max_bytes=4000, quality=80, min_quality=70, thumbnail_dim=0)
+        image = pipeline.process_image(_noise((300, 300)))
+
+        assert len(image.full.data) <= 4000
+        assert image.full.width < 300
+        assert pipeline.metrics()["shrunk"] >= 1
+
+    def test_gives_up_at_minimum_size(self) -> None:
+        pipeline = ImagePipeline(max_bytes=10, thumbnail_dim=0)
+        image = pipeline.process_image(_noise((100, 100)))
+
+        assert image.full.quality == pipeline.min_quality
+        assert pipeline.metrics()["over_budget"] == 1
+
+
+class TestThumbnail:
+    def test_thumbnail_has_its_own_size_and_budget(self) -> None:
+        pipeline = ImagePipeline(max_dim=800, thumbnail_dim=120, thumbnail_max_bytes=3000)
+        image = pipeline.process_image(_noise((640, 480)))
+
+        assert (image.full.width, image.full.height) == (640, 480)
+        assert image.thumbnail is not None
+        assert max(image.thumbnail.width, image.thumbnail.height) <= 120
+        assert len(image.thumbnail.data) <= 3000
+        assert image.thumbnail.mime == "image/webp"
+        metrics = pipeline.metrics()
+        assert metrics["images"] == 1
+        assert metrics["avg_thumbnail_bytes"] == len(image.thumbnail.data)
+
+
+class TestConfiguration:
+    def test_unknown_format_is_rejected(self) -> None:
+        with pytest.raises(ValueError):
+            ImagePipeline(fmt="gif")
+
+    def test_unwritable_format_falls_back_to_webp(self) -> None:
+        with patch("app.image_pipeline._can_save", side_effect=lambda fmt: fmt != "avif"):
+            assert ImagePipeline(fmt="avif").fmt == "webp"
+
+    def test_defaults(self) -> None:
+        with patch.dict(os.environ, {}, clear=True):
+            pipeline = load_image_pipeline_from_env()
+        assert pipeline.fmt == "webp"
+        assert pipeline.max_dim == 1600
+        assert pipeline.max_bytes == 250_000
+        assert pipeline.thumbnail_dim == 0
+
+    def test_from_env(self) -> None:
+        env = {"IMAGE_FORMAT": "JPG", "IMAGE_MAX_DIM": "1024", "IMAGE_TARGET_BYTES": "0", "IMAGE_THUMBNAIL_DIM": "320"}
+        with patch.dict(os.environ, env, clear=True):
+            pipeline = load_image_pipeline_from_env()
+        assert pipeline.fmt == "jpeg"
+        assert pipeline.mime == "image/jpeg"
+        assert pipeline.max_dim == 1024
+        assert pipeline.max_bytes == 0
+        assert pipeline.thumbnail_dim == 320
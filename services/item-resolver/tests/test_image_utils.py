@@ -0,0 +1,146 @@
+"""
+Unit tests for screenshot cropping.
+
+Tests cover:
+- Golden bounding boxes for edge projection and largest component, for
+  both the NumPy and the pure-Python implementation
+- Parity of the two implementations on randomly drawn images
+- crop_screenshot_to_content end to end
+"""
+
+from __future__ import annotations
+
+import io
+import random
+
+import pytest
+from PIL import Image, ImageDraw, ImageFilter
+
+from app import image_utils
+from app.image_benchmark import synthetic_screenshot
+from app.image_utils import (
+    _component_bbox_numpy,
+    _component_bbox_python,
+    _downscale,
+    _edge_bbox_numpy,
+    _edge_bbox_python,
+    crop_screenshot_to_content,
+)
+
+
+def _canvas(size: tuple[int, int], bg: tuple[int, ...] = (255, 255, 255)) -> tuple[Image.Image, ImageDraw.ImageDraw]:
+    image = Image.new("RGB", size, bg)
+    return image, ImageDraw.Draw(image)
+
+
+def _golden() -> dict[str, Image.Image]:
+    single, draw = _canvas((400, 300))
+    draw.rectangle((50, 40, 249, 199), fill=(200, 30, 30))
+    two, draw = _canvas((400, 300), (250, 250, 250))
+    draw.rectangle((10, 10, 59, 59), fill=(0, 0, 0))
+    draw.rectangle((200, 100, 299, 249), fill=(0, 0, 255))
+    tie, draw = _canvas((300, 300))
+    draw.rectangle((20, 20, 69, 69), fill=(0, 0, 0))
+    draw.rectangle((200, 200, 249, 249), fill=(0, 0, 0))
+    ring, draw = _canvas((300, 300))
+    draw.ellipse((40, 40, 260, 260), outline=(0, 0, 0), width=3)
+    blank, _ = _canvas((200, 200))
+    return {"single": single, "two": two, "tie": tie, "ring": ring, "blank": blank, "page": synthetic_screenshot(0)}
+
+
+GOLDEN = _golden()
+
+# Recorded with the original per-pixel implementation.
+EDGE_BOXES = {
+    "single": (0, 0, 400, 300),
+    "two": (0, 0, 400, 300),
+    "tie": (0, 0, 300, 300),
+    "ring": (0, 0, 300, 300),
+    "blank": (0, 0, 200, 200),
+    "page": (0, 0, 1280, 4000),
+}
+COMPONENT_BOXES = {
+    "single": (49, 38, 250, 201),
+    "two": (198, 98, 301, 250),
+    # Equal areas: the component met first in raster order wins.
+    "tie": (19, 19, 70, 70),
+    "ring": (39, 39, 260, 260),
+    "blank": None,
+    "page": (0, 72, 1272, 4000),
+}
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def use_numpy(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> bool:
+    monkeypatch.setattr(image_utils, "NUMPY_AVAILABLE", request.param)
+    return request.param
+
+
+class TestGoldenBoxes:
+    @pytest.mark.parametrize("name", sorted(GOLDEN))
+    def test_edge_projection(self, use_numpy: bool, name: str) -> None:
+        assert image_utils._bbox_from_edge_projection(GOLDEN[name]) == EDGE_BOXES[name]
+
+    @pytest.mark.parametrize("name", sorted(GOLDEN))
+    def test_largest_component(self, use_numpy: bool, name: str) -> None:
+        assert image_utils._bbox_from_largest_component(GOLDEN[name]) == COMPONENT_BOXES[name]
+
+
+def _random_image(rnd: random.Random) -> Image.Image:
+    width, height = rnd.randint(5, 260), rnd.randint(5, 260)
+    image, draw = _canvas((width, height), tuple(rnd.randint(0, 255) for _ in range(3)))
+    for _ in range(rnd.randint(0, 25)):
+        x0, y0 = rnd.randint(0, width - 1), rnd.randint(0, height - 1)
+        x1 = min(width - 1, x0 + rnd.randint(0, width // 2))
+        y1 = min(height - 1, y0 + rnd.randint(0, height // 2))
+        box = (x0, y0, x1, y1)
+        color = tuple(rnd.randint(0, 255) for _ in range(3))
+        shape = rnd.random()
+        if shape < 0.4:
+            draw.rectangle(box, fill=color)
+        elif shape < 0.7:
+            draw.line(box, fill=color, width=rnd.randint(1, 4))
+        else:
+            draw.ellipse(box, outline=color)
+    for _ in range(rnd.randint(0, 300) if rnd.random() < 0.3 else 0):
+        image.putpixel((rnd.randint(0, width - 1), rnd.randint(0, height - 1)), (rnd.randint(0, 255),) * 3)
+    return image
+
+
+class TestParity:
+    def test_numpy_matches_python_on_random_images(self) -> None:
+        rnd = random.Random(1234)
+        for _ in range(150):
+            image = _random_image(rnd)
+            small, _ = _downscale(image, 220)
+            assert _component_bbox_numpy(small, 30) == _component_bbox_python(small, 30)
+            edges = _downscale(image, 300)[0].convert("L").filter(ImageFilter.FIND_EDGES)
+            assert _edge_bbox_numpy(edges, 40) == _edge_bbox_python(edges, 40)
+
+    def test_snake_component(self) -> None:
+        # One long winding component links many runs through a chain of rows.
+        image, draw = _canvas((120, 120))
+        for i, y in enumerate(range(2, 114, 4)):
+            draw.line((2, y, 117, y), fill=(0, 0, 0))
+            x = 117 if i % 2 == 0 else 2
+            draw.line((x, y, x, y + 4), fill=(0, 0, 0))
+        assert _component_bbox_numpy(image, 30) == _component_bbox_python(image, 30) == (2, 2, 118, 115)
+
+
+class TestCropScreenshot:
+    def test_crops_to_content_and_encodes_jpeg(self, use_numpy: bool) -> None:
+        image, draw = _canvas((400, 300))
+        draw.rectangle((50, 40, 249, 199), fill=(200, 30, 30))
+        buf = io.BytesIO()
+        image.save(buf, format="PNG")
+
+        cropped = Image.open(io.BytesIO(crop_screenshot_to_content(buf.getvalue())))
+        assert cropped.format == "JPEG"
+        assert cropped.size == (400, 300)
+
+    def test_transparent_png_is_flattened_on_white(self) -> None:
+        image = Image.new("RGBA", (50, 50), (0, 0, 0, 0))
+        buf = io.BytesIO()
+        image.save(buf, format="PNG")
+        cropped = Image.open(io.BytesIO(crop_screenshot_to_content(buf.getvalue())))
+        assert cropped.getpixel((25, 25))[0] > 240
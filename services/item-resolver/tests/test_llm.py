@@ -9,22 +9,32 @@ Tests cover:
 - StubLLMClient
 - load_llm_client_from_env factory
 - DeepSeekTextClient with mocked HTTP
+- Pooled HTTP client lifecycle and latency metrics
+- Streaming completions: early stop, output token budget, JSON object scanner
+- Cache-friendly prompt layout and token usage / cost metrics
 """
 
 from __future__ import annotations
 
+import asyncio
 import json as json_module
 import os
 from contextlib import asynccontextmanager
-from typing import Any
+from typing import Any, Optional
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
 import pytest
 
 from app.llm import (
+    TEXT_SYSTEM_PROMPT,
+    TEXT_USER_PREFIX,
+    VISION_SYSTEM_PROMPT,
+    VISION_USER_PREFIX,
     DeepSeekTextClient,
     LLMOutput,
+    LLMPricing,
+    LLMUsageStats,
     OpenAILikeClient,
     StubLLMClient,
     _default_canonical_url,
@@ -521,14 +531,16 @@ def create_mock_response(
     raise_error: Exception | None = None,
 ) -> tuple[MagicMock, list[dict[str, Any]]]:
     """
-    Create a mock httpx.AsyncClient that captures requests and returns mocked responses.
+    Create a mock httpx.AsyncClient class whose instances capture requests and return mocked responses.
 
     Returns:
         A tuple of (mock_client_class, captured_requests_list)
     """
     captured_requests: list[dict[str, Any]] = []
 
-    async def mock_post(url: str, json: dict[str, Any], headers: dict[str, str]) -> MagicMock:
+    async def mock_post(
+        url: str, json: dict[str, Any], headers: dict[str, str], extensions: dict[str, Any] | None = None
+    ) -> MagicMock:
         captured_requests.append({"url": url, "json": json, "headers": headers})
 
         if raise_error:
@@ -549,16 +561,14 @@ def create_mock_response(
         mock_resp.json.return_value = json_data or {}
         return mock_resp
 
-    @asynccontextmanager
-    async def mock_context(*args: Any, **kwargs: Any):
+    def make_client(*args: Any, **kwargs: Any) -> MagicMock:
         mock_client = MagicMock()
         mock_client.post = mock_post
-        yield mock_client
+        mock_client.is_closed = False
+        mock_client.aclose = AsyncMock()
+        return mock_client
 
-    mock_class = MagicMock()
-    mock_class.return_value.__aenter__ = mock_context().__aenter__
-    mock_class.return_value.__aexit__ = mock_context().__aexit__
-    mock_class.side_effect = lambda *args, **kwargs: mock_context()
+    mock_class = MagicMock(side_effect=make_client)
 
     return mock_class, captured_requests
 
@@ -953,3 +963,366 @@ class TestOpenAILikeClient:
         # Image candidates truncated to max_chars (500)
         assert "z" * 500 in user_text
         assert "z" * 501 not in user_text
+
+
+# =============================================================================
+# Pooled HTTP client tests
+# =============================================================================
+
+
+def _text_client(**kwargs: Any) -> DeepSeekTextClient:
+    return DeepSeekTextClient(
+        base_url="https://api.deepseek.com",
+        api_key="test-key",
+        model="deepseek-chat",
+        timeout_s=30,
+        max_chars=10000,
+        **kwargs,
+    )
+
+
+class TestPooledHttpClient:
+    """The HTTP client is created once, reused across calls and closed explicitly."""
+
+    OK = {"choices": [{"message": {"content": '{"title": "Pooled", "confidence": 0.5}'}}]}
+
+    async def _extract(self, client: DeepSeekTextClient) -> LLMOutput:
+        return await client.extract(url="https://shop.com/p", title="T", image_candidates="", html_content="<p>x</p>")
+
+    @pytest.mark.anyio
+    async def test_client_is_reused_across_calls(self) -> None:
+        mock_class, captured = create_mock_response(200, self.OK)
+        client = _text_client()
+
+        with patch("app.llm.httpx.AsyncClient", mock_class):
+            for _ in range(3):
+                await self._extract(client)
+
+        assert len(captured) == 3
+        assert mock_class.call_count == 1
+        kwargs = mock_class.call_args.kwargs
+        assert kwargs["base_url"] == "https://api.deepseek.com"
+        assert kwargs["limits"].max_keepalive_connections == 20
+        assert kwargs["limits"].keepalive_expiry == 60.0
+
+    @pytest.mark.anyio
+    async def test_aclose_closes_and_next_call_reopens(self) -> None:
+        mock_class, _ = create_mock_response(200, self.OK)
+        client = _text_client()
+
+        with patch("app.llm.httpx.AsyncClient", mock_class):
+            await self._extract(client)
+            http = client._client
+            await client.aclose()
+            http.aclose.assert_awaited_once()
+            await self._extract(client)
+
+        assert mock_class.call_count == 2
+
+    @pytest.mark.anyio
+    async def test_aclose_without_client_is_noop(self) -> None:
+        await _text_client().aclose()
+
+    @pytest.mark.anyio
+    async def test_http2_falls_back_without_h2(self) -> None:
+        mock_class, _ = create_mock_response(200, self.OK)
+        client = _text_client(http2=True)
+
+        with patch("app.llm.HTTP2_AVAILABLE", False), patch("app.llm.httpx.AsyncClient", mock_class):
+            await self._extract(client)
+            assert client.metrics()["http2"] is False
+
+        assert mock_class.call_args.kwargs["http2"] is False
+
+    @pytest.mark.anyio
+    async def test_records_connect_ttfb_and_total(self) -> None:
+        async def post(url: str, json: dict, headers: dict, extensions: dict) -> MagicMock:
+            trace = extensions["trace"]
+            if not post.connected:
+                await trace("connection.connect_tcp.started", {})
+                await trace("connection.connect_tcp.complete", {})
+                await trace("connection.start_tls.complete", {})
+                post.connected = True
+            await trace("http2.send_request_headers.started", {})
+            await trace("http2.receive_response_headers.complete", {})
+            resp = MagicMock()
+            resp.json.return_value = self.OK
+            return resp
+
+        post.connected = False
+        http = MagicMock(is_closed=False, post=post)
+        client = _text_client()
+
+        with patch("app.llm.httpx.AsyncClient", MagicMock(return_value=http)):
+            await self._extract(client)
+            await self._extract(client)
+
+        metrics = client.metrics()
+        assert metrics["requests"] == 2
+        assert metrics["failures"] == 0
+        assert metrics["new_connections"] == 1
+        assert metrics["reused_connections"] == 1
+        assert metrics["avg_ttfb_ms"] >= 0
+        assert metrics["avg_total_ms"] >= metrics["avg_ttfb_ms"]
+
+    @pytest.mark.anyio
+    async def test_failures_are_counted(self) -> None:
+        mock_class, _ = create_mock_response(500, {})
+        client = _text_client()
+
+        with patch("app.llm.httpx.AsyncClient", mock_class):
+            with pytest.raises(httpx.HTTPStatusError):
+                await self._extract(client)
+
+        assert client.metrics()["failures"] == 1
+
+    def test_pool_settings_from_env(self) -> None:
+        env = {
+            "LLM_MODE": "live",
+            "LLM_BASE_URL": "https://api.deepseek.com",
+            "LLM_API_KEY": "k",
+            "LLM_MODEL": "deepseek-chat",
+            "LLM_HTTP2": "false",
+            "LLM_MAX_CONNECTIONS": "5",
+            "LLM_KEEPALIVE_S": "30",
+        }
+        with patch.dict(os.environ, env, clear=True):
+            client = load_llm_client_from_env()
+
+        assert isinstance(client, DeepSeekTextClient)
+        assert client.http2 is False
+        assert client.max_connections == 5
+        assert client.keepalive_s == 30.0
+
+
+# =============================================================================
+# Streaming tests
+# =============================================================================
+
+
+def _sse(*pieces: str, done: bool = True) -> list[str]:
+    lines = [": keep-alive", ""]
+    for piece in pieces:
+        lines.append("data: " + json_module.dumps({"choices": [{"delta": {"content": piece}}]}))
+        lines.append("")
+    if done:
+        lines.append("data: [DONE]")
+    return lines
+
+
+class FakeStreamingHttp:
+    """Stands in for httpx.AsyncClient.stream(); records how many SSE lines were consumed."""
+
+    def __init__(self, lines: list[str], status_code: int = 200, stall_after: Optional[int] = None) -> None:
+        self.lines = lines
+        self.status_code = status_code
+        self.stall_after = stall_after
+        self.consumed = 0
+        self.closed_early = False
+        self.requests: list[dict[str, Any]] = []
+        self.is_closed = False
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs: Any):
+        self.requests.append({"method": method, "url": url, **kwargs})
+        http = self
+
+        class Response:
+            status_code = http.status_code
+
+            def raise_for_status(self) -> None:
+                if self.status_code >= 400:
+                    raise httpx.HTTPStatusError("error", request=MagicMock(), response=MagicMock())
+
+            async def aiter_lines(self):
+                for line in http.lines:
+                    if http.consumed == http.stall_after:
+                        # The model keeps generating slowly after the object.
+                        await asyncio.sleep(10)
+                    http.consumed += 1
+                    yield line
+
+        try:
+            yield Response()
+        finally:
+            self.closed_early = self.consumed < len(self.lines)
+
+
+class TestStreaming:
+    async def _extract(self, http: FakeStreamingHttp, **kwargs: Any) -> LLMOutput:
+        client = _text_client(stream=True, **kwargs)
+        with patch("app.llm.httpx.AsyncClient", MagicMock(return_value=http)):
+            try:
+                return await client.extract(url="https://shop.com/p", title="T", image_candidates="", html_content="x")
+            finally:
+                self.metrics = client.metrics()
+
+    @pytest.mark.anyio
+    async def test_returns_at_closing_brace_and_cancels_stream(self) -> None:
+        lines = _sse(
+            '```json\n{"title": "Str', 'eamed {x}", "price_amount": 10', ', "confidence": 0.9}', "\n```\nThe price was found in ..."
+        )
+        http = FakeStreamingHttp(lines, stall_after=lines.index(next(l for l in lines if "```\\nThe" in l)))
+        out = await self._extract(http, usage_grace_s=0.05)
+
+        assert out.title == "Streamed {x}"
+        assert out.price_amount == 10
+        assert http.closed_early
+        assert self.metrics["streamed"] == 1
+        assert self.metrics["early_stops"] == 1
+        request = http.requests[0]
+        assert request["method"] == "POST"
+        assert request["json"]["stream"] is True
+        assert request["json"]["max_tokens"] == 1024
+
+    @pytest.mark.anyio
+    async def test_aborts_when_output_exceeds_token_budget(self) -> None:
+        http = FakeStreamingHttp(_sse('{"description": "', *(["blah "] * 50)))
+        with pytest.raises(ValueError, match="token budget"):
+            await self._extract(http, max_output_tokens=10)
+        assert http.closed_early
+        assert self.metrics["budget_aborts"] == 1
+        assert self.metrics["failures"] == 1
+
+    @pytest.mark.anyio
+    async def test_rambling_without_json_is_cancelled(self) -> None:
+        http = FakeStreamingHttp(_sse(*(["Let me think about this product. "] * 200)))
+        with pytest.raises(ValueError, match="no json object found"):
+            await self._extract(http)
+        assert http.closed_early
+
+    @pytest.mark.anyio
+    async def test_incomplete_object_at_end_of_stream_fails_to_parse(self) -> None:
+        http = FakeStreamingHttp(_sse('{"title": "cut'))
+        with pytest.raises(ValueError):
+            await self._extract(http)
+
+    @pytest.mark.anyio
+    async def test_http_error_is_raised(self) -> None:
+        with pytest.raises(httpx.HTTPStatusError):
+            await self._extract(FakeStreamingHttp([], status_code=429))
+
+    def test_streaming_enabled_by_default_from_env(self) -> None:
+        env = {"LLM_BASE_URL": "https://api.deepseek.com", "LLM_API_KEY": "k", "LLM_MODEL": "deepseek-chat"}
+        with patch.dict(os.environ, env, clear=True):
+            client = load_llm_client_from_env()
+        assert client.stream is True
+        with patch.dict(os.environ, {**env, "LLM_STREAM": "false", "LLM_MAX_OUTPUT_TOKENS": "300"}, clear=True):
+            client = load_llm_client_from_env()
+        assert client.stream is False
+        assert client.max_output_tokens == 300
+
+
+class TestJsonObjectScanner:
+    def test_braces_and_escaped_quotes_inside_strings(self) -> None:
+        from app.llm import _JsonObjectScanner
+
+        scanner = _JsonObjectScanner()
+        assert scanner.feed('{"a": "} \\" {"') is None
+        assert scanner.feed(', "b": {"c": 1}}') == '{"a": "} \\" {", "b": {"c": 1}}'
+
+
+# =============================================================================
+# Prompt layout and usage metrics tests
+# =============================================================================
+
+
+class TestPromptPrefixCaching:
+    async def _messages(self, client: Any, **kwargs: Any) -> list[dict[str, Any]]:
+        mock_class, captured = create_mock_response(200, TestPooledHttpClient.OK)
+        with patch("app.llm.httpx.AsyncClient", mock_class):
+            await client.extract(image_candidates="", **kwargs)
+        return captured[0]["json"]["messages"]
+
+    @pytest.mark.anyio
+    async def test_text_prompt_prefix_is_identical_across_pages(self) -> None:
+        first = await self._messages(_text_client(), url="https://a.com/1", title="A", html_content="<p>a</p>")
+        second = await self._messages(_text_client(), url="https://b.com/2", title="B", html_content="<p>b</p>")
+
+        assert first[0] == second[0] == {"role": "system", "content": TEXT_SYSTEM_PROMPT}
+        for messages in (first, second):
+            user = messages[1]["content"]
+            assert user.startswith(TEXT_USER_PREFIX)
+            # Per-page data goes last.
+            assert user.index("Page content:") < user.index("URL: ")
+
+    @pytest.mark.anyio
+    async def test_vision_prompt_prefix_is_static(self) -> None:
+        client = OpenAILikeClient(
+            base_url="https://api.openai.com", api_key="k", model="gpt-4o", timeout_s=30, max_chars=1000
+        )
+        messages = await self._messages(
+            client, url="https://a.com/1", title="A", image_base64="AA", image_mime="image/png"
+        )
+        assert messages[0]["content"] == VISION_SYSTEM_PROMPT
+        assert messages[1]["content"][0]["text"].startswith(VISION_USER_PREFIX)
+
+
+class TestUsageMetrics:
+    DEEPSEEK_USAGE = {
+        "prompt_tokens": 3000,
+        "prompt_cache_hit_tokens": 1000,
+        "prompt_cache_miss_tokens": 2000,
+        "completion_tokens": 100,
+    }
+
+    @pytest.mark.anyio
+    async def test_records_deepseek_cache_hits_and_cost(self) -> None:
+        body = {**TestPooledHttpClient.OK, "usage": self.DEEPSEEK_USAGE}
+        mock_class, _ = create_mock_response(200, body)
+        client = _text_client(pricing=LLMPricing(input_per_mtok=0.27, cached_input_per_mtok=0.07, output_per_mtok=1.1))
+
+        with patch("app.llm.httpx.AsyncClient", mock_class):
+            await client.extract(url="https://a.com", title="A", image_candidates="", html_content="x")
+            await client.extract(url="https://a.com", title="A", image_candidates="", html_content="x")
+
+        usage = client.metrics()["usage"]
+        assert usage["responses"] == 2
+        assert usage["prompt_tokens"] == 6000
+        assert usage["cached_prompt_tokens"] == 2000
+        assert usage["uncached_prompt_tokens"] == 4000
+        assert usage["prompt_cache_hit_ratio"] == 0.333
+        # (2000 * 0.27 + 1000 * 0.07 + 100 * 1.1) / 1e6 per call
+        assert usage["avg_cost_per_call_usd"] == pytest.approx(0.00072)
+        assert usage["cost_usd"] == pytest.approx(0.00144)
+
+    def test_openai_cached_tokens(self) -> None:
+        stats = LLMUsageStats()
+        usage = {"prompt_tokens": 2048, "prompt_tokens_details": {"cached_tokens": 1024}, "completion_tokens": 50}
+        stats.record(usage, LLMPricing())
+        assert stats.cached_prompt_tokens == 1024
+        assert stats.to_dict()["cost_usd"] == 0.0
+
+    def test_missing_usage_is_counted_separately(self) -> None:
+        stats = LLMUsageStats()
+        stats.record(None, LLMPricing())
+        assert stats.to_dict()["usage_missing"] == 1
+        assert stats.to_dict()["responses"] == 0
+
+    @pytest.mark.anyio
+    async def test_streamed_usage_chunk_is_read_after_the_object(self) -> None:
+        lines = _sse('{"title": "S"}', done=False)
+        lines += ["data: " + json_module.dumps({"choices": [], "usage": self.DEEPSEEK_USAGE}), "", "data: [DONE]"]
+        http = FakeStreamingHttp(lines)
+        client = _text_client(stream=True)
+
+        with patch("app.llm.httpx.AsyncClient", MagicMock(return_value=http)):
+            await client.extract(url="https://a.com", title="A", image_candidates="", html_content="x")
+
+        assert http.requests[0]["json"]["stream_options"] == {"include_usage": True}
+        metrics = client.metrics()
+        assert metrics["usage"]["cached_prompt_tokens"] == 1000
+        assert metrics["early_stops"] == 0
+
+    def test_prices_from_env(self) -> None:
+        env = {
+            "LLM_BASE_URL": "https://api.deepseek.com",
+            "LLM_API_KEY": "k",
+            "LLM_MODEL": "deepseek-chat",
+            "LLM_PRICE_INPUT_PER_MTOK": "0.27",
+            "LLM_PRICE_CACHED_INPUT_PER_MTOK": "0.07",
+            "LLM_PRICE_OUTPUT_PER_MTOK": "1.1",
+        }
+        with patch.dict(os.environ, env, clear=True):
+            client = load_llm_client_from_env()
+        assert client.pricing == LLMPricing(0.27, 0.07, 1.1)
@@ -0,0 +1,232 @@
+"""
+Unit tests for the LLM provider fallback chain.
+
+Tests cover:
+- Hedging to the next provider when the first one is slow
+- Immediate fallback on failure and exhausting the chain
+- Latency percentile driven hedge delays
+- Circuit breaker open / half-open / close transitions
+- Env configuration of fallback providers
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Any, Optional
+from unittest.mock import patch
+
+import pytest
+
+from app.llm import DeepSeekTextClient, LLMOutput, OpenAILikeClient, load_llm_client_from_env
+from app.llm_fallback import CLOSED, HALF_OPEN, OPEN, FallbackLLMClient, ProviderHealth
+
+
+class FakeProvider:
+    def __init__(self, title: str, *, delay_s: float = 0.0, error: Optional[Exception] = None) -> None:
+        self.title = title
+        self.delay_s = delay_s
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+        self.closed = False
+
+    async def extract(self, **kwargs: Any) -> LLMOutput:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay_s)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return LLMOutput(title=self.title)
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+    def metrics(self) -> dict[str, Any]:
+        return {"requests": self.calls}
+
+
+async def _extract(client: FallbackLLMClient) -> LLMOutput:
+    return await client.extract(url="https://shop.com/p", title="T", image_candidates="")
+
+
+class TestHedging:
+    @pytest.mark.anyio
+    async def test_fast_primary_is_not_hedged(self) -> None:
+        primary, backup = FakeProvider("primary"), FakeProvider("backup")
+        client = FallbackLLMClient([("a", primary), ("b", backup)], hedge_after_s=0.5)
+
+        assert (await _extract(client)).title == "primary"
+        assert backup.calls == 0
+
+    @pytest.mark.anyio
+    async def test_slow_primary_is_hedged_and_loser_cancelled(self) -> None:
+        primary, backup = FakeProvider("primary", delay_s=5), FakeProvider("backup", delay_s=0.01)
+        client = FallbackLLMClient([("a", primary), ("b", backup)], hedge_after_s=0.05)
+
+        assert (await _extract(client)).title == "backup"
+        assert primary.cancelled == 1
+        metrics = client.metrics()["providers"]
+        assert metrics["b"]["hedged"] == 1
+        assert metrics["b"]["wins"] == 1
+        assert metrics["a"]["cancelled"] == 1
+        # A lost race is not a failure.
+        assert metrics["a"]["failures"] == 0
+
+    @pytest.mark.anyio
+    async def test_primary_can_still_win_after_hedge(self) -> None:
+        primary, backup = FakeProvider("primary", delay_s=0.08), FakeProvider("backup", delay_s=5)
+        client = FallbackLLMClient([("a", primary), ("b", backup)], hedge_after_s=0.02)
+
+        assert (await _extract(client)).title == "primary"
+        assert backup.calls == 1
+        assert backup.cancelled == 1
+
+    def test_hedge_delay_follows_latency_percentile(self) -> None:
+        client = FallbackLLMClient([("a", FakeProvider("a"))], hedge_after_s=15, min_samples=20)
+        health = client.health["a"]
+        for ms in range(100, 2100, 100):
+            health.record_success(float(ms))
+        assert client.hedge_delay_s("a") == 2.0
+        client.hedge_quantile = 0.5
+        assert client.hedge_delay_s("a") == 1.1
+
+    def test_default_hedge_delay_until_enough_samples(self) -> None:
+        client = FallbackLLMClient([("a", FakeProvider("a"))], hedge_after_s=15, min_samples=20)
+        client.health["a"].record_success(100.0)
+        assert client.hedge_delay_s("a") == 15
+
+
+class TestFallback:
+    @pytest.mark.anyio
+    async def test_failure_moves_to_next_provider_immediately(self) -> None:
+        primary = FakeProvider("primary", error=ValueError("no json object found"))
+        backup = FakeProvider("backup")
+        client = FallbackLLMClient([("a", primary), ("b", backup)], hedge_after_s=60)
+
+        assert (await asyncio.wait_for(_extract(client), timeout=1)).title == "backup"
+        assert client.health["a"].failures == 1
+
+    @pytest.mark.anyio
+    async def test_raises_last_error_when_all_fail(self) -> None:
+        client = FallbackLLMClient(
+            [("a", FakeProvider("a", error=ValueError("a"))), ("b", FakeProvider("b", error=RuntimeError("b")))]
+        )
+        with pytest.raises(RuntimeError, match="b"):
+            await _extract(client)
+        assert client.metrics()["exhausted"] == 1
+
+    def test_requires_a_provider(self) -> None:
+        with pytest.raises(ValueError):
+            FallbackLLMClient([])
+
+
+class TestCircuitBreaker:
+    @pytest.mark.anyio
+    async def test_opens_after_consecutive_failures_and_skips_provider(self) -> None:
+        primary = FakeProvider("primary", error=ValueError("down"))
+        backup = FakeProvider("backup")
+        client = FallbackLLMClient([("a", primary), ("b", backup)], failure_threshold=2, cooldown_s=60)
+
+        await _extract(client)
+        await _extract(client)
+        assert client.health["a"].state == OPEN
+
+        await _extract(client)
+        assert primary.calls == 2
+        assert backup.calls == 3
+
+    def test_half_open_probe_closes_or_reopens(self) -> None:
+        health = ProviderHealth("a")
+        health.record_failure(100.0, failure_threshold=1)
+        assert health.state == OPEN
+        assert not health.available(110.0, cooldown_s=30)
+        assert health.available(131.0, cooldown_s=30)
+        assert health.state == HALF_OPEN
+
+        health.record_failure(132.0, failure_threshold=5)
+        assert health.state == OPEN
+        assert health.opened_at == 132.0
+
+        assert health.available(170.0, cooldown_s=30)
+        health.record_success(200.0)
+        assert health.state == CLOSED
+        assert health.consecutive_failures == 0
+
+    def test_only_one_probe_at_a_time(self) -> None:
+        health = ProviderHealth("a", state=HALF_OPEN, probe_in_flight=True)
+        assert not health.available(0.0, cooldown_s=30)
+
+    @pytest.mark.anyio
+    async def test_concurrent_calls_send_a_single_probe(self) -> None:
+        primary = FakeProvider("primary", delay_s=0.05)
+        backup = FakeProvider("backup")
+        client = FallbackLLMClient([("a", primary), ("b", backup)], hedge_after_s=60, cooldown_s=30)
+        client.health["a"].record_failure(0.0, failure_threshold=1)
+
+        results = await asyncio.gather(*(_extract(client) for _ in range(5)))
+
+        # One call probes the half-open primary, the others go straight to the backup.
+        assert primary.calls == 1
+        assert backup.calls == 4
+        assert sorted(r.title for r in results) == ["backup"] * 4 + ["primary"]
+        assert client.health["a"].state == CLOSED
+        assert not client.health["a"].probe_in_flight
+
+    @pytest.mark.anyio
+    async def test_all_open_still_tries_chain(self) -> None:
+        primary = FakeProvider("primary")
+        client = FallbackLLMClient([("a", primary)], cooldown_s=60)
+        client.health["a"].record_failure(1e12, failure_threshold=1)
+
+        assert (await _extract(client)).title == "primary"
+        assert client.health["a"].state == CLOSED
+
+
+class TestLifecycle:
+    @pytest.mark.anyio
+    async def test_aclose_closes_every_provider(self) -> None:
+        providers = [("a", FakeProvider("a")), ("b", FakeProvider("b"))]
+        await FallbackLLMClient(providers).aclose()
+        assert all(p.closed for _, p in providers)
+
+    def test_metrics_include_provider_http_metrics(self) -> None:
+        metrics = FallbackLLMClient([("a", FakeProvider("a"))], hedge_after_s=2).metrics()
+        assert metrics["providers"]["a"]["http"] == {"requests": 0}
+        assert metrics["providers"]["a"]["hedge_after_ms"] == 2000
+
+
+class TestFromEnv:
+    BASE = {"LLM_BASE_URL": "https://api.deepseek.com", "LLM_API_KEY": "k", "LLM_MODEL": "deepseek-chat"}
+
+    def test_single_provider_without_fallbacks(self) -> None:
+        with patch.dict(os.environ, self.BASE, clear=True):
+            assert isinstance(load_llm_client_from_env(), DeepSeekTextClient)
+
+    def test_fallback_chain_inherits_primary_settings(self) -> None:
+        env = {
+            **self.BASE,
+            "LLM_FALLBACK_1_MODEL": "deepseek-reasoner",
+            "LLM_FALLBACK_2_MODEL": "gpt-4o-mini",
+            "LLM_FALLBACK_2_BASE_URL": "https://api.openai.com",
+            "LLM_FALLBACK_2_API_KEY": "other",
+            "LLM_HEDGE_AFTER_S": "8",
+            "LLM_CIRCUIT_FAILURES": "5",
+        }
+        with patch.dict(os.environ, env, clear=True):
+            client = load_llm_client_from_env()
+
+        assert isinstance(client, FallbackLLMClient)
+        names = [name for name, _ in client.providers]
+        assert names == ["primary:deepseek-chat", "fallback_1:deepseek-reasoner", "fallback_2:gpt-4o-mini"]
+        second, third = client.providers[1][1], client.providers[2][1]
+        assert isinstance(second, DeepSeekTextClient)
+        assert second.base_url == "https://api.deepseek.com"
+        assert second.api_key == "k"
+        assert isinstance(third, OpenAILikeClient)
+        assert third.base_url == "https://api.openai.com"
+        assert client.hedge_after_s == 8
+        assert client.failure_threshold == 5
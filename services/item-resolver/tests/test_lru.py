@@ -0,0 +1,31 @@
+"""Unit tests for the bounded LRU mapping."""
+
+from __future__ import annotations
+
+from app.lru import LRUDict
+
+
+class TestLRUDict:
+    def test_evicts_least_recently_used(self) -> None:
+        lru: LRUDict[str, int] = LRUDict(2)
+        lru["a"] = 1
+        lru["b"] = 2
+        assert lru.touch("a") == 1
+        lru["c"] = 3
+
+        assert list(lru) == ["a", "c"]
+
+    def test_increment_counts_and_bounds(self) -> None:
+        lru: LRUDict[str, int] = LRUDict(2)
+        for key in ("a", "b", "a", "c"):
+            lru.increment(key)
+
+        assert dict(lru) == {"a": 2, "c": 1}
+
+    def test_setdefault_recent_creates_once(self) -> None:
+        lru: LRUDict[str, list[int]] = LRUDict(2)
+        lru.setdefault_recent("a", list).append(1)
+        lru.setdefault_recent("a", list).append(2)
+
+        assert lru["a"] == [1, 2]
+        assert lru.touch("missing") is None
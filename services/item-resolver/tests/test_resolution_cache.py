@@ -0,0 +1,299 @@
+"""Unit tests for the resolution cache.
+
+Tests cover:
+- URL normalization (tracking params, host case, fragments)
+- LRU eviction and TTL expiry
+- Per-domain TTL policy
+- CouchDB-backed shared tier and purging of its expired documents
+- Image payloads left out of cached results
+- /resolver/v1/resolve short-circuit on cache hit, refetching the image
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.couchdb import ConflictError, DocumentNotFoundError
+from app.main import create_app
+from app.resolution_cache import (
+    ResolutionCache,
+    _parse_domain_ttls,
+    is_cacheable,
+    normalize_url,
+)
+
+
+RESULT = {
+    "title": "Cached Product",
+    "description": None,
+    "price_amount": 1990.0,
+    "price_currency": "RUB",
+    "canonical_url": "https://shop.example.com/p/1",
+    "confidence": 0.9,
+    "image_url": None,
+    "image_base64": None,
+}
+
+
+class FakeSharedStore:
+    def __init__(self) -> None:
+        self.docs: dict[str, dict] = {}
+
+    async def get(self, doc_id: str) -> dict:
+        if doc_id not in self.docs:
+            raise DocumentNotFoundError(doc_id)
+        return dict(self.docs[doc_id])
+
+    async def put(self, doc: dict) -> dict:
+        current = self.docs.get(doc["_id"])
+        if current is not None and current.get("_rev") != doc.get("_rev"):
+            raise ConflictError(doc["_id"])
+        self.docs[doc["_id"]] = {**doc, "_rev": "1-x" if current is None else "2-x"}
+        return {"ok": True}
+
+    async def find(self, selector: dict, fields: list[str] | None = None, limit: int | None = None) -> list[dict]:
+        cutoff = selector["expires_at"]["$lt"]
+        docs = [d for d in self.docs.values() if d.get("type") == selector["type"] and d["expires_at"] < cutoff]
+        return [{name: d[name] for name in fields or d} for d in docs[:limit]]
+
+    async def bulk_docs(self, docs: list[dict]) -> list[dict]:
+        for doc in docs:
+            assert doc["_deleted"] and doc["_rev"] == self.docs[doc["_id"]]["_rev"]
+            del self.docs[doc["_id"]]
+        return [{"ok": True} for _ in docs]
+
+
+class TestNormalizeUrl:
+    def test_strips_tracking_params(self) -> None:
+        url = "https://Shop.Example.com/p/1?utm_source=tg&color=red&gclid=abc&size=M"
+        assert normalize_url(url) == "https://shop.example.com/p/1?color=red&size=M"
+
+    def test_sorts_query_and_drops_fragment(self) -> None:
+        assert normalize_url("https://a.com/x?b=2&a=1#reviews") == "https://a.com/x?a=1&b=2"
+
+    def test_drops_www_default_port_and_trailing_slash(self) -> None:
+        assert normalize_url("HTTPS://www.A.com:443/item/") == "https://a.com/item"
+
+    def test_keeps_non_default_port(self) -> None:
+        assert normalize_url("http://a.com:8080/") == "http://a.com:8080/"
+
+    def test_equivalent_urls_share_key(self) -> None:
+        a = normalize_url("https://www.ozon.ru/product/123/?utm_medium=share&ysclid=1")
+        b = normalize_url("https://ozon.ru/product/123")
+        assert a == b
+
+
+class TestDomainTtls:
+    def test_parse_domain_ttls(self) -> None:
+        assert _parse_domain_ttls("ozon.ru=900, Wildberries.ru=600,bad,x=y") == {
+            "ozon.ru": 900,
+            "wildberries.ru": 600,
+        }
+
+    def test_ttl_for_prefers_host_then_domain(self) -> None:
+        cache = ResolutionCache(default_ttl_s=100, domain_ttls={"ozon.ru": 50, "m.ozon.ru": 10})
+        assert cache.ttl_for("https://www.ozon.ru/p") == 50
+        assert cache.ttl_for("https://m.ozon.ru/p") == 10
+        assert cache.ttl_for("https://example.com/p") == 100
+
+
+class TestResolutionCache:
+    @pytest.mark.anyio
+    async def test_hit_after_set_with_equivalent_url(self) -> None:
+        cache = ResolutionCache()
+        await cache.set("https://shop.example.com/p/1?utm_source=x", RESULT)
+
+        assert await cache.get("https://SHOP.example.com/p/1") == RESULT
+        assert await cache.get("https://shop.example.com/p/2") is None
+
+        metrics = cache.metrics()
+        assert metrics["hits"] == 1
+        assert metrics["misses"] == 1
+        assert metrics["hits_by_domain"] == {"example.com": 1}
+
+    @pytest.mark.anyio
+    async def test_hits_by_domain_keeps_most_recent_domains(self) -> None:
+        cache = ResolutionCache(max_domains=2)
+        for url in ("https://a.com/1", "https://b.com/1", "https://c.com/1"):
+            await cache.set(url, RESULT)
+        await cache.get("https://a.com/1")
+        await cache.get("https://b.com/1")
+        await cache.get("https://a.com/1")
+        await cache.get("https://c.com/1")
+
+        assert cache.metrics()["hits_by_domain"] == {"a.com": 2, "c.com": 1}
+
+    @pytest.mark.anyio
+    async def test_returns_copies(self) -> None:
+        cache = ResolutionCache()
+        await cache.set("https://a.com/1", RESULT)
+        got = await cache.get("https://a.com/1")
+        got["title"] = "mutated"
+        assert (await cache.get("https://a.com/1"))["title"] == "Cached Product"
+
+    @pytest.mark.anyio
+    async def test_lru_eviction(self) -> None:
+        cache = ResolutionCache(max_entries=2)
+        await cache.set("https://a.com/1", RESULT)
+        await cache.set("https://a.com/2", RESULT)
+        await cache.get("https://a.com/1")
+        await cache.set("https://a.com/3", RESULT)
+
+        assert cache.size() == 2
+        assert await cache.get("https://a.com/2") is None
+        assert await cache.get("https://a.com/1") is not None
+
+    @pytest.mark.anyio
+    async def test_entries_expire(self) -> None:
+        cache = ResolutionCache(default_ttl_s=1)
+        await cache.set("https://a.com/1", RESULT)
+        cache._entries["https://a.com/1"] = (0.0, RESULT)
+
+        assert await cache.get("https://a.com/1") is None
+        assert cache.size() == 0
+
+    @pytest.mark.anyio
+    async def test_zero_ttl_domain_is_not_cached(self) -> None:
+        cache = ResolutionCache(domain_ttls={"a.com": 0})
+        await cache.set("https://a.com/1", RESULT)
+        assert cache.size() == 0
+        assert cache.metrics()["stores"] == 0
+
+
+class TestSharedTier:
+    @pytest.mark.anyio
+    async def test_shared_tier_serves_other_instances(self) -> None:
+        store = FakeSharedStore()
+        writer = ResolutionCache(shared=store)  # type: ignore[arg-type]
+        reader = ResolutionCache(shared=store)  # type: ignore[arg-type]
+
+        await writer.set("https://a.com/1", RESULT)
+
+        assert await reader.get("https://a.com/1") == RESULT
+        assert reader.metrics()["shared_hits"] == 1
+        # Promoted into the local tier
+        assert reader.size() == 1
+
+    @pytest.mark.anyio
+    async def test_shared_tier_overwrites_existing_doc(self) -> None:
+        store = FakeSharedStore()
+        cache = ResolutionCache(shared=store)  # type: ignore[arg-type]
+
+        await cache.set("https://a.com/1", RESULT)
+        await cache.set("https://a.com/1", {**RESULT, "title": "Updated"})
+
+        doc = store.docs[ResolutionCache.shared_doc_id("https://a.com/1")]
+        assert doc["result"]["title"] == "Updated"
+
+    @pytest.mark.anyio
+    async def test_shared_tier_ignores_expired_docs(self) -> None:
+        store = FakeSharedStore()
+        key = "https://a.com/1"
+        store.docs[ResolutionCache.shared_doc_id(key)] = {
+            "_id": ResolutionCache.shared_doc_id(key),
+            "url": key,
+            "result": RESULT,
+            "expires_at": (datetime.now(timezone.utc) - timedelta(seconds=1)).isoformat(),
+        }
+        cache = ResolutionCache(shared=store)  # type: ignore[arg-type]
+
+        assert await cache.get(key) is None
+
+
+    @pytest.mark.anyio
+    async def test_image_payloads_are_not_cached(self) -> None:
+        store = FakeSharedStore()
+        cache = ResolutionCache(shared=store)  # type: ignore[arg-type]
+        result = {**RESULT, "image_url": "https://a.com/1.png", "image_base64": "data:image/webp;base64,AAAA"}
+
+        await cache.set("https://a.com/1", {**result, "image_full": {"data": "AAAA"}})
+
+        stored = {**result, "image_base64": None, "image_full": None}
+        assert await cache.get("https://a.com/1") == stored
+        assert store.docs[ResolutionCache.shared_doc_id("https://a.com/1")]["result"] == stored
+
+    @pytest.mark.anyio
+    async def test_expired_docs_are_purged(self) -> None:
+        store = FakeSharedStore()
+        cache = ResolutionCache(shared=store)  # type: ignore[arg-type]
+        await cache.set("https://a.com/1", RESULT)
+        expired_id = ResolutionCache.shared_doc_id("https://a.com/2")
+        store.docs[expired_id] = {
+            "_id": expired_id,
+            "_rev": "1-x",
+            "type": "resolver_cache",
+            "url": "https://a.com/2",
+            "result": RESULT,
+            "expires_at": (datetime.now(timezone.utc) - timedelta(seconds=1)).isoformat(),
+        }
+
+        assert await cache.purge_expired() == 1
+        assert list(store.docs) == [ResolutionCache.shared_doc_id("https://a.com/1")]
+        assert cache.metrics()["purged"] == 1
+
+    @pytest.mark.anyio
+    async def test_purge_runs_on_store_once_per_interval(self) -> None:
+        store = FakeSharedStore()
+        cache = ResolutionCache(shared=store, purge_interval_s=3600)  # type: ignore[arg-type]
+        purges = 0
+
+        async def counting_purge() -> int:
+            nonlocal purges
+            purges += 1
+            return 0
+
+        cache.purge_expired = counting_purge  # type: ignore[method-assign]
+        await cache.set("https://a.com/1", RESULT)
+        await cache.set("https://a.com/2", RESULT)
+
+        assert purges == 1
+
+
+def test_is_cacheable_requires_title() -> None:
+    assert is_cacheable(RESULT)
+    assert not is_cacheable({**RESULT, "title": None})
+
+
+def test_resolve_endpoint_serves_cache_hit() -> None:
+    os.environ["RU_BEARER_TOKEN"] = "ru_secret"
+    os.environ["LLM_MODE"] = "stub"
+    os.environ["SSRF_ALLOWLIST_HOSTS"] = "example.com"
+    app = create_app(fetcher_mode="stub")
+    asyncio.run(app.state.resolution_cache.set("https://example.com/p/1", RESULT))
+    client = TestClient(app)
+
+    r = client.post(
+        "/resolver/v1/resolve",
+        json={"url": "https://example.com/p/1?utm_campaign=x"},
+        headers={"Authorization": "Bearer ru_secret"},
+    )
+
+    assert r.status_code == 200
+    assert r.json() == RESULT
+
+
+def test_resolve_endpoint_fetches_image_on_cache_hit() -> None:
+    os.environ["RU_BEARER_TOKEN"] = "ru_secret"
+    os.environ["LLM_MODE"] = "stub"
+    os.environ["SSRF_ALLOWLIST_HOSTS"] = "example.com"
+    app = create_app(fetcher_mode="stub")
+    asyncio.run(app.state.resolution_cache.set("https://example.com/p/2", {**RESULT, "image_url": "https://example.com/2.webp"}))
+    fetch_image = AsyncMock(return_value=("https://example.com/2.webp", "image/webp", "AAAA"))
+    app.state.fetcher.fetch_image_base64 = fetch_image
+    client = TestClient(app)
+
+    r = client.post(
+        "/resolver/v1/resolve",
+        json={"url": "https://example.com/p/2"},
+        headers={"Authorization": "Bearer ru_secret"},
+    )
+
+    assert r.status_code == 200
+    assert r.json()["image_base64"] == "data:image/webp;base64,AAAA"
+    fetch_image.assert_awaited_once_with(url="https://example.com/2.webp", session_url="https://example.com/p/2")
@@ -1,8 +1,16 @@
+import io
 import os
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from fastapi.testclient import TestClient
+from PIL import Image
 
+from app.fetcher import PlaywrightFetcher
+from app.image_fetch import DirectImageFetcher
+from app.llm import LLMOutput
 from app.main import create_app
+from app.scrape import PageCaptureConfig
 
 
 def test_resolve_stub_mode_returns_shape() -> None:
@@ -29,3 +37,70 @@ def test_resolve_stub_mode_returns_shape() -> None:
         "image_url",
         "image_base64",
     }
+
+
+class FakeImageResponse:
+    status = 200
+    url = "https://example.com/p.png"
+
+    def __init__(self) -> None:
+        buf = io.BytesIO()
+        Image.new("RGB", (40, 30), (200, 10, 10)).save(buf, format="PNG")
+        self.headers = {"content-type": "image/png"}
+        self._body = buf.getvalue()
+
+    async def body(self) -> bytes:
+        return self._body
+
+    async def dispose(self) -> None:
+        pass
+
+
+class FakeLLM:
+    async def extract(self, **_kwargs) -> LLMOutput:
+        return LLMOutput(title="Lamp", image_url="/p.png", confidence=0.9)
+
+
+def test_resolve_downloads_image_directly() -> None:
+    """The Playwright path downloads the product image instead of opening and screenshotting it."""
+    page = MagicMock()
+    page.screenshot = AsyncMock(return_value=b"page-shot")
+    page.close = AsyncMock()
+    context = MagicMock()
+    context.new_page = AsyncMock(return_value=page)
+    context.storage_state = AsyncMock()
+    context.request.get = AsyncMock(return_value=FakeImageResponse())
+    manager = MagicMock()
+    manager.semaphore = AsyncMock()
+    manager.acquire_context = AsyncMock(return_value=context)
+    manager.release_context = AsyncMock()
+
+    env = {"RU_BEARER_TOKEN": "ru_secret", "SSRF_ALLOWLIST_HOSTS": "example.com", "RESOLUTION_CACHE_ENABLED": "false"}
+    html = "<html><body><h1>Lamp</h1></body></html>"
+    with patch.dict(os.environ, env), patch(
+        "app.main.capture_page_source", AsyncMock(return_value=("https://example.com/lamp", "Lamp", html))
+    ):
+        app = create_app(fetcher_mode="stub")
+        app.state.fetcher = PlaywrightFetcher(
+            manager=manager,
+            browser=MagicMock(),
+            storage_state_dir=Path("/tmp"),
+            cfg=PageCaptureConfig(),
+            image_fetcher=DirectImageFetcher(),
+        )
+        app.state.llm_client = FakeLLM()
+        r = TestClient(app).post(
+            "/resolver/v1/resolve",
+            json={"url": "https://example.com/lamp"},
+            headers={"Authorization": "Bearer ru_secret"},
+        )
+
+    assert r.status_code == 200
+    body = r.json()
+    assert body["image_url"] == "https://example.com/p.png"
+    assert body["image_base64"].startswith("data:image/webp;base64,")
+    assert context.request.get.await_args.kwargs["headers"]["Referer"] == "https://example.com/lamp"
+    # Only the product page was opened; the image was never navigated to or screenshotted
+    context.new_page.assert_awaited_once()
+    page.screenshot.assert_awaited_once_with(full_page=False, type="jpeg", quality=75)
+    manager.release_context.assert_awaited_once_with(context)
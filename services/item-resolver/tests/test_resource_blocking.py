@@ -0,0 +1,177 @@
+"""Unit tests for resource blocking during page capture.
+
+Tests cover:
+- Default type and tracker-host blocking
+- Per-domain allow/deny overrides
+- Route handler wiring and stats
+- Environment configuration
+"""
+
+from __future__ import annotations
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from app.resource_blocking import (
+    DEFAULT_BLOCKED_TYPES,
+    ResourceBlocker,
+    _host_matches,
+    load_resource_blocker_from_env,
+)
+
+
+class FakeRequest:
+    def __init__(self, resource_type: str, url: str) -> None:
+        self.resource_type = resource_type
+        self.url = url
+
+
+class FakeRoute:
+    def __init__(self) -> None:
+        self.outcome: str | None = None
+
+    async def continue_(self) -> None:
+        self.outcome = "continued"
+
+    async def abort(self, error_code: str) -> None:
+        self.outcome = f"aborted:{error_code}"
+
+
+class FakeRoutedContext:
+    def __init__(self) -> None:
+        self.routes: list = []
+
+    async def route(self, pattern: str, handler) -> None:
+        self.routes.append((pattern, handler))
+
+
+def test_host_matches_subdomains_only() -> None:
+    hosts = frozenset({"doubleclick.net"})
+    assert _host_matches("doubleclick.net", hosts)
+    assert _host_matches("stats.g.doubleclick.net", hosts)
+    assert not _host_matches("notdoubleclick.net", hosts)
+
+
+class TestSiteRules:
+    def test_default_rules(self) -> None:
+        rules = ResourceBlocker().rules_for("https://www.ozon.ru/product/1")
+
+        assert rules.block_reason("font", "https://cdn.ozon.ru/a.woff2") == "type"
+        assert rules.block_reason("media", "https://cdn.ozon.ru/v.mp4") == "type"
+        assert rules.block_reason("script", "https://mc.yandex.ru/metrika/tag.js") == "tracker"
+        assert rules.block_reason("script", "https://cdn.ozon.ru/app.js") is None
+        assert rules.block_reason("image", "https://cdn.ozon.ru/p.jpg") is None
+
+    def test_documents_are_never_blocked(self) -> None:
+        blocker = ResourceBlocker(domain_rules={"example.com": {"deny_types": ["document"]}})
+        rules = blocker.rules_for("https://example.com/")
+        assert rules.block_reason("document", "https://www.googletagmanager.com/ns.html") is None
+
+    def test_domain_overrides(self) -> None:
+        blocker = ResourceBlocker(
+            domain_rules={
+                "ozon.ru": {"allow_types": ["font"], "deny_types": ["image"], "allow_hosts": ["mc.yandex.ru"]},
+                "wildberries.ru": {"deny_hosts": ["ads.wb.ru"]},
+            }
+        )
+        ozon = blocker.rules_for("https://m.ozon.ru/p/1")
+        assert ozon.block_reason("font", "https://cdn.ozon.ru/a.woff2") is None
+        assert ozon.block_reason("image", "https://cdn.ozon.ru/p.jpg") == "type"
+        assert ozon.block_reason("script", "https://mc.yandex.ru/metrika/tag.js") is None
+
+        wb = blocker.rules_for("https://www.wildberries.ru/catalog/1")
+        assert wb.block_reason("xhr", "https://ads.wb.ru/v1/ad") == "tracker"
+        # Overrides do not leak to other sites
+        assert blocker.rules_for("https://example.com/").block_reason("font", "https://example.com/a.woff") == "type"
+
+
+    def test_resolved_rules_and_site_counts_are_bounded(self) -> None:
+        blocker = ResourceBlocker(max_sites=2)
+        for site in ("a.com", "b.com", "a.com", "c.com"):
+            rules = blocker.rules_for(f"https://{site}/")
+            blocker.stats.record(site, "font", rules.block_reason("font", f"https://{site}/f.woff"))
+
+        assert list(blocker._resolved) == ["a.com", "c.com"]
+        assert blocker.metrics()["blocked_by_site"] == {"a.com": 2, "c.com": 1}
+
+
+class TestInstall:
+    @pytest.mark.anyio
+    async def test_route_handler_blocks_and_counts(self) -> None:
+        blocker = ResourceBlocker()
+        ctx = FakeRoutedContext()
+        await blocker.install(ctx, "https://www.ozon.ru/product/1")
+
+        pattern, handler = ctx.routes[0]
+        assert pattern == "**/*"
+
+        blocked, allowed = FakeRoute(), FakeRoute()
+        await handler(blocked, FakeRequest("font", "https://cdn.ozon.ru/a.woff2"))
+        await handler(allowed, FakeRequest("script", "https://cdn.ozon.ru/app.js"))
+
+        assert blocked.outcome == "aborted:blockedbyclient"
+        assert allowed.outcome == "continued"
+        metrics = blocker.metrics()
+        assert metrics["blocked"] == 1
+        assert metrics["allowed"] == 1
+        assert metrics["blocked_by_type"] == {"font": 1}
+        assert metrics["blocked_by_site"] == {"ozon.ru": 1}
+
+    @pytest.mark.anyio
+    async def test_new_context_installs_blocker(self) -> None:
+        from app.browser_manager import new_context
+
+        class FakeBrowser:
+            async def new_context(self, **_kwargs):
+                return FakeContextWithRoutes()
+
+        class FakeContextWithRoutes(FakeRoutedContext):
+            async def add_init_script(self, _script: str) -> None:
+                pass
+
+            async def set_extra_http_headers(self, _headers) -> None:
+                pass
+
+            async def add_cookies(self, _cookies) -> None:
+                pass
+
+            async def grant_permissions(self, _perms, origin: str) -> None:
+                pass
+
+        ctx = await new_context(FakeBrowser(), "https://ozon.ru/p", blocker=ResourceBlocker())  # type: ignore[arg-type]
+        assert len(ctx.routes) == 1
+
+
+class TestLoadFromEnv:
+    def test_defaults(self) -> None:
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("RESOURCE_BLOCK_TYPES", None)
+            os.environ.pop("RESOURCE_BLOCKING_ENABLED", None)
+            blocker = load_resource_blocker_from_env()
+        assert blocker is not None
+        assert blocker.blocked_types == DEFAULT_BLOCKED_TYPES
+
+    def test_disabled(self) -> None:
+        with patch.dict(os.environ, {"RESOURCE_BLOCKING_ENABLED": "false"}):
+            assert load_resource_blocker_from_env() is None
+
+    def test_custom_types_hosts_and_rules(self) -> None:
+        env = {
+            "RESOURCE_BLOCK_TYPES": "font, image",
+            "RESOURCE_BLOCK_HOSTS": "ads.example.net",
+            "RESOURCE_BLOCKING_RULES": '{"ozon.ru": {"allow_types": ["image"]}}',
+        }
+        with patch.dict(os.environ, env):
+            blocker = load_resource_blocker_from_env()
+        assert blocker is not None
+        assert blocker.blocked_types == frozenset({"font", "image"})
+        assert "ads.example.net" in blocker.tracker_hosts
+        assert blocker.rules_for("https://ozon.ru/").block_reason("image", "https://ozon.ru/a.png") is None
+
+    def test_invalid_rules_are_ignored(self) -> None:
+        with patch.dict(os.environ, {"RESOURCE_BLOCKING_RULES": "{not json"}):
+            blocker = load_resource_blocker_from_env()
+        assert blocker is not None
+        assert blocker.domain_rules == {}
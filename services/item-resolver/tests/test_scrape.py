@@ -1,6 +1,6 @@
 """Unit tests for scrape module.
 
-Tests cover pure functions only (no Playwright integration):
+Tests cover pure functions and fake-page helpers (no Playwright integration):
 - safe_host() - hostname sanitization
 - registrable_domain() - eTLD+1 extraction
 - looks_like_interstitial_or_challenge() - challenge page detection
@@ -9,10 +9,12 @@ Tests cover pure functions only (no Playwright integration):
 - PageCaptureConfig - configuration dataclass
 - _challenge_title_patterns() - challenge pattern list
 - dismiss_common_popups patterns - popup button/close selector patterns
+- wait_for_page_quiet() - in-page readiness signal plus in-flight requests
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 from pathlib import Path
@@ -21,6 +23,7 @@ from typing import TYPE_CHECKING
 import pytest
 
 from app.scrape import (
+    READINESS_INIT_SCRIPT,
     PageCaptureConfig,
     _challenge_title_patterns,
     _state_merge,
@@ -28,6 +31,7 @@ from app.scrape import (
     registrable_domain,
     safe_host,
     storage_state_path,
+    wait_for_page_quiet,
 )
 
 if TYPE_CHECKING:
@@ -403,6 +407,10 @@ class TestPageCaptureConfig:
         assert cfg.timeout_ms == 90_000
         assert cfg.wait_until == "load"
 
+    def test_dom_quiet_ms_matches_sampling_window(self) -> None:
+        cfg = PageCaptureConfig(dom_sample_interval_ms=400, dom_stable_samples=4)
+        assert cfg.dom_quiet_ms == 1_600
+
     def test_page_capture_config_frozen(self) -> None:
         """Config is frozen (immutable)."""
         cfg = PageCaptureConfig()
@@ -570,3 +578,95 @@ class TestStorageStateIntegration:
         # Should have both cookies merged
         cookie_names = {c["name"] for c in merged["cookies"]}
         assert "session" in cookie_names or "tracking" in cookie_names
+
+
+# ---------------------------------------------------------------------------
+# wait_for_page_quiet() Tests
+# ---------------------------------------------------------------------------
+
+
+class FakeReadyPage:
+    """Page whose in-page readiness promise resolves immediately."""
+
+    def __init__(self, *, installed: bool = True, results: list[dict] | None = None) -> None:
+        self.installed = installed
+        self.results = list(results or [{"network_ms": 120.0, "dom_ms": 80.0, "dom_idle_ms": 1500.0}])
+        self.handlers: dict[str, list] = {}
+        self.wait_calls = 0
+        self.injected = False
+        self.before_wait = None
+
+    def on(self, event: str, handler) -> None:
+        self.handlers.setdefault(event, []).append(handler)
+
+    def remove_listener(self, event: str, handler) -> None:
+        self.handlers[event].remove(handler)
+
+    def emit(self, event: str) -> None:
+        for handler in list(self.handlers.get(event, [])):
+            handler(object())
+
+    async def evaluate(self, expression: str, arg=None):
+        if expression == READINESS_INIT_SCRIPT:
+            self.injected = True
+            self.installed = True
+            return None
+        if "!!window.__ruReadiness" in expression:
+            return self.installed
+        self.wait_calls += 1
+        if self.before_wait is not None:
+            self.before_wait(self)
+        result = self.results.pop(0) if len(self.results) > 1 else self.results[0]
+        return {"timed_out": False, "resources": 3, "mutations": 7, **result}
+
+
+class TestWaitForPageQuiet:
+    @pytest.mark.anyio
+    async def test_resolves_from_single_in_page_promise(self) -> None:
+        page = FakeReadyPage()
+        ready = await wait_for_page_quiet(page, network_quiet_ms=2000, dom_quiet_ms=1500, timeout_ms=5000)
+
+        assert page.wait_calls == 1
+        assert ready.timed_out is False
+        assert ready.network_ms == pytest.approx(120.0, abs=50)
+        assert ready.dom_idle_ms == 1500.0
+        assert ready.mutations == 7
+        # Listeners are cleaned up
+        assert all(not handlers for handlers in page.handlers.values())
+
+    @pytest.mark.anyio
+    async def test_injects_script_when_missing(self) -> None:
+        page = FakeReadyPage(installed=False)
+        await wait_for_page_quiet(page, network_quiet_ms=100, dom_quiet_ms=100, timeout_ms=1000)
+        assert page.injected is True
+
+    @pytest.mark.anyio
+    async def test_waits_for_in_flight_requests_then_rechecks(self) -> None:
+        page = FakeReadyPage()
+
+        def start_request(p: FakeReadyPage) -> None:
+            if p.wait_calls == 1:
+                p.emit("request")
+                asyncio.get_running_loop().call_later(0.05, p.emit, "requestfinished")
+
+        page.before_wait = start_request
+        ready = await wait_for_page_quiet(page, network_quiet_ms=100, dom_quiet_ms=100, timeout_ms=2000)
+
+        assert page.wait_calls == 2
+        assert ready.timed_out is False
+
+    @pytest.mark.anyio
+    async def test_times_out_on_request_that_never_finishes(self) -> None:
+        page = FakeReadyPage()
+        page.before_wait = lambda p: p.emit("request")
+        ready = await wait_for_page_quiet(page, network_quiet_ms=100, dom_quiet_ms=100, timeout_ms=100)
+        assert ready.timed_out is True
+
+    @pytest.mark.anyio
+    async def test_gives_up_after_repeated_evaluate_failures(self) -> None:
+        class BrokenPage(FakeReadyPage):
+            async def evaluate(self, expression: str, arg=None):
+                raise RuntimeError("Execution context was destroyed")
+
+        ready = await wait_for_page_quiet(BrokenPage(), network_quiet_ms=100, dom_quiet_ms=100, timeout_ms=1000)
+        assert ready.timed_out is False
@@ -0,0 +1,91 @@
+"""Unit tests for single-flight deduplication."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    @pytest.mark.anyio
+    async def test_concurrent_callers_share_one_call(self) -> None:
+        flights = SingleFlight()
+        calls = 0
+
+        async def work() -> dict:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            return {"title": "Shared"}
+
+        results = await asyncio.gather(*(flights.do("k", work) for _ in range(5)))
+
+        assert calls == 1
+        assert all(r == {"title": "Shared"} for r in results)
+        assert flights.metrics() == {"in_flight": 0, "leaders": 1, "deduplicated": 4}
+
+    @pytest.mark.anyio
+    async def test_different_keys_run_separately(self) -> None:
+        flights = SingleFlight()
+        calls: list[str] = []
+
+        async def work(key: str) -> str:
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return key
+
+        results = await asyncio.gather(flights.do("a", lambda: work("a")), flights.do("b", lambda: work("b")))
+
+        assert results == ["a", "b"]
+        assert sorted(calls) == ["a", "b"]
+
+    @pytest.mark.anyio
+    async def test_sequential_calls_are_not_deduplicated(self) -> None:
+        flights = SingleFlight()
+        calls = 0
+
+        async def work() -> int:
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert await flights.do("k", work) == 1
+        assert await flights.do("k", work) == 2
+        assert flights.in_flight() == 0
+
+    @pytest.mark.anyio
+    async def test_exception_propagates_to_all_callers(self) -> None:
+        flights = SingleFlight()
+
+        async def work() -> None:
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(*(flights.do("k", work) for _ in range(3)), return_exceptions=True)
+
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flights.in_flight() == 0
+
+    @pytest.mark.anyio
+    async def test_leader_cancellation_does_not_cancel_followers(self) -> None:
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def work() -> str:
+            await release.wait()
+            return "done"
+
+        leader = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        release.set()
+
+        assert await follower == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await leader
@@ -0,0 +1,229 @@
+"""Unit tests for the structured data fast path.
+
+Tests cover:
+- Price and currency parsing
+- JSON-LD, microdata and OpenGraph extraction
+- Fallback to the LLM on missing, conflicting or low-confidence data
+- Per-domain metrics
+- Environment configuration
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from app.html_preprocessor import preprocess_html
+from app.structured_data import (
+    StructuredExtractor,
+    load_structured_extractor_from_env,
+    normalize_currency,
+    parse_price,
+)
+
+
+def _jsonld(product: dict) -> str:
+    return f'<script type="application/ld+json">{json.dumps(product, ensure_ascii=False)}</script>'
+
+
+PRODUCT = {
+    "@context": "https://schema.org",
+    "@type": "Product",
+    "name": "Смартфон Example X",
+    "description": "128 ГБ, чёрный",
+    "image": ["https://cdn.example.com/x.jpg"],
+    "offers": {"@type": "Offer", "price": "93499", "priceCurrency": "RUB"},
+}
+
+OG_TAGS = (
+    '<meta property="og:title" content="Смартфон Example X">'
+    '<meta property="og:image" content="https://cdn.example.com/x.jpg">'
+    '<meta property="product:price:amount" content="93499">'
+    '<meta property="product:price:currency" content="RUB">'
+)
+
+
+def _page(head: str, body: str = '<div class="price">93&nbsp;499 ₽</div>') -> str:
+    return f"<html><head>{head}</head><body><h1>Смартфон Example X</h1>{body}</body></html>"
+
+
+class TestParsing:
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            ("93 499", 93499.0),
+            ("93 499 ₽", 93499.0),
+            ("1.299,00", 1299.0),
+            ("1,299.00", 1299.0),
+            ("12,5", 12.5),
+            ("1,299", 1299.0),
+            (93499, 93499.0),
+            (0, None),
+            ("", None),
+            ("бесплатно", None),
+            (True, None),
+        ],
+    )
+    def test_parse_price(self, value, expected) -> None:
+        assert parse_price(value) == expected
+
+    @pytest.mark.parametrize(
+        "value, expected",
+        [("rub", "RUB"), ("₽", "RUB"), ("RUR", "RUB"), ("$", "USD"), ("руб.", "RUB"), ("dollars", None), (None, None)],
+    )
+    def test_normalize_currency(self, value, expected) -> None:
+        assert normalize_currency(value) == expected
+
+
+class TestEvaluate:
+    def test_complete_jsonld_with_visible_price_is_a_hit(self) -> None:
+        result = StructuredExtractor().evaluate(_page(_jsonld(PRODUCT)), url="https://shop.example.com/p/1")
+
+        assert result.reason == "ok"
+        assert result.sources == ["jsonld"]
+        out = result.output
+        assert out is not None
+        assert out.title == "Смартфон Example X"
+        assert out.description == "128 ГБ, чёрный"
+        assert out.price_amount == 93499.0
+        assert out.price_currency == "RUB"
+        assert out.image_url == "https://cdn.example.com/x.jpg"
+        assert out.canonical_url == "https://shop.example.com/p/1"
+        assert out.confidence == pytest.approx(0.8)
+
+    def test_agreeing_sources_raise_confidence(self) -> None:
+        html = _page(_jsonld(PRODUCT) + OG_TAGS + '<link rel="canonical" href="/p/1-canonical">')
+        result = StructuredExtractor().evaluate(html, url="https://shop.example.com/p/1?utm=x")
+
+        assert result.output is not None
+        assert result.confidence == pytest.approx(0.9)
+        assert result.output.canonical_url == "https://shop.example.com/p/1-canonical"
+
+    def test_jsonld_inside_graph_is_found(self) -> None:
+        html = _page(_jsonld({"@graph": [{"@type": "BreadcrumbList"}, PRODUCT]}))
+        assert StructuredExtractor().evaluate(html, url="https://shop.example.com/p/1").output is not None
+
+    def test_price_not_shown_on_page_falls_back(self) -> None:
+        result = StructuredExtractor().evaluate(_page(_jsonld(PRODUCT), body=""), url="https://shop.example.com/p/1")
+        assert result.output is None
+        assert result.reason == "low_confidence"
+        assert result.confidence == pytest.approx(0.7)
+
+    def test_price_only_in_scripts_is_not_visible(self) -> None:
+        body = '<script>window.state = {"price": "93 499"};</script>'
+        result = StructuredExtractor().evaluate(_page(_jsonld(PRODUCT), body=body), url="https://shop.example.com/p/1")
+        assert result.reason == "low_confidence"
+
+    def test_reuses_the_callers_preprocessed_page(self) -> None:
+        html = _page(_jsonld(PRODUCT))
+        preprocessed = preprocess_html(html, base_url="https://shop.example.com/p/1")
+
+        with patch("app.structured_data.preprocess_html") as rescan:
+            result = StructuredExtractor().evaluate(html, url="https://shop.example.com/p/1", preprocessed=preprocessed)
+
+        rescan.assert_not_called()
+        assert result.reason == "ok"
+
+    def test_conflicting_prices_fall_back(self) -> None:
+        og = OG_TAGS.replace('content="93499"', 'content="89999"')
+        result = StructuredExtractor().evaluate(_page(_jsonld(PRODUCT) + og), url="https://shop.example.com/p/1")
+        assert result.output is None
+        assert result.reason == "price_conflict"
+
+    def test_conflicting_currencies_fall_back(self) -> None:
+        og = OG_TAGS.replace('content="RUB"', 'content="USD"')
+        result = StructuredExtractor().evaluate(_page(_jsonld(PRODUCT) + og), url="https://shop.example.com/p/1")
+        assert result.reason == "currency_conflict"
+
+    def test_missing_image_falls_back(self) -> None:
+        product = {k: v for k, v in PRODUCT.items() if k != "image"}
+        result = StructuredExtractor().evaluate(_page(_jsonld(product)), url="https://shop.example.com/p/1")
+        assert result.output is None
+        assert result.reason == "missing_image"
+
+    def test_multiple_offer_prices_lower_confidence(self) -> None:
+        product = dict(PRODUCT, offers=[{"price": 93499, "priceCurrency": "RUB"}, {"price": 97999, "priceCurrency": "RUB"}])
+        result = StructuredExtractor().evaluate(_page(_jsonld(product)), url="https://shop.example.com/p/1")
+        assert result.output is None
+        assert result.reason == "low_confidence"
+
+    def test_opengraph_alone_is_not_enough(self) -> None:
+        result = StructuredExtractor().evaluate(_page(OG_TAGS), url="https://shop.example.com/p/1")
+        assert result.sources == ["opengraph"]
+        assert result.output is None
+        assert result.reason == "low_confidence"
+
+    def test_microdata_hit(self) -> None:
+        body = (
+            '<div itemscope itemtype="https://schema.org/Product">'
+            '<span itemprop="name">Смартфон Example X</span>'
+            '<img itemprop="image" src="/img/x.jpg">'
+            '<div itemprop="offers" itemscope itemtype="https://schema.org/Offer">'
+            '<span itemprop="price" content="93499">93 499</span>'
+            '<meta itemprop="priceCurrency" content="RUB">'
+            "</div></div>"
+        )
+        html = _page(OG_TAGS, body=body)
+        result = StructuredExtractor().evaluate(html, url="https://shop.example.com/p/1")
+
+        assert result.sources == ["microdata", "opengraph"]
+        assert result.output is not None
+        assert result.output.image_url == "https://shop.example.com/img/x.jpg"
+
+    def test_page_without_structured_data(self) -> None:
+        result = StructuredExtractor().evaluate("<html><body>hello</body></html>", url="https://shop.example.com/")
+        assert result.reason == "no_structured_data"
+
+    def test_invalid_jsonld_is_ignored(self) -> None:
+        html = _page('<script type="application/ld+json">{not json</script>')
+        assert StructuredExtractor().evaluate(html, url="https://shop.example.com/").output is None
+
+
+class TestExtract:
+    def test_counts_hits_and_misses_per_domain(self) -> None:
+        extractor = StructuredExtractor()
+        assert extractor.extract(_page(_jsonld(PRODUCT)), url="https://www.shop.example.com/p/1") is not None
+        assert extractor.extract(_page(OG_TAGS), url="https://m.shop.example.com/p/2") is None
+        assert extractor.extract("<html></html>", url="https://other.ru/p") is None
+
+        metrics = extractor.metrics()
+        assert metrics["hits"] == 1
+        assert metrics["misses"] == 2
+        assert metrics["miss_reasons"] == {"low_confidence": 1, "no_structured_data": 1}
+        assert metrics["by_domain"]["example.com"] == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+        assert metrics["by_domain"]["other.ru"]["hits"] == 0
+
+    def test_per_domain_counts_are_capped(self) -> None:
+        extractor = StructuredExtractor(max_domains=2)
+        extractor.extract("<html></html>", url="https://a.com/p")
+        extractor.extract("<html></html>", url="https://b.com/p")
+        extractor.extract("<html></html>", url="https://a.com/q")
+        extractor.extract("<html></html>", url="https://c.com/p")
+
+        metrics = extractor.metrics()
+        assert set(metrics["by_domain"]) == {"a.com", "c.com"}
+        assert metrics["by_domain"]["a.com"]["misses"] == 2
+        assert metrics["misses"] == 4
+
+    def test_min_confidence_is_configurable(self) -> None:
+        extractor = StructuredExtractor(min_confidence=0.6)
+        assert extractor.extract(_page(_jsonld(PRODUCT), body=""), url="https://shop.example.com/p/1") is not None
+
+
+class TestFromEnv:
+    def test_enabled_by_default(self) -> None:
+        with patch.dict(os.environ, {}, clear=True):
+            extractor = load_structured_extractor_from_env()
+        assert extractor is not None
+        assert extractor.min_confidence == 0.8
+
+    def test_can_be_disabled(self) -> None:
+        with patch.dict(os.environ, {"STRUCTURED_FAST_PATH_ENABLED": "false"}, clear=True):
+            assert load_structured_extractor_from_env() is None
+
+    def test_min_confidence_from_env(self) -> None:
+        with patch.dict(os.environ, {"STRUCTURED_FAST_PATH_MIN_CONFIDENCE": "0.9"}, clear=True):
+            assert load_structured_extractor_from_env().min_confidence == 0.9